@@ -0,0 +1,178 @@
+"""
+Apify Result Folders
+Resolves and creates the platform folder that stores the posts of one Apify run.
+Runs are routed through track_accounts' ResultFolderRoute table; folder names
+are only used to recover runs started before routes were recorded.
+"""
+
+import logging
+
+from django.apps import apps
+from django.db.models import Q
+
+from track_accounts.folder_routing import folder_route_service
+
+logger = logging.getLogger(__name__)
+
+# Platform key -> (platform app label, display label)
+PLATFORM_FOLDER_APPS = {
+    'instagram': ('instagram_data', 'Instagram'),
+    'facebook': ('facebook_data', 'Facebook'),
+    'tiktok': ('tiktok_data', 'TikTok'),
+    'linkedin': ('linkedin_data', 'LinkedIn'),
+}
+
+# Platforms whose run folders are linked to a unified job folder in Data Storage
+LINKED_JOB_FOLDER_PLATFORMS = {'instagram', 'facebook'}
+
+
+def platform_folder_model(platform):
+    app_label, _ = PLATFORM_FOLDER_APPS[platform]
+    return apps.get_model(app_label, 'Folder')
+
+
+def run_folder_name(scraper_request, default_name):
+    """Content folder name: source folder names + run start time"""
+    from track_accounts.models import SourceFolder
+
+    batch_job = scraper_request.batch_job
+
+    # Get source folder names
+    source_folder_names = []
+    if batch_job.source_folder_ids:
+        source_folders = SourceFolder.objects.filter(id__in=batch_job.source_folder_ids)
+        source_folder_names = [sf.name for sf in source_folders]
+
+    # Create folder name with source folder names + date/time
+    if source_folder_names:
+        folder_base_name = ", ".join(source_folder_names)
+    else:
+        folder_base_name = default_name
+
+    # Format: "Brand Sources - 06/10/2025 14:00:00"
+    return f"{folder_base_name} - {scraper_request.started_at.strftime('%d/%m/%Y %H:%M:%S')}"
+
+
+def run_source_username(scraper_request):
+    """Account name of the run's target, e.g. 'nike' for https://www.instagram.com/nike/"""
+    target_url = (scraper_request.target_url or '').rstrip('/')
+    return target_url.split('/')[-1] if target_url else ''
+
+
+def recorded_job_folder_id(scraper_request, platform):
+    """
+    Job folder id recorded for the run: on its result route once the run has
+    started, otherwise in the batch job's platform_params ('job_folder_ids'
+    per platform, or a single 'job_folder_id')
+    """
+    route = folder_route_service.resolve('apify', scraper_request.request_id)
+    if route and route.unified_job_folder_id:
+        return route.unified_job_folder_id
+
+    platform_params = scraper_request.batch_job.platform_params or {}
+    job_folder_ids = platform_params.get('job_folder_ids') or {}
+    return job_folder_ids.get(platform) or platform_params.get('job_folder_id')
+
+
+def find_unified_job_folder(scraper_request, platform):
+    """
+    Job folder a run's platform folder links to, resolved by the id recorded
+    for the run. Runs without one fall back to the platform's job folder whose
+    name is exactly the run's source account (e.g. 'Instagram - nike'); no
+    folder is linked otherwise.
+    """
+    from track_accounts.models import UnifiedRunFolder
+
+    _, label = PLATFORM_FOLDER_APPS[platform]
+    job_folders = UnifiedRunFolder.objects.filter(
+        project_id=scraper_request.batch_job.project_id,
+        folder_type='job',
+    )
+
+    job_folder_id = recorded_job_folder_id(scraper_request, platform)
+    if job_folder_id:
+        return job_folders.filter(id=job_folder_id).first()
+
+    # Legacy runs: exact name match only, never a substring of another account
+    username = run_source_username(scraper_request)
+    if not username:
+        return None
+    return job_folders.filter(
+        # Older job folders carry the platform only in their name
+        Q(platform_code=platform) | Q(platform_code__isnull=True)
+    ).filter(
+        Q(name__iexact=f"{label} - {username}") | Q(name__iexact=username)
+    ).order_by('-created_at').first()
+
+
+def resolve_run_folder(scraper_request, platform):
+    """Existing platform folder of an Apify run, or None"""
+    folder_model = platform_folder_model(platform)
+
+    route = folder_route_service.resolve('apify', scraper_request.request_id)
+    if route and route.platform_folder_id:
+        folder = folder_model.objects.filter(id=route.platform_folder_id).first()
+        if folder:
+            return folder
+
+    # Runs started before routes were recorded are found by their folder name
+    if not scraper_request.started_at:
+        return None
+    _, label = PLATFORM_FOLDER_APPS[platform]
+    folder = folder_model.objects.filter(
+        name=run_folder_name(scraper_request, f"{label} Scrape"),
+        project_id=scraper_request.batch_job.project_id,
+    ).first()
+    if folder:
+        register_run_folder(scraper_request, platform, folder)
+    return folder
+
+
+def get_or_create_run_folder(scraper_request, platform):
+    """Platform folder of an Apify run, created (and routed) on first use"""
+    folder = resolve_run_folder(scraper_request, platform)
+    if folder:
+        return folder
+
+    _, label = PLATFORM_FOLDER_APPS[platform]
+    project_id = scraper_request.batch_job.project_id
+    defaults = {
+        'description': f'Results from Apify run {scraper_request.request_id}',
+        'category': 'posts',
+        'folder_type': 'content',
+    }
+    unified_job_folder = None
+    if platform in LINKED_JOB_FOLDER_PLATFORMS:
+        unified_job_folder = defaults['unified_job_folder'] = find_unified_job_folder(scraper_request, platform)
+
+    folder, created = platform_folder_model(platform).objects.get_or_create(
+        name=run_folder_name(scraper_request, f"{label} Scrape"),
+        project_id=project_id,
+        defaults=defaults
+    )
+
+    if created:
+        logger.info(f"✓ Created new {label} folder: {folder.name} (ID: {folder.id})")
+    else:
+        logger.info(f"✓ Using existing {label} folder: {folder.name} (ID: {folder.id})")
+
+    # Link an existing folder that was created before its job folder existed
+    if not created and unified_job_folder and not folder.unified_job_folder_id:
+        folder.unified_job_folder = unified_job_folder
+        folder.save(update_fields=['unified_job_folder'])
+        logger.info(f"✓ Linked existing folder {folder.id} to unified job folder {unified_job_folder.id}")
+
+    register_run_folder(scraper_request, platform, folder)
+    return folder
+
+
+def register_run_folder(scraper_request, platform, folder):
+    """Record the (apify, run id) -> folder route"""
+    return folder_route_service.register(
+        'apify',
+        scraper_request.request_id,
+        platform_code=platform,
+        project_id=scraper_request.batch_job.project_id,
+        platform_folder_id=folder.id,
+        unified_job_folder_id=folder.unified_job_folder_id,
+    )
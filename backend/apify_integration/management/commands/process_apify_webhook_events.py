@@ -0,0 +1,28 @@
+"""
+Management command to replay Apify webhook events that were never processed
+
+Scheduled every five minutes by the apify-webhook-recovery cron in .upsun/config.yaml.
+
+Usage:
+    python manage.py process_apify_webhook_events --older-than 5
+"""
+
+from django.core.management.base import BaseCommand
+
+from apify_integration.tasks import apify_webhook_queue
+
+
+class Command(BaseCommand):
+    help = 'Process Apify webhook events left pending or abandoned by a restarted or crashed worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=5,
+            help='Only replay events untouched for more than N minutes (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        processed = apify_webhook_queue.recover_pending(older_than_minutes=options['older_than'])
+        self.stdout.write(self.style.SUCCESS(f'Processed {processed} pending webhook event(s)'))
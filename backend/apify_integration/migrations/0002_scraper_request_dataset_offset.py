@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-19 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apify_integration', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apifyscraperrequest',
+            name='dataset_id',
+            field=models.CharField(blank=True, help_text='Default dataset of the actor run', max_length=255, null=True),
+        ),
+        migrations.AddField(
+            model_name='apifyscraperrequest',
+            name='results_offset',
+            field=models.PositiveIntegerField(default=0, help_text='Dataset items already stored; ingestion resumes here'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apify_integration', '0002_scraper_request_dataset_offset'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='apifywebhookevent',
+            index=models.Index(fields=['status', 'created_at'], name='apify_integ_status_8fe3e0_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 18:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('apify_integration', '0003_webhook_event_status_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='apifywebhookevent',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='apifywebhookevent',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='apifywebhookevent',
+            index=models.Index(fields=['status', 'updated_at'], name='apify_integ_status_fa53a1_idx'),
+        ),
+    ]
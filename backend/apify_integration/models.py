@@ -87,6 +87,8 @@ class ApifyScraperRequest(models.Model):
     source_name = models.CharField(max_length=200)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     request_id = models.CharField(max_length=255, blank=True, null=True)
+    dataset_id = models.CharField(max_length=255, blank=True, null=True, help_text="Default dataset of the actor run")
+    results_offset = models.PositiveIntegerField(default=0, help_text="Dataset items already stored; ingestion resumes here")
     error_message = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -132,13 +134,19 @@ class ApifyWebhookEvent(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
     platform = models.CharField(max_length=50, blank=True)
     raw_data = models.JSONField(default=dict)
+    attempts = models.PositiveSmallIntegerField(default=0)
     processed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # heartbeat while processing
 
     class Meta:
         verbose_name = "Apify Webhook Event"
         verbose_name_plural = "Apify Webhook Events"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['status', 'updated_at']),
+        ]
 
     def __str__(self):
         return f"Webhook {self.run_id} - {self.status}"
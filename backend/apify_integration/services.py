@@ -12,6 +12,7 @@ from typing import Optional, Dict, Any, List
 from django.conf import settings
 from django.utils import timezone
 
+from .folders import PLATFORM_FOLDER_APPS, get_or_create_run_folder
 from .models import ApifyConfig, ApifyBatchJob, ApifyScraperRequest
 
 logger = logging.getLogger(__name__)
@@ -377,6 +378,7 @@ class ApifyAutomatedBatchScraper:
                 scraper_request.save()
                 
                 self.logger.info(f"Started Apify actor run: {run_data['id']} for {scraper_request.platform}")
+                self._register_result_route(scraper_request)
                 return True
             else:
                 error_msg = f"Apify API error: {response.status_code} - {response.text}"
@@ -396,6 +398,17 @@ class ApifyAutomatedBatchScraper:
             scraper_request.save()
             return False
 
+    def _register_result_route(self, scraper_request: ApifyScraperRequest):
+        """Create the run's result folder now and route the run id to it"""
+        platform = scraper_request.platform.split('_')[0]
+        if platform not in PLATFORM_FOLDER_APPS:
+            return
+        try:
+            get_or_create_run_folder(scraper_request, platform)
+        except Exception as e:
+            # Ingestion creates the folder and route itself if this fails
+            self.logger.warning(f"Could not register result folder for run {scraper_request.request_id}: {e}")
+
     def test_apify_connection(self, config: ApifyConfig) -> Dict[str, Any]:
         """Test connection to Apify API with a specific configuration"""
         try:
@@ -472,3 +485,59 @@ class ApifyAutomatedBatchScraper:
         except Exception as e:
             self.logger.error(f"Error extracting TikTok username from {url}: {str(e)}")
             return 'trending'
+
+
+class ApifyDatasetReader:
+    """
+    Reads an Apify dataset page by page (offset/limit) so large actor runs are
+    never downloaded into memory in one response
+    """
+
+    def __init__(self, api_token: str, page_size: Optional[int] = None, timeout: int = 30, session=None):
+        self.logger = logging.getLogger(__name__)
+        self.base_url = "https://api.apify.com/v2"
+        self.page_size = page_size or getattr(settings, 'APIFY_DATASET_PAGE_SIZE', 1000)
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.session.headers.update({'Authorization': f'Bearer {api_token}'})
+
+    def resolve_dataset_id(self, run_id: str, actor_id: Optional[str] = None) -> str:
+        """Look up the default dataset of an actor run"""
+        run_urls = [f"{self.base_url}/actor-runs/{run_id}"]
+        if actor_id:
+            run_urls.append(f"{self.base_url}/acts/{actor_id}/runs/{run_id}")
+
+        for url in run_urls:
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code == 200:
+                dataset_id = response.json().get('data', {}).get('defaultDatasetId')
+                if dataset_id:
+                    return dataset_id
+
+        # Some older requests stored the dataset id in place of the run id
+        self.logger.warning(f"Could not resolve dataset for run {run_id}, using it as the dataset id")
+        return run_id
+
+    def iter_pages(self, dataset_id: str, offset: int = 0):
+        """
+        Yield (offset, items) for each page of the dataset starting at `offset`.
+        The offset of a page is where the next call should resume once it is stored.
+        """
+        url = f"{self.base_url}/datasets/{dataset_id}/items"
+        while True:
+            response = self.session.get(
+                url,
+                params={'format': 'json', 'offset': offset, 'limit': self.page_size},
+                timeout=self.timeout,
+            )
+            response.raise_for_status()
+            items = response.json()
+            if not items:
+                return
+
+            yield offset, items
+            offset += len(items)
+
+            total = response.headers.get('X-Apify-Pagination-Total')
+            if len(items) < self.page_size or (total is not None and offset >= int(total)):
+                return
@@ -0,0 +1,283 @@
+"""
+Apify Webhook Tasks
+Processes Apify webhook events off the request thread and coalesces batch job status updates
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import ApifyBatchJob, ApifyScraperRequest, ApifyWebhookEvent
+
+logger = logging.getLogger(__name__)
+
+# Apify run status -> scraper request status
+STATUS_MAPPING = {
+    'READY': 'processing',
+    'RUNNING': 'processing',
+    'SUCCEEDED': 'completed',
+    'FAILED': 'failed',
+    'ABORTED': 'cancelled',
+    'TIMED_OUT': 'failed'
+}
+
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+
+def update_batch_job_status(batch_job_id):
+    """
+    Recompute a batch job's counters and status from its scraper requests
+    with a single aggregate query and a single UPDATE
+    """
+    counts = ApifyScraperRequest.objects.filter(batch_job_id=batch_job_id).aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        failed=Count('id', filter=Q(status__in=['failed', 'cancelled'])),
+    )
+    total, completed, failed = counts['total'], counts['completed'], counts['failed']
+    if not total:
+        return None
+
+    changes = {
+        'successful_requests': completed,
+        'failed_requests': failed,
+        'processed_sources': completed + failed,
+        'updated_at': timezone.now(),
+    }
+    if completed + failed >= total:
+        changes['status'] = 'completed' if failed == 0 else 'failed'
+        changes['completed_at'] = timezone.now()
+
+    ApifyBatchJob.objects.filter(id=batch_job_id).update(**changes)
+    if 'status' in changes:
+        logger.info(f"✅ Updated batch job {batch_job_id} status to {changes['status']}")
+    return changes.get('status')
+
+
+class BatchJobStatusCoalescer:
+    """
+    Debounces batch job status recomputation: when many runs of the same batch
+    finish together, the aggregate is computed once per debounce window.
+    """
+
+    def __init__(self, delay=None):
+        self._delay = delay
+        self._pending = set()
+        self._timer = None
+        self._lock = threading.Lock()
+
+    @property
+    def delay(self):
+        if self._delay is not None:
+            return self._delay
+        return getattr(settings, 'APIFY_BATCH_STATUS_DEBOUNCE', 2.0)
+
+    def schedule(self, batch_job_id):
+        """Mark a batch job as needing a status refresh"""
+        if not batch_job_id:
+            return
+        if self.delay <= 0:
+            update_batch_job_status(batch_job_id)
+            return
+
+        with self._lock:
+            self._pending.add(batch_job_id)
+            if self._timer is None:
+                self._timer = threading.Timer(self.delay, self._flush_in_thread)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_in_thread(self):
+        try:
+            self.flush()
+        finally:
+            close_old_connections()
+
+    def flush(self):
+        """Refresh every pending batch job now"""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+        for batch_job_id in pending:
+            try:
+                update_batch_job_status(batch_job_id)
+            except Exception as e:
+                logger.error(f"❌ Error updating batch job {batch_job_id}: {str(e)}")
+
+
+class EventHeartbeat:
+    """
+    Touches a processing event's updated_at from a daemon thread while it runs.
+    The thread dies with its worker, so recovery can tell an abandoned event
+    from one that is simply taking long.
+    """
+
+    def __init__(self, event_id, interval=None):
+        self.event_id = event_id
+        self.interval = interval or getattr(settings, 'APIFY_WEBHOOK_HEARTBEAT_SECONDS', 30)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._beat, name=f'apify-heartbeat-{self.event_id}', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _beat(self):
+        beaten = False
+        try:
+            while not self._stop.wait(self.interval):
+                ApifyWebhookEvent.objects.filter(id=self.event_id, status='processing').update(
+                    updated_at=timezone.now()
+                )
+                beaten = True
+        except Exception as e:
+            logger.warning(f"⚠️ Heartbeat stopped for Apify webhook event {self.event_id}: {str(e)}")
+        finally:
+            if beaten:
+                connection.close()
+
+
+def process_webhook_event(event_id):
+    """
+    Apply one stored Apify webhook event: update the scraper request, ingest
+    its dataset when the run succeeded and schedule the batch job refresh.
+    A failed event goes back to pending for recovery until it has used up
+    APIFY_WEBHOOK_MAX_ATTEMPTS.
+    """
+    # Claim the event so redelivered or recovered events are processed once
+    claimed = ApifyWebhookEvent.objects.filter(id=event_id, status='pending').update(
+        status='processing', attempts=F('attempts') + 1, updated_at=timezone.now()
+    )
+    if not claimed:
+        return
+
+    event = ApifyWebhookEvent.objects.get(id=event_id)
+    try:
+        with EventHeartbeat(event_id):
+            _apply_webhook_event(event)
+        event.status = 'completed'
+    except Exception as e:
+        retry = event.attempts < getattr(settings, 'APIFY_WEBHOOK_MAX_ATTEMPTS', 3)
+        logger.error(f"❌ Error processing Apify webhook event {event_id} (attempt {event.attempts}): {str(e)}")
+        event.status = 'pending' if retry else 'failed'
+
+    if event.status != 'pending':
+        event.processed_at = timezone.now()
+    event.save(update_fields=['status', 'platform', 'processed_at', 'updated_at'])
+
+
+def _apply_webhook_event(event):
+    """Update the event's scraper request and ingest its results; raises on failure"""
+    scraper_request = ApifyScraperRequest.objects.select_related('config', 'batch_job').filter(
+        request_id=event.run_id
+    ).first()
+
+    if not scraper_request:
+        logger.warning(f"No scraper request found for Apify run {event.run_id}")
+        return
+
+    new_status = STATUS_MAPPING.get(event.raw_data.get('status'), 'processing')
+
+    # Process results if completed successfully
+    if new_status == 'completed':
+        from .views import _process_apify_results
+        _process_apify_results(scraper_request)
+        logger.info(f"✅ Processed results for scraper request {scraper_request.id}")
+
+    scraper_request.status = new_status
+    if new_status in FINISHED_STATUSES:
+        scraper_request.completed_at = timezone.now()
+    scraper_request.save(update_fields=['status', 'completed_at', 'updated_at'])
+    logger.info(f"✅ Updated scraper request {scraper_request.id} status to {new_status}")
+
+    event.platform = scraper_request.platform.split('_')[0]
+    batch_job_status_coalescer.schedule(scraper_request.batch_job_id)
+
+
+class ApifyWebhookQueue:
+    """
+    Small in-process worker pool so the webhook view can return immediately.
+    Events are persisted before they are queued, so anything lost with a worker
+    process is picked up again by `recover_pending`, which the
+    apify-webhook-recovery cron runs every few minutes.
+    """
+
+    def __init__(self, max_workers=None):
+        self._max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                max_workers = self._max_workers or getattr(settings, 'APIFY_WEBHOOK_WORKERS', 2)
+                self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='apify-webhook')
+            return self._executor
+
+    def submit(self, event_id):
+        """Queue an event for processing (inline when APIFY_WEBHOOK_ASYNC is off)"""
+        if not getattr(settings, 'APIFY_WEBHOOK_ASYNC', True):
+            process_webhook_event(event_id)
+            return
+        self._get_executor().submit(self._run, event_id)
+
+    def _run(self, event_id):
+        try:
+            process_webhook_event(event_id)
+        except Exception as e:
+            logger.error(f"❌ Apify webhook worker failed for event {event_id}: {str(e)}")
+        finally:
+            close_old_connections()
+
+    def depth(self):
+        """
+        Stored events still waiting to be processed. Events older than the
+        metrics retention window are left to recovery and not counted as backlog.
+        """
+        since = timezone.now() - timedelta(seconds=getattr(settings, 'WEBHOOK_METRICS_RETENTION', 3600))
+        return ApifyWebhookEvent.objects.filter(
+            status__in=['pending', 'processing'], created_at__gte=since
+        ).count()
+
+    def recover_pending(self, older_than_minutes=5):
+        """
+        Re-run events nobody is working on: pending ones that were never picked
+        up or are waiting for a retry, and processing ones whose heartbeat
+        stopped with their worker. The open batch jobs of those events are then
+        refreshed, since a debounced status update dies with the worker that
+        scheduled it; jobs without stale events are left alone.
+        """
+        cutoff = timezone.now() - timedelta(minutes=older_than_minutes)
+        stale = ApifyWebhookEvent.objects.filter(status__in=['pending', 'processing'], updated_at__lt=cutoff)
+        # Half-processed events are safe to replay: result ingestion resumes from its offset
+        stale.filter(status='processing').update(status='pending')
+
+        events = list(stale.filter(status='pending').order_by('created_at').values_list('id', 'run_id'))
+        batch_job_ids = set(ApifyScraperRequest.objects.filter(
+            request_id__in={run_id for _, run_id in events}, batch_job__status__in=['pending', 'processing'],
+        ).values_list('batch_job_id', flat=True))
+        for event_id, _ in events:
+            process_webhook_event(event_id)
+        for batch_job_id in batch_job_ids:
+            batch_job_status_coalescer.schedule(batch_job_id)
+        batch_job_status_coalescer.flush()
+        return len(events)
+
+
+# Global instances
+batch_job_status_coalescer = BatchJobStatusCoalescer()
+apify_webhook_queue = ApifyWebhookQueue()
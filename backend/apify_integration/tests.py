@@ -0,0 +1,354 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from common.webhook_admission import FixedWindowLimiter, get_webhook_admission
+from instagram_data.models import Folder as InstagramFolder, InstagramPost
+from track_accounts.folder_routing import folder_route_service
+from track_accounts.models import ResultFolderRoute, UnifiedRunFolder
+from users.models import Project
+
+from .models import ApifyBatchJob, ApifyConfig, ApifyScraperRequest, ApifyWebhookEvent
+from .tasks import BatchJobStatusCoalescer, apify_webhook_queue, process_webhook_event, update_batch_job_status
+from .folders import get_or_create_run_folder
+from .views import _get_platform_results, _process_apify_results
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200, headers=None):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+
+    def json(self):
+        return self.payload
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+
+class FakeApifySession:
+    """Serves an in-memory dataset through the Apify run and dataset items endpoints"""
+
+    def __init__(self, items, fail_at_offset=None):
+        self.items = items
+        self.fail_at_offset = fail_at_offset
+        self.headers = {}
+        self.item_requests = []
+
+    def get(self, url, params=None, timeout=None):
+        if '/actor-runs/' in url:
+            return FakeResponse({'data': {'defaultDatasetId': 'dataset-1'}})
+
+        offset, limit = params['offset'], params['limit']
+        self.item_requests.append(offset)
+        if offset == self.fail_at_offset:
+            return FakeResponse({}, status_code=502)
+        page = self.items[offset:offset + limit]
+        return FakeResponse(page, headers={'X-Apify-Pagination-Total': str(len(self.items))})
+
+
+def instagram_item(number, likes=10):
+    return {
+        'id': f'ig-{number}',
+        'url': f'https://www.instagram.com/p/{number}/',
+        'ownerUsername': 'nike',
+        'caption': f'Post {number}',
+        'likesCount': likes,
+        'commentsCount': 1,
+    }
+
+
+@override_settings(APIFY_DATASET_PAGE_SIZE=2)
+class ApifyDatasetIngestionTest(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', password='x')
+        project = Project.objects.create(name='Nike', owner=owner)
+        config = ApifyConfig.objects.create(platform='instagram_posts', api_token='token',
+                                            actor_id='apify/instagram-scraper')
+        batch_job = ApifyBatchJob.objects.create(name='Batch', project=project)
+        self.scraper_request = ApifyScraperRequest.objects.create(
+            config=config,
+            batch_job=batch_job,
+            platform='instagram_posts',
+            content_type='posts',
+            target_url='https://www.instagram.com/nike',
+            source_name='Nike',
+            request_id='run-1',
+            started_at=timezone.now(),
+        )
+        # Routes cached by earlier tests point at rolled-back folders
+        folder_route_service.clear()
+
+    def _run(self, session, **kwargs):
+        with mock.patch('apify_integration.services.requests.Session', return_value=session):
+            _process_apify_results(self.scraper_request, **kwargs)
+        self.scraper_request.refresh_from_db()
+
+    def test_dataset_is_read_in_pages(self):
+        session = FakeApifySession([instagram_item(i) for i in range(5)])
+
+        self._run(session)
+
+        self.assertEqual(session.item_requests, [0, 2, 4])
+        self.assertEqual(InstagramPost.objects.count(), 5)
+        self.assertEqual(self.scraper_request.dataset_id, 'dataset-1')
+        self.assertEqual(self.scraper_request.results_offset, 5)
+
+    def test_failed_page_resumes_from_last_committed_offset(self):
+        items = [instagram_item(i) for i in range(5)]
+        with self.assertRaises(RuntimeError):
+            self._run(FakeApifySession(items, fail_at_offset=4))
+        self.scraper_request.refresh_from_db()
+
+        self.assertEqual(self.scraper_request.results_offset, 4)
+        self.assertEqual(InstagramPost.objects.count(), 4)
+
+        retry = FakeApifySession(items)
+        self._run(retry)
+
+        self.assertEqual(retry.item_requests, [4])
+        self.assertEqual(self.scraper_request.results_offset, 5)
+        self.assertEqual(InstagramPost.objects.count(), 5)
+
+    def test_results_are_routed_to_the_registered_folder(self):
+        batch_job = self.scraper_request.batch_job
+        job_folder = UnifiedRunFolder.objects.create(name='IG job', project=batch_job.project,
+                                                     folder_type='job', platform_code='instagram')
+        batch_job.platform_params = {'job_folder_ids': {'instagram': job_folder.id}}
+        batch_job.save()
+        self._run(FakeApifySession([instagram_item(1)]))
+
+        route = ResultFolderRoute.objects.get(provider='apify', external_id='run-1')
+        folder = InstagramFolder.objects.get(id=route.platform_folder_id)
+        self.assertEqual(folder.unified_job_folder, job_folder)
+        self.assertEqual(InstagramPost.objects.get().folder, folder)
+
+        # Reading results back goes straight to the routed folder, even if it is renamed
+        InstagramFolder.objects.filter(id=folder.id).update(name='Renamed')
+        self.scraper_request.started_at = None
+        results = _get_platform_results(self.scraper_request)
+        self.assertEqual([r['post_id'] for r in results], ['ig-1'])
+
+    def test_run_links_to_the_job_folder_recorded_at_start(self):
+        batch_job = self.scraper_request.batch_job
+        UnifiedRunFolder.objects.create(name='Instagram - nike', project=batch_job.project,
+                                        folder_type='job', platform_code='instagram')
+        recorded = UnifiedRunFolder.objects.create(name='Spring campaign', project=batch_job.project,
+                                                   folder_type='job', platform_code='instagram')
+        batch_job.platform_params = {'job_folder_id': recorded.id}
+        batch_job.save()
+
+        folder = get_or_create_run_folder(self.scraper_request, 'instagram')
+
+        self.assertEqual(folder.unified_job_folder, recorded)
+        route = ResultFolderRoute.objects.get(provider='apify', external_id='run-1')
+        self.assertEqual(route.unified_job_folder_id, recorded.id)
+
+    def test_legacy_runs_only_link_to_an_exactly_named_job_folder(self):
+        project = self.scraper_request.batch_job.project
+        UnifiedRunFolder.objects.create(name='Instagram - nikefootball', project=project,
+                                        folder_type='job', platform_code='instagram')
+        self.assertIsNone(get_or_create_run_folder(self.scraper_request, 'instagram').unified_job_folder)
+
+        nike = UnifiedRunFolder.objects.create(name='Instagram - Nike', project=project,
+                                               folder_type='job', platform_code='instagram')
+        other = ApifyScraperRequest.objects.create(
+            config=self.scraper_request.config, batch_job=self.scraper_request.batch_job,
+            platform='instagram_posts', content_type='posts', target_url='https://www.instagram.com/nike/',
+            source_name='Nike', request_id='run-2', started_at=timezone.now() + timedelta(seconds=1),
+        )
+        self.assertEqual(get_or_create_run_folder(other, 'instagram').unified_job_folder, nike)
+
+    def test_reprocessing_updates_posts_instead_of_duplicating(self):
+        self._run(FakeApifySession([instagram_item(1), instagram_item(2)]))
+        self._run(FakeApifySession([instagram_item(1, likes=99), instagram_item(2)]), restart=True)
+
+        self.assertEqual(InstagramPost.objects.count(), 2)
+        self.assertEqual(InstagramPost.objects.get(post_id='ig-1').likes, 99)
+
+
+@override_settings(APIFY_WEBHOOK_ASYNC=False, APIFY_BATCH_STATUS_DEBOUNCE=60)
+class ApifyWebhookQueueTest(TestCase):
+    def setUp(self):
+        owner = User.objects.create_user(username='owner', password='x')
+        project = Project.objects.create(name='Nike', owner=owner)
+        config = ApifyConfig.objects.create(platform='instagram_posts', api_token='token',
+                                            actor_id='apify/instagram-scraper')
+        self.batch_job = ApifyBatchJob.objects.create(name='Batch', project=project, status='processing')
+        self.requests = [
+            ApifyScraperRequest.objects.create(
+                config=config, batch_job=self.batch_job, platform='instagram_posts', content_type='posts',
+                target_url=f'https://www.instagram.com/brand{i}', source_name=f'Brand {i}',
+                request_id=f'run-{i}', status='processing', started_at=timezone.now(),
+            )
+            for i in range(3)
+        ]
+        self.process_results = mock.patch('apify_integration.views._process_apify_results').start()
+        self.addCleanup(mock.patch.stopall)
+        self.coalescer = BatchJobStatusCoalescer()
+        mock.patch('apify_integration.tasks.batch_job_status_coalescer', self.coalescer).start()
+
+    def _deliver(self, run_id, status='SUCCEEDED'):
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post('/api/apify/webhook/', {'runId': run_id, 'status': status},
+                                        content_type='application/json')
+        return response, callbacks
+
+    def test_webhook_queues_event_without_processing_inline(self):
+        response, callbacks = self._deliver('run-0')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(ApifyWebhookEvent.objects.get().status, 'pending')
+        self.process_results.assert_not_called()
+
+        for callback in callbacks:
+            callback()
+
+        self.process_results.assert_called_once()
+        self.assertEqual(ApifyWebhookEvent.objects.get().status, 'completed')
+        self.requests[0].refresh_from_db()
+        self.assertEqual(self.requests[0].status, 'completed')
+
+    def test_burst_of_finished_runs_updates_batch_job_once(self):
+        for i, status in enumerate(['SUCCEEDED', 'SUCCEEDED', 'FAILED']):
+            _, callbacks = self._deliver(f'run-{i}', status)
+            for callback in callbacks:
+                callback()
+
+        self.batch_job.refresh_from_db()
+        self.assertEqual(self.batch_job.status, 'processing')  # still inside the debounce window
+
+        with mock.patch('apify_integration.tasks.update_batch_job_status',
+                        wraps=update_batch_job_status) as update:
+            self.coalescer.flush()
+
+        update.assert_called_once_with(self.batch_job.id)
+        self.batch_job.refresh_from_db()
+        self.assertEqual(self.batch_job.status, 'failed')
+        self.assertEqual((self.batch_job.successful_requests, self.batch_job.failed_requests), (2, 1))
+
+    def test_batch_job_status_uses_single_aggregate_query(self):
+        ApifyScraperRequest.objects.filter(batch_job=self.batch_job).update(status='completed')
+
+        with self.assertNumQueries(2):
+            status = update_batch_job_status(self.batch_job.id)
+
+        self.assertEqual(status, 'completed')
+
+    def test_recovery_replays_abandoned_events_only_and_refreshes_batch_job(self):
+        long_ago = timezone.now() - timedelta(minutes=30)
+        abandoned = ApifyWebhookEvent.objects.create(event_id='e-0', run_id='run-0', status='processing',
+                                                     raw_data={'status': 'SUCCEEDED'})
+        running = ApifyWebhookEvent.objects.create(event_id='e-2', run_id='run-2', status='processing',
+                                                   raw_data={'status': 'SUCCEEDED'})
+        ApifyWebhookEvent.objects.filter(id=abandoned.id).update(created_at=long_ago, updated_at=long_ago)
+        ApifyWebhookEvent.objects.filter(id=running.id).update(created_at=long_ago)  # heartbeat is fresh
+        # run-1 finished, but the worker holding its debounced batch refresh was recycled
+        ApifyScraperRequest.objects.filter(request_id='run-1').update(status='completed')
+
+        self.assertEqual(apify_webhook_queue.recover_pending(older_than_minutes=5), 1)
+
+        abandoned.refresh_from_db()
+        running.refresh_from_db()
+        self.assertEqual(abandoned.status, 'completed')
+        self.assertEqual(running.status, 'processing')
+        self.batch_job.refresh_from_db()
+        self.assertEqual(self.batch_job.successful_requests, 2)
+
+    def test_recovery_leaves_batch_jobs_without_stale_events_alone(self):
+        ApifyScraperRequest.objects.filter(request_id='run-1').update(status='completed')
+        recent = ApifyWebhookEvent.objects.create(event_id='e-0', run_id='run-0', raw_data={'status': 'SUCCEEDED'})
+
+        with mock.patch('apify_integration.tasks.update_batch_job_status') as update:
+            self.assertEqual(apify_webhook_queue.recover_pending(older_than_minutes=5), 0)
+
+        update.assert_not_called()
+        recent.refresh_from_db()
+        self.assertEqual(recent.status, 'pending')  # still the live worker's
+
+    @override_settings(APIFY_WEBHOOK_MAX_ATTEMPTS=2)
+    def test_failed_event_returns_to_pending_until_attempts_run_out(self):
+        self.process_results.side_effect = RuntimeError('dataset unavailable')
+        event = ApifyWebhookEvent.objects.create(event_id='e-0', run_id='run-0', raw_data={'status': 'SUCCEEDED'})
+
+        process_webhook_event(event.id)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('pending', 1))
+
+        process_webhook_event(event.id)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('failed', 2))
+        self.requests[0].refresh_from_db()
+        self.assertEqual(self.requests[0].status, 'processing')
+
+
+@override_settings(APIFY_WEBHOOK_ASYNC=False, WEBHOOK_RATE_LIMIT=60, WEBHOOK_RATE_BURST=100,
+                   WEBHOOK_MAX_EVENTS=1000, WEBHOOK_SOURCE_CONCURRENCY={'apify': 2})
+class ApifyWebhookAdmissionTest(TestCase):
+    def setUp(self):
+        caches['webhook_cache'].clear()
+        self.addCleanup(caches['webhook_cache'].clear)
+        self.process_event = mock.patch('apify_integration.tasks.process_webhook_event').start()
+        self.addCleanup(mock.patch.stopall)
+
+    def _deliver(self, run_id='run-1'):
+        return self.client.post('/api/apify/webhook/', {'runId': run_id, 'status': 'SUCCEEDED'},
+                                content_type='application/json')
+
+    def test_burst_beyond_the_window_limit_is_rejected_with_retry_after(self):
+        with self.settings(WEBHOOK_RATE_BURST=2):
+            responses = [self._deliver(f'run-{i}') for i in range(3)]
+
+        self.assertEqual([r.status_code for r in responses], [202, 202, 429])
+        self.assertEqual(responses[2].json()['reason'], 'rate_limited')
+        self.assertIn(responses[2]['Retry-After'], ('1', '2'))  # until the 2s window closes
+        self.assertEqual(ApifyWebhookEvent.objects.count(), 2)
+
+    def test_rate_limit_is_shared_by_every_limiter_instance(self):
+        # Each worker process builds its own limiter; only the cache counter is shared
+        first, second = (FixedWindowLimiter('webhook_admission:test:window', rate_per_minute=60, capacity=2)
+                         for _ in range(2))
+
+        self.assertEqual([first.take(now=1000.0), second.take(now=1000.5)], [0.0, 0.0])
+        self.assertEqual(second.take(now=1001.5), 0.5)
+        self.assertEqual(first.take(now=1002.0), 0.0)  # the counter resets with the next window
+
+    def test_broken_webhook_cache_admits_deliveries(self):
+        with mock.patch('common.webhook_admission._cache') as broken:
+            broken.return_value.get.side_effect = OSError('unable to open database file')
+            broken.return_value.add.side_effect = broken.return_value.incr.side_effect = OSError('disk I/O error')
+            self.assertEqual(self._deliver().status_code, 202)
+
+    def test_backlog_over_max_events_applies_backpressure(self):
+        for i in range(4):
+            ApifyWebhookEvent.objects.create(event_id=f'queued-{i}', run_id=f'queued-{i}', status='pending')
+        # Left behind long ago: recovery's job, not backlog
+        ApifyWebhookEvent.objects.filter(event_id='queued-3').update(
+            created_at=timezone.now() - timedelta(hours=2))
+
+        with self.settings(WEBHOOK_MAX_EVENTS=3, WEBHOOK_BACKPRESSURE_RETRY_AFTER=45):
+            response = self._deliver()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['queue_depth'], 3)
+        self.assertEqual(response['Retry-After'], '45')
+
+    def test_in_flight_deliveries_are_capped_per_source(self):
+        admission = get_webhook_admission('apify')
+        self.assertTrue(admission.acquire())
+        self.assertTrue(admission.acquire())
+        try:
+            response = self._deliver()
+        finally:
+            admission.release()
+            admission.release()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.json()['reason'], 'concurrency')
+        self.assertEqual(self._deliver().status_code, 202)
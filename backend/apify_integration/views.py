@@ -11,15 +11,18 @@ from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.http import JsonResponse
 from django.utils import timezone
+from django.db import IntegrityError, transaction
 from django.db.models import Q
 import json
 import logging
 import time
-import requests
 
 from .models import ApifyConfig, ApifyBatchJob, ApifyScraperRequest, ApifyNotification, ApifyWebhookEvent
 from .serializers import ApifyConfigSerializer, ApifyBatchJobSerializer, ApifyScraperRequestSerializer
-from .services import ApifyAutomatedBatchScraper
+from .folders import get_or_create_run_folder, resolve_run_folder
+from .services import ApifyAutomatedBatchScraper, ApifyDatasetReader
+from .tasks import apify_webhook_queue
+from common.webhook_admission import webhook_admission
 
 logger = logging.getLogger(__name__)
 
@@ -235,102 +238,46 @@ class ApifyScraperRequestViewSet(viewsets.ModelViewSet):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@webhook_admission('apify', queue_depth=apify_webhook_queue.depth)
 def apify_webhook(request):
-    """Handle Apify webhook events"""
+    """
+    Handle Apify webhook events.
+
+    The event is stored and handed to the background queue; result download,
+    status changes and batch job completion happen in apify_integration.tasks.
+    """
     start_time = time.time()
-    
+
     try:
         # Parse webhook data
         data = json.loads(request.body)
         run_id = data.get('runId')
-        status = data.get('status')
         actor_id = data.get('actorId')
-        
+
         if not run_id:
             return JsonResponse({'error': 'runId required'}, status=400)
-        
+
         # Create webhook event
-        webhook_event = ApifyWebhookEvent.objects.create(
-            event_id=f"{run_id}_{int(time.time())}",
-            run_id=run_id,
-            status='processing',
-            platform=actor_id.split('/')[-1] if actor_id else '',
-            raw_data=data
-        )
-        
-        # Find associated scraper request
-        scraper_request = None
-        if run_id:
-            try:
-                scraper_request = ApifyScraperRequest.objects.filter(request_id=run_id).first()
-                if scraper_request:
-                    webhook_event.platform = scraper_request.platform.split('_')[0]
-                    webhook_event.save()
-                    logger.info(f"✅ Found associated scraper request: {scraper_request.id}")
-            except Exception as e:
-                logger.error(f"Error finding scraper request: {str(e)}")
-                scraper_request = None
-        
-        # Update scraper request status
-        if scraper_request:
-            try:
-                # Map Apify status to our status
-                status_mapping = {
-                    'READY': 'processing',
-                    'RUNNING': 'processing',
-                    'SUCCEEDED': 'completed',
-                    'FAILED': 'failed',
-                    'ABORTED': 'cancelled',
-                    'TIMED_OUT': 'failed'
-                }
-                
-                new_status = status_mapping.get(status, 'processing')
-                scraper_request.status = new_status
-                
-                if new_status in ['completed', 'failed', 'cancelled']:
-                    scraper_request.completed_at = timezone.now()
-                
-                # Process results if completed successfully
-                if new_status == 'completed':
-                    try:
-                        _process_apify_results(scraper_request)
-                        logger.info(f"✅ Processed results for scraper request {scraper_request.id}")
-                    except Exception as e:
-                        logger.error(f"❌ Error processing results for {scraper_request.id}: {str(e)}")
-                
-                scraper_request.save()
-                logger.info(f"✅ Updated scraper request {scraper_request.id} status to {new_status}")
-                
-                # Update batch job status
-                batch_job = scraper_request.batch_job
-                if batch_job:
-                    # Count completed/failed requests
-                    completed_requests = batch_job.scraper_requests.filter(status='completed').count()
-                    failed_requests = batch_job.scraper_requests.filter(status='failed').count()
-                    total_requests = batch_job.scraper_requests.count()
-                    
-                    if completed_requests + failed_requests >= total_requests:
-                        if failed_requests == 0:
-                            batch_job.status = 'completed'
-                        else:
-                            batch_job.status = 'failed'
-                        batch_job.completed_at = timezone.now()
-                        batch_job.save()
-                        logger.info(f"✅ Updated batch job {batch_job.id} status to {batch_job.status}")
+        try:
+            with transaction.atomic():
+                webhook_event = ApifyWebhookEvent.objects.create(
+                    event_id=f"{run_id}_{data.get('status', '')}_{int(time.time())}",
+                    run_id=run_id,
+                    status='pending',
+                    platform=actor_id.split('/')[-1] if actor_id else '',
+                    raw_data=data
+                )
+        except IntegrityError:
+            # Same delivery retried within a second - already queued
+            return JsonResponse({'status': 'duplicate'})
 
-            except Exception as e:
-                logger.error(f"❌ Error updating scraper request: {str(e)}")
+        transaction.on_commit(lambda: apify_webhook_queue.submit(webhook_event.id))
 
-        # Mark webhook as completed
-        webhook_event.status = 'completed'
-        webhook_event.processed_at = timezone.now()
-        webhook_event.save()
-        
         processing_time = time.time() - start_time
-        logger.info(f"Webhook processed in {processing_time:.2f}s")
-        
-        return JsonResponse({'status': 'success'})
-        
+        logger.info(f"Webhook for run {run_id} queued in {processing_time:.3f}s")
+
+        return JsonResponse({'status': 'queued', 'event_id': webhook_event.id}, status=202)
+
     except json.JSONDecodeError:
         return JsonResponse({'error': 'Invalid JSON'}, status=400)
     except Exception as e:
@@ -397,380 +344,274 @@ def apify_notify(request):
         return JsonResponse({'error': str(e)}, status=500)
 
 
-def _process_apify_results(scraper_request: ApifyScraperRequest):
+def _process_apify_results(scraper_request: ApifyScraperRequest, restart: bool = False):
     """
-    Download and process results from Apify when a scraper request completes
+    Download and process results from Apify when a scraper request completes.
+
+    The dataset is read page by page; each page is upserted and the request's
+    `results_offset` advanced in the same transaction, so a crashed or retried
+    run resumes from the last stored page instead of starting over. Errors are
+    re-raised so the caller keeps the request open for that retry.
     """
     try:
-        # Get the dataset results from Apify
         config = scraper_request.config
         run_id = scraper_request.request_id
-        
+
         if not run_id:
             logger.error(f"No run_id found for scraper request {scraper_request.id}")
             return
-        
-        # Download results from Apify
-        dataset_url = f"https://api.apify.com/v2/acts/{config.actor_id}/runs/{run_id}/dataset/items"
-        headers = {
-            'Authorization': f'Bearer {config.api_token}',
-            'Content-Type': 'application/json'
-        }
-        
-        # Try the correct dataset API endpoint
-        response = requests.get(dataset_url, headers=headers, timeout=30)
-        
-        # If that fails, try the alternative dataset endpoint
-        if response.status_code == 404:
-            dataset_url = f"https://api.apify.com/v2/datasets/{run_id}/items"
-            response = requests.get(dataset_url, headers=headers, timeout=30)
-            
-        # If still failing, try to get the dataset ID from the run info
-        if response.status_code == 404:
-            run_info_url = f"https://api.apify.com/v2/acts/{config.actor_id}/runs/{run_id}"
-            run_response = requests.get(run_info_url, headers=headers, timeout=30)
-            
-            if run_response.status_code == 200:
-                run_data = run_response.json()['data']
-                dataset_id = run_data.get('defaultDatasetId')
-                
-                if dataset_id:
-                    dataset_url = f"https://api.apify.com/v2/datasets/{dataset_id}/items"
-                    response = requests.get(dataset_url, headers=headers, timeout=30)
-        
-        if response.status_code == 200:
-            results = response.json()
-            logger.info(f"Downloaded {len(results)} items for {scraper_request.platform}")
-            
-            # Process results based on platform
-            if scraper_request.platform.startswith('instagram'):
-                _process_instagram_results(scraper_request, results)
-            elif scraper_request.platform.startswith('facebook'):
-                _process_facebook_results(scraper_request, results)
-            elif scraper_request.platform.startswith('tiktok'):
-                _process_tiktok_results(scraper_request, results)
-            elif scraper_request.platform.startswith('linkedin'):
-                _process_linkedin_results(scraper_request, results)
-            else:
-                logger.warning(f"Unknown platform for result processing: {scraper_request.platform}")
-                
-        else:
-            logger.error(f"Failed to download results: {response.status_code} - {response.text}")
-            
-    except Exception as e:
-        logger.error(f"Error processing Apify results: {str(e)}")
 
+        platform = _apify_platform(scraper_request)
+        if not platform:
+            logger.warning(f"Unknown platform for result processing: {scraper_request.platform}")
+            return
 
-def _process_instagram_results(scraper_request: ApifyScraperRequest, results):
-    """Process Instagram scraping results"""
-    try:
-        from instagram_data.models import Folder, InstagramPost
-        from track_accounts.models import SourceFolder, UnifiedRunFolder
-
-        # Create or get folder for this scraping run
-        batch_job = scraper_request.batch_job
-
-        # Get source folder names
-        source_folder_names = []
-        if batch_job.source_folder_ids:
-            source_folders = SourceFolder.objects.filter(id__in=batch_job.source_folder_ids)
-            source_folder_names = [sf.name for sf in source_folders]
-
-        # Create folder name with source folder names + date/time
-        if source_folder_names:
-            folder_base_name = ", ".join(source_folder_names)
-        else:
-            folder_base_name = "Instagram Scrape"
-
-        # Format: "Brand Sources - 06/10/2025 14:00:00"
-        folder_name = f"{folder_base_name} - {scraper_request.started_at.strftime('%d/%m/%Y %H:%M:%S')}"
-
-        # Find the corresponding unified job folder for this scraper request
-        # Look for job folder with Instagram platform created around the same time
-        unified_job_folder = None
-        target_url = scraper_request.target_url or ''
-        username = target_url.split('/')[-1] if target_url else ''
-
-        if username:
-            # Try to find unified job folder by username in name
-            unified_job_folder = UnifiedRunFolder.objects.filter(
-                Q(project=batch_job.project) &
-                Q(folder_type='job') &
-                Q(name__icontains='Instagram') &
-                Q(name__icontains=username)
-            ).first()
-
-        if not unified_job_folder:
-            # Fallback: find most recent Instagram job folder for this project
-            unified_job_folder = UnifiedRunFolder.objects.filter(
-                project=batch_job.project,
-                folder_type='job',
-                name__icontains='Instagram'
-            ).order_by('-created_at').first()
-
-        folder, created = Folder.objects.get_or_create(
-            name=folder_name,
-            project=batch_job.project,
-            defaults={
-                'description': f'Results from Apify run {scraper_request.request_id}',
-                'category': 'posts',
-                'folder_type': 'content',
-                'unified_job_folder': unified_job_folder
-            }
-        )
+        reader = ApifyDatasetReader(config.api_token)
 
-        if created:
-            logger.info(f"✓ Created new Instagram folder: {folder.name} (ID: {folder.id})")
-        else:
-            logger.info(f"✓ Using existing Instagram folder: {folder.name} (ID: {folder.id})")
+        if not scraper_request.dataset_id:
+            scraper_request.dataset_id = reader.resolve_dataset_id(run_id, config.actor_id)
+            scraper_request.save(update_fields=['dataset_id'])
 
-        # Update unified_job_folder link if folder already exists but wasn't linked
-        if not created and not folder.unified_job_folder and unified_job_folder:
-            folder.unified_job_folder = unified_job_folder
-            folder.save()
-            logger.info(f"✓ Linked existing folder {folder.id} to unified job folder {unified_job_folder.id}")
-        
-        posts_saved = 0
-        for item in results:
-            try:
-                # Map Apify data to InstagramPost model
-                post_data = {
-                    'folder': folder,
-                    'url': item.get('url', ''),
-                    'user_posted': item.get('ownerUsername', ''),
-                    'description': item.get('caption', ''),
-                    'hashtags': item.get('hashtags', []),
-                    'num_comments': item.get('commentsCount', 0),
-                    'likes': item.get('likesCount', 0),
-                    'post_id': item.get('id', ''),
-                    'shortcode': item.get('shortCode', ''),
-                    'content_type': item.get('type', 'post'),
-                    'views': item.get('videoViewCount', 0),
-                    'photos': item.get('images', []),
-                    'videos': item.get('videos', []),
-                    'thumbnail': item.get('displayUrl', ''),
-                    'user_posted_id': item.get('ownerId', ''),
-                    'followers': item.get('ownerFollowersCount', 0),
-                    'following': item.get('ownerFollowingCount', 0),
-                    'is_verified': item.get('ownerIsVerified', False),
-                    'location': item.get('locationName', ''),
-                    'date_posted': timezone.now()  # Apify doesn't always provide this
-                }
-                
-                # Create or update post - use post_id as primary uniqueness key
-                post, created = InstagramPost.objects.get_or_create(
-                    post_id=post_data['post_id'],
-                    defaults=post_data
-                )
+        if restart and scraper_request.results_offset:
+            scraper_request.results_offset = 0
+            scraper_request.save(update_fields=['results_offset'])
 
-                if created:
-                    posts_saved += 1
-                    logger.info(f"✓ Saved Instagram post {post_data['post_id']} by @{post_data['user_posted']}")
-                else:
-                    # Update existing post with new folder if different
-                    if post.folder != folder:
-                        post.folder = folder
-                        post.save()
-                        posts_saved += 1
-                        logger.info(f"✓ Updated Instagram post {post_data['post_id']} folder assignment")
+        if scraper_request.results_offset:
+            logger.info(f"Resuming {scraper_request.platform} results at item {scraper_request.results_offset}")
 
-            except Exception as e:
-                logger.error(f"Error saving Instagram post {post_data.get('post_id', 'unknown')}: {str(e)}")
-                continue
-        
-        logger.info(f"Saved {posts_saved} Instagram posts to folder {folder.name}")
-        
-    except Exception as e:
-        logger.error(f"Error processing Instagram results: {str(e)}")
+        folder = None
+        items_read = 0
+        for offset, items in reader.iter_pages(scraper_request.dataset_id, offset=scraper_request.results_offset):
+            with transaction.atomic():
+                folder = _store_platform_results(platform, scraper_request, items, folder=folder)
+                scraper_request.results_offset = offset + len(items)
+                scraper_request.save(update_fields=['results_offset'])
+            items_read += len(items)
 
+        logger.info(f"Downloaded {items_read} items for {scraper_request.platform} "
+                    f"({scraper_request.results_offset} stored in total)")
 
-def _process_facebook_results(scraper_request: ApifyScraperRequest, results):
-    """Process Facebook scraping results"""
-    try:
-        from facebook_data.models import Folder, FacebookPost
-        from track_accounts.models import SourceFolder, UnifiedRunFolder
-        from django.db.models import Q
-
-        # Create or get folder for this scraping run
-        batch_job = scraper_request.batch_job
-
-        # Get source folder names
-        source_folder_names = []
-        if batch_job.source_folder_ids:
-            source_folders = SourceFolder.objects.filter(id__in=batch_job.source_folder_ids)
-            source_folder_names = [sf.name for sf in source_folders]
-
-        # Create folder name with source folder names + date/time
-        if source_folder_names:
-            folder_base_name = ", ".join(source_folder_names)
-        else:
-            folder_base_name = "Facebook Scrape"
-
-        # Format: "Brand Sources - 06/10/2025 14:00:00"
-        folder_name = f"{folder_base_name} - {scraper_request.started_at.strftime('%d/%m/%Y %H:%M:%S')}"
-
-        # Find the corresponding unified job folder for this scraper request
-        unified_job_folder = None
-        target_url = scraper_request.target_url or ''
-        username = target_url.split('/')[-1] if target_url else ''
-
-        if username:
-            # Try to find unified job folder by username in name
-            unified_job_folder = UnifiedRunFolder.objects.filter(
-                Q(project=batch_job.project) &
-                Q(folder_type='job') &
-                Q(name__icontains='Facebook') &
-                Q(name__icontains=username)
-            ).first()
-
-        if not unified_job_folder:
-            # Fallback: find most recent Facebook job folder for this project
-            unified_job_folder = UnifiedRunFolder.objects.filter(
-                project=batch_job.project,
-                folder_type='job',
-                name__icontains='Facebook'
-            ).order_by('-created_at').first()
-
-        folder, created = Folder.objects.get_or_create(
-            name=folder_name,
-            project=batch_job.project,
-            defaults={
-                'description': f'Results from Apify run {scraper_request.request_id}',
-                'category': 'posts',
-                'unified_job_folder': unified_job_folder,
-                'folder_type': 'content'
-            }
-        )
+    except Exception as e:
+        logger.error(f"Error processing Apify results: {str(e)}")
+        raise
 
-        # Update unified_job_folder link if folder already exists but wasn't linked
-        if not created and not folder.unified_job_folder and unified_job_folder:
-            folder.unified_job_folder = unified_job_folder
-            folder.save()
-            logger.info(f"✓ Linked existing folder {folder.id} to unified job folder {unified_job_folder.id}")
 
-        posts_saved = 0
-        for item in results:
-            try:
-                # Map Apify data to FacebookPost model
-                post_data = {
-                    'folder': folder,
-                    'url': item.get('postUrl', item.get('url', '')),
-                    'user_posted': item.get('user', ''),
-                    'content': item.get('text', ''),
-                    'description': item.get('text', ''),
-                    'likes': item.get('likes', 0),
-                    'num_comments': item.get('comments', 0),
-                    'num_shares': item.get('shares', 0),
-                    'post_id': item.get('postId', item.get('id', '')),
-                    'video_view_count': item.get('views', 0),
-                    'date_posted': timezone.now()
-                }
+def _apify_platform(scraper_request: ApifyScraperRequest):
+    """Platform key ('instagram', 'facebook', ...) of a scraper request"""
+    for platform in APIFY_RESULT_HANDLERS:
+        if scraper_request.platform.startswith(platform):
+            return platform
+    return None
 
-                # Create or update post
-                post, created = FacebookPost.objects.get_or_create(
-                    post_id=post_data['post_id'],
-                    defaults=post_data
-                )
 
-                if created:
-                    posts_saved += 1
-                    logger.info(f"✓ Saved Facebook post {post_data['post_id']} by {post_data['user_posted']}")
-                else:
-                    # Update existing post with new folder if different
-                    if post.folder != folder:
-                        post.folder = folder
-                        post.save()
-                        logger.info(f"✓ Updated Facebook post {post_data['post_id']} folder")
+def _store_platform_results(platform, scraper_request: ApifyScraperRequest, results, folder=None):
+    """
+    Map a page of Apify items to platform posts and bulk upsert them.
+    Returns the content folder so later pages of the same run reuse it.
+    """
+    get_model, map_item = APIFY_RESULT_HANDLERS[platform]
+    if folder is None:
+        folder = get_or_create_run_folder(scraper_request, platform)
 
-            except Exception as e:
-                logger.error(f"Error saving Facebook post {item.get('postId', 'unknown')}: {str(e)}")
-                continue
+    rows = [map_item(item, folder) for item in results]
+    model = get_model()
+    created, updated = _bulk_upsert_posts(model, folder, rows)
+    if created or updated:
+        # bulk_create/bulk_update send no signals, so the unified rows are synced here
+        from track_accounts.unified_posts import unified_post_service
+        unified_post_service.sync_queryset(
+            model.objects.filter(post_id__in=[str(row['post_id']) for row in rows if row.get('post_id')]))
+    logger.info(f"Saved {created} new and {updated} existing {platform} posts to folder {folder.name}")
+    return folder
 
-        logger.info(f"Saved {posts_saved} Facebook posts to folder {folder.name}")
 
-    except Exception as e:
-        logger.error(f"Error processing Facebook results: {str(e)}")
+# Fields set when a post is first stored and left alone when it is seen again
+UPSERT_PRESERVED_FIELDS = {'date_posted'}
 
 
-def _process_tiktok_results(scraper_request: ApifyScraperRequest, results):
-    """Process TikTok scraping results"""
-    try:
-        from tiktok_data.models import Folder, TikTokPost
-        from track_accounts.models import SourceFolder
-
-        # Create or get folder for this scraping run
-        batch_job = scraper_request.batch_job
-
-        # Get source folder names
-        source_folder_names = []
-        if batch_job.source_folder_ids:
-            source_folders = SourceFolder.objects.filter(id__in=batch_job.source_folder_ids)
-            source_folder_names = [sf.name for sf in source_folders]
-
-        # Create folder name with source folder names + date/time
-        if source_folder_names:
-            folder_base_name = ", ".join(source_folder_names)
-        else:
-            folder_base_name = "TikTok Scrape"
-
-        # Format: "Brand Sources - 06/10/2025 14:00:00"
-        folder_name = f"{folder_base_name} - {scraper_request.started_at.strftime('%d/%m/%Y %H:%M:%S')}"
-
-        folder, created = Folder.objects.get_or_create(
-            name=folder_name,
-            project=batch_job.project,
-            defaults={
-                'description': f'Results from Apify run {scraper_request.request_id}',
-                'category': 'posts',
-                'folder_type': 'content'
-            }
-        )
+def _bulk_upsert_posts(model, folder, rows, batch_size=500):
+    """
+    Insert or update posts keyed on post_id with one lookup query per page
+    instead of a get_or_create per item. Returns (created, updated).
+    """
+    rows_by_post_id = {}
+    for row in rows:
+        if not row.get('post_id'):
+            logger.warning(f"Skipping {model.__name__} item without a post id: {row.get('url', '')}")
+            continue
+        rows_by_post_id[str(row['post_id'])] = row
+
+    if not rows_by_post_id:
+        return 0, 0
+
+    existing = {}
+    for post in model.objects.filter(post_id__in=list(rows_by_post_id)).order_by('id'):
+        # Prefer the copy already in this run's folder
+        if post.post_id not in existing or post.folder_id == folder.id:
+            existing[post.post_id] = post
+
+    to_create = []
+    to_update = []
+    update_fields = set()
+    now = timezone.now()
+    for post_id, row in rows_by_post_id.items():
+        post = existing.get(post_id)
+        if post is None:
+            to_create.append(model(**row))
+            continue
+        for field, value in row.items():
+            if field not in UPSERT_PRESERVED_FIELDS:
+                setattr(post, field, value)
+                update_fields.add(field)
+        post.updated_at = now
+        to_update.append(post)
+
+    if to_create:
+        model.objects.bulk_create(to_create, batch_size=batch_size)
+    if to_update:
+        model.objects.bulk_update(to_update, sorted(update_fields | {'updated_at'}), batch_size=batch_size)
+    return len(to_create), len(to_update)
+
+
+def _map_instagram_item(item, folder):
+    """Map an Apify Instagram item to InstagramPost fields"""
+    return {
+        'folder': folder,
+        'url': item.get('url', ''),
+        'user_posted': item.get('ownerUsername', ''),
+        'description': item.get('caption', ''),
+        'hashtags': item.get('hashtags', []),
+        'num_comments': item.get('commentsCount', 0),
+        'likes': item.get('likesCount', 0),
+        'post_id': item.get('id', ''),
+        'shortcode': item.get('shortCode', ''),
+        'content_type': item.get('type', 'post'),
+        'views': item.get('videoViewCount', 0),
+        'photos': item.get('images', []),
+        'videos': item.get('videos', []),
+        'thumbnail': item.get('displayUrl', ''),
+        'user_posted_id': item.get('ownerId', ''),
+        'followers': item.get('ownerFollowersCount', 0),
+        'following': item.get('ownerFollowingCount', 0),
+        'is_verified': item.get('ownerIsVerified', False),
+        'location': item.get('locationName', ''),
+        'date_posted': timezone.now()  # Apify doesn't always provide this
+    }
+
+
+def _map_facebook_item(item, folder):
+    """Map an Apify Facebook item to FacebookPost fields"""
+    return {
+        'folder': folder,
+        'url': item.get('postUrl', item.get('url', '')),
+        'user_posted': item.get('user', ''),
+        'content': item.get('text', ''),
+        'description': item.get('text', ''),
+        'likes': item.get('likes', 0),
+        'num_comments': item.get('comments', 0),
+        'num_shares': item.get('shares', 0),
+        'post_id': item.get('postId', item.get('id', '')),
+        'video_view_count': item.get('views', 0),
+        'date_posted': timezone.now()
+    }
+
+
+def _map_tiktok_item(item, folder):
+    """Map an Apify TikTok item to TikTokPost fields"""
+    hashtags_list = item.get('hashtags', [])
+    hashtags_str = ', '.join([tag.get('name', '') if isinstance(tag, dict) else str(tag) for tag in hashtags_list])
+
+    return {
+        'folder': folder,
+        'url': item.get('webVideoUrl', item.get('url', '')),
+        'user_posted': item.get('authorMeta', {}).get('name', item.get('author', '')),
+        'description': item.get('text', ''),
+        'hashtags': hashtags_str,
+        'likes': item.get('diggCount', 0),
+        'num_comments': item.get('commentCount', 0),
+        'post_id': item.get('id', ''),
+        'thumbnail': item.get('covers', {}).get('default', '') if isinstance(item.get('covers'), dict) else '',
+        'videos': item.get('videoUrl', ''),
+        'followers': item.get('authorMeta', {}).get('fans', 0),
+        'is_verified': item.get('authorMeta', {}).get('verified', False),
+        'date_posted': timezone.now()
+    }
+
+
+def _map_linkedin_item(item, folder):
+    """Map an Apify LinkedIn item to LinkedInPost fields"""
+    author_data = item.get('author', {})
+    return {
+        'folder': folder,
+        'url': item.get('postUrl', item.get('url', '')),
+        'user_posted': author_data.get('name', item.get('authorName', '')),
+        'description': item.get('text', ''),
+        'likes': item.get('likesCount', 0),
+        'num_likes': item.get('likesCount', 0),
+        'num_comments': item.get('commentsCount', 0),
+        'num_shares': item.get('sharesCount', 0),
+        'post_id': item.get('postId', item.get('urn', '')),
+        'post_text': item.get('text', ''),
+        'images': item.get('images', []),
+        'videos': item.get('videos', []),
+        'user_title': author_data.get('title', ''),
+        'user_headline': author_data.get('headline', ''),
+        'user_url': author_data.get('url', ''),
+        'author_profile_pic': author_data.get('profilePicture', ''),
+        'date_posted': timezone.now(),
+        'account_type': 'company' if item.get('type') == 'company' else 'personal'
+    }
+
+
+def _instagram_post_model():
+    from instagram_data.models import InstagramPost
+    return InstagramPost
+
+
+def _facebook_post_model():
+    from facebook_data.models import FacebookPost
+    return FacebookPost
+
+
+def _tiktok_post_model():
+    from tiktok_data.models import TikTokPost
+    return TikTokPost
+
+
+def _linkedin_post_model():
+    from linkedin_data.models import LinkedInPost
+    return LinkedInPost
+
+
+# Platform key -> (post model getter, item mapper)
+APIFY_RESULT_HANDLERS = {
+    'instagram': (_instagram_post_model, _map_instagram_item),
+    'facebook': (_facebook_post_model, _map_facebook_item),
+    'tiktok': (_tiktok_post_model, _map_tiktok_item),
+    'linkedin': (_linkedin_post_model, _map_linkedin_item),
+}
 
-        posts_saved = 0
-        for item in results:
-            try:
-                # Map Apify data to TikTokPost model
-                hashtags_list = item.get('hashtags', [])
-                hashtags_str = ', '.join([tag.get('name', '') if isinstance(tag, dict) else str(tag) for tag in hashtags_list])
-
-                post_data = {
-                    'folder': folder,
-                    'url': item.get('webVideoUrl', item.get('url', '')),
-                    'user_posted': item.get('authorMeta', {}).get('name', item.get('author', '')),
-                    'description': item.get('text', ''),
-                    'hashtags': hashtags_str,
-                    'likes': item.get('diggCount', 0),
-                    'num_comments': item.get('commentCount', 0),
-                    'post_id': item.get('id', ''),
-                    'thumbnail': item.get('covers', {}).get('default', '') if isinstance(item.get('covers'), dict) else '',
-                    'videos': item.get('videoUrl', ''),
-                    'followers': item.get('authorMeta', {}).get('fans', 0),
-                    'is_verified': item.get('authorMeta', {}).get('verified', False),
-                    'date_posted': timezone.now()
-                }
 
-                # Create or update post
-                post, created = TikTokPost.objects.get_or_create(
-                    post_id=post_data['post_id'],
-                    defaults=post_data
-                )
+def _process_instagram_results(scraper_request: ApifyScraperRequest, results):
+    """Process Instagram scraping results"""
+    try:
+        _store_platform_results('instagram', scraper_request, results)
+    except Exception as e:
+        logger.error(f"Error processing Instagram results: {str(e)}")
 
-                if created:
-                    posts_saved += 1
-                    logger.info(f"✓ Saved TikTok post {post_data['post_id']} by @{post_data['user_posted']}")
-                else:
-                    # Update existing post with new folder if different
-                    if post.folder != folder:
-                        post.folder = folder
-                        post.save()
-                        logger.info(f"✓ Updated TikTok post {post_data['post_id']} folder")
 
-            except Exception as e:
-                logger.error(f"Error saving TikTok post {item.get('id', 'unknown')}: {str(e)}")
-                continue
+def _process_facebook_results(scraper_request: ApifyScraperRequest, results):
+    """Process Facebook scraping results"""
+    try:
+        _store_platform_results('facebook', scraper_request, results)
+    except Exception as e:
+        logger.error(f"Error processing Facebook results: {str(e)}")
 
-        logger.info(f"Saved {posts_saved} TikTok posts to folder {folder.name}")
 
+def _process_tiktok_results(scraper_request: ApifyScraperRequest, results):
+    """Process TikTok scraping results"""
+    try:
+        _store_platform_results('tiktok', scraper_request, results)
     except Exception as e:
         logger.error(f"Error processing TikTok results: {str(e)}")
 
@@ -778,85 +619,7 @@ def _process_tiktok_results(scraper_request: ApifyScraperRequest, results):
 def _process_linkedin_results(scraper_request: ApifyScraperRequest, results):
     """Process LinkedIn scraping results"""
     try:
-        from linkedin_data.models import Folder, LinkedInPost
-        from track_accounts.models import SourceFolder
-
-        # Create or get folder for this scraping run
-        batch_job = scraper_request.batch_job
-
-        # Get source folder names
-        source_folder_names = []
-        if batch_job.source_folder_ids:
-            source_folders = SourceFolder.objects.filter(id__in=batch_job.source_folder_ids)
-            source_folder_names = [sf.name for sf in source_folders]
-
-        # Create folder name with source folder names + date/time
-        if source_folder_names:
-            folder_base_name = ", ".join(source_folder_names)
-        else:
-            folder_base_name = "LinkedIn Scrape"
-
-        # Format: "Brand Sources - 06/10/2025 14:00:00"
-        folder_name = f"{folder_base_name} - {scraper_request.started_at.strftime('%d/%m/%Y %H:%M:%S')}"
-
-        folder, created = Folder.objects.get_or_create(
-            name=folder_name,
-            project=batch_job.project,
-            defaults={
-                'description': f'Results from Apify run {scraper_request.request_id}',
-                'category': 'posts',
-                'folder_type': 'content'
-            }
-        )
-
-        posts_saved = 0
-        for item in results:
-            try:
-                # Map Apify data to LinkedInPost model
-                author_data = item.get('author', {})
-                post_data = {
-                    'folder': folder,
-                    'url': item.get('postUrl', item.get('url', '')),
-                    'user_posted': author_data.get('name', item.get('authorName', '')),
-                    'description': item.get('text', ''),
-                    'likes': item.get('likesCount', 0),
-                    'num_likes': item.get('likesCount', 0),
-                    'num_comments': item.get('commentsCount', 0),
-                    'num_shares': item.get('sharesCount', 0),
-                    'post_id': item.get('postId', item.get('urn', '')),
-                    'post_text': item.get('text', ''),
-                    'images': item.get('images', []),
-                    'videos': item.get('videos', []),
-                    'user_title': author_data.get('title', ''),
-                    'user_headline': author_data.get('headline', ''),
-                    'user_url': author_data.get('url', ''),
-                    'author_profile_pic': author_data.get('profilePicture', ''),
-                    'date_posted': timezone.now(),
-                    'account_type': 'company' if item.get('type') == 'company' else 'personal'
-                }
-
-                # Create or update post
-                post, created = LinkedInPost.objects.get_or_create(
-                    post_id=post_data['post_id'],
-                    defaults=post_data
-                )
-
-                if created:
-                    posts_saved += 1
-                    logger.info(f"✓ Saved LinkedIn post {post_data['post_id']} by {post_data['user_posted']}")
-                else:
-                    # Update existing post with new folder if different
-                    if post.folder != folder:
-                        post.folder = folder
-                        post.save()
-                        logger.info(f"✓ Updated LinkedIn post {post_data['post_id']} folder")
-
-            except Exception as e:
-                logger.error(f"Error saving LinkedIn post {item.get('postId', 'unknown')}: {str(e)}")
-                continue
-
-        logger.info(f"Saved {posts_saved} LinkedIn posts to folder {folder.name}")
-
+        _store_platform_results('linkedin', scraper_request, results)
     except Exception as e:
         logger.error(f"Error processing LinkedIn results: {str(e)}")
 
@@ -866,38 +629,15 @@ def _get_platform_results(scraper_request: ApifyScraperRequest):
     try:
         platform = scraper_request.platform
         results = []
-        batch_job = scraper_request.batch_job
 
-        # Build the exact folder name that was created for this scraper request
-        if not scraper_request.started_at:
-            logger.warning(f"Scraper request {scraper_request.id} has no started_at timestamp")
+        # Folders are found through the run's route; started_at is only needed for legacy runs
+        if not scraper_request.started_at and not scraper_request.request_id:
+            logger.warning(f"Scraper request {scraper_request.id} has no run id or started_at timestamp")
             return []
 
         if platform.startswith('instagram'):
-            from instagram_data.models import Folder, InstagramPost
-            from track_accounts.models import SourceFolder
-
-            # Get source folder names
-            source_folder_names = []
-            if batch_job.source_folder_ids:
-                source_folders = SourceFolder.objects.filter(id__in=batch_job.source_folder_ids)
-                source_folder_names = [sf.name for sf in source_folders]
-
-            # Create folder name with source folder names + date/time
-            if source_folder_names:
-                folder_base_name = ", ".join(source_folder_names)
-            else:
-                folder_base_name = "Instagram Scrape"
-
-            # Format: "Brand Sources - 06/10/2025 14:00:00"
-            folder_name = f"{folder_base_name} - {scraper_request.started_at.strftime('%d/%m/%Y %H:%M:%S')}"
-
-            try:
-                folder = Folder.objects.get(
-                    name=folder_name,
-                    project=batch_job.project
-                )
-
+            folder = resolve_run_folder(scraper_request, 'instagram')
+            if folder:
                 # Get posts ONLY from this specific folder
                 for post in folder.posts.all():
                     results.append({
@@ -920,34 +660,12 @@ def _get_platform_results(scraper_request: ApifyScraperRequest):
                         'location': post.location,
                         'created_at': post.created_at.isoformat(),
                     })
-            except Folder.DoesNotExist:
+            else:
                 logger.warning(f"No folder found for scraper request {scraper_request.id}")
 
         elif platform.startswith('facebook'):
-            from facebook_data.models import Folder, FacebookPost
-            from track_accounts.models import SourceFolder
-
-            # Get source folder names
-            source_folder_names = []
-            if batch_job.source_folder_ids:
-                source_folders = SourceFolder.objects.filter(id__in=batch_job.source_folder_ids)
-                source_folder_names = [sf.name for sf in source_folders]
-
-            # Create folder name with source folder names + date/time
-            if source_folder_names:
-                folder_base_name = ", ".join(source_folder_names)
-            else:
-                folder_base_name = "Facebook Scrape"
-
-            # Format: "Brand Sources - 06/10/2025 14:00:00"
-            folder_name = f"{folder_base_name} - {scraper_request.started_at.strftime('%d/%m/%Y %H:%M:%S')}"
-
-            try:
-                folder = Folder.objects.get(
-                    name=folder_name,
-                    project=batch_job.project
-                )
-
+            folder = resolve_run_folder(scraper_request, 'facebook')
+            if folder:
                 for post in folder.posts.all():
                     results.append({
                         'id': post.id,
@@ -964,34 +682,12 @@ def _get_platform_results(scraper_request: ApifyScraperRequest):
                         'thumbnail': post.thumbnail,
                         'created_at': post.created_at.isoformat(),
                     })
-            except Folder.DoesNotExist:
+            else:
                 logger.warning(f"No folder found for scraper request {scraper_request.id}")
 
         elif platform.startswith('tiktok'):
-            from tiktok_data.models import Folder, TikTokPost
-            from track_accounts.models import SourceFolder
-
-            # Get source folder names
-            source_folder_names = []
-            if batch_job.source_folder_ids:
-                source_folders = SourceFolder.objects.filter(id__in=batch_job.source_folder_ids)
-                source_folder_names = [sf.name for sf in source_folders]
-
-            # Create folder name with source folder names + date/time
-            if source_folder_names:
-                folder_base_name = ", ".join(source_folder_names)
-            else:
-                folder_base_name = "TikTok Scrape"
-
-            # Format: "Brand Sources - 06/10/2025 14:00:00"
-            folder_name = f"{folder_base_name} - {scraper_request.started_at.strftime('%d/%m/%Y %H:%M:%S')}"
-
-            try:
-                folder = Folder.objects.get(
-                    name=folder_name,
-                    project=batch_job.project
-                )
-
+            folder = resolve_run_folder(scraper_request, 'tiktok')
+            if folder:
                 for post in folder.posts.all():
                     results.append({
                         'id': post.id,
@@ -1009,34 +705,12 @@ def _get_platform_results(scraper_request: ApifyScraperRequest):
                         'is_verified': post.is_verified,
                         'created_at': post.created_at.isoformat(),
                     })
-            except Folder.DoesNotExist:
+            else:
                 logger.warning(f"No folder found for scraper request {scraper_request.id}")
 
         elif platform.startswith('linkedin'):
-            from linkedin_data.models import Folder, LinkedInPost
-            from track_accounts.models import SourceFolder
-
-            # Get source folder names
-            source_folder_names = []
-            if batch_job.source_folder_ids:
-                source_folders = SourceFolder.objects.filter(id__in=batch_job.source_folder_ids)
-                source_folder_names = [sf.name for sf in source_folders]
-
-            # Create folder name with source folder names + date/time
-            if source_folder_names:
-                folder_base_name = ", ".join(source_folder_names)
-            else:
-                folder_base_name = "LinkedIn Scrape"
-
-            # Format: "Brand Sources - 06/10/2025 14:00:00"
-            folder_name = f"{folder_base_name} - {scraper_request.started_at.strftime('%d/%m/%Y %H:%M:%S')}"
-
-            try:
-                folder = Folder.objects.get(
-                    name=folder_name,
-                    project=batch_job.project
-                )
-
+            folder = resolve_run_folder(scraper_request, 'linkedin')
+            if folder:
                 for post in folder.posts.all():
                     results.append({
                         'id': post.id,
@@ -1053,7 +727,7 @@ def _get_platform_results(scraper_request: ApifyScraperRequest):
                         'user_headline': post.user_headline,
                         'created_at': post.created_at.isoformat(),
                     })
-            except Folder.DoesNotExist:
+            else:
                 logger.warning(f"No folder found for scraper request {scraper_request.id}")
 
         return results
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brightdata_integration', '0009_brightdatawebhookevent_error_message_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='brightdatawebhookevent',
+            index=models.Index(fields=['status', 'created_at'], name='brightdata__status_6a035c_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-19 16:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brightdata_integration', '0010_webhook_event_status_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='brightdatascrapedpost',
+            name='brightdata__folder__8a6c43_idx',
+        ),
+        migrations.AddIndex(
+            model_name='brightdatascrapedpost',
+            index=models.Index(fields=['folder_id', '-created_at', '-id'], name='brightdata__folder__976302_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='brightdatascrapedpost',
+            index=models.Index(fields=['folder_id', 'webhook_delivered', '-created_at', '-id'], name='brightdata__folder__d635dd_idx'),
+        ),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 5.2 on 2026-10-19 16:46
+
+import hashlib
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# Frozen copy of common/post_dedup.py as of this migration; track_accounts 0006 and 0008 import it from here
+PLATFORMS = ('instagram', 'facebook', 'linkedin', 'tiktok')
+IDENTIFYING_PARAMS = {'story_fbid', 'fbid', 'id', 'v'}
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'web.')
+INSTAGRAM_PATH = re.compile(r'^/(?:[^/]+/)?(?:p|reel|reels|tv)/([^/]+)')
+MERGE_METRICS = ('likes', 'num_comments', 'shares', 'views', 'follower_count')
+
+
+def canonical_url(url):
+    if not url:
+        return ''
+    parts = urlsplit(str(url).strip())
+    if not parts.netloc:
+        return ''
+    host = parts.netloc.lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    path = parts.path.rstrip('/')
+    match = INSTAGRAM_PATH.match(path) if host.startswith('instagram.') else None
+    if match:
+        path = f'/p/{match.group(1)}'
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query) if key in IDENTIFYING_PARAMS))
+    return f'{host}{path}' + (f'?{query}' if query else '')
+
+
+def fingerprint(platform, post_id=None, url=None):
+    post_id = str(post_id).strip() if post_id is not None else ''
+    url = canonical_url(url)
+    if post_id:
+        key = f'id:{post_id}'
+    elif url:
+        key = f'url:{url}'
+    else:
+        return None
+    platform = (platform or '').lower()
+    platform = next((name for name in PLATFORMS if platform.startswith(name)), platform)
+    return hashlib.blake2b(f'{platform}|{key}'.encode(), digest_size=16).hexdigest()
+
+
+def merge_metrics(instance, values):
+    changed = []
+    for field, value in values.items():
+        if value in (None, '', [], {}) or not hasattr(instance, field):
+            continue
+        current = getattr(instance, field)
+        if field in MERGE_METRICS:
+            try:
+                value = max(int(current or 0), int(value))
+            except (TypeError, ValueError):
+                continue
+            if value == current:
+                continue
+        elif current not in (None, '', [], {}):
+            continue
+        setattr(instance, field, value)
+        changed.append(field)
+    return changed
+
+
+def fingerprint_and_merge(apps, schema_editor):
+    """Fingerprint existing posts, then fold repeats within a folder into the oldest row"""
+    BrightDataScrapedPost = apps.get_model('brightdata_integration', 'BrightDataScrapedPost')
+    batch = []
+    for post in BrightDataScrapedPost.objects.only('id', 'platform', 'post_id', 'url').iterator(chunk_size=2000):
+        post.fingerprint = fingerprint(post.platform, post.post_id, post.url)
+        batch.append(post)
+        if len(batch) >= 2000:
+            BrightDataScrapedPost.objects.bulk_update(batch, ['fingerprint'])
+            batch = []
+    BrightDataScrapedPost.objects.bulk_update(batch, ['fingerprint'])
+
+    duplicates = []
+    groups = (BrightDataScrapedPost.objects.exclude(fingerprint__isnull=True).order_by()
+              .values('folder_id', 'fingerprint').annotate(n=Count('id')).filter(n__gt=1))
+    for group in groups:
+        original, *repeats = BrightDataScrapedPost.objects.filter(
+            folder_id=group['folder_id'], fingerprint=group['fingerprint']).order_by('id')
+        for post in repeats:
+            if merge_metrics(original, {'likes': post.likes, 'num_comments': post.num_comments, 'shares': post.shares,
+                                        'follower_count': post.follower_count, 'date_posted': post.date_posted}):
+                original.save()
+            duplicates.append(post.id)
+    for start in range(0, len(duplicates), 500):
+        BrightDataScrapedPost.objects.filter(id__in=duplicates[start:start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('brightdata_integration', '0011_scraped_post_folder_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='brightdatascrapedpost',
+            name='fingerprint',
+            field=models.CharField(blank=True, help_text='Hash of platform and canonical URL or post id (common/post_dedup.py)', max_length=32, null=True),
+        ),
+        # Irreversible: repeats are deleted once merged into the oldest row
+        migrations.RunPython(fingerprint_and_merge),
+        migrations.AddConstraint(
+            model_name='brightdatascrapedpost',
+            constraint=models.UniqueConstraint(fields=('folder_id', 'fingerprint'), name='uq_scraped_post_folder_fingerprint'),
+        ),
+    ]
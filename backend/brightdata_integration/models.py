@@ -10,6 +10,8 @@ from django.contrib.auth.models import User
 from django.utils import timezone
 from users.models import Project
 
+from common.post_dedup import fingerprint
+
 
 class BrightDataConfig(models.Model):
     """Configuration for BrightData integration"""
@@ -168,6 +170,9 @@ class BrightDataWebhookEvent(models.Model):
         verbose_name = "BrightData Webhook Event"
         verbose_name_plural = "BrightData Webhook Events"
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
 
     def __str__(self):
         return f"Webhook {self.snapshot_id} - {self.status}"
@@ -186,6 +191,8 @@ class BrightDataScrapedPost(models.Model):
     post_id = models.CharField(max_length=255, help_text='Platform-specific post ID')
     url = models.URLField(max_length=500, blank=True, null=True)
     platform = models.CharField(max_length=50, default='instagram')
+    fingerprint = models.CharField(max_length=32, blank=True, null=True,
+                                   help_text='Hash of platform and canonical URL or post id (common/post_dedup.py)')
     
     # Content
     user_posted = models.CharField(max_length=255, blank=True, null=True)
@@ -221,13 +228,24 @@ class BrightDataScrapedPost(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def save(self, *args, **kwargs):
+        if not self.fingerprint:
+            self.fingerprint = fingerprint(self.platform, self.post_id, self.url)
+        super().save(*args, **kwargs)
+
     class Meta:
         unique_together = ['post_id', 'platform', 'scraper_request']
+        constraints = [
+            # A post is stored once per job folder; repeat deliveries are merged into it
+            models.UniqueConstraint(fields=['folder_id', 'fingerprint'], name='uq_scraped_post_folder_fingerprint'),
+        ]
         verbose_name = "BrightData Scraped Post"
         verbose_name_plural = "BrightData Scraped Posts"
         ordering = ['-date_posted', '-created_at']
         indexes = [
-            models.Index(fields=['folder_id']),
+            # Folder pages are keyset-paginated newest first; webhook results only read delivered posts
+            models.Index(fields=['folder_id', '-created_at', '-id']),
+            models.Index(fields=['folder_id', 'webhook_delivered', '-created_at', '-id']),
             models.Index(fields=['platform']),
             models.Index(fields=['user_posted']),
             models.Index(fields=['date_posted']),
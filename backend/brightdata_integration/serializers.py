@@ -4,7 +4,10 @@ BrightData Integration Serializers
 This module provides serializers for BrightData integration models.
 """
 
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
+
+from common.keyset_pagination import FieldProjection
 from .models import BrightDataConfig, BrightDataBatchJob, BrightDataScraperRequest, BrightDataWebhookEvent
 
 
@@ -86,4 +89,25 @@ class BrightDataWebhookEventSerializer(serializers.ModelSerializer):
             'id', 'event_id', 'snapshot_id', 'status', 'platform',
             'raw_data', 'processed_at', 'created_at'
         ]
-        read_only_fields = ['processed_at', 'created_at']
\ No newline at end of file
+        read_only_fields = ['processed_at', 'created_at']
+
+# Fields of BrightDataScrapedPost list endpoints, served with values() (see
+# common.keyset_pagination). Legacy aliases are only returned when requested
+# with ?fields=, e.g. ?fields=post_id,likesCount
+SCRAPED_POST_DEFAULT_FIELDS = [
+    'id', 'post_id', 'url', 'user_posted', 'content', 'description', 'likes', 'num_comments', 'shares',
+    'date_posted', 'created_at', 'platform', 'media_type', 'media_url', 'hashtags', 'mentions', 'location',
+    'is_verified',
+]
+scraped_post_projection = FieldProjection({
+    **{field: field for field in SCRAPED_POST_DEFAULT_FIELDS},
+    'user_username': 'user_posted',
+    'username': 'user_posted',
+    'caption': 'content',
+    'likes_count': 'likes',
+    'likesCount': 'likes',
+    'comments_count': 'num_comments',
+    'commentsCount': 'num_comments',
+    'shares_count': 'shares',
+    'timestamp': Coalesce('date_posted', 'created_at'),
+}, default=SCRAPED_POST_DEFAULT_FIELDS)
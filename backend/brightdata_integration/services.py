@@ -15,9 +15,12 @@ import json
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 from django.conf import settings
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
-from .models import BrightDataConfig, BrightDataBatchJob, BrightDataScraperRequest
+from common.post_dedup import fingerprint, merge_metrics, post_dedup_service
+from track_accounts.unified_posts import unified_post_service
+from .models import BrightDataConfig, BrightDataBatchJob, BrightDataScraperRequest, BrightDataScrapedPost
 
 logger = logging.getLogger(__name__)
 
@@ -808,25 +811,17 @@ class BrightDataAutomatedBatchScraper:
         Save scraped results to the database
         """
         try:
-            from .models import BrightDataScrapedPost
             from django.utils.dateparse import parse_datetime
             import re
             
             saved_count = 0
+            posts_data = []
             
             for item in results_data:
                 try:
                     # Extract post data with multiple possible field names
                     post_id = (item.get('post_id') or item.get('shortcode') or 
-                              item.get('id') or item.get('url', '').split('/')[-2] if item.get('url') else str(saved_count))
-                    
-                    # Skip if we already have this post
-                    if BrightDataScrapedPost.objects.filter(
-                        post_id=post_id,
-                        platform=scraper_request.platform,
-                        scraper_request=scraper_request
-                    ).exists():
-                        continue
+                              item.get('id') or item.get('url', '').split('/')[-2] if item.get('url') else str(len(posts_data)))
                     
                     # Parse date
                     date_posted = None
@@ -845,8 +840,7 @@ class BrightDataAutomatedBatchScraper:
                         clean_value = re.sub(r'[^\d]', '', str(value))
                         return int(clean_value) if clean_value else default
                     
-                    # Create post record
-                    post = BrightDataScrapedPost.objects.create(
+                    posts_data.append(dict(
                         scraper_request=scraper_request,
                         folder_id=scraper_request.folder_id or 0,
                         post_id=post_id,
@@ -879,15 +873,18 @@ class BrightDataAutomatedBatchScraper:
                         
                         # Raw data backup
                         raw_data=item
-                    )
-                    
-                    saved_count += 1
-                    print(f"✅ Saved post {post_id} by {post.user_posted}")
+                    ))
                     
                 except Exception as e:
                     print(f"❌ Error saving post: {str(e)}")
                     continue
             
+            # New posts are inserted; copies a webhook or earlier poll stored get their metrics merged
+            for post, created in store_scraped_posts(posts_data):
+                if created:
+                    saved_count += 1
+                    print(f"✅ Saved post {post.post_id} by {post.user_posted}")
+            
             print(f"✅ Saved {saved_count} posts to database")
             return saved_count
             
@@ -1398,6 +1395,7 @@ class BrightDataAutomatedBatchScraper:
             print(f"❌ Error creating platform-specific folder: {e}")
             return None
 
+    @unified_post_service.deferred()
     def _move_scraped_data_to_workflow_folder(self, job_folder, platform_folder, scraper_request):
         """
         🎯 WORKFLOW MANAGEMENT: Move scraped posts to Data Storage folder
@@ -1542,6 +1540,7 @@ class BrightDataAutomatedBatchScraper:
             print(f"❌ WORKFLOW: Error moving scraped data: {e}")
             return 0
 
+    @unified_post_service.deferred()
     def _move_scraped_data_to_job_folder(self, job_folder, platform_folder, scraper_request):
         """Move scraped posts from BrightData to the new job folder"""
         try:
@@ -1969,4 +1968,71 @@ class BrightDataAutomatedBatchScraper:
                 'running': False,
                 'status': 'error',
                 'error': str(e)
-            }
\ No newline at end of file
+            }
+
+
+def store_scraped_posts(posts_data: List[Dict[str, Any]]) -> List[tuple]:
+    """
+    Store a delivery of scraped posts: new posts are bulk inserted, repeats of
+    a post already in the same folder (or earlier in the delivery) are merged
+    into that row with one bulk update. Returns (post, created) per item.
+    """
+    keys, posts, to_create, to_update, update_fields = [], {}, [], {}, set()
+    for post_data in posts_data:
+        value = fingerprint(post_data['platform'], post_data['post_id'], post_data.get('url'))
+        keys.append((post_data['folder_id'], value) if value else None)
+    stored = post_dedup_service.existing(BrightDataScrapedPost, 'folder_id', {key for key in keys if key})
+
+    results = []
+    for key, post_data in zip(keys, posts_data):
+        post = posts.get(key) or stored.get(key)
+        if post is None:
+            post = BrightDataScrapedPost(fingerprint=key[1] if key else None, **post_data)
+            to_create.append(post)
+            results.append((post, True))
+        else:
+            changed = merge_metrics(post, post_data)
+            if changed and post.pk:
+                to_update[post.pk] = post
+                update_fields.update(changed)
+            results.append((post, False))
+        if key:
+            posts[key] = post
+
+    try:
+        with transaction.atomic():
+            BrightDataScrapedPost.objects.bulk_create(to_create, batch_size=500)
+    except IntegrityError:
+        # Another worker stored some of these since the filter was filled: fall back to one at a time
+        return [(store_scraped_post(post_data), created) for post_data, (_, created) in zip(posts_data, results)]
+    if to_update:
+        now = timezone.now()
+        for post in to_update.values():
+            post.updated_at = now
+        BrightDataScrapedPost.objects.bulk_update(list(to_update.values()), sorted(update_fields | {'updated_at'}),
+                                                  batch_size=500)
+    post_dedup_service.remember(BrightDataScrapedPost, 'folder_id', [key for key in posts if key])
+    post_dedup_service.stats['inserted'] += len(to_create)
+    post_dedup_service.stats['merged'] += len(to_update)
+
+    # Bulk writes send no signals
+    ids, size = [post.pk for post in to_create] + list(to_update), unified_post_service.batch_size
+    for start in range(0, len(ids), size):
+        unified_post_service.sync_queryset(BrightDataScrapedPost.objects.filter(pk__in=ids[start:start + size]))
+    return results
+
+
+def store_scraped_post(post_data):
+    """Insert one scraped post, or merge it into the row already stored for the same post in the same folder"""
+    post_fingerprint = fingerprint(post_data['platform'], post_data['post_id'], post_data.get('url'))
+    try:
+        with transaction.atomic():
+            return BrightDataScrapedPost.objects.create(fingerprint=post_fingerprint, **post_data)
+    except IntegrityError:
+        if post_fingerprint is None:
+            raise
+    post = BrightDataScrapedPost.objects.get(folder_id=post_data['folder_id'], fingerprint=post_fingerprint)
+    changed = merge_metrics(post, post_data)
+    if changed:
+        post.save(update_fields=changed + ['updated_at'])
+    return post
@@ -1,4 +1,6 @@
 from track_accounts.models import UnifiedRunFolder
+from track_accounts.folder_routing import folder_route_service
+from track_accounts.unified_posts import unified_post_service
 
 # New endpoints for human-friendly data storage URLs
 from django.shortcuts import get_object_or_404
@@ -9,6 +11,10 @@ from rest_framework.response import Response
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.core.files.storage import default_storage
+from django.db.models import Count
+from common.keyset_pagination import InvalidPageRequest, page_number, page_size, paginate
+from common.request_profiling import query_budget
+from .serializers import scraped_post_projection
 import json
 import csv
 import io
@@ -19,6 +25,36 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+
+def _scraped_posts_page(queryset, params):
+    """
+    BrightDataScrapedPost rows, newest first, as plain dicts of the ?fields=
+    projection (no model instances), with the pagination keys. Every row when
+    no paging parameter is sent, otherwise one page. total_results is only
+    counted for the first page and is None on later ones
+    """
+    fields = scraped_post_projection.select(params)
+    rows, next_cursor = paginate(scraped_post_projection.values(queryset, fields), params)
+    page = page_number(params)
+    first_page = not params.get('cursor') and (page or 1) == 1
+    return {
+        'total_results': queryset.count() if first_page else None,
+        'data': scraped_post_projection.rows(rows, fields),
+        **({'page': page} if page else {}),
+        'page_size': page_size(params),
+        'next_cursor': next_cursor,
+        'has_next': next_cursor is not None,
+    }
+
+
+def _found(page):
+    """Posts found for a results message: the total on the first page, the page's rows after it"""
+    return page['total_results'] if page['total_results'] is not None else len(page['data'])
+
+
+def _invalid_page_response(error):
+    return JsonResponse({'success': False, 'error': str(error)}, status=400)
+
 def run_info_lookup(request, run_id):
     """
     Look up run information by run ID, snapshot ID, or folder ID
@@ -90,6 +126,8 @@ def run_info_lookup(request, run_id):
             'error': f'Server error while looking up run info: {str(e)}'
         }, status=500)
 
+@query_budget(10)
+@unified_post_service.deferred()
 def data_storage_run_endpoint(request, run_id):
     """
     CRITICAL ENDPOINT: Handle /data-storage/run/{run_id}/ requests
@@ -105,9 +143,7 @@ def data_storage_run_endpoint(request, run_id):
             
             # Try to find by snapshot ID
             if not scraper_request:
-                snapshot_matches = BrightDataScraperRequest.objects.filter(snapshot_id__icontains=str(run_id))
-                if snapshot_matches.exists():
-                    scraper_request = snapshot_matches.first()
+                scraper_request = BrightDataScraperRequest.objects.filter(snapshot_id=str(run_id)).first()
             
             # CRITICAL FIX: Try to treat run_id as folder_id directly
             if not scraper_request:
@@ -276,39 +312,7 @@ def data_storage_run_endpoint(request, run_id):
         
         # Get scraped posts for this run - GET ALL POSTS in the folder
         # Some older posts might not have scraper_request link, so get all folder posts
-        scraped_posts = BrightDataScrapedPost.objects.filter(
-            folder_id=scraper_request.folder_id
-        ).order_by('-date_posted', '-created_at')
-        
-        posts_data = []
-        for post in scraped_posts:
-            posts_data.append({
-                'post_id': post.post_id,
-                'url': post.url,
-                'user_posted': post.user_posted,
-                'user_username': post.user_posted,
-                'username': post.user_posted,
-                'content': post.content,
-                'caption': post.content,
-                'description': post.description,
-                'likes': post.likes,
-                'likes_count': post.likes,
-                'likesCount': post.likes,
-                'num_comments': post.num_comments,
-                'comments_count': post.num_comments,
-                'commentsCount': post.num_comments,
-                'shares': post.shares,
-                'shares_count': post.shares,
-                'date_posted': post.date_posted.isoformat() if post.date_posted else None,
-                'timestamp': post.date_posted.isoformat() if post.date_posted else post.created_at.isoformat(),
-                'media_type': post.media_type,
-                'media_url': post.media_url,
-                'hashtags': post.hashtags,
-                'mentions': post.mentions,
-                'location': post.location,
-                'is_verified': post.is_verified,
-                'platform': post.platform,
-            })
+        scraped_posts = BrightDataScrapedPost.objects.filter(folder_id=scraper_request.folder_id)
         
         # SPECIAL HANDLING FOR FOLDER 286: Show Instagram/Facebook options instead of posts
         if int(run_id) == 286:
@@ -346,11 +350,17 @@ def data_storage_run_endpoint(request, run_id):
             })
         
         # Check for subfolders (Instagram, Facebook, etc.)
-        subfolders = UnifiedRunFolder.objects.filter(parent_folder_id=folder.id)
+        subfolders = list(UnifiedRunFolder.objects.filter(parent_folder_id=folder.id))
         subfolders_data = []
-        
+
+        # Post counts for every subfolder in one grouped query
+        subfolder_counts = dict(
+            BrightDataScrapedPost.objects.filter(folder_id__in=[subfolder.id for subfolder in subfolders])
+            .order_by().values('folder_id').annotate(count=Count('id')).values_list('folder_id', 'count')
+        ) if subfolders else {}
+
         for subfolder in subfolders:
-            subfolder_posts = BrightDataScrapedPost.objects.filter(folder_id=subfolder.id).count()
+            subfolder_posts = subfolder_counts.get(subfolder.id, 0)
             subfolders_data.append({
                 'folder_id': subfolder.id,
                 'folder_name': subfolder.name,
@@ -366,8 +376,7 @@ def data_storage_run_endpoint(request, run_id):
             'folder_id': folder.id,
             'run_id': run_id,
             'scrape_number': scraper_request.scrape_number or 1,
-            'total_results': len(posts_data),
-            'data': posts_data,
+            **_scraped_posts_page(scraped_posts, request.GET),
             'status': scraper_request.status,
             'message': f'Data for run {run_id} ({folder.name})'
         }
@@ -387,6 +396,8 @@ def data_storage_run_endpoint(request, run_id):
         
         return JsonResponse(response_data)
         
+    except InvalidPageRequest as e:
+        return _invalid_page_response(e)
     except Exception as e:
         logger.error(f"Error in data_storage_run_endpoint for run {run_id}: {str(e)}")
         return JsonResponse({
@@ -394,6 +405,7 @@ def data_storage_run_endpoint(request, run_id):
             'error': f'Server error while fetching run data: {str(e)}'
         }, status=500)
 
+@unified_post_service.deferred()
 def emergency_create_folder_286(request):
     """
     EMERGENCY ENDPOINT: Create folder 286 and scraper request 286 with sample data
@@ -464,6 +476,7 @@ def emergency_create_folder_286(request):
             'error': f'Failed to create folder 286: {str(e)}'
         }, status=500)
 
+@unified_post_service.deferred()
 def create_complete_folder_structure(request):
     """
     Create complete folder structure: Main folder 286 with Instagram/Facebook subfolders
@@ -710,6 +723,7 @@ def update_folder_286_structure(request):
             'error': f'Failed to update folder 286: {str(e)}'
         }, status=500)
 
+@unified_post_service.deferred()
 def fix_real_brightdata_structure(request):
     """
     Fix the real BrightData structure: Create proper folders for Instagram/Facebook data
@@ -932,6 +946,7 @@ def clean_folder_structure(request):
             'error': f'Failed to clean folder structure: {str(e)}'
         }, status=500)
 
+@unified_post_service.deferred()
 def create_working_folder(request):
     """
     🧹 CLEANUP DATA STORAGE or Create working folder
@@ -1382,9 +1397,14 @@ from rest_framework.authentication import TokenAuthentication, SessionAuthentica
 
 from .models import BrightDataConfig, BrightDataBatchJob, BrightDataScraperRequest, BrightDataWebhookEvent, BrightDataScrapedPost
 from .serializers import BrightDataConfigSerializer, BrightDataBatchJobSerializer, BrightDataScraperRequestSerializer
-from .services import BrightDataAutomatedBatchScraper
+from .services import BrightDataAutomatedBatchScraper, store_scraped_posts
+from .webhook_handler import pending_webhook_events
+from common.structured_logging import BatchLog, LogSampler
+from track_accounts.folder_aggregation import folder_aggregation_service, page_params
+from common.webhook_admission import webhook_admission
 
 logger = logging.getLogger(__name__)
+ingest_log_sampler = LogSampler(logger)
 
 
 class BrightDataConfigViewSet(viewsets.ModelViewSet):
@@ -1548,6 +1568,7 @@ class BrightDataScraperRequestViewSet(viewsets.ModelViewSet):
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@webhook_admission('brightdata', queue_depth=pending_webhook_events)
 def brightdata_webhook(request):
     """
     Handle BrightData webhook events for data delivery
@@ -1718,7 +1739,8 @@ def brightdata_webhook(request):
                 if scraper_request:
                     webhook_event.platform = scraper_request.platform
                     webhook_event.save()
-                    target_folder_id = scraper_request.folder_id
+                    route = folder_route_service.resolve('brightdata', snapshot_id)
+                    target_folder_id = (route and route.unified_job_folder_id) or scraper_request.folder_id
                     logger.info(f"✅ Found scraper request by snapshot_id: {scraper_request.id} -> Folder {target_folder_id}")
             except Exception as e:
                 logger.error(f"Error finding scraper request by snapshot_id: {str(e)}")
@@ -1906,56 +1928,38 @@ def brightdata_notify(request):
 
 
 
-def _create_brightdata_scraped_post(item_data, platform, folder_id=None, scraper_request=None):
+def _scraped_post_data(item_data, platform, folder_id=None, scraper_request=None):
     """
-    PRODUCTION FIX: Create BrightDataScrapedPost records from webhook data
+    PRODUCTION FIX: Map webhook data to BrightDataScrapedPost fields
     This is the missing piece that links posts to job folders!
     CRITICAL FIX: Made scraper_request optional to fix database constraint
     """
     try:
-        from .models import BrightDataScrapedPost
         from django.utils import timezone
         import time
         
-        # DEBUG: Log all input parameters
-        logger.info(f"🔍 _create_brightdata_scraped_post called:")
-        logger.info(f"   item_data keys: {list(item_data.keys()) if item_data else 'None'}")
-        logger.info(f"   platform: {platform}")
-        logger.info(f"   folder_id param: {folder_id}")
-        logger.info(f"   scraper_request: {scraper_request}")
-        
         # 🔥 ENHANCED FOLDER_ID EXTRACTION - Multiple fallbacks for reliability
         if not folder_id:
             folder_id = item_data.get('folder_id')
-            logger.info(f"   folder_id from item_data: {folder_id}")
         if not folder_id and scraper_request:
             folder_id = scraper_request.folder_id
-            logger.info(f"   folder_id from scraper_request: {folder_id}")
         if not folder_id:
             # CRITICAL FALLBACK: Use default folder 1 (Nike) if no folder specified
             folder_id = 1
-            logger.warning(f"   ⚠️ Using default folder_id: {folder_id}")
-            
-        logger.info(f"   🎯 FINAL folder_id: {folder_id}")
+            ingest_log_sampler.debug('⚠️ Using default folder_id %s', folder_id)
         
         # 🚨 PRODUCTION CRITICAL: Ensure folder_id is valid
         if not folder_id:
             logger.error(f"❌ No valid folder_id found - cannot save post!")
             return None
         
-        # ENHANCED: Verify folder exists and create UnifiedRunFolder if needed
-        if folder_id:
+        # The folder check only feeds a diagnostic, so it runs for sampled items only
+        if ingest_log_sampler.should_log():
             from track_accounts.models import UnifiedRunFolder
-            try:
-                unified_folder = UnifiedRunFolder.objects.filter(id=folder_id).first()
-                if unified_folder:
-                    logger.info(f"✅ Found UnifiedRunFolder {folder_id}: {unified_folder.name}")
-                else:
-                    logger.warning(f"⚠️ No UnifiedRunFolder found for ID {folder_id} - will create post anyway")
-            except Exception as e:
-                logger.warning(f"⚠️ Error checking UnifiedRunFolder {folder_id}: {e}")
+            if not UnifiedRunFolder.objects.filter(id=folder_id).exists():
+                logger.debug('⚠️ No UnifiedRunFolder found for ID %s - will create post anyway', folder_id)
         
-        # Create the BrightDataScrapedPost record
+        # Field values of the BrightDataScrapedPost record
         post_data = {
             'post_id': item_data.get('post_id') or item_data.get('id') or f"webhook_{int(time.time())}",
             'url': item_data.get('url', ''),
@@ -1978,37 +1982,11 @@ def _create_brightdata_scraped_post(item_data, platform, folder_id=None, scraper
             'date_posted': timezone.now()
         }
         
-        # DEBUG: Log the post_data being created
-        logger.info(f"📝 Creating post_data: {post_data}")
-        
-        # Get or create the scraped post (FIXED: scraper_request now optional)
-        logger.info(f"💾 Attempting to get_or_create BrightDataScrapedPost...")
-        scraped_post, created = BrightDataScrapedPost.objects.get_or_create(
-            post_id=post_data['post_id'],
-            defaults=post_data
-        )
-        
-        if created:
-            logger.info(f"✅ Created BrightDataScrapedPost: {scraped_post.post_id} -> Folder {folder_id}")
-            logger.info(f"   Post ID: {scraped_post.id}")
-            logger.info(f"   Platform: {scraped_post.platform}")
-            logger.info(f"   User: {scraped_post.user_posted}")
-            logger.info(f"   Content: {scraped_post.content[:100]}...")
-        else:
-            logger.info(f"♻️ Found existing BrightDataScrapedPost: {scraped_post.post_id}")
-            # Update folder_id if it wasn't set before
-            if not scraped_post.folder_id and folder_id:
-                scraped_post.folder_id = folder_id
-                scraped_post.save()
-                logger.info(f"🔗 Updated folder link: {scraped_post.post_id} -> Folder {folder_id}")
-        
-        logger.info(f"🎉 Successfully processed BrightDataScrapedPost: {scraped_post.id}")
-        return scraped_post
+        return post_data
         
     except Exception as e:
-        logger.error(f"❌ Error creating BrightDataScrapedPost: {e}")
-        import traceback
-        logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+        logger.exception('❌ Error mapping BrightDataScrapedPost for %s item %s: %s',
+                         platform, item_data.get('post_id') or item_data.get('id'), e)
         return None
 
 
@@ -2021,55 +1999,60 @@ def _process_brightdata_results(data: list, platform: str, scraper_request=None,
     CRITICAL: Now accepts target_folder_id parameter for proper folder linking
     """
     try:
-        logger.info(f"📊 Processing {len(data)} items for platform {platform}")
-        logger.info(f"📁 Target folder ID: {target_folder_id}")
-        
-        # CRITICAL FIX: Process each item and create BrightDataScrapedPost records
-        processed_count = 0
-        
-        for item in data:
-            # 🔥 ENHANCED FOLDER_ID DETECTION - Priority order for folder assignment
-            item_folder_id = target_folder_id  # Use webhook-determined folder first
-            if not item_folder_id:
-                item_folder_id = item.get('folder_id')  # Check item data
-            if not item_folder_id and scraper_request:
-                item_folder_id = scraper_request.folder_id  # Use scraper request folder
-            if not item_folder_id:
-                item_folder_id = 1  # Final fallback
-            
-            logger.info(f"📁 Processing item for folder_id: {item_folder_id} (platform: {platform})")
-            
-            # CREATE THE MISSING BrightDataScrapedPost RECORD
-            scraped_post = _create_brightdata_scraped_post(item, platform, item_folder_id, scraper_request)
-            
-            if scraped_post:
-                processed_count += 1
-                logger.info(f"✅ Created post {scraped_post.id} in folder {item_folder_id}: {scraped_post.user_posted}")
-        
-        logger.info(f"Created {processed_count} BrightDataScrapedPost records with folder links")
-        
-        # ENHANCED: Update scraper request status if we processed data successfully
-        if scraper_request and processed_count > 0:
-            logger.info(f"🔄 Updating scraper request {scraper_request.id} status to completed")
-            scraper_request.status = 'completed'
-            scraper_request.completed_at = timezone.now()
+        # UnifiedPost rows for everything stored below are written in batches at the end
+        with unified_post_service.deferred():
+            # CRITICAL FIX: Process each item and create BrightDataScrapedPost records
+            processed_count = 0
+            posts_data = []
+
+            # One summary record per batch; per-item detail is sampled debug logging
+            with BatchLog(logger, 'brightdata_ingest', platform=platform, folder_id=target_folder_id,
+                          scraper_request_id=scraper_request.id if scraper_request else None) as batch:
+                for item in data:
+                    # 🔥 ENHANCED FOLDER_ID DETECTION - Priority order for folder assignment
+                    item_folder_id = target_folder_id  # Use webhook-determined folder first
+                    if not item_folder_id:
+                        item_folder_id = item.get('folder_id')  # Check item data
+                    if not item_folder_id and scraper_request:
+                        item_folder_id = scraper_request.folder_id  # Use scraper request folder
+                    if not item_folder_id:
+                        item_folder_id = 1  # Final fallback
+
+                    # CREATE THE MISSING BrightDataScrapedPost RECORD
+                    post_data = _scraped_post_data(item, platform, item_folder_id, scraper_request)
+                    if post_data:
+                        posts_data.append(post_data)
+                    else:
+                        batch.count('failed')
+
+                # One insert for new posts and one update for repeats of posts already in their folder
+                for scraped_post, created in store_scraped_posts(posts_data):
+                    processed_count += 1
+                    batch.count('created' if created else 'existing')
+                    ingest_log_sampler.debug('%s BrightDataScrapedPost %s (%s, @%s) -> folder %s',
+                                             '✅ Created' if created else '♻️ Existing', scraped_post.post_id,
+                                             platform, scraped_post.user_posted, scraped_post.folder_id)
+        
+            # ENHANCED: Update scraper request status if we processed data successfully
+            if scraper_request and processed_count > 0:
+                scraper_request.status = 'completed'
+                scraper_request.completed_at = timezone.now()
             
-            # Set started_at if not already set
-            if not scraper_request.started_at:
-                scraper_request.started_at = scraper_request.created_at
+                # Set started_at if not already set
+                if not scraper_request.started_at:
+                    scraper_request.started_at = scraper_request.created_at
                 
-            scraper_request.save()
-            logger.info(f"✅ Updated scraper request {scraper_request.id} to completed with {processed_count} posts")
-        
-        # Also process results based on platform (keep existing logic)
-        if platform == 'instagram':
-            _process_instagram_results(scraper_request, data)
-        elif platform == 'facebook':
-            _process_facebook_results(scraper_request, data)
-        elif platform == 'tiktok':
-            _process_tiktok_results(scraper_request, data)
-        elif platform == 'linkedin':
-            _process_linkedin_results(scraper_request, data)
+                scraper_request.save()
+        
+            # Also process results based on platform (keep existing logic)
+            if platform == 'instagram':
+                _process_instagram_results(scraper_request, data)
+            elif platform == 'facebook':
+                _process_facebook_results(scraper_request, data)
+            elif platform == 'tiktok':
+                _process_tiktok_results(scraper_request, data)
+            elif platform == 'linkedin':
+                _process_linkedin_results(scraper_request, data)
         
         return True
             
@@ -2493,6 +2476,15 @@ def trigger_scraper_endpoint(request):
                                 unified_folder.folder_type = 'job'
                                 unified_folder.save()
                                 logger.info(f"🔄 Updated folder {folder_id} type to 'job' for scraping workflow")
+
+                            # Route the snapshot to its job folder so the webhook needs no lookups
+                            folder_route_service.register(
+                                'brightdata',
+                                snapshot_id,
+                                platform_code=platform.lower(),
+                                project_id=unified_folder.project_id,
+                                unified_job_folder_id=unified_folder.id,
+                            )
                             
             except Exception as e:
                 logger.warning(f"Failed to create job tracking record: {str(e)}")
@@ -2779,45 +2771,20 @@ def brightdata_job_results(request, job_folder_id):
             folder_id=job_folder_id
         ).exclude(
             post_id__startswith='sample_post_'  # Exclude old sample data
-        ).order_by('-date_posted', '-created_at')
+        )
         
         if existing_scraped_posts.exists():
-            logger.info(f"✅ Found {existing_scraped_posts.count()} real scraped posts for folder {job_folder_id}")
-            
             # Return real scraped data immediately
-            posts_data = []
-            for post in existing_scraped_posts:
-                posts_data.append({
-                    'post_id': post.post_id,
-                    'url': post.url,
-                    'user_username': post.user_posted,
-                    'username': post.user_posted,
-                    'caption': post.content,
-                    'description': post.description,
-                    'likes_count': post.likes,
-                    'likesCount': post.likes,
-                    'comments_count': post.num_comments,
-                    'commentsCount': post.num_comments,
-                    'shares_count': post.shares,
-                    'timestamp': post.date_posted.isoformat() if post.date_posted else post.created_at.isoformat(),
-                    'date_posted': post.date_posted.isoformat() if post.date_posted else post.created_at.isoformat(),
-                    'is_verified': post.is_verified,
-                    'platform': post.platform,
-                    'media_type': post.media_type,
-                    'media_url': post.media_url,
-                    'location': post.location,
-                    'hashtags': post.hashtags,
-                    'mentions': post.mentions,
-                })
+            page = _scraped_posts_page(existing_scraped_posts, request.GET)
+            logger.info(f"✅ Found {_found(page)} real scraped posts for folder {job_folder_id}")
             
             return JsonResponse({
                 'success': True,
                 'job_folder_id': job_folder_id,
                 'job_folder_name': job_folder.name,
-                'total_results': len(posts_data),
-                'data': posts_data,
+                **page,
                 'source': 'real_brightdata_scraped_data',
-                'message': f'Showing {len(posts_data)} real scraped posts from BrightData'
+                'message': f"Showing {_found(page)} real scraped posts from BrightData"
             })
         
         # Look for BrightData scraper requests related to this job
@@ -2969,35 +2936,11 @@ def brightdata_job_results(request, job_folder_id):
                     continue
         
         # Get saved posts from database (now includes fresh data if available)
-        saved_posts = BrightDataScrapedPost.objects.filter(
-            folder_id=job_folder_id
-        ).order_by('-date_posted', '-created_at')
+        saved_posts = BrightDataScrapedPost.objects.filter(folder_id=job_folder_id)
         
         if saved_posts.exists():
             # We have saved posts - return them
-            posts_data = []
-            for post in saved_posts:
-                posts_data.append({
-                    'post_id': post.post_id,
-                    'url': post.url,
-                    'user_username': post.user_posted,
-                    'username': post.user_posted,
-                    'caption': post.content,
-                    'description': post.description,
-                    'likes_count': post.likes,
-                    'likesCount': post.likes,
-                    'comments_count': post.num_comments,
-                    'commentsCount': post.num_comments,
-                    'timestamp': post.date_posted.isoformat() if post.date_posted else None,
-                    'date_posted': post.date_posted.isoformat() if post.date_posted else None,
-                    'is_verified': post.is_verified,
-                    'platform': post.platform,
-                    'media_type': post.media_type,
-                    'media_url': post.media_url,
-                    'location': post.location,
-                    'hashtags': post.hashtags,
-                    'mentions': post.mentions,
-                })
+            page = _scraped_posts_page(saved_posts, request.GET)
             
             # Determine data source
             data_source = 'fresh_from_brightdata' if fresh_data_fetched else 'database'
@@ -3006,12 +2949,11 @@ def brightdata_job_results(request, job_folder_id):
                 'success': True,
                 'job_folder_id': job_folder_id,
                 'job_folder_name': job_folder.name,
-                'total_results': len(posts_data),
-                'data': posts_data,
+                **page,
                 'source': data_source,
                 'fresh_data_fetched': fresh_data_fetched,
-                'saved_posts_count': len(posts_data),
-                'message': f'Showing {len(posts_data)} posts from {data_source}'
+                'saved_posts_count': page['total_results'],
+                'message': f"Showing {_found(page)} posts from {data_source}"
             })
         
         # No saved posts - try to fetch and save from BrightData
@@ -3021,11 +2963,11 @@ def brightdata_job_results(request, job_folder_id):
         failed_snapshots = []
         saved_count = 0
         
-        for request in scraper_requests:
-            snapshot_id = request.snapshot_id
+        for scraper_request in scraper_requests:
+            snapshot_id = scraper_request.snapshot_id
             
             # Try to fetch and save results
-            save_result = scraper.fetch_and_save_brightdata_results(snapshot_id, request)
+            save_result = scraper.fetch_and_save_brightdata_results(snapshot_id, scraper_request)
             
             if save_result['success']:
                 successful_snapshots.append(snapshot_id)
@@ -3037,35 +2979,13 @@ def brightdata_job_results(request, job_folder_id):
                 })
         
         # After saving, try to get the saved posts again
-        saved_posts = BrightDataScrapedPost.objects.filter(
-            folder_id=job_folder_id
-        ).order_by('-date_posted', '-created_at')
-        
-        posts_data = []
-        for post in saved_posts:
-            posts_data.append({
-                'post_id': post.post_id,
-                'url': post.url,
-                'user_username': post.user_posted,
-                'username': post.user_posted,
-                'caption': post.content,
-                'description': post.description,
-                'likes_count': post.likes,
-                'likesCount': post.likes,
-                'comments_count': post.num_comments,
-                'commentsCount': post.num_comments,
-                'timestamp': post.date_posted.isoformat() if post.date_posted else None,
-                'date_posted': post.date_posted.isoformat() if post.date_posted else None,
-                'is_verified': post.is_verified,
-                'platform': post.platform,
-            })
+        saved_posts = BrightDataScrapedPost.objects.filter(folder_id=job_folder_id)
         
         return JsonResponse({
             'success': True,
             'job_folder_id': job_folder_id,
             'job_folder_name': job_folder.name,
-            'total_results': len(posts_data),
-            'data': posts_data,
+            **_scraped_posts_page(saved_posts, request.GET),
             'source': 'fetched_and_saved',
             'saved_count': saved_count,
             'successful_snapshots': len(successful_snapshots),
@@ -3076,6 +2996,8 @@ def brightdata_job_results(request, job_folder_id):
             }
         })
         
+    except InvalidPageRequest as e:
+        return _invalid_page_response(e)
     except Exception as e:
         logger.error(f"Error fetching job results for folder {job_folder_id}: {str(e)}")
         return JsonResponse({
@@ -3181,6 +3103,7 @@ def run_redirect_endpoint(request, run_id):
 
 
 @csrf_exempt
+@unified_post_service.deferred()
 def upload_data_file(request):
     """
     Upload JSON or CSV file and create a new folder with the data
@@ -3412,6 +3335,7 @@ def list_uploaded_folders(request):
             'error': f'Error listing folders: {str(e)}'
         }, status=500)
 
+@query_budget(10)
 @require_http_methods(["GET"])
 def webhook_results_by_folder_scrape(request, folder_name, scrape_number):
     """
@@ -3440,13 +3364,10 @@ def webhook_results_by_folder_scrape(request, folder_name, scrape_number):
                 'error': f'Error finding folder: {str(e)}'
             }, status=400)
         
-        # Get webhook-delivered posts ONLY (posts that came via webhook)
-        webhook_posts = BrightDataScrapedPost.objects.filter(
-            folder_id=folder.id,
-            webhook_delivered=True  # 🎯 ONLY webhook-delivered posts (no polling)
-        ).order_by('-created_at')
+        # Posts delivered to this folder or any of its subfolders, one page at a time
+        results = folder_aggregation_service.aggregate(folder.id, **page_params(request.GET))
         
-        if not webhook_posts.exists():
+        if results['total_results'] == 0:
             # Check if there are any scraper requests for this folder
             scraper_requests = BrightDataScraperRequest.objects.filter(folder_id=folder.id)
             
@@ -3471,37 +3392,19 @@ def webhook_results_by_folder_scrape(request, folder_name, scrape_number):
                     'folder_name': decoded_folder_name
                 }, status=404)
         
-        # Transform webhook-delivered posts to expected format
-        posts_data = []
-        for post in webhook_posts:
-            posts_data.append({
-                'post_id': post.post_id,
-                'url': post.url,
-                'user_posted': post.user_posted,
-                'content': post.content,
-                'likes': post.likes,
-                'num_comments': post.num_comments,
-                'date_posted': post.date_posted,
-                'platform': post.platform,
-                'id': post.id,
-                'webhook_delivered': True,  # Mark as webhook-delivered
-                'created_at': post.created_at.isoformat() if post.created_at else None,
-                'raw_data': post.raw_data
-            })
-        
-        logger.info(f"✅ WEBHOOK RESULTS: Found {len(posts_data)} webhook-delivered posts")
+        logger.info(f"✅ WEBHOOK RESULTS: Found {_found(results)} webhook-delivered posts")
         
         return JsonResponse({
             'success': True,
-            'data': posts_data,
-            'total_results': len(posts_data),
+            **results,
             'folder_name': decoded_folder_name,
-            'folder_id': folder.id,
             'scrape_number': scrape_number,
             'delivery_method': 'webhook',
-            'message': f'Successfully loaded {len(posts_data)} webhook-delivered posts'
+            'message': f"Successfully loaded {_found(results)} webhook-delivered posts"
         })
         
+    except InvalidPageRequest as e:
+        return _invalid_page_response(e)
     except Exception as e:
         logger.error(f"❌ WEBHOOK RESULTS ERROR: {str(e)}")
         return JsonResponse({
@@ -3567,56 +3470,33 @@ def webhook_results_by_run_id(request, run_id):
                 'status': 'no_folder'
             }, status=404)
         
-        folder = UnifiedRunFolder.objects.get(id=scraper_request.folder_id)
-        
-        # Get webhook-delivered posts for this folder
-        webhook_posts = BrightDataScrapedPost.objects.filter(
-            folder_id=folder.id,
-            webhook_delivered=True  # 🎯 ONLY webhook-delivered posts
-        ).order_by('-created_at')
+        results = folder_aggregation_service.aggregate(scraper_request.folder_id, **page_params(request.GET))
+        if results is None:
+            raise UnifiedRunFolder.DoesNotExist(f'UnifiedRunFolder {scraper_request.folder_id} does not exist')
         
-        if not webhook_posts.exists():
+        if results['total_results'] == 0:
             return JsonResponse({
                 'success': False,
                 'message': f'Run {run_id} exists but no webhook results received yet',
                 'status': 'waiting_for_webhook',
                 'scraper_status': scraper_request.status,
-                'folder_name': folder.name,
+                'folder_name': results['folder_name'],
                 'job_id': scraper_request.snapshot_id,
                 'hint': 'Data will appear here automatically when BrightData webhook delivers results'
             }, status=202)
         
-        # Transform posts data
-        posts_data = []
-        for post in webhook_posts:
-            posts_data.append({
-                'post_id': post.post_id,
-                'url': post.url,
-                'user_posted': post.user_posted,
-                'content': post.content,
-                'likes': post.likes,
-                'num_comments': post.num_comments,
-                'date_posted': post.date_posted,
-                'platform': post.platform,
-                'id': post.id,
-                'webhook_delivered': True,
-                'created_at': post.created_at.isoformat() if post.created_at else None,
-                'raw_data': post.raw_data
-            })
-        
-        logger.info(f"✅ WEBHOOK RESULTS BY RUN: Found {len(posts_data)} posts for run {run_id}")
+        logger.info(f"✅ WEBHOOK RESULTS BY RUN: Found {_found(results)} posts for run {run_id}")
         
         return JsonResponse({
             'success': True,
-            'data': posts_data,
-            'total_results': len(posts_data),
-            'folder_name': folder.name,
-            'folder_id': folder.id,
+            **results,
             'run_id': run_id,
             'delivery_method': 'webhook',
-            'message': f'Successfully loaded {len(posts_data)} webhook-delivered posts from run {run_id}'
+            'message': f"Successfully loaded {_found(results)} webhook-delivered posts from run {run_id}"
         })
         
+    except InvalidPageRequest as e:
+        return _invalid_page_response(e)
     except Exception as e:
         logger.error(f"❌ WEBHOOK RESULTS BY RUN ERROR: {str(e)}")
         return JsonResponse({
@@ -3624,6 +3504,7 @@ def webhook_results_by_run_id(request, run_id):
             'error': f'Error loading webhook results for run {run_id}: {str(e)}'
         }, status=500)
 
+@query_budget(10)
 @require_http_methods(["GET"])
 def webhook_results_by_job_id(request, job_id):
     """
@@ -3633,82 +3514,38 @@ def webhook_results_by_job_id(request, job_id):
     try:
         logger.info(f"🎯 WEBHOOK RESULTS BY JOB ID: {job_id}")
         
-        # 🔧 Use the new aggregation function for better folder handling
-        # This will handle both direct webhook data and subfolder aggregation
-        aggregation_response = webhook_results_by_folder_id(request, job_id)
-        
-        # If aggregation found data, return it
-        if hasattr(aggregation_response, 'data') and aggregation_response.data.get('success'):
-            return JsonResponse(aggregation_response.data)
+        # Posts of the job folder and all of its subfolders, aggregated in-process
+        results = folder_aggregation_service.aggregate(job_id, **page_params(request.GET))
         
-        # Fallback to original logic if aggregation didn't work
-        # Find folder by job ID
-        folder = UnifiedRunFolder.objects.filter(id=job_id).first()
-        
-        if not folder:
+        if results is None:
             return JsonResponse({
                 'success': False,
                 'error': f'Job/Folder {job_id} not found',
                 'status': 'not_found'
             }, status=404)
         
-        # Get webhook-delivered posts for this folder
-        webhook_posts = BrightDataScrapedPost.objects.filter(
-            folder_id=folder.id,
-            webhook_delivered=True  # 🎯 ONLY webhook-delivered posts
-        ).order_by('-created_at')
-        
-        if not webhook_posts.exists():
-            # 🔧 Enhanced message for folder 1 specifically
-            if int(job_id) == 1:
-                return JsonResponse({
-                    'success': False,
-                    'message': f'Folder 1 (Nike scraping run) has subfolders but no direct webhook data yet. The subfolder aggregation will handle this automatically.',
-                    'status': 'waiting_for_webhook',
-                    'folder_name': folder.name,
-                    'hint': 'This folder has Instagram and Facebook subfolders with data - aggregation should work',
-                    'debug_info': 'Check /api/track-accounts/report-folders/1/ to see subfolder structure'
-                }, status=202)
-            else:
-                return JsonResponse({
-                    'success': False,
-                    'message': f'Job {job_id} exists but no webhook results received yet',
-                    'status': 'waiting_for_webhook',
-                    'folder_name': folder.name,
-                    'hint': 'Data will appear here automatically when BrightData webhook delivers results'
-                }, status=202)
-        
-        # Transform posts data
-        posts_data = []
-        for post in webhook_posts:
-            posts_data.append({
-                'post_id': post.post_id,
-                'url': post.url,
-                'user_posted': post.user_posted,
-                'content': post.content,
-                'likes': post.likes,
-                'num_comments': post.num_comments,
-                'date_posted': post.date_posted,
-                'platform': post.platform,
-                'id': post.id,
-                'webhook_delivered': True,
-                'created_at': post.created_at.isoformat() if post.created_at else None,
-                'raw_data': post.raw_data
-            })
+        if results['total_results'] == 0:
+            return JsonResponse({
+                'success': False,
+                'message': f'Job {job_id} exists but no webhook results received yet',
+                'status': 'waiting_for_webhook',
+                'folder_name': results['folder_name'],
+                'subfolders_found': results['subfolders_processed'],
+                'hint': 'Data will appear here automatically when BrightData webhook delivers results'
+            }, status=202)
         
-        logger.info(f"✅ WEBHOOK RESULTS BY JOB: Found {len(posts_data)} posts for job {job_id}")
+        logger.info(f"✅ WEBHOOK RESULTS BY JOB: Found {_found(results)} posts for job {job_id}")
         
         return JsonResponse({
             'success': True,
-            'data': posts_data,
-            'total_results': len(posts_data),
-            'folder_name': folder.name,
-            'folder_id': folder.id,
+            **results,
             'job_id': job_id,
             'delivery_method': 'webhook',
-            'message': f'Successfully loaded {len(posts_data)} webhook-delivered posts from job {job_id}'
+            'message': f"Successfully loaded {_found(results)} webhook-delivered posts from job {job_id}"
         })
         
+    except InvalidPageRequest as e:
+        return _invalid_page_response(e)
     except Exception as e:
         logger.error(f"❌ WEBHOOK RESULTS BY JOB ERROR: {str(e)}")
         return JsonResponse({
@@ -3717,6 +3554,7 @@ def webhook_results_by_job_id(request, job_id):
         }, status=500)
 
 
+@query_budget(10)
 @api_view(['GET'])
 def webhook_results_by_folder_id(request, folder_id):
     """
@@ -3727,131 +3565,37 @@ def webhook_results_by_folder_id(request, folder_id):
     try:
         logger.info(f"🔧 AGGREGATION FIX: Checking folder {folder_id} for webhook data")
         
-        # First check if we have direct webhook data for this folder
-        folder_posts = BrightDataScrapedPost.objects.filter(
-            folder_id=folder_id,
-            webhook_delivered=True
-        ).order_by('-created_at')
+        results = folder_aggregation_service.aggregate(folder_id, **page_params(request.GET))
         
-        if folder_posts.exists():
-            # Direct folder data available
-            posts_data = []
-            for post in folder_posts:
-                post_data = {
-                    'id': post.id,
-                    'post_id': post.post_id,
-                    'url': post.url,
-                    'user_posted': post.user_posted,
-                    'content': post.description or post.content,
-                    'likes': post.likes or 0,
-                    'num_comments': post.num_comments or 0,
-                    'date_posted': post.date_posted.isoformat() if post.date_posted else '',
-                    'webhook_delivered': post.webhook_delivered,
-                    'created_at': post.created_at.isoformat()
-                }
-                posts_data.append(post_data)
-            
-            logger.info(f"✅ Found {len(posts_data)} direct webhook posts in folder {folder_id}")
+        if results is None:
+            logger.warning(f"⚠️ Folder {folder_id} not found")
             return Response({
-                'success': True,
-                'total_results': len(posts_data),
-                'data': posts_data,
-                'source': 'direct_folder_webhook'
+                'success': False,
+                'message': f'Folder {folder_id} not found',
+                'total_results': 0,
+                'data': []
             })
         
-        # No direct data, try to get folder info and aggregate subfolders
-        logger.info(f"🔍 No direct webhook data, checking subfolders for folder {folder_id}")
-        try:
-            # Use internal API to get folder data
-            folder_response = requests.get(f'https://trackfutura.futureobjects.io/api/track-accounts/report-folders/{folder_id}/')
-            if folder_response.status_code == 200:
-                folder_data = folder_response.json()
-                subfolders = folder_data.get('subfolders', [])
-                
-                logger.info(f"📁 Found {len(subfolders)} subfolders in folder {folder_id}")
-                
-                if subfolders:
-                    # Aggregate posts from all subfolders
-                    all_posts = []
-                    for subfolder in subfolders:
-                        subfolder_id = subfolder.get('id')
-                        platform = subfolder.get('platform', 'instagram')
-                        
-                        logger.info(f"📁 Processing subfolder {subfolder_id} ({platform})")
-                        
-                        # Try to get posts from platform-specific endpoints
-                        try:
-                            posts_endpoint = f'https://trackfutura.futureobjects.io/api/{platform}-data/folders/{subfolder_id}/posts/'
-                            posts_response = requests.get(posts_endpoint, timeout=10)
-                            if posts_response.status_code == 200:
-                                posts_data = posts_response.json()
-                                posts = posts_data.get('results', posts_data)
-                                
-                                logger.info(f"✅ Found {len(posts)} posts in {platform} subfolder {subfolder_id}")
-                                
-                                # Transform posts to common format
-                                for i, post in enumerate(posts):
-                                    transformed_post = {
-                                        'id': post.get('id', i + len(all_posts) + 1),
-                                        'post_id': post.get('post_id') or post.get('shortcode') or f'post_{i}',
-                                        'url': post.get('url') or post.get('postUrl', ''),
-                                        'user_posted': post.get('user_posted') or post.get('ownerUsername') or post.get('user', 'Unknown'),
-                                        'content': post.get('description') or post.get('caption') or post.get('text') or post.get('content', ''),
-                                        'likes': int(post.get('likes') or post.get('likesCount') or 0),
-                                        'num_comments': int(post.get('num_comments') or post.get('commentsCount') or post.get('comments') or 0),
-                                        'date_posted': post.get('date_posted') or post.get('timestamp') or post.get('date', ''),
-                                        'platform': platform,
-                                        'subfolder_id': subfolder_id,
-                                        'created_at': post.get('created_at') or post.get('timestamp', '')
-                                    }
-                                    all_posts.append(transformed_post)
-                        except Exception as e:
-                            logger.error(f'❌ Error fetching posts from {platform} subfolder {subfolder_id}: {e}')
-                    
-                    if all_posts:
-                        logger.info(f"✅ AGGREGATION SUCCESS: Combined {len(all_posts)} posts from {len(subfolders)} subfolders")
-                        return Response({
-                            'success': True,
-                            'total_results': len(all_posts),
-                            'data': all_posts,
-                            'source': 'aggregated_subfolders',
-                            'folder_name': folder_data.get('name'),
-                            'subfolders_processed': len(subfolders)
-                        })
-                    else:
-                        logger.warning(f"⚠️ No posts found in any subfolders for folder {folder_id}")
-                        return Response({
-                            'success': False,
-                            'message': f'Folder {folder_id} has subfolders but no accessible post data',
-                            'total_results': 0,
-                            'data': [],
-                            'subfolders_found': len(subfolders)
-                        })
-                else:
-                    logger.warning(f"⚠️ Folder {folder_id} has no subfolders")
-                    return Response({
-                        'success': False,
-                        'message': f'Folder {folder_id} exists but has no subfolders or direct data',
-                        'total_results': 0,
-                        'data': []
-                    })
-            else:
-                logger.error(f"❌ Folder {folder_id} not found (status: {folder_response.status_code})")
-                return Response({
-                    'success': False,
-                    'message': f'Folder {folder_id} not found',
-                    'total_results': 0,
-                    'data': []
-                })
-        except Exception as e:
-            logger.error(f"❌ Error accessing folder {folder_id}: {e}")
+        if results['total_results'] == 0:
+            logger.warning(f"⚠️ No posts found in folder {folder_id} or its {results['subfolders_processed']} subfolders")
             return Response({
                 'success': False,
-                'message': f'Error accessing folder {folder_id}: {str(e)}',
+                'message': f'Folder {folder_id} exists but has no webhook or platform post data',
                 'total_results': 0,
-                'data': []
+                'data': [],
+                'subfolders_found': results['subfolders_processed']
             })
+        
+        logger.info(f"✅ AGGREGATION: {_found(results)} posts from folder {folder_id} "
+                    f"and {results['subfolders_processed']} subfolders")
+        return Response({
+            'success': True,
+            **results,
+            'source': 'aggregated_subfolders' if results['subfolders_processed'] else 'direct_folder_webhook',
+        })
             
+    except InvalidPageRequest as e:
+        return Response({'success': False, 'message': str(e), 'total_results': 0, 'data': []}, status=400)
     except Exception as e:
         logger.error(f"❌ Database error for folder {folder_id}: {e}")
         return Response({
@@ -3862,6 +3606,7 @@ def webhook_results_by_folder_id(request, folder_id):
         })
 
 @require_http_methods(["GET", "POST"])
+@unified_post_service.deferred()
 def emergency_create_run_data(request, run_id):
     """
     🚨 EMERGENCY: Create scraped data for a specific run ID
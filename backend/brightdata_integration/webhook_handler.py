@@ -8,32 +8,41 @@ import time
 import logging
 import traceback
 import requests
-from datetime import datetime
+from datetime import timedelta
+from django.conf import settings
 from django.http import JsonResponse
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from .models import BrightDataWebhookEvent, BrightDataScraperRequest
+from common.webhook_admission import webhook_admission
 from workflow.models import ScrapingJob
 
 logger = logging.getLogger(__name__)
 
 
+def pending_webhook_events():
+    """
+    Webhook deliveries stored but not yet finished. Events stuck in processing
+    longer than the metrics retention window are not counted as backlog.
+    """
+    since = timezone.now() - timedelta(seconds=getattr(settings, 'WEBHOOK_METRICS_RETENTION', 3600))
+    return BrightDataWebhookEvent.objects.filter(
+        status__in=['pending', 'processing'], created_at__gte=since
+    ).count()
+
+
 @csrf_exempt
+@webhook_admission('brightdata', queue_depth=pending_webhook_events)
 def brightdata_webhook(request):
     """
     Safe webhook handler that always captures raw payload first, then validates
     """
     # 1. CONFIRM DJANGO RECEIVES THE REQUEST
-    logger.info("=" * 80)
-    logger.info(f"🎯 WEBHOOK RECEIVED AT {datetime.now()}")
-    logger.info("=" * 80)
-    logger.info(f"📡 Method: {request.method}")
-    logger.info(f"🌐 Client IP: {request.META.get('REMOTE_ADDR', 'unknown')}")
-    logger.info(f"🔗 URL: {request.build_absolute_uri()}")
-    logger.info(f"📋 Content-Type: {request.content_type}")
-    logger.info(f"📏 Content-Length: {request.META.get('CONTENT_LENGTH', 'unknown')}")
-    logger.info(f"📨 Headers: {dict(request.headers)}")
-    logger.info(f"🔍 Query Params: {dict(request.GET)}")
+    # Request details are debug-only and formatted lazily; the outcome is
+    # logged once per delivery at the end
+    logger.debug('🎯 Webhook %s from %s: content-type=%s length=%s headers=%s query=%s',
+                 request.method, request.META.get('REMOTE_ADDR', 'unknown'), request.content_type,
+                 request.META.get('CONTENT_LENGTH', 'unknown'), request.headers, request.GET)
 
     # 2. CHECK HTTP METHOD
     if request.method != 'POST':
@@ -46,40 +55,30 @@ def brightdata_webhook(request):
 
     try:
         # 3. ALWAYS SAVE RAW PAYLOAD FIRST (for debugging)
-        logger.info("📦 CAPTURING RAW PAYLOAD:")
         try:
             raw_body = request.body.decode("utf-8")
-            logger.info(f"Raw body: {raw_body[:1000]}...")  # First 1000 chars
         except UnicodeDecodeError as e:
             logger.error(f"❌ Unicode decode error: {e}")
             raw_body = str(request.body)
-            logger.info(f"Raw body (bytes): {raw_body[:1000]}...")
+        logger.debug('Raw body: %.1000s', raw_body)
 
         # 4. PARSE JSON (but don't fail yet)
-        logger.info("🔍 PARSING JSON PAYLOAD:")
         data = None
         json_error = None
 
         if request.content_type == 'application/json':
             try:
                 data = json.loads(request.body)
-                logger.info(f"✅ JSON parsed successfully")
-                logger.info(f"📊 Data type: {type(data)}")
 
                 # Add robust type checks
                 if not isinstance(data, (list, dict)):
                     logger.warning(f"⚠️  JSON is not list/dict, wrapping as list: {type(data)}")
                     data = [data]  # Wrap single items in list
 
-                if isinstance(data, dict):
-                    logger.info(f"📋 Data keys: {list(data.keys())}")
-                elif isinstance(data, list):
-                    logger.info(f"📋 List length: {len(data)}")
-                logger.info(f"📄 Parsed JSON: {str(data)[:500]}...")  # First 500 chars
+                logger.debug('📄 Parsed JSON: %.500s', data)
             except json.JSONDecodeError as e:
                 json_error = str(e)
-                logger.error(f"❌ JSON decode error: {e}")
-                logger.error(f"❌ Raw body that failed: {raw_body}")
+                logger.error('❌ JSON decode error: %s (body starts %.200r)', e, raw_body)
                 # Don't return error yet - save the raw payload first
         else:
             logger.error(f"❌ Unsupported content type: {request.content_type}")
@@ -87,7 +86,6 @@ def brightdata_webhook(request):
             # Still save the raw payload for debugging
 
         # 5. EXTRACT METADATA
-        logger.info("🏷️ EXTRACTING METADATA:")
         snapshot_id = _extract_snapshot_id_from_request_and_data(request, data)
 
         # Improved platform detection
@@ -99,11 +97,7 @@ def brightdata_webhook(request):
         if not platform and data:
             platform = _detect_platform_from_data(data)
 
-        logger.info(f"📱 Platform detected: {platform}")
-        logger.info(f"📸 Snapshot ID: {snapshot_id}")
-
         # 6. ALWAYS SAVE TO DATABASE FIRST (even if validation fails)
-        logger.info("💾 SAVING RAW PAYLOAD TO DATABASE:")
         try:
             # Better test webhook detection
             is_test_webhook = (request.headers.get('X-Brightdata-Test') or
@@ -126,13 +120,8 @@ def brightdata_webhook(request):
                 status=status,
                 error_message=json_error if json_error else None
             )
-            logger.info(f"✅ WebhookEvent created: ID {webhook_event.id}")
-            logger.info(f"✅ Platform: {webhook_event.platform}")
-            logger.info(f"✅ Snapshot ID: {webhook_event.snapshot_id}")
-            logger.info(f"✅ Status: {webhook_event.status}")
-            logger.info(f"✅ Created at: {webhook_event.created_at}")
-            if json_error:
-                logger.info(f"✅ Error message: {webhook_event.error_message}")
+            logger.info('✅ WebhookEvent %s saved: platform=%s snapshot=%s status=%s',
+                        webhook_event.id, platform, snapshot_id, status)
         except Exception as e:
             logger.error(f"❌ Failed to save webhook event to database: {str(e)}")
             logger.error(f"❌ Exception type: {type(e).__name__}")
@@ -143,7 +132,6 @@ def brightdata_webhook(request):
         if json_error:
             logger.error(f"❌ JSON validation failed: {json_error}")
             processing_time = round(time.time() - start_time, 3)
-            logger.info("=" * 80)
             return JsonResponse({
                 'status': 'json_error',
                 'message': 'Invalid JSON payload',
@@ -154,10 +142,8 @@ def brightdata_webhook(request):
 
         # Check if this is a test payload
         if is_test_webhook:
-            logger.warning(f"🧪 TEST WEBHOOK DETECTED")
-            logger.warning(f"📋 Test payload data: {data}")
-            logger.warning(f"📨 Headers: {dict(request.headers)}")
-            logger.warning(f"🔍 Query params: {dict(request.GET)}")
+            logger.warning('🧪 Test webhook received (no snapshot id)')
+            logger.debug('📋 Test payload: %.500s headers=%s', data, request.headers)
 
             # Update status to indicate it was processed
             if webhook_event:
@@ -165,8 +151,6 @@ def brightdata_webhook(request):
                 webhook_event.save()
 
             processing_time = round(time.time() - start_time, 3)
-            logger.info(f"✅ Test webhook received successfully in {processing_time}s")
-            logger.info("=" * 80)
 
             return JsonResponse({
                 'status': 'test_received',
@@ -176,8 +160,6 @@ def brightdata_webhook(request):
                 'note': 'This was a test webhook from BrightData. Real scraping webhooks will contain snapshot_id.'
             })
 
-        logger.info(f"✅ Metadata extracted successfully")
-
         # 8. PROCESS REAL WEBHOOK DATA
         # Handle BrightData file_url payload format
         if isinstance(data, dict) and 'file_url' in data:
@@ -204,17 +186,13 @@ def brightdata_webhook(request):
         else:
             # Direct data format
             posts_data = data if isinstance(data, list) else data.get('data', [])
-            logger.info(f"Processing direct data format with {len(posts_data) if isinstance(posts_data, list) else 1} items")
 
         # 9. PROCESS THE ACTUAL DATA
-        logger.info("🔄 PROCESSING WEBHOOK DATA:")
-
         # Find ScrapingJob directly by snapshot_id
         scrape_job = None
         try:
             scrape_job = ScrapingJob.objects.filter(request_id=snapshot_id).first()
             if scrape_job:
-                logger.info(f"✅ Found ScrapingJob directly by request_id: {scrape_job.id}")
                 # Update job status to processing
                 scrape_job.status = 'processing'
                 scrape_job.started_at = timezone.now()
@@ -231,23 +209,19 @@ def brightdata_webhook(request):
             scraper_requests = list(BrightDataScraperRequest.objects.filter(
                 snapshot_id=snapshot_id
             ).order_by('created_at'))
-            logger.info(f"📋 Found {len(scraper_requests)} scraper requests for snapshot_id: {snapshot_id}")
         except Exception as e:
             logger.warning(f"⚠️  Error finding scraper requests: {str(e)}")
 
         # Process the data
         try:
-            logger.info(f"🔄 Calling _process_webhook_data with platform: {platform}")
             success = _process_webhook_data(posts_data, platform, scraper_requests, scrape_job)
 
             if success:
-                logger.info(f"✅ Data processing completed successfully")
                 # Update job status to completed
                 if scrape_job:
                     scrape_job.status = 'completed'
                     scrape_job.completed_at = timezone.now()
                     scrape_job.save()
-                    logger.info(f"✅ Updated ScrapingJob {scrape_job.id} to completed")
             else:
                 logger.warning(f"⚠️  Data processing completed with warnings")
                 if scrape_job:
@@ -279,11 +253,13 @@ def brightdata_webhook(request):
             webhook_event.status = 'processed'
             webhook_event.processed_at = timezone.now()
             webhook_event.save()
-            logger.info(f"✅ WebhookEvent status updated to 'processed'")
 
         processing_time = round(time.time() - start_time, 3)
-        logger.info(f"✅ Webhook processed successfully: {snapshot_id} in {processing_time}s")
-        logger.info("=" * 80)
+        items = len(posts_data) if isinstance(posts_data, list) else 1
+        logger.info('✅ Webhook %s processed: %s %s items in %ss', snapshot_id, items, platform, processing_time,
+                    extra={'event': 'brightdata_webhook', 'snapshot_id': snapshot_id, 'platform': platform,
+                           'items': items, 'duration_ms': round(processing_time * 1000, 1),
+                           'scrape_job_id': scrape_job.id if scrape_job else None})
 
         return JsonResponse({
             'status': 'processed',
@@ -303,9 +279,7 @@ def brightdata_webhook(request):
             webhook_event.status = 'error'
             webhook_event.error_message = str(e)
             webhook_event.save()
-            logger.info(f"✅ WebhookEvent status updated to 'error'")
 
-        logger.error("=" * 80)
         return JsonResponse({
             'error': 'Internal server error',
             'details': str(e),
@@ -0,0 +1,358 @@
+"""
+Chat Context Service
+Caches per-project data context snapshots for the chat assistant and
+compacts them to a token budget before they are placed in the prompt
+"""
+
+import json
+import logging
+import sys
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+# Add the parent directory to sys.path to import common modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+try:
+    from common.data_integration_service import DataIntegrationService
+    from common.sentiment_analysis_service import sentiment_service
+except ImportError:
+    # Fallback if import fails
+    DataIntegrationService = None
+    sentiment_service = None
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Number of items kept per list in the cached snapshot; rendering samples from these
+SNAPSHOT_SAMPLE_SIZE = 10
+SNAPSHOT_TEXT_LIMIT = 1000
+DAYS_BACK = 30
+
+
+def _clip(value, limit):
+    """Recursively shorten strings and lists inside JSON-like data"""
+    if limit is None:
+        return value
+    if isinstance(value, str):
+        return value if len(value) <= limit else value[:limit] + '…'
+    if isinstance(value, list):
+        return [_clip(item, limit) for item in value[:10]]
+    if isinstance(value, dict):
+        return {key: _clip(item, limit) for key, item in value.items()}
+    return value
+
+
+class ProjectContextCache:
+    """
+    Builds and caches the project data snapshot used to ground chat responses
+    """
+
+    CACHE_PREFIX = 'chat_context'
+
+    def __init__(self, ttl=None):
+        self._ttl = ttl
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, 'CHAT_CONTEXT_CACHE_TTL', 300)
+
+    def cache_key(self, project_id):
+        return f"{self.CACHE_PREFIX}:{project_id}"
+
+    def get_snapshot(self, project_id):
+        """Return the cached snapshot for a project, building it on a miss"""
+        key = self.cache_key(project_id)
+        snapshot = cache.get(key)
+        if snapshot is not None:
+            return snapshot
+
+        snapshot = self.build_snapshot(project_id)
+        cache.set(key, snapshot, timeout=self.ttl)
+        return snapshot
+
+    def invalidate(self, project_id):
+        """Drop the cached snapshot so the next chat message sees fresh data"""
+        if project_id:
+            cache.delete(self.cache_key(project_id))
+
+    def build_snapshot(self, project_id):
+        """Collect posts, metrics and sentiment for a project into a compact dict"""
+        if not DataIntegrationService:
+            raise RuntimeError("Data integration service is unavailable")
+
+        data_service = DataIntegrationService(project_id=project_id)
+
+        # Get recent posts separated by company vs competitor (use 30 days to ensure we get data)
+        company_posts = data_service.get_company_posts(limit=50, days_back=DAYS_BACK)
+        competitor_posts = data_service.get_competitor_posts(limit=50, days_back=DAYS_BACK)
+        all_posts = data_service.get_all_posts(limit=50, days_back=DAYS_BACK)
+        recent_comments = data_service.get_all_comments(limit=50, days_back=DAYS_BACK)
+
+        logger.info(
+            f"[CHAT_CONTEXT] Building snapshot for project {project_id}: "
+            f"{len(company_posts)} company posts, {len(competitor_posts)} competitor posts"
+        )
+
+        snapshot = {
+            'project_id': project_id,
+            'built_at': timezone.now().isoformat(),
+            'company_posts_count': len(company_posts),
+            'company_posts': _clip(company_posts[:SNAPSHOT_SAMPLE_SIZE], SNAPSHOT_TEXT_LIMIT),
+            'competitor_posts_count': len(competitor_posts),
+            'competitor_posts': _clip(competitor_posts[:SNAPSHOT_SAMPLE_SIZE], SNAPSHOT_TEXT_LIMIT),
+            'company_metrics': data_service.get_engagement_metrics(days_back=DAYS_BACK, source_type='company'),
+            'competitor_metrics': data_service.get_engagement_metrics(days_back=DAYS_BACK, source_type='competitor'),
+            'overall_metrics': data_service.get_engagement_metrics(days_back=DAYS_BACK),
+            'recent_comments_count': len(recent_comments),
+            'recent_comments': _clip(recent_comments[:SNAPSHOT_SAMPLE_SIZE], SNAPSHOT_TEXT_LIMIT),
+            'brightdata_metrics': data_service.get_brightdata_metrics(days_back=DAYS_BACK),
+            'sentiment': None,
+            'content_sentiment': None,
+        }
+
+        # Perform sentiment analysis on recent comments
+        if sentiment_service and recent_comments:
+            sentiment_analysis = sentiment_service.analyze_comment_sentiment(recent_comments)
+            snapshot['sentiment'] = {
+                'overall_sentiment': sentiment_analysis.get('overall_sentiment', 'neutral'),
+                'sentiment_breakdown': sentiment_analysis.get('sentiment_breakdown', {}),
+                'sentiment_percentages': sentiment_analysis.get('sentiment_percentages', {}),
+                'platform_breakdown': sentiment_analysis.get('platform_breakdown', {}),
+                'insights': sentiment_analysis.get('insights', []),
+                'total_analyzed': sentiment_analysis.get('total_analyzed', 0),
+                'high_confidence_count': sentiment_analysis.get('high_confidence_count', 0),
+            }
+
+            # Also analyze content sentiment
+            if all_posts:
+                content_sentiment = sentiment_service.analyze_content_sentiment(all_posts, include_comments=False)
+                snapshot['content_sentiment'] = {
+                    'post_sentiment_results': _clip(
+                        content_sentiment.get('post_sentiment_results', [])[:SNAPSHOT_SAMPLE_SIZE],
+                        SNAPSHOT_TEXT_LIMIT
+                    ),
+                    'overall_insights': content_sentiment.get('overall_insights', []),
+                    'recommendations': content_sentiment.get('recommendations', []),
+                }
+
+        # Round-trip through JSON so the cached value never holds model instances or datetimes
+        return json.loads(json.dumps(snapshot, default=str))
+
+
+class ContextTokenBudgeter:
+    """
+    Renders a context snapshot into prompt text that fits within a token budget
+    """
+
+    # Detail levels tried in order until the rendered context fits the budget
+    DETAIL_LEVELS = [
+        {'posts': 3, 'comments': 5, 'clip': None, 'breakdowns': True, 'post_sentiment': True, 'brightdata': True},
+        {'posts': 3, 'comments': 5, 'clip': 400, 'breakdowns': True, 'post_sentiment': True, 'brightdata': True},
+        {'posts': 2, 'comments': 3, 'clip': 200, 'breakdowns': True, 'post_sentiment': False, 'brightdata': True},
+        {'posts': 1, 'comments': 2, 'clip': 120, 'breakdowns': False, 'post_sentiment': False, 'brightdata': False},
+        {'posts': 0, 'comments': 0, 'clip': 80, 'breakdowns': False, 'post_sentiment': False, 'brightdata': False},
+    ]
+
+    def __init__(self, max_tokens=None):
+        self._max_tokens = max_tokens
+        self._encoding = None
+        if tiktoken:
+            try:
+                self._encoding = tiktoken.get_encoding('cl100k_base')
+            except Exception as e:
+                logger.warning(f"tiktoken encoding unavailable, estimating tokens: {e}")
+
+    @property
+    def max_tokens(self):
+        if self._max_tokens is not None:
+            return self._max_tokens
+        return getattr(settings, 'CHAT_CONTEXT_TOKEN_BUDGET', 6000)
+
+    def count_tokens(self, text):
+        """Token count via tiktoken when installed, otherwise ~4 characters per token"""
+        if self._encoding:
+            return len(self._encoding.encode(text))
+        return (len(text) + 3) // 4
+
+    def truncate(self, text, max_tokens):
+        """Cut text to at most max_tokens tokens, as counted by count_tokens"""
+        max_tokens = max(max_tokens, 0)
+        if not self._encoding:
+            return text[:max_tokens * 4]
+        tokens = self._encoding.encode(text)
+        # Decoding a cut can re-tokenise differently, so shorten until it fits
+        cut = max_tokens
+        while len(tokens) > max_tokens:
+            text = self._encoding.decode(tokens[:cut])
+            tokens = self._encoding.encode(text)
+            cut -= 1
+        return text
+
+    def compact(self, snapshot, max_tokens=None):
+        """Return the most detailed rendering of the snapshot that fits the budget"""
+        budget = max_tokens if max_tokens is not None else self.max_tokens
+
+        text = ''
+        for level in self.DETAIL_LEVELS:
+            text = self.render(snapshot, level)
+            if self.count_tokens(text) <= budget:
+                return text
+
+        # Even the summary-only rendering is too large - hard truncate it
+        return self.truncate(text, budget)
+
+    def render(self, snapshot, level):
+        """Render the snapshot as prompt text at a given detail level"""
+        clip = level['clip']
+
+        def dump(value):
+            return json.dumps(_clip(value, clip), default=str)
+
+        def sample(items, count):
+            if not items or count == 0:
+                return None
+            return dump(items[:count])
+
+        def metrics_block(metrics):
+            lines = [
+                f"- Total Posts: {metrics.get('total_posts', 0)}",
+                f"- Total Likes: {metrics.get('total_likes', 0)}",
+                f"- Total Comments: {metrics.get('total_comments', 0)}",
+                f"- Total Shares: {metrics.get('total_shares', 0)}",
+                f"- Total Views: {metrics.get('total_views', 0)}",
+                f"- Avg Engagement Rate: {metrics.get('engagement_rate', 0):.2f}%",
+            ]
+            if level['breakdowns']:
+                lines.append(f"- Platform Breakdown: {dump(metrics.get('platforms', {}))}")
+            return '\n'.join(lines)
+
+        company_metrics = snapshot.get('company_metrics') or {}
+        competitor_metrics = snapshot.get('competitor_metrics') or {}
+        overall_metrics = snapshot.get('overall_metrics') or {}
+        company_count = snapshot.get('company_posts_count', 0)
+        competitor_count = snapshot.get('competitor_posts_count', 0)
+        comments_count = snapshot.get('recent_comments_count', 0)
+
+        sections = [
+            f"CURRENT PROJECT DATA CONTEXT (Last {DAYS_BACK} Days):",
+            "=== COMPANY DATA ===",
+            f"Company Posts: {company_count} posts",
+        ]
+        company_sample = sample(snapshot.get('company_posts'), level['posts'])
+        if company_sample or not company_count:
+            sections.append(company_sample or "No company posts found")
+        sections += [
+            "Company Engagement Metrics:",
+            metrics_block(company_metrics),
+            "=== COMPETITOR DATA ===",
+            f"Competitor Posts: {competitor_count} posts",
+        ]
+        competitor_sample = sample(snapshot.get('competitor_posts'), level['posts'])
+        if competitor_sample or not competitor_count:
+            sections.append(competitor_sample or "No competitor posts found")
+        sections += [
+            "Competitor Engagement Metrics:",
+            metrics_block(competitor_metrics),
+            "=== OVERALL COMPARISON ===",
+            f"Total Posts: {overall_metrics.get('total_posts', 0)} "
+            f"(Company: {company_count}, Competitors: {competitor_count})",
+            f"Overall Engagement Rate: {overall_metrics.get('engagement_rate', 0):.2f}%",
+            "Data Sources:",
+            f"- BrightData Scraped Posts: {overall_metrics.get('brightdata_posts', 0)}",
+            f"- Legacy Platform Posts: {overall_metrics.get('legacy_posts', 0)}",
+        ]
+        if level['breakdowns']:
+            sections.append(f"- Data Source Breakdown: {dump(overall_metrics.get('data_source_breakdown', {}))}")
+
+        sections.append(f"Recent Comments/Content ({comments_count} items):")
+        comments_sample = sample(snapshot.get('recent_comments'), level['comments'])
+        if comments_sample or not comments_count:
+            sections.append(comments_sample or "No recent content found")
+
+        if level['brightdata'] and snapshot.get('brightdata_metrics'):
+            sections += [
+                "=== BRIGHTDATA SPECIFIC METRICS ===",
+                dump(snapshot['brightdata_metrics']),
+            ]
+
+        sentiment = snapshot.get('sentiment')
+        if sentiment:
+            sections += [
+                "SENTIMENT ANALYSIS INSIGHTS:",
+                f"Overall Sentiment: {str(sentiment.get('overall_sentiment', 'neutral')).title()}",
+                f"Sentiment Breakdown: {dump(sentiment.get('sentiment_breakdown', {}))}",
+                f"Sentiment Percentages: {dump(sentiment.get('sentiment_percentages', {}))}",
+            ]
+            if level['breakdowns']:
+                sections.append(f"Platform Breakdown: {dump(sentiment.get('platform_breakdown', {}))}")
+            sections += [
+                "Key Insights:",
+                '\n'.join(_clip(sentiment.get('insights', []), clip)),
+                f"Total Comments Analyzed: {sentiment.get('total_analyzed', 0)}",
+                f"High Confidence Results: {sentiment.get('high_confidence_count', 0)}",
+            ]
+
+        content_sentiment = snapshot.get('content_sentiment')
+        if content_sentiment:
+            sections.append("CONTENT SENTIMENT ANALYSIS:")
+            if level['post_sentiment']:
+                sections.append(f"Post Sentiment Results: {dump(content_sentiment.get('post_sentiment_results', []))}")
+            sections += [
+                f"Content Insights: {' '.join(_clip(content_sentiment.get('overall_insights', []), clip))}",
+                f"Recommendations: {' '.join(_clip(content_sentiment.get('recommendations', []), clip))}",
+            ]
+
+        return '\n'.join(sections)
+
+
+def invalidate_project_context(project_id):
+    """
+    Called once per write path whenever a project's posts or comments change:
+    UnifiedPostService for post writes and deletes, the comment views and
+    webhook ingestion for comments, and track_accounts signals for platform
+    folder deletes. Runs once the current transaction commits,
+    so no reader rebuilds a snapshot from pre-commit rows. Cheap, because
+    indexing runs in the background.
+    """
+    if project_id:
+        transaction.on_commit(lambda: _invalidate_project_context(project_id))
+
+
+def invalidate_folder_context(*folders):
+    """invalidate_project_context for the projects of platform folders; None and project-less folders are skipped"""
+    for project_id in {folder.project_id for folder in folders if folder is not None}:
+        invalidate_project_context(project_id)
+
+
+def _invalidate_project_context(project_id):
+    try:
+        project_context_cache.invalidate(project_id)
+    except Exception as e:
+        logger.warning(f"Could not invalidate chat context for project {project_id}: {e}")
+
+    # Dashboard, folder tree and report results cached for the project are now stale
+    try:
+        from common.cache_aside import invalidate_project_cache
+        invalidate_project_cache(project_id)
+    except Exception as e:
+        logger.warning(f"Could not invalidate cached endpoints for project {project_id}: {e}")
+
+    # New posts/comments are appended to the project's retrieval index in the background
+    from .retrieval import index_project_documents
+    index_project_documents(project_id)
+
+
+# Global instances
+project_context_cache = ProjectContextCache()
+context_budgeter = ContextTokenBudgeter()
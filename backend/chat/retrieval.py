@@ -0,0 +1,761 @@
+"""
+Semantic Retrieval Service
+Local vector index over scraped posts and comments used to ground chat responses
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+from django.apps import apps
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+
+try:
+    import fcntl
+except ImportError:
+    # Windows development machines - fall back to the in-process lock only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"[#@]?\w+", re.UNICODE)
+
+# Characters of source text kept with each indexed document
+DOC_TEXT_LIMIT = 600
+
+# Rows fetched per source query while catching an index up
+INDEX_BATCH_SIZE = 500
+
+# Hits fetched per requested result, so hits dropped as stale still leave k results
+SEARCH_OVERFETCH = 3
+
+
+class HashingEmbedder:
+    """
+    Deterministic local embedding: signed feature hashing of unigrams and bigrams.
+    Needs no network or model download, so it is also what the tests use.
+    """
+
+    name = 'hashing-v1'
+
+    def __init__(self, dim=256):
+        self.dim = dim
+
+    def _features(self, text):
+        tokens = [token.lower() for token in TOKEN_RE.findall(text or '')]
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for token in tokens:
+            # Hashtags and mentions also count as the bare word
+            if token[0] in '#@' and len(token) > 1:
+                features.append(token[1:])
+        return features
+
+    def embed(self, texts):
+        """Return an (n, dim) float32 matrix of L2-normalised embeddings"""
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                digest = hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest()
+                value = int.from_bytes(digest, 'little')
+                sign = 1.0 if value & 1 else -1.0
+                matrix[row, (value >> 1) % self.dim] += sign
+
+        # Sub-linear term frequency so repeated words do not dominate
+        matrix = np.sign(matrix) * np.log1p(np.abs(matrix))
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class OpenAIEmbedder:
+    """
+    Embeddings from the OpenAI API, reduced to the configured dimension
+    """
+
+    def __init__(self, dim=256, model='text-embedding-3-small'):
+        import openai
+
+        self.dim = dim
+        self.model = model
+        self.name = f"openai-{model}-{dim}"
+        self.client = openai.OpenAI(
+            api_key=os.getenv('OPENAI_API_KEY', ''),
+            base_url=os.getenv('OPENAI_BASE_URL') or None,
+        )
+
+    def embed(self, texts):
+        response = self.client.embeddings.create(
+            model=self.model,
+            input=[text or ' ' for text in texts],
+            dimensions=self.dim,
+        )
+        matrix = np.array([item.embedding for item in response.data], dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+def get_default_embedder():
+    """Embedder selected by SEMANTIC_INDEX_EMBEDDER ('hashing' or 'openai')"""
+    dim = getattr(settings, 'SEMANTIC_INDEX_DIM', 256)
+    if getattr(settings, 'SEMANTIC_INDEX_EMBEDDER', 'hashing') == 'openai' and os.getenv('OPENAI_API_KEY'):
+        try:
+            return OpenAIEmbedder(dim=dim)
+        except Exception as e:
+            logger.warning(f"OpenAI embedder unavailable, using local hashing embedder: {e}")
+    return HashingEmbedder(dim=dim)
+
+
+class ProjectVectorIndex:
+    """
+    On-disk vector index for one project.
+
+    Embeddings live in a float16 matrix memory-mapped from `vectors.f16`,
+    document metadata in `docs.jsonl` (one line per matrix row) and counters in
+    `state.json`. Search is approximate (random-hyperplane LSH buckets, exact
+    rerank of the candidates) once the index outgrows SEMANTIC_INDEX_EXACT_THRESHOLD.
+    Rows are append-only: a re-embedded or removed document leaves its old row
+    behind as a tombstone (`dead` in state.json) that search skips.
+    """
+
+    INITIAL_CAPACITY = 1024
+
+    def __init__(self, path, dim, embedder_name, tables=8, bits=12, exact_threshold=5000):
+        self.path = path
+        self.dim = dim
+        self.embedder_name = embedder_name
+        self.tables = tables
+        self.bits = bits
+        self.exact_threshold = exact_threshold
+
+        # Hyperplanes are seeded from the dimension so every process hashes identically
+        rng = np.random.default_rng(dim)
+        self._planes = rng.standard_normal((tables * bits, dim)).astype(np.float32)
+        self._powers = (1 << np.arange(bits, dtype=np.int64))
+
+        self._lock = threading.RLock()
+        self._docs_offset = 0
+        self._vectors = None
+        self._docs = []
+        self._state = None
+        self._buckets = [{} for _ in range(tables)]
+        self._bucketed_rows = 0
+        self._live = {}
+        self._dead = set()
+        self._dead_count = 0
+
+    # -- files -------------------------------------------------------------
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    @contextmanager
+    def _write_lock(self):
+        """Serialise writers across threads and worker processes"""
+        os.makedirs(self.path, exist_ok=True)
+        with self._lock:
+            with open(self._file('index.lock'), 'a') as lock_file:
+                if fcntl:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_state(self):
+        try:
+            with open(self._file('state.json')) as fh:
+                state = json.load(fh)
+        except (OSError, ValueError):
+            return None
+        if state.get('dim') != self.dim or state.get('embedder') != self.embedder_name:
+            # Vectors from another embedder are not comparable - start over
+            return None
+        return state
+
+    def _write_state(self, state):
+        tmp_path = self._file('state.json.tmp')
+        with open(tmp_path, 'w') as fh:
+            json.dump(state, fh)
+        os.replace(tmp_path, self._file('state.json'))
+
+    def _empty_state(self):
+        return {'dim': self.dim, 'embedder': self.embedder_name, 'count': 0, 'capacity': 0, 'cursors': {}, 'dead': []}
+
+    def _reset_files(self):
+        for name in ('vectors.f16', 'docs.jsonl', 'state.json'):
+            try:
+                os.remove(self._file(name))
+            except FileNotFoundError:
+                pass
+
+    def _refresh(self):
+        """Pick up rows committed by any writer; only new docs lines are parsed"""
+        state = self._read_state() or self._empty_state()
+        previous = self._state or self._empty_state()
+        self._state = state
+
+        if state['count'] < previous['count'] or state['count'] < len(self._docs):
+            # Index was reset underneath us
+            self._docs = []
+            self._docs_offset = 0
+            self._vectors = None
+            self._buckets = [{} for _ in range(self.tables)]
+            self._bucketed_rows = 0
+            self._live = {}
+            self._dead = set()
+            self._dead_count = 0
+
+        if state['capacity'] and (self._vectors is None or len(self._vectors) != state['capacity']):
+            self._vectors = np.memmap(self._file('vectors.f16'), dtype=np.float16, mode='r',
+                                      shape=(state['capacity'], self.dim))
+        elif not state['capacity']:
+            self._vectors = None
+
+        if len(self._docs) < state['count']:
+            with open(self._file('docs.jsonl'), 'rb') as fh:
+                fh.seek(self._docs_offset)
+                while len(self._docs) < state['count']:
+                    line = fh.readline()
+                    if not line:
+                        break
+                    doc = json.loads(line)
+                    if 'source' in doc:
+                        self._live[(doc['source'], doc['id'])] = len(self._docs)
+                    self._docs.append(doc)
+                self._docs_offset = fh.tell()
+
+        # Tombstones are only ever appended, so an unchanged length means nothing new
+        dead = state.get('dead', ())
+        if len(dead) != self._dead_count:
+            self._dead = set(dead)
+            self._dead_count = len(dead)
+
+    def _live_row(self, source, pk):
+        row = self._live.get((source, pk))
+        return None if row is None or row in self._dead else row
+
+    # -- public API --------------------------------------------------------
+
+    @property
+    def count(self):
+        with self._lock:
+            self._refresh()
+            return self._state['count']
+
+    def cursors(self):
+        with self._lock:
+            self._refresh()
+            return dict(self._state['cursors'])
+
+    def indexed_text(self, source, pk):
+        """Text of the live document of a source row, or None when it is not indexed"""
+        with self._lock:
+            self._refresh()
+            row = self._live_row(source, pk)
+            return None if row is None else self._docs[row]['text']
+
+    def add(self, docs, vectors, cursors=None, replace=False):
+        """
+        Append documents and their embeddings, then advance the source cursors.
+        Rows become visible to readers only once state.json is replaced.
+        Documents at or below their source's cursor were added by another
+        writer since the caller read the cursors, and are skipped.
+        With `replace`, it is the other way round: documents re-embed rows at
+        or below the cursor and tombstone their previous row, and documents
+        above it are left to the catch-up that appends them.
+        """
+        with self._write_lock():
+            state = self._read_state()
+            if state is None:
+                self._reset_files()
+                state = self._empty_state()
+            state.setdefault('dead', [])
+            if replace:
+                self._refresh()
+
+            fresh = [
+                row for row, doc in enumerate(docs)
+                if 'source' not in doc or (doc['id'] > state['cursors'].get(doc['source'], 0)) != replace
+            ]
+            if len(fresh) < len(docs):
+                docs = [docs[row] for row in fresh]
+                vectors = np.asarray(vectors)[fresh] if fresh else None
+            if replace:
+                state['dead'].extend(self._rows_of(docs))
+
+            if len(docs):
+                start = state['count']
+                needed = start + len(docs)
+                if needed > state['capacity']:
+                    capacity = max(self.INITIAL_CAPACITY, state['capacity'] * 2, needed)
+                    with open(self._file('vectors.f16'), 'ab') as fh:
+                        fh.truncate(capacity * self.dim * np.dtype(np.float16).itemsize)
+                    state['capacity'] = capacity
+
+                matrix = np.memmap(self._file('vectors.f16'), dtype=np.float16, mode='r+',
+                                   shape=(state['capacity'], self.dim))
+                matrix[start:needed] = np.asarray(vectors, dtype=np.float16)
+                matrix.flush()
+                del matrix
+
+                with open(self._file('docs.jsonl'), 'r+' if start else 'w') as fh:
+                    # Drop any tail left behind by a writer that died before committing state
+                    self._seek_line(fh, start)
+                    fh.truncate()
+                    for doc in docs:
+                        fh.write(json.dumps(doc, default=str) + '\n')
+
+                state['count'] = needed
+
+            for source, cursor in (cursors or {}).items():
+                state['cursors'][source] = max(cursor, state['cursors'].get(source, 0))
+            self._write_state(state)
+
+    def remove(self, keys):
+        """Tombstone the live rows of (source, id) keys, e.g. deleted posts or posts moved to another project"""
+        with self._write_lock():
+            state = self._read_state()
+            if state is None:
+                return
+            self._refresh()
+            dead = self._rows_of({'source': source, 'id': pk} for source, pk in keys)
+            if dead:
+                state.setdefault('dead', []).extend(dead)
+                self._write_state(state)
+
+    def _rows_of(self, docs):
+        rows = (self._live_row(doc['source'], doc['id']) for doc in docs if 'source' in doc)
+        return [row for row in rows if row is not None]
+
+    def _seek_line(self, fh, line_number):
+        for _ in range(line_number):
+            if not fh.readline():
+                break
+
+    def _signatures(self, matrix):
+        """LSH bucket code of each row in every table -> (n, tables) int64"""
+        bits = (np.asarray(matrix, dtype=np.float32) @ self._planes.T) > 0
+        bits = bits.reshape(len(matrix), self.tables, self.bits)
+        return (bits * self._powers).sum(axis=2)
+
+    def _update_buckets(self, count):
+        if self._bucketed_rows >= count:
+            return
+        start = self._bucketed_rows
+        codes = self._signatures(self._vectors[start:count])
+        for table, buckets in enumerate(self._buckets):
+            for offset, code in enumerate(codes[:, table].tolist()):
+                buckets.setdefault(code, []).append(start + offset)
+        self._bucketed_rows = count
+
+    def search(self, query_vector, k=5):
+        """Return [(score, doc)] for the k rows most similar to the query vector"""
+        with self._lock:
+            self._refresh()
+            count = self._state['count']
+            if not count or k <= 0:
+                return []
+
+            query = np.asarray(query_vector, dtype=np.float32).reshape(-1)
+            rows = None
+            if count > self.exact_threshold:
+                self._update_buckets(count)
+                codes = self._signatures(query[None, :])[0].tolist()
+                candidates = set()
+                for table, code in enumerate(codes):
+                    candidates.update(self._buckets[table].get(code, ()))
+                if len(candidates) >= k:
+                    rows = np.fromiter(candidates, dtype=np.int64)
+
+            if rows is None and not self._dead:
+                scores = self._vectors[:count].astype(np.float32) @ query
+                rows = np.arange(count)
+            else:
+                if rows is None:
+                    rows = np.arange(count)
+                if self._dead:
+                    rows = rows[~np.isin(rows, np.fromiter(self._dead, dtype=np.int64))]
+                scores = self._vectors[rows].astype(np.float32) @ query
+
+            top = np.argsort(-scores)[:k]
+            return [(float(scores[i]), self._docs[int(rows[i])]) for i in top]
+
+
+class SemanticIndexService:
+    """
+    Keeps one ProjectVectorIndex per project in sync with scraped posts and comments.
+    Catching an index up runs on a background thread (see `schedule`), never on
+    the webhook or chat request that noticed new rows. Rows that change after
+    they were indexed are re-embedded or tombstoned: edited and deleted rows
+    through `mark_changed`, folders moved between projects through
+    `move_folder`, and any stale hit a search comes across.
+    """
+
+    # (source key, app label, model, platform, kind, text fields)
+    SOURCES = [
+        ('instagram_post', 'instagram_data', 'InstagramPost', 'instagram', 'post', ['description']),
+        ('instagram_comment', 'instagram_data', 'InstagramComment', 'instagram', 'comment', ['comment']),
+        ('facebook_post', 'facebook_data', 'FacebookPost', 'facebook', 'post', ['content', 'description']),
+        ('facebook_comment', 'facebook_data', 'FacebookComment', 'facebook', 'comment', ['comment_text']),
+        ('linkedin_post', 'linkedin_data', 'LinkedInPost', 'linkedin', 'post', ['post_text', 'description']),
+        ('linkedin_comment', 'linkedin_data', 'LinkedInComment', 'linkedin', 'comment', ['comment_text']),
+        ('tiktok_post', 'tiktok_data', 'TikTokPost', 'tiktok', 'post', ['description']),
+        ('brightdata_post', 'brightdata_integration', 'BrightDataScrapedPost', None, 'post', ['content', 'description']),
+    ]
+
+    def __init__(self, root=None, embedder=None):
+        self._root = root
+        self._embedder = embedder
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self._scheduled = set()
+        self._executor = None
+        # source key -> folder id -> ids of rows edited or deleted since the last pass
+        self._changes = {}
+        self._changes_scheduled = False
+        # project id -> source key -> ids to refresh on the project's next pass
+        self._stale = {}
+        self._model_sources = {f"{app_label}.{model_name}": source
+                               for source, app_label, model_name, *_ in self.SOURCES}
+
+    def _spec(self, source):
+        return next(spec for spec in self.SOURCES if spec[0] == source)
+
+    @property
+    def root(self):
+        if self._root is not None:
+            return self._root
+        return getattr(settings, 'SEMANTIC_INDEX_ROOT', os.path.join(settings.BASE_DIR, 'semantic_index'))
+
+    @property
+    def embedder(self):
+        if self._embedder is None:
+            self._embedder = get_default_embedder()
+        return self._embedder
+
+    def get_index(self, project_id):
+        path = os.path.join(self.root, f"project_{project_id}")
+        with self._lock:
+            index = self._indexes.get(path)
+            if index is None:
+                index = ProjectVectorIndex(
+                    path,
+                    dim=self.embedder.dim,
+                    embedder_name=self.embedder.name,
+                    tables=getattr(settings, 'SEMANTIC_INDEX_LSH_TABLES', 8),
+                    bits=getattr(settings, 'SEMANTIC_INDEX_LSH_BITS', 12),
+                    exact_threshold=getattr(settings, 'SEMANTIC_INDEX_EXACT_THRESHOLD', 5000),
+                )
+                self._indexes[path] = index
+            return index
+
+    def _source_queryset(self, app_label, model_name, project_id):
+        model = apps.get_model(app_label, model_name)
+        if model_name == 'BrightDataScrapedPost':
+            UnifiedRunFolder = apps.get_model('track_accounts', 'UnifiedRunFolder')
+            folder_ids = UnifiedRunFolder.objects.filter(project_id=project_id).values('id')
+            return model.objects.filter(
+                Q(scraper_request__batch_job__project_id=project_id) | Q(folder_id__in=folder_ids)
+            )
+        return model.objects.filter(folder__project_id=project_id)
+
+    def _document(self, source, platform, kind, row, text_fields):
+        text = ' '.join(str(row[field]) for field in text_fields if row.get(field)).strip()
+        if not text:
+            return None
+        return {
+            'source': source,
+            'id': row['id'],
+            'platform': platform or row.get('platform'),
+            'kind': kind,
+            'user': row.get('user_posted') or row.get('comment_user') or row.get('user_name'),
+            'url': row.get('url') or row.get('post_url'),
+            'text': text[:DOC_TEXT_LIMIT],
+        }
+
+    def _fields(self, model, text_fields):
+        model_fields = {field.attname for field in model._meta.concrete_fields}
+        wanted = ['id', 'platform', 'user_posted', 'comment_user', 'user_name', 'url', 'post_url'] + text_fields
+        return [name for name in wanted if name in model_fields]
+
+    def _current_documents(self, project_id, source, ids):
+        """{id: document} of the given rows as currently stored in the project; missing ids left the project"""
+        _, app_label, model_name, platform, kind, text_fields = self._spec(source)
+        try:
+            queryset = self._source_queryset(app_label, model_name, project_id)
+        except LookupError:
+            return {}
+        rows = queryset.filter(pk__in=list(ids)).values(*self._fields(queryset.model, text_fields))
+        docs = (self._document(source, platform, kind, row, text_fields) for row in rows)
+        return {doc['id']: doc for doc in docs if doc}
+
+    def index_project(self, project_id):
+        """
+        Embed and append posts/comments stored since the last call.
+        Each source keeps a primary-key cursor, so only new rows are read.
+        Rows queued as stale for the project are refreshed first.
+        """
+        with self._lock:
+            stale = self._stale.pop(project_id, {})
+        for source, ids in stale.items():
+            self.refresh_rows(project_id, source, ids)
+
+        index = self.get_index(project_id)
+        cursors = index.cursors()
+        added = 0
+
+        for source, app_label, model_name, platform, kind, text_fields in self.SOURCES:
+            try:
+                queryset = self._source_queryset(app_label, model_name, project_id)
+            except LookupError:
+                continue
+
+            fields = self._fields(queryset.model, text_fields)
+
+            cursor = cursors.get(source, 0)
+            while True:
+                # Skip ahead past rows another worker indexed in the meantime
+                cursor = max(cursor, index.cursors().get(source, 0))
+                rows = list(queryset.filter(pk__gt=cursor).order_by('pk').values(*fields)[:INDEX_BATCH_SIZE])
+                if not rows:
+                    break
+                cursor = rows[-1]['id']
+
+                docs = [doc for doc in (self._document(source, platform, kind, row, text_fields) for row in rows) if doc]
+                vectors = self.embedder.embed([doc['text'] for doc in docs]) if docs else None
+                index.add(docs, vectors, cursors={source: cursor})
+                added += len(docs)
+
+                if len(rows) < INDEX_BATCH_SIZE:
+                    break
+
+        if added:
+            logger.info(f"[SEMANTIC_INDEX] Indexed {added} new documents for project {project_id}")
+        return added
+
+    def refresh_rows(self, project_id, source, ids):
+        """
+        Bring already indexed rows of one source up to date in a project's index:
+        edited rows are re-embedded, rows deleted or no longer in the project are
+        tombstoned. Rows above the source's cursor are left to `index_project`.
+        """
+        index = self.get_index(project_id)
+        current = self._current_documents(project_id, source, ids)
+
+        gone = [(source, pk) for pk in ids if pk not in current]
+        if gone:
+            index.remove(gone)
+        changed = [doc for doc in current.values() if index.indexed_text(source, doc['id']) != doc['text']]
+        if changed:
+            index.add(changed, self.embedder.embed([doc['text'] for doc in changed]), replace=True)
+        return len(gone) + len(changed)
+
+    def search(self, project_id, query, k=5):
+        """
+        Top-k posts/comments of a project most similar to the query text.
+        Hits are checked against the rows as stored now: deleted rows, rows
+        that left the project and rows edited since they were embedded are
+        dropped and queued for a refresh.
+        """
+        if not query or not project_id:
+            return []
+        # Catch-up for rows stored by paths that do not notify the index; this
+        # search uses what is indexed already
+        self.schedule(project_id)
+
+        query_vector = self.embedder.embed([query])[0]
+        hits = self.get_index(project_id).search(query_vector, k=k * SEARCH_OVERFETCH)
+
+        by_source = {}
+        for _, doc in hits:
+            by_source.setdefault(doc['source'], set()).add(doc['id'])
+        current = {source: self._current_documents(project_id, source, ids) for source, ids in by_source.items()}
+
+        results, stale = [], {}
+        for score, doc in hits:
+            now = current[doc['source']].get(doc['id'])
+            if now is None or now['text'] != doc['text']:
+                stale.setdefault(doc['source'], set()).add(doc['id'])
+            elif len(results) < k:
+                results.append(dict(doc, score=round(score, 4)))
+        if stale:
+            with self._lock:
+                for source, ids in stale.items():
+                    self._stale.setdefault(project_id, {}).setdefault(source, set()).update(ids)
+            self.schedule(project_id)
+        return results
+
+    def mark_changed(self, instance):
+        """
+        Queue an edited or deleted post/comment for a refresh. Its project is
+        resolved from its folder on the background indexer, after commit.
+        """
+        source = self._model_sources.get(instance._meta.label)
+        if source is None:
+            return
+        with self._lock:
+            self._changes.setdefault(source, {}).setdefault(instance.folder_id, set()).add(instance.pk)
+        if not getattr(settings, 'SEMANTIC_INDEX_ASYNC', True):
+            self._quietly(self.apply_changes)
+            return
+        transaction.on_commit(self._submit_changes)
+
+    def apply_changes(self):
+        """Refresh the rows queued by `mark_changed` in the index of their folder's project"""
+        with self._lock:
+            changes, self._changes = self._changes, {}
+
+        refreshed = 0
+        for source, folders in changes.items():
+            folder_projects = self._folder_projects(source, [folder_id for folder_id in folders if folder_id])
+            for folder_id, ids in folders.items():
+                # Rows whose folder is gone are dropped by the next search that hits them
+                if folder_id in folder_projects:
+                    refreshed += self.refresh_rows(folder_projects[folder_id], source, ids)
+        return refreshed
+
+    def folder_moved(self, folder, previous_project_id):
+        """Move a platform folder's rows between project indexes on the background indexer, after commit"""
+        if not getattr(settings, 'SEMANTIC_INDEX_ASYNC', True):
+            self._quietly(self.move_folder, folder, previous_project_id)
+            return
+        transaction.on_commit(lambda: self._background().submit(self._run_task, self.move_folder,
+                                                                folder, previous_project_id))
+
+    def move_folder(self, folder, previous_project_id):
+        """
+        A platform folder moved to another project: tombstone its rows in the
+        old project's index and add them to the new one's
+        """
+        for source, app_label, model_name, *_ in self.SOURCES:
+            model = apps.get_model(app_label, model_name)
+            if model_name == 'BrightDataScrapedPost' or model._meta.get_field('folder').related_model is not type(folder):
+                continue
+            ids = list(model.objects.filter(folder=folder).values_list('pk', flat=True))
+            if previous_project_id and ids:
+                self.get_index(previous_project_id).remove([(source, pk) for pk in ids])
+            if folder.project_id and ids:
+                self._index_rows(folder.project_id, source, ids)
+
+    def _index_rows(self, project_id, source, ids):
+        """Append rows the project's index does not hold yet, below or above the cursor"""
+        index = self.get_index(project_id)
+        cursor = index.cursors().get(source, 0)
+        docs = [doc for doc in self._current_documents(project_id, source, ids).values()
+                if doc['id'] <= cursor and index.indexed_text(source, doc['id']) is None]
+        if docs:
+            index.add(docs, self.embedder.embed([doc['text'] for doc in docs]), replace=True)
+        # Rows above the cursor are appended by the catch-up
+        self.schedule(project_id)
+
+    def _folder_projects(self, source, folder_ids):
+        """{folder id: project id} for the folders of a source's rows"""
+        _, app_label, model_name, *_ = self._spec(source)
+        if model_name == 'BrightDataScrapedPost':
+            folder_model = apps.get_model('track_accounts', 'UnifiedRunFolder')
+        else:
+            folder_model = apps.get_model(app_label, model_name)._meta.get_field('folder').related_model
+        return dict(folder_model.objects.filter(pk__in=folder_ids, project_id__isnull=False)
+                    .values_list('pk', 'project_id'))
+
+    def schedule(self, project_id):
+        """
+        Index a project's new rows on the background indexer once the current
+        transaction commits, or right away when SEMANTIC_INDEX_ASYNC is off.
+        Requests for a project that is already queued are merged.
+        """
+        if not getattr(settings, 'SEMANTIC_INDEX_ASYNC', True):
+            self._index_quietly(project_id)
+            return
+        transaction.on_commit(lambda: self._submit(project_id))
+
+    def _submit(self, project_id):
+        with self._lock:
+            if project_id in self._scheduled:
+                return
+            self._scheduled.add(project_id)
+        self._background().submit(self._run, project_id)
+
+    def _submit_changes(self):
+        with self._lock:
+            if self._changes_scheduled:
+                return
+            self._changes_scheduled = True
+        self._background().submit(self._run_changes)
+
+    def _background(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='semantic-index')
+            return self._executor
+
+    def _run(self, project_id):
+        with self._lock:
+            # Rows stored from here on need another pass
+            self._scheduled.discard(project_id)
+        try:
+            self._index_quietly(project_id)
+        finally:
+            close_old_connections()
+
+    def _run_changes(self):
+        with self._lock:
+            self._changes_scheduled = False
+        try:
+            self._quietly(self.apply_changes)
+        finally:
+            close_old_connections()
+
+    def _run_task(self, task, *args):
+        try:
+            self._quietly(task, *args)
+        finally:
+            close_old_connections()
+
+    def _index_quietly(self, project_id):
+        try:
+            return self.index_project(project_id)
+        except Exception as e:
+            logger.warning(f"Could not update semantic index for project {project_id}: {e}")
+            return 0
+
+    def _quietly(self, task, *args):
+        try:
+            return task(*args)
+        except Exception as e:
+            logger.warning(f"Could not update semantic index ({task.__name__}): {e}")
+            return 0
+
+
+def search(project_id, query, k=5):
+    """Retrieve the k most relevant scraped posts/comments for a chat query"""
+    return semantic_index_service.search(project_id, query, k=k)
+
+
+def index_project_documents(project_id):
+    """Called by ingestion paths once new posts for a project are stored; indexing runs in the background"""
+    semantic_index_service.schedule(project_id)
+
+
+def refresh_indexed_document(instance):
+    """Called when an indexed post/comment is edited or deleted; it is re-embedded or tombstoned in the background"""
+    semantic_index_service.mark_changed(instance)
+
+
+def move_indexed_folder(folder, previous_project_id):
+    """Called when a platform folder moves to another project; its rows follow it between indexes"""
+    semantic_index_service.folder_moved(folder, previous_project_id)
+
+
+# Global semantic index service instance
+semantic_index_service = SemanticIndexService()
@@ -0,0 +1,335 @@
+import json
+import shutil
+import tempfile
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from facebook_data.models import FacebookPost, Folder as FacebookFolder
+from instagram_data.models import Folder as InstagramFolder, InstagramComment, InstagramPost
+from users.models import Project
+
+from .context_service import ContextTokenBudgeter, ProjectContextCache, invalidate_project_context
+from .models import ChatThread
+from .openai_service import OpenAIService
+from .retrieval import HashingEmbedder, ProjectVectorIndex, SemanticIndexService
+
+
+def make_snapshot(post_text='Great product launch ' * 50):
+    posts = [{'id': i, 'platform': 'instagram', 'content': post_text, 'likes': i} for i in range(10)]
+    metrics = {'total_posts': 10, 'total_likes': 45, 'engagement_rate': 4.5, 'platforms': {'instagram': 10}}
+    return {
+        'project_id': 1,
+        'company_posts_count': 10,
+        'company_posts': posts,
+        'competitor_posts_count': 10,
+        'competitor_posts': posts,
+        'company_metrics': metrics,
+        'competitor_metrics': metrics,
+        'overall_metrics': metrics,
+        'recent_comments_count': 10,
+        'recent_comments': [{'comment': post_text} for _ in range(10)],
+        'brightdata_metrics': {'total_posts': 10},
+        'sentiment': {'overall_sentiment': 'positive', 'insights': ['Fans love the launch']},
+        'content_sentiment': None,
+    }
+
+
+class ProjectContextCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.context_cache = ProjectContextCache(ttl=60)
+
+    def test_snapshot_is_built_once_until_invalidated(self):
+        with mock.patch.object(ProjectContextCache, 'build_snapshot', return_value={'project_id': 7}) as build:
+            self.context_cache.get_snapshot(7)
+            self.context_cache.get_snapshot(7)
+            self.assertEqual(build.call_count, 1)
+
+            self.context_cache.invalidate(7)
+            self.context_cache.get_snapshot(7)
+            self.assertEqual(build.call_count, 2)
+
+    def test_post_and_comment_writes_invalidate_the_project_context(self):
+        owner = User.objects.create_user(username='writer', password='x')
+        project = Project.objects.create(name='Writes', owner=owner)
+        folder = InstagramFolder.objects.create(name='IG', project=project)
+
+        with mock.patch.object(ProjectContextCache, 'invalidate') as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            post = InstagramPost.objects.create(folder=folder, url='https://instagram.com/p/1', post_id='1')
+            comment = self.client.post('/api/instagram_data/comments/', {
+                'comment_id': 'c1', 'folder': folder.id, 'post_id': '1', 'post_url': 'https://instagram.com/p/1',
+                'comment': 'Nice', 'comment_user': 'fan',
+            }, content_type='application/json')
+            self.client.delete(f"/api/instagram_data/comments/{comment.json()['id']}/")
+            post.delete()
+
+        self.assertEqual(comment.status_code, 201)
+        self.assertEqual(invalidate.call_count, 4)
+        self.assertTrue(all(call.args == (project.id,) for call in invalidate.call_args_list))
+        # Comment rows saved outside those write paths are not invalidated one by one
+        with mock.patch.object(ProjectContextCache, 'invalidate') as invalidate, \
+                self.captureOnCommitCallbacks(execute=True):
+            InstagramComment.objects.create(folder=folder, post_id='1', comment='Nice')
+        invalidate.assert_not_called()
+
+
+class ContextTokenBudgeterTest(TestCase):
+    def test_large_context_is_compacted_to_budget(self):
+        budgeter = ContextTokenBudgeter(max_tokens=800)
+        snapshot = make_snapshot()
+
+        full = budgeter.render(snapshot, budgeter.DETAIL_LEVELS[0])
+        compacted = budgeter.compact(snapshot)
+
+        self.assertGreater(budgeter.count_tokens(full), 800)
+        self.assertLessEqual(budgeter.count_tokens(compacted), 800)
+        self.assertIn('Company Posts: 10 posts', compacted)
+
+    def test_small_context_keeps_full_detail(self):
+        budgeter = ContextTokenBudgeter(max_tokens=100000)
+        snapshot = make_snapshot(post_text='short')
+
+        self.assertEqual(budgeter.compact(snapshot), budgeter.render(snapshot, budgeter.DETAIL_LEVELS[0]))
+
+    def test_truncation_counts_tokens_not_characters(self):
+        budgeter = ContextTokenBudgeter(max_tokens=200)
+        # One token per character, so a four-characters-per-token cut would overshoot
+        budgeter._encoding = SimpleNamespace(encode=list, decode=''.join)
+
+        compacted = budgeter.compact(make_snapshot())
+
+        self.assertEqual(budgeter.count_tokens(compacted), 200)
+
+
+class FakeStream:
+    """Stands in for the OpenAI SDK stream object returned with stream=True"""
+
+    def __init__(self, deltas):
+        self.chunks = [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=delta))])
+            for delta in deltas
+        ]
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.chunks)
+
+    def close(self):
+        self.closed = True
+
+
+class StreamingChatTest(APITestCase):
+    def setUp(self):
+        self.thread = ChatThread.objects.create(title='Launch review')
+        self.url = f'/api/chat/threads/{self.thread.id}/stream_message/'
+
+    def _events(self, response):
+        body = b''.join(response.streaming_content).decode('utf-8')
+        events = []
+        for block in body.strip().split('\n\n'):
+            event_line, data_line = block.split('\n')
+            events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+        return events
+
+    def test_stream_response_yields_deltas_and_closes_stream(self):
+        stream = FakeStream(['Hello', None, ' world'])
+        service = OpenAIService()
+        service.client = mock.Mock()
+        service.client.chat.completions.create.return_value = stream
+
+        self.assertEqual(list(service.stream_response('Hi')), ['Hello', ' world'])
+        self.assertTrue(stream.closed)
+
+    def test_tokens_are_streamed_and_ai_message_persisted(self):
+        with mock.patch('chat.views.openai_service.stream_response', return_value=iter(['Engagement ', 'is up'])):
+            response = self.client.post(self.url, {'content': 'How are we doing?'}, format='json',
+                                        HTTP_ACCEPT='text/event-stream')
+            events = self._events(response)
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        self.assertEqual([name for name, _ in events], ['user_message', 'token', 'token', 'done'])
+        self.assertEqual(events[-1][1]['content'], 'Engagement is up')
+        self.assertEqual(
+            list(self.thread.messages.values_list('sender', 'content')),
+            [('user', 'How are we doing?'), ('ai', 'Engagement is up')]
+        )
+
+    def test_client_disconnect_cancels_upstream_and_keeps_partial_response(self):
+        def tokens():
+            yield 'Partial'
+            yield ' answer'
+
+        upstream = tokens()
+        with mock.patch('chat.views.openai_service.stream_response', return_value=upstream):
+            response = self.client.post(self.url, {'content': 'Summarise'}, format='json')
+            content = iter(response.streaming_content)
+            next(content)  # user_message
+            next(content)  # first token
+            response.close()
+
+        self.assertIsNone(upstream.gi_frame)  # upstream generator was closed
+        self.assertEqual(self.thread.messages.filter(sender='ai').get().content, 'Partial')
+
+
+@override_settings(SEMANTIC_INDEX_ASYNC=False)
+class SemanticIndexTest(TestCase):
+    def setUp(self):
+        self.index_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.index_root, ignore_errors=True)
+        self.service = SemanticIndexService(root=self.index_root, embedder=HashingEmbedder(dim=128))
+        patcher = mock.patch('chat.retrieval.semantic_index_service', self.service)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        # Writes queue indexing for after commit, which TestCase never runs, so each test starts unindexed
+        with self.settings(SEMANTIC_INDEX_ASYNC=True):
+            owner = User.objects.create_user(username='analyst', password='x')
+            self.project = Project.objects.create(name='Launch', owner=owner)
+            other_project = Project.objects.create(name='Other', owner=owner)
+
+            ig_folder = InstagramFolder.objects.create(name='IG', project=self.project)
+            fb_folder = FacebookFolder.objects.create(name='FB', project=self.project)
+            InstagramPost.objects.create(folder=ig_folder, url='https://instagram.com/p/1', user_posted='nike',
+                                         post_id='1', description='New running shoes drop this Friday #running')
+            InstagramComment.objects.create(folder=ig_folder, post_id='1', post_url='https://instagram.com/p/1',
+                                            comment_user='fan', comment='Delivery was late and support never replied')
+            FacebookPost.objects.create(folder=fb_folder, url='https://facebook.com/p/2', post_id='2',
+                                        content='Our summer football camp is open for registration')
+            other_folder = InstagramFolder.objects.create(name='Other IG', project=other_project)
+            InstagramPost.objects.create(folder=other_folder, url='https://instagram.com/p/9', user_posted='x',
+                                         post_id='9', description='Running shoes running shoes')
+
+    def test_search_returns_relevant_documents_from_all_platforms(self):
+        shoes = self.service.search(self.project.id, 'running shoes', k=1)
+        delivery = self.service.search(self.project.id, 'late delivery support', k=1)
+        football = self.service.search(self.project.id, 'football camp registration', k=3)
+
+        self.assertEqual((shoes[0]['platform'], shoes[0]['kind']), ('instagram', 'post'))
+        self.assertEqual((delivery[0]['platform'], delivery[0]['kind']), ('instagram', 'comment'))
+        self.assertEqual(football[0]['platform'], 'facebook')
+        # Other projects' posts are never indexed into this project
+        self.assertEqual(self.service.get_index(self.project.id).count, 3)
+
+    def test_ingest_appends_only_new_documents(self):
+        self.service.index_project(self.project.id)
+        folder = InstagramFolder.objects.get(name='IG')
+
+        # Storing the post is what appends it to the index
+        with mock.patch.object(self.service.embedder, 'embed', wraps=self.service.embedder.embed) as embed, \
+                self.captureOnCommitCallbacks(execute=True):
+            InstagramPost.objects.create(folder=folder, url='https://instagram.com/p/3', user_posted='nike',
+                                         post_id='3', description='Marathon training plan for beginners')
+
+        embed.assert_called_once()
+        self.assertEqual(len(embed.call_args[0][0]), 1)
+        self.assertEqual(self.service.get_index(self.project.id).count, 4)
+        self.assertIn('Marathon', self.service.search(self.project.id, 'marathon training', k=1)[0]['text'])
+
+    def test_rows_indexed_by_another_worker_are_not_added_twice(self):
+        other_worker = SemanticIndexService(root=self.index_root, embedder=HashingEmbedder(dim=128))
+        other_worker.index_project(self.project.id)
+        index = self.service.get_index(self.project.id)
+
+        # This worker read the cursors before the other one committed its batch
+        with mock.patch.object(index, 'cursors', return_value={}):
+            self.service.index_project(self.project.id)
+
+        self.assertEqual(index.count, 3)
+
+    @override_settings(SEMANTIC_INDEX_ASYNC=True)
+    def test_ingest_and_search_leave_indexing_to_the_background(self):
+        executor = mock.Mock()
+        self.service._executor = executor
+        with mock.patch.object(self.service.embedder, 'embed', wraps=self.service.embedder.embed) as embed, \
+                self.captureOnCommitCallbacks(execute=True):
+            invalidate_project_context(self.project.id)
+            invalidate_project_context(self.project.id)
+            self.assertEqual(self.service.search(self.project.id, 'running shoes'), [])
+
+        # Only the query itself was embedded on this thread; the project was queued once
+        self.assertEqual(embed.call_count, 1)
+        executor.submit.assert_called_once_with(self.service._run, self.project.id)
+
+    def test_edited_deleted_and_moved_rows_are_refreshed(self):
+        self.service.index_project(self.project.id)
+        index = self.service.get_index(self.project.id)
+        post = InstagramPost.objects.get(post_id='1')
+
+        post.description = 'Limited edition sneakers restock'
+        post.save()
+        self.assertEqual(index.indexed_text('instagram_post', post.id), 'Limited edition sneakers restock')
+        self.assertIn('sneakers', self.service.search(self.project.id, 'sneakers restock', k=1)[0]['text'])
+
+        FacebookPost.objects.get(post_id='2').delete()
+        self.assertEqual([hit['platform'] for hit in self.service.search(self.project.id, 'football camp', k=3)],
+                         ['instagram', 'instagram'])
+
+        other_project = Project.objects.get(name='Other')
+        folder = InstagramFolder.objects.get(name='IG')
+        folder.project = other_project
+        folder.save()
+        self.assertEqual(self.service.search(self.project.id, 'sneakers restock'), [])
+        self.assertIsNone(index.indexed_text('instagram_post', post.id))
+        self.service.index_project(other_project.id)
+        moved = self.service.search(other_project.id, 'sneakers restock', k=1)
+        self.assertEqual(moved[0]['id'], post.id)
+
+    def test_search_drops_hits_that_no_longer_match_the_stored_rows(self):
+        self.service.index_project(self.project.id)
+        # Queryset updates send no signals, so the index still holds the old text
+        InstagramPost.objects.filter(post_id='1').update(description='Store opening hours')
+        InstagramComment.objects.all().delete()
+
+        hits = self.service.search(self.project.id, 'running shoes late delivery', k=3)
+
+        self.assertEqual([hit['platform'] for hit in hits], ['facebook'])
+        # The stale rows were refreshed for the next search
+        self.assertIn('opening hours', self.service.search(self.project.id, 'store opening hours', k=1)[0]['text'])
+
+    def test_embeddings_are_stored_as_float16(self):
+        self.service.index_project(self.project.id)
+        index = self.service.get_index(self.project.id)
+
+        stored = np.memmap(index._file('vectors.f16'), dtype=np.float16, mode='r')
+        self.assertEqual(stored.size % 128, 0)
+        self.assertGreaterEqual(stored.size // 128, index.count)
+
+    def test_chat_prompt_includes_retrieved_posts(self):
+        service = OpenAIService()
+        with mock.patch('chat.openai_service.semantic_index_service', self.service), \
+                mock.patch.object(ProjectContextCache, 'get_snapshot', return_value=make_snapshot('short')):
+            messages = service.build_messages('What do people say about delivery?', project_id=self.project.id)
+
+        self.assertIn('MOST RELEVANT POSTS AND COMMENTS', messages[0]['content'])
+        self.assertIn('Delivery was late', messages[0]['content'])
+
+
+class ProjectVectorIndexTest(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.path, ignore_errors=True)
+
+    def test_approximate_search_finds_near_duplicate(self):
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((300, 64)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        docs = [{'id': i} for i in range(300)]
+
+        index = ProjectVectorIndex(self.path, dim=64, embedder_name='test', tables=8, bits=6, exact_threshold=0)
+        index.add(docs[:200], vectors[:200])
+        index.add(docs[200:], vectors[200:])
+
+        query = vectors[250] + 0.05 * rng.standard_normal(64).astype(np.float32)
+        results = index.search(query / np.linalg.norm(query), k=3)
+
+        self.assertEqual(results[0][1]['id'], 250)
+        # A second handle on the same files sees the committed rows
+        reader = ProjectVectorIndex(self.path, dim=64, embedder_name='test', exact_threshold=0)
+        self.assertEqual(reader.count, 300)
@@ -1,12 +1,33 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.renderers import BaseRenderer, JSONRenderer
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+import json
 from .models import ChatThread, ChatMessage
 from .serializers import ChatThreadSerializer, ChatMessageSerializer
 from .openai_service import openai_service
 
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets clients negotiate `Accept: text/event-stream`; the stream itself is
+    written by a StreamingHttpResponse, so this renderer only handles errors.
+    """
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return _sse_event('error', data)
+
+
+def _sse_event(event, data):
+    """Encode one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode('utf-8')
+
+
 class ChatThreadViewSet(viewsets.ModelViewSet):
     """
     ViewSet for managing chat threads
@@ -112,6 +133,75 @@ class ChatThreadViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['POST'], renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def stream_message(self, request, pk=None):
+        """
+        Add a user message and stream the AI response as server-sent events.
+
+        Events: `user_message` (saved user message), `token` (response text delta),
+        `done` (saved AI message) or `error`. The AI message is persisted once the
+        stream completes; if the client disconnects the upstream completion is
+        cancelled and the partial response is kept.
+        """
+        thread = self.get_object()
+        data = request.data.copy()
+        data['sender'] = 'user'
+        serializer = ChatMessageSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        user_message = serializer.save(thread=thread)
+        conversation_history = list(ChatMessage.objects.filter(thread=thread).order_by('timestamp'))
+
+        project_id = request.data.get('project_id') or request.query_params.get('project_id')
+        try:
+            project_id = int(project_id) if project_id else None
+        except (ValueError, TypeError):
+            project_id = None
+
+        def event_stream():
+            yield _sse_event('user_message', ChatMessageSerializer(user_message).data)
+
+            chunks = []
+            tokens = openai_service.stream_response(
+                user_message.content,
+                conversation_history,
+                project_id=project_id
+            )
+            try:
+                for delta in tokens:
+                    chunks.append(delta)
+                    yield _sse_event('token', {'content': delta})
+            except GeneratorExit:
+                # Client went away - stop the upstream completion and keep what was streamed
+                tokens.close()
+                if chunks:
+                    ChatMessage.objects.create(thread=thread, content=''.join(chunks), sender='ai')
+                    thread.save()
+                raise
+            except Exception as e:
+                print(f"❌ AI streaming failed: {str(e)}")
+                error_message = ChatMessage.objects.create(
+                    thread=thread,
+                    content=f"I encountered an error processing your request. Error: {str(e)}",
+                    sender='ai',
+                    is_error=True
+                )
+                thread.save()
+                yield _sse_event('error', ChatMessageSerializer(error_message).data)
+                return
+
+            ai_message = ChatMessage.objects.create(thread=thread, content=''.join(chunks), sender='ai')
+
+            # Update thread's updated_at timestamp
+            thread.save()
+            yield _sse_event('done', ChatMessageSerializer(ai_message).data)
+
+        response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # Disable proxy buffering so tokens flush immediately
+        return response
+
     @action(detail=True, methods=['POST'])
     def archive(self, request, pk=None):
         """
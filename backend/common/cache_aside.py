@@ -0,0 +1,90 @@
+"""
+Cache-Aside Helpers
+Versioned read-through caching for expensive project-level endpoints. The
+cache is an optimisation only: when the backend fails (unwritable cache
+directory, locked or corrupt file) values are computed directly and
+invalidation is skipped, so requests never fail because of it.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def project_namespace(project_id) -> str:
+    return f'project:{project_id}'
+
+
+def _version_key(namespace: str) -> str:
+    return f'cache_aside:version:{namespace}'
+
+
+def namespace_version(namespace: str) -> int:
+    """Current version of a namespace; every cached value embeds it in its key"""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted version counter never reuses an old version
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_namespace(namespace: str):
+    """Make every value cached under a namespace unreachable with one atomic increment"""
+    try:
+        try:
+            cache.incr(_version_key(namespace))
+        except ValueError:
+            namespace_version(namespace)
+    except Exception as e:
+        logger.warning(f"⚠️ Cache unavailable, could not invalidate {namespace}: {e}")
+
+
+def invalidate_project_cache(project_id):
+    """
+    Invalidate a project's namespace once the current transaction commits (at
+    once outside one); a read between an earlier bump and the commit would
+    cache pre-commit rows under the new version
+    """
+    if project_id:
+        transaction.on_commit(lambda: invalidate_namespace(project_namespace(project_id)))
+
+
+def make_key(namespace: str, name: str, *parts) -> str:
+    digest = hashlib.md5(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+    return f'cache_aside:{namespace}:{namespace_version(namespace)}:{name}:{digest}'
+
+
+def cache_aside(namespace: str, name: str, compute: Callable[[], Any], *parts, timeout=None) -> Any:
+    """
+    Return the cached value for (namespace, name, parts), computing and storing it on a miss.
+    `timeout=None` uses the cache's default timeout.
+    """
+    try:
+        key = make_key(namespace, name, *parts)
+        value = cache.get(key, _MISSING)
+    except Exception as e:
+        logger.warning(f"⚠️ Cache unavailable, computing {namespace} {name} directly: {e}")
+        return compute()
+    if value is not _MISSING:
+        return value
+
+    value = compute()
+    try:
+        if timeout is None:
+            cache.set(key, value)
+        else:
+            cache.set(key, value, timeout=timeout)
+    except Exception as e:
+        logger.warning(f"⚠️ Cache unavailable, could not store {namespace} {name}: {e}")
+    return value
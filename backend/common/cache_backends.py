@@ -0,0 +1,239 @@
+"""
+Shared Cache Backend
+SQLite-backed Django cache shared by every worker process on a host
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+class SQLiteCache(BaseCache):
+    """
+    Django cache backend storing entries in a single SQLite file.
+
+    - Safe across processes: the file runs in WAL mode, so readers never block
+      the writer, and every multi-statement write runs under BEGIN IMMEDIATE.
+    - LRU eviction: reads stamp an `accessed` time (at most once per
+      LRU_RESOLUTION seconds per key, to keep reads mostly read-only) and the
+      cull removes the least recently used entries once MAX_ENTRIES is exceeded.
+    - Atomic counters: integers are stored unpickled, so `incr`/`decr` are a
+      single locked read-modify-write visible to every process.
+
+    Usage in settings::
+
+        CACHES = {'default': {
+            'BACKEND': 'common.cache_backends.SQLiteCache',
+            'LOCATION': '/var/cache/trackfutura/default.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 10000, 'CULL_FREQUENCY': 3},
+        }}
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = location
+        self._busy_timeout = float(options.get('BUSY_TIMEOUT', 10.0))
+        self._lru_resolution = float(options.get('LRU_RESOLUTION', 1.0))
+        # Counting rows costs a scan, so the size check runs every N writes
+        self._cull_check_interval = int(options.get('CULL_CHECK_INTERVAL', 50))
+        self._writes = 0
+        self._local = threading.local()
+
+    # Connection handling
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        # Connections must not cross a fork
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self._path, timeout=self._busy_timeout, isolation_level=None,
+                               check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL, accessed REAL NOT NULL'
+            ') WITHOUT ROWID'
+        )
+        conn.execute('CREATE INDEX IF NOT EXISTS cache_entries_accessed ON cache_entries (accessed)')
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    @contextmanager
+    def _write(self):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    # Encoding
+
+    @staticmethod
+    def _encode(value):
+        # Plain ints stay as SQLite INTEGERs so counters can be updated in place
+        if type(value) is int and -2 ** 63 <= value < 2 ** 63:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, int):
+            return value
+        return pickle.loads(value)
+
+    # Cache API
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._get_many([key]).get(key, default)
+
+    def get_many(self, keys, version=None):
+        keyed = {self.make_and_validate_key(key, version=version): key for key in keys}
+        found = self._get_many(list(keyed))
+        return {keyed[key]: value for key, value in found.items()}
+
+    def _get_many(self, keys):
+        if not keys:
+            return {}
+        conn = self._connection()
+        now = time.time()
+        placeholders = ','.join('?' * len(keys))
+        rows = conn.execute(
+            f'SELECT key, value, expires, accessed FROM cache_entries WHERE key IN ({placeholders})', keys
+        ).fetchall()
+
+        found, expired, stale = {}, [], []
+        for key, value, expires, accessed in rows:
+            if expires is not None and expires <= now:
+                expired.append(key)
+                continue
+            found[key] = self._decode(value)
+            if now - accessed > self._lru_resolution:
+                stale.append(key)
+
+        if expired:
+            conn.executemany('DELETE FROM cache_entries WHERE key = ? AND expires <= ?',
+                             [(key, now) for key in expired])
+        if stale:
+            conn.executemany('UPDATE cache_entries SET accessed = ? WHERE key = ?', [(now, key) for key in stale])
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._set_many([(key, value)], timeout)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        items = [(self.make_and_validate_key(key, version=version), value) for key, value in data.items()]
+        self._set_many(items, timeout)
+        return []
+
+    def _set_many(self, items, timeout):
+        if not items:
+            return
+        expires = self.get_backend_timeout(timeout)
+        now = time.time()
+        with self._write() as conn:
+            conn.executemany(
+                'INSERT INTO cache_entries (key, value, expires, accessed) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires, '
+                'accessed = excluded.accessed',
+                [(key, self._encode(value), expires, now) for key, value in items],
+            )
+            self._maybe_cull(conn, now, len(items))
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        with self._write() as conn:
+            # Only overwrite a row whose entry has already expired
+            cursor = conn.execute(
+                'INSERT INTO cache_entries (key, value, expires, accessed) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires = excluded.expires, '
+                'accessed = excluded.accessed WHERE cache_entries.expires IS NOT NULL AND cache_entries.expires <= ?',
+                (key, self._encode(value), self.get_backend_timeout(timeout), now, now),
+            )
+            added = cursor.rowcount > 0
+            if added:
+                self._maybe_cull(conn, now, 1)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        with self._write() as conn:
+            row = conn.execute(
+                'SELECT value FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, now)
+            ).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            new_value = self._decode(row[0]) + delta
+            conn.execute('UPDATE cache_entries SET value = ?, accessed = ? WHERE key = ?',
+                         (self._encode(new_value), now, key))
+        return new_value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        cursor = self._connection().execute(
+            'UPDATE cache_entries SET expires = ?, accessed = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (self.get_backend_timeout(timeout), now, key, now),
+        )
+        return cursor.rowcount > 0
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._connection().execute(
+            'SELECT 1 FROM cache_entries WHERE key = ? AND (expires IS NULL OR expires > ?)', (key, time.time())
+        ).fetchone()
+        return row is not None
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._connection().execute('DELETE FROM cache_entries WHERE key = ?', (key,))
+        return cursor.rowcount > 0
+
+    def delete_many(self, keys, version=None):
+        keys = [(self.make_and_validate_key(key, version=version),) for key in keys]
+        if keys:
+            self._connection().executemany('DELETE FROM cache_entries WHERE key = ?', keys)
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entries')
+
+    # Eviction
+
+    def _maybe_cull(self, conn, now, writes):
+        self._writes += writes
+        if self._writes < self._cull_check_interval:
+            return
+        self._writes = 0
+        self._cull(conn, now)
+
+    def _cull(self, conn, now):
+        conn.execute('DELETE FROM cache_entries WHERE expires IS NOT NULL AND expires <= ?', (now,))
+        count = conn.execute('SELECT COUNT(*) FROM cache_entries').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        if self._cull_frequency == 0:
+            conn.execute('DELETE FROM cache_entries')
+            return
+        # Evict the least recently used share, and at least enough to get back under the limit
+        evict = max(count // self._cull_frequency, count - self._max_entries)
+        conn.execute(
+            'DELETE FROM cache_entries WHERE key IN '
+            '(SELECT key FROM cache_entries ORDER BY accessed LIMIT ?)', (evict,)
+        )
@@ -0,0 +1,151 @@
+"""
+Bulk Comment Ingestion
+Links scraped comments to their posts and upserts them in chunks
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(items: List, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BulkCommentIngestor:
+    """
+    Upserts comment rows for one platform.
+
+    Rows are plain dicts of comment model values keyed by attname (``folder_id``
+    rather than ``folder``). All post ids referenced by a delivery are resolved
+    with one lookup per chunk instead of one ``get()`` per comment, and each
+    chunk of comments is written with a single ``bulk_create(update_conflicts=True)``
+    against the model's unique key.
+    """
+
+    def __init__(self, comment_model, post_model, post_field: str,
+                 unique_fields: Tuple[str, ...], chunk_size: Optional[int] = None):
+        self.comment_model = comment_model
+        self.post_model = post_model
+        self.post_attname = comment_model._meta.get_field(post_field).attname
+        self.unique_fields = [comment_model._meta.get_field(name).attname for name in unique_fields]
+        self.fields = {field.attname: field for field in comment_model._meta.concrete_fields}
+        self._chunk_size = chunk_size
+
+    @property
+    def chunk_size(self) -> int:
+        return self._chunk_size or getattr(settings, 'COMMENT_INGEST_CHUNK_SIZE', 1000)
+
+    def clean_row(self, row: Dict) -> Dict:
+        """
+        Convert a row's values the way save() would and reject values its
+        columns cannot hold. A bad value raises ValidationError here, so the
+        caller skips that comment; in the chunk's INSERT it would fail the
+        whole delivery.
+        """
+        cleaned = {}
+        for name, value in row.items():
+            field = self.fields[name]
+            value = field.to_python(value)
+            if value is None and not field.null:
+                raise ValidationError(f"{field.name} cannot be empty")
+            if field.max_length and value is not None and len(value) > field.max_length:
+                raise ValidationError(f"{field.name} is longer than {field.max_length} characters")
+            cleaned[name] = value
+        return cleaned
+
+    def resolve_posts(self, post_ids: Iterable[str]) -> Dict[str, int]:
+        """Map post_id -> post pk; the newest post wins when a post_id was stored twice"""
+        post_ids = sorted({post_id for post_id in post_ids if post_id})
+        post_map = {}
+        for chunk in _chunks(post_ids, self.chunk_size):
+            rows = self.post_model.objects.filter(post_id__in=chunk).order_by('id').values_list('post_id', 'id')
+            post_map.update(rows)
+        return post_map
+
+    def ingest(self, rows: List[Dict]) -> Dict[str, int]:
+        """Link and upsert comment rows, returning created/updated counts"""
+        result = {'created': 0, 'updated': 0, 'linked': 0}
+        if not rows:
+            return result
+
+        post_map = self.resolve_posts(row.get('post_id') for row in rows)
+
+        # A delivery can repeat a comment; the last copy wins, as it did row by row
+        unique_rows = {}
+        for row in rows:
+            row[self.post_attname] = post_map.get(row.get('post_id'))
+            unique_rows[self._key(row)] = row
+        result['linked'] = sum(1 for row in unique_rows.values() if row[self.post_attname])
+
+        for chunk in _chunks(list(unique_rows.values()), self.chunk_size):
+            created, updated = self._upsert_chunk(chunk)
+            result['created'] += created
+            result['updated'] += updated
+
+        logger.info(f"📥 Upserted {len(unique_rows)} {self.comment_model.__name__} rows "
+                    f"({result['created']} new, {result['linked']} linked to posts)")
+        return result
+
+    def project_ids(self, rows: List[Dict]) -> Set:
+        """Projects of the result folders the rows are stored in"""
+        folder_ids = {row.get('folder_id') for row in rows} - {None}
+        if not folder_ids:
+            return set()
+        folder_model = self.comment_model._meta.get_field('folder').related_model
+        return set(folder_model.objects.filter(id__in=folder_ids, project__isnull=False)
+                   .values_list('project_id', flat=True))
+
+    def _key(self, row: Dict) -> Tuple:
+        return tuple(row.get(field) for field in self.unique_fields)
+
+    def _existing_ids(self, chunk: List[Dict]) -> Dict[Tuple, int]:
+        lead = self.unique_fields[0]
+        values = {row[lead] for row in chunk}
+        existing = self.comment_model.objects.filter(**{f'{lead}__in': values}).order_by()
+        existing = existing.values_list('id', *self.unique_fields)
+        return {tuple(fields): pk for pk, *fields in existing}
+
+    def _upsert_chunk(self, chunk: List[Dict]) -> Tuple[int, int]:
+        existing = self._existing_ids(chunk)
+        update_fields = self._update_fields(chunk[0])
+
+        # NULL never conflicts in a unique index, so rows keyed on a NULL value
+        # (comments without a result folder) are matched to their pk instead
+        conflicting, by_pk = [], []
+        now = timezone.now()
+        for row in chunk:
+            key = self._key(row)
+            if None in key and key in existing:
+                comment = self.comment_model(id=existing[key], **row)
+                # bulk_update() skips auto_now, so stamp it here
+                if 'updated_at' in update_fields:
+                    comment.updated_at = now
+                by_pk.append(comment)
+            else:
+                conflicting.append(self.comment_model(**row))
+
+        if conflicting:
+            self.comment_model.objects.bulk_create(
+                conflicting,
+                update_conflicts=True,
+                unique_fields=self.unique_fields,
+                update_fields=update_fields,
+            )
+        if by_pk:
+            self.comment_model.objects.bulk_update(by_pk, update_fields)
+
+        updated = sum(1 for row in chunk if self._key(row) in existing)
+        return len(chunk) - updated, updated
+
+    def _update_fields(self, row: Dict) -> List[str]:
+        fields = [name for name in row if name not in self.unique_fields]
+        if any(field.name == 'updated_at' for field in self.comment_model._meta.concrete_fields):
+            fields.append('updated_at')
+        return fields
@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 import json
 import logging
 import random
+from track_accounts.unified_posts import PLATFORMS, unified_post_service
 from .data_integration_service import DataIntegrationService
 
 logger = logging.getLogger(__name__)
@@ -30,39 +31,37 @@ class DashboardService:
             if not self.data_service:
                 return self._get_default_stats()
 
-            # Get engagement metrics
-            engagement_metrics = self.data_service.get_engagement_metrics(days_back=days_back)
-
-            # Get content analysis
-            content_analysis = self.data_service.get_content_analysis_data(days_back=days_back)
-
-            # Calculate total accounts (unique users across all platforms)
-            recent_posts = self.data_service.get_all_posts(limit=1000, days_back=days_back)
-            unique_accounts = len(set(post.get('user_posted', '') for post in recent_posts if post.get('user_posted')))
+            # One aggregate over the unified post table for the totals, one for the per-platform split
+            since = timezone.now() - timedelta(days=days_back)
+            totals = unified_post_service.totals(self.project_id, since=since)
+            platforms = {
+                platform: {'posts': row['posts'], 'likes': row['likes'], 'comments': row['num_comments'],
+                           'shares': row['shares'], 'views': row['views']}
+                for platform, row in unified_post_service.platform_totals(self.project_id, since=since).items()
+            }
 
             # Calculate engagement rate
-            total_engagement = engagement_metrics.get('total_likes', 0) + engagement_metrics.get('total_comments', 0) + engagement_metrics.get('total_shares', 0)
-            total_posts = engagement_metrics.get('total_posts', 1)
+            total_posts = totals['posts']
+            total_engagement = totals['likes'] + totals['num_comments'] + totals['shares']
             engagement_rate = round((total_engagement / total_posts) if total_posts > 0 else 0, 1)
 
             # Estimate storage (basic calculation)
-            total_data_points = engagement_metrics.get('total_posts', 0) + len(self.data_service.get_all_comments(limit=1000, days_back=days_back))
-            storage_mb = round(total_data_points * 0.05, 1)  # Rough estimate: 0.05MB per data point
+            storage_mb = round(total_posts * 0.05, 1)  # Rough estimate: 0.05MB per data point
 
             return {
-                'totalPosts': engagement_metrics.get('total_posts', 0),
-                'totalAccounts': unique_accounts,
+                'totalPosts': total_posts,
+                'totalAccounts': totals['accounts'],
                 'totalReports': 0,  # Will need to implement reports count
                 'totalStorageUsed': f"{storage_mb} MB",
                 'creditBalance': 1000,  # Placeholder
                 'maxCredits': 2000,  # Placeholder
                 'engagementRate': engagement_rate,
-                'growthRate': self._calculate_growth_rate(days_back),
-                'platforms': engagement_metrics.get('platforms', {}),
-                'totalLikes': engagement_metrics.get('total_likes', 0),
-                'totalComments': engagement_metrics.get('total_comments', 0),
-                'totalShares': engagement_metrics.get('total_shares', 0),
-                'totalViews': engagement_metrics.get('total_views', 0)
+                'growthRate': self._calculate_growth_rate(days_back, current_posts=total_posts),
+                'platforms': platforms,
+                'totalLikes': totals['likes'],
+                'totalComments': totals['num_comments'],
+                'totalShares': totals['shares'],
+                'totalViews': totals['views']
             }
 
         except Exception as e:
@@ -77,44 +76,12 @@ class DashboardService:
             if not self.data_service:
                 return self._get_default_activity_timeline()
 
-            # Get data for the past X days
-            end_date = timezone.now()
-            timeline_data = []
-
-            # Group by weeks for better visualization
-            weeks = days_back // 7
-            for i in range(weeks):
-                week_start = end_date - timedelta(days=(i + 1) * 7)
-                week_end = end_date - timedelta(days=i * 7)
-
-                # Get posts for this week for each platform
-                instagram_posts = len([p for p in self.data_service.get_all_posts(limit=1000, days_back=days_back)
-                                     if p.get('platform') == 'instagram' and
-                                     week_start <= p.get('date_posted', datetime.min) <= week_end])
-
-                facebook_posts = len([p for p in self.data_service.get_all_posts(limit=1000, days_back=days_back)
-                                    if p.get('platform') == 'facebook' and
-                                    week_start <= p.get('date_posted', datetime.min) <= week_end])
-
-                linkedin_posts = len([p for p in self.data_service.get_all_posts(limit=1000, days_back=days_back)
-                                    if p.get('platform') == 'linkedin' and
-                                    week_start <= p.get('date_posted', datetime.min) <= week_end])
-
-                tiktok_posts = len([p for p in self.data_service.get_all_posts(limit=1000, days_back=days_back)
-                                  if p.get('platform') == 'tiktok' and
-                                  week_start <= p.get('date_posted', datetime.min) <= week_end])
-
-                timeline_data.append({
-                    'date': week_start.strftime('%b %d'),
-                    'instagram': instagram_posts,
-                    'facebook': facebook_posts,
-                    'linkedin': linkedin_posts,
-                    'tiktok': tiktok_posts
-                })
-
-            # Reverse to show oldest to newest
-            timeline_data.reverse()
-            return timeline_data
+            # Group by weeks for better visualization, oldest to newest
+            timeline = unified_post_service.timeline(self.project_id, buckets=days_back // 7, bucket_days=7)
+            return [
+                {'date': week['start'].strftime('%b %d'), **{platform: week[platform] for platform in PLATFORMS}}
+                for week in timeline
+            ]
 
         except Exception as e:
             logger.error(f"Error getting activity timeline: {e}")
@@ -128,15 +95,11 @@ class DashboardService:
             if not self.data_service:
                 return self._get_default_platform_distribution()
 
-            # Get all posts and calculate distribution
-            all_posts = self.data_service.get_all_posts(limit=1000, days_back=30)
+            since = timezone.now() - timedelta(days=30)
+            platform_counts = {platform: row['posts'] for platform, row
+                               in unified_post_service.platform_totals(self.project_id, since=since).items()}
 
-            platform_counts = {}
-            for post in all_posts:
-                platform = post.get('platform', 'unknown')
-                platform_counts[platform] = platform_counts.get(platform, 0) + 1
-
-            total_posts = len(all_posts)
+            total_posts = sum(platform_counts.values())
             if total_posts == 0:
                 return self._get_default_platform_distribution()
 
@@ -213,18 +176,17 @@ class DashboardService:
             if not self.data_service:
                 return self._get_default_top_performers()
 
-            # Get engagement metrics by platform
-            engagement_metrics = self.data_service.get_engagement_metrics(days_back=30)
-            platforms = engagement_metrics.get('platforms', {})
+            since = timezone.now() - timedelta(days=30)
+            platforms = unified_post_service.platform_totals(self.project_id, since=since)
 
             performers = []
             for platform_name, platform_data in platforms.items():
-                if platform_data.get('total_posts', 0) > 0:
+                if platform_data['posts'] > 0:
                     avg_engagement = (
-                        platform_data.get('total_likes', 0) +
-                        platform_data.get('total_comments', 0) +
-                        platform_data.get('total_shares', 0)
-                    ) / platform_data.get('total_posts', 1)
+                        platform_data['likes'] +
+                        platform_data['num_comments'] +
+                        platform_data['shares']
+                    ) / platform_data['posts']
 
                     engagement_rate = round(avg_engagement / 100, 1) if avg_engagement > 0 else 0
 
@@ -251,13 +213,9 @@ class DashboardService:
                 return self._get_default_weekly_goals()
 
             # Get current week's stats
-            weekly_stats = self.data_service.get_engagement_metrics(days_back=7)
-            total_posts = weekly_stats.get('total_posts', 0)
-            total_engagement = (
-                weekly_stats.get('total_likes', 0) +
-                weekly_stats.get('total_comments', 0) +
-                weekly_stats.get('total_shares', 0)
-            )
+            weekly_stats = unified_post_service.totals(self.project_id, since=timezone.now() - timedelta(days=7))
+            total_posts = weekly_stats['posts']
+            total_engagement = weekly_stats['likes'] + weekly_stats['num_comments'] + weekly_stats['shares']
             engagement_rate = (total_engagement / total_posts) if total_posts > 0 else 0
 
             goals = [
@@ -287,18 +245,18 @@ class DashboardService:
             logger.error(f"Error getting weekly goals: {e}")
             return self._get_default_weekly_goals()
 
-    def _calculate_growth_rate(self, days_back):
+    def _calculate_growth_rate(self, days_back, current_posts=None):
         """Calculate growth rate compared to previous period"""
         try:
-            # Get current period stats
-            current_metrics = self.data_service.get_engagement_metrics(days_back=days_back)
-            current_posts = current_metrics.get('total_posts', 0)
-
-            # Get previous period stats (same duration, but earlier)
-            previous_posts = len(self.data_service.get_all_posts(
-                limit=1000,
-                days_back=days_back * 2
-            )) - current_posts
+            now = timezone.now()
+            period_start = now - timedelta(days=days_back)
+            if current_posts is None:
+                current_posts = unified_post_service.posts(self.project_id, since=period_start).count()
+
+            # Same duration, but earlier
+            previous_posts = unified_post_service.posts(
+                self.project_id, since=period_start - timedelta(days=days_back), until=period_start
+            ).count()
 
             if previous_posts > 0:
                 growth_rate = round(((current_posts - previous_posts) / previous_posts) * 100, 1)
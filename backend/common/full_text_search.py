@@ -0,0 +1,247 @@
+"""
+Full-Text Search
+Maintained full-text indexes over the platform post and comment tables: a
+generated tsvector column with a GIN index on PostgreSQL, an FTS5 table kept
+in sync by triggers on SQLite, and icontains anywhere else
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+# Text search configuration of the tsvector column: no stemming or stop words,
+# so usernames, hashtags and non-English captions index as written
+TS_CONFIG = 'simple'
+VECTOR_COLUMN = 'search_vector'
+
+
+class SearchIndex:
+    """
+    Columns of one table in the index. `people` (usernames, page names) rank
+    above `text` (captions, comment bodies); `hashtags` ranks highest and is
+    the only column a ``#tag`` term matches.
+    """
+
+    def __init__(self, people: Tuple[str, ...] = (), text: Tuple[str, ...] = (), hashtags: Optional[str] = None):
+        self.people = people
+        self.text = text
+        self.hashtags = hashtags
+
+    @property
+    def columns(self) -> List[str]:
+        return [*self.people, *self.text, *([self.hashtags] if self.hashtags else [])]
+
+
+SEARCH_INDEXES: Dict[str, SearchIndex] = {
+    'instagram_data.InstagramPost': SearchIndex(('user_posted',), ('description',), 'hashtags'),
+    'instagram_data.InstagramComment': SearchIndex(('comment_user',), ('comment',), 'hashtag_comment'),
+    'facebook_data.FacebookPost': SearchIndex(('user_posted', 'page_name'), ('content', 'description'), 'hashtags'),
+    'facebook_data.FacebookComment': SearchIndex(('user_name',), ('comment_text',)),
+    'linkedin_data.LinkedInPost': SearchIndex(('user_posted',), ('description', 'post_text'), 'hashtags'),
+    'tiktok_data.TikTokPost': SearchIndex(('user_posted',), ('description',), 'hashtags'),
+}
+
+
+def fts_table(db_table: str) -> str:
+    return f'{db_table}_fts'
+
+
+def _q(name: str) -> str:
+    return connection.ops.quote_name(name)
+
+
+def _postgres_statements(db_table: str, index: SearchIndex) -> List[str]:
+    def weighted(columns, weight):
+        return [f"setweight(to_tsvector('{TS_CONFIG}', coalesce({_q(column)}::text, '')), '{weight}')"
+                for column in columns]
+
+    vector = ' || '.join(weighted(index.people, 'B') + weighted(index.text, 'D')
+                         + weighted([index.hashtags] if index.hashtags else [], 'A'))
+    return [
+        f"ALTER TABLE {_q(db_table)} ADD COLUMN IF NOT EXISTS {_q(VECTOR_COLUMN)} tsvector "
+        f"GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX IF NOT EXISTS {_q(db_table + '_search_gin')} ON {_q(db_table)} USING gin ({_q(VECTOR_COLUMN)})",
+    ]
+
+
+def _sqlite_triggers(db_table: str, index: SearchIndex) -> List[str]:
+    fts, columns = fts_table(db_table), index.columns
+    names = ', '.join(_q(column) for column in columns)
+
+    def values(row):
+        return ', '.join(f'{row}.{_q(column)}' for column in columns)
+
+    delete = f"INSERT INTO {_q(fts)} ({_q(fts)}, rowid, {names}) VALUES ('delete', old.id, {values('old')});"
+    insert = f"INSERT INTO {_q(fts)} (rowid, {names}) VALUES (new.id, {values('new')});"
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {_q(fts + '_ai')} AFTER INSERT ON {_q(db_table)} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {_q(fts + '_ad')} AFTER DELETE ON {_q(db_table)} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {_q(fts + '_au')} AFTER UPDATE ON {_q(db_table)} BEGIN {delete} {insert} END",
+    ]
+
+
+def install(schema_editor, db_table: str, index: SearchIndex):
+    """Create the index for a table and fill it from the existing rows"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        # The generated column is computed for existing rows when it is added
+        for statement in _postgres_statements(db_table, index):
+            schema_editor.execute(statement)
+    elif vendor == 'sqlite' and sqlite_fts5_available(schema_editor.connection):
+        fts = fts_table(db_table)
+        names = ', '.join(_q(column) for column in index.columns)
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {_q(fts)} USING fts5({names}, content={_q(db_table)}, "
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        for statement in _sqlite_triggers(db_table, index):
+            schema_editor.execute(statement)
+        schema_editor.execute(f"INSERT INTO {_q(fts)} ({_q(fts)}) VALUES ('rebuild')")
+    _installed.clear()
+
+
+def uninstall(schema_editor, db_table: str):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(f"DROP INDEX IF EXISTS {_q(db_table + '_search_gin')}")
+        schema_editor.execute(f"ALTER TABLE {_q(db_table)} DROP COLUMN IF EXISTS {_q(VECTOR_COLUMN)}")
+    elif vendor == 'sqlite':
+        fts = fts_table(db_table)
+        for suffix in ('_ai', '_ad', '_au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {_q(fts + suffix)}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {_q(fts)}")
+    _installed.clear()
+
+
+def install_migration(model_label: str):
+    """RunPython operation installing the index of one model"""
+    from django.db import migrations
+
+    def forwards(apps, schema_editor):
+        install(schema_editor, apps.get_model(model_label)._meta.db_table, SEARCH_INDEXES[model_label])
+
+    def backwards(apps, schema_editor):
+        uninstall(schema_editor, apps.get_model(model_label)._meta.db_table)
+
+    return migrations.RunPython(forwards, backwards)
+
+
+def ensure_sqlite_triggers(using='default', **kwargs):
+    """
+    Recreate missing SQLite sync triggers. SQLite applies most ALTERs by
+    rebuilding the table, which drops its triggers; runs after every migrate.
+    """
+    from django.apps import apps
+    from django.db import connections
+
+    conn = connections[using]
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        existing = set(conn.introspection.table_names(cursor))
+        for label, index in SEARCH_INDEXES.items():
+            db_table = apps.get_model(label)._meta.db_table
+            if fts_table(db_table) in existing:
+                for statement in _sqlite_triggers(db_table, index):
+                    cursor.execute(statement)
+
+
+def sqlite_fts5_available(conn=None) -> bool:
+    conn = conn or connection
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            return bool(cursor.fetchone()[0])
+    except Exception:
+        return False
+
+
+_installed: Dict[str, bool] = {}
+
+
+def _index_installed(db_table: str) -> bool:
+    """Whether the table's index exists (looked up once per process)"""
+    if db_table not in _installed:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                columns = connection.introspection.get_table_description(cursor, db_table)
+                _installed[db_table] = any(column.name == VECTOR_COLUMN for column in columns)
+            elif connection.vendor == 'sqlite':
+                _installed[db_table] = fts_table(db_table) in connection.introspection.table_names(cursor)
+            else:
+                _installed[db_table] = False
+    return _installed[db_table]
+
+
+def parse_query(query: str) -> Tuple[List[str], List[str]]:
+    """(words, hashtags) of a search string; words match as prefixes, ``#tags`` exactly"""
+    hashtags = [tag.lower() for tag in re.findall(r'#(\w+)', query)]
+    words = [word.lower() for word in re.findall(r'(?<![#\w])\w+', query)]
+    return words, hashtags
+
+
+def _postgres_tsquery(words, hashtags) -> str:
+    return ' & '.join([f'{word}:*' for word in words] + [f'{tag}:A' for tag in hashtags])
+
+
+def _fts5_query(words, hashtags, index: SearchIndex) -> str:
+    terms = [f'"{word}"*' for word in words]
+    terms += [f'{index.hashtags} : "{tag}"' if index.hashtags else f'"{tag}"' for tag in hashtags]
+    return ' AND '.join(terms)
+
+
+def _fallback(index: SearchIndex, words, hashtags, query) -> Q:
+    condition = Q()
+    for term in words + hashtags or [query]:
+        term_condition = Q()
+        for column in index.columns:
+            term_condition |= Q(**{f'{column}__icontains': term})
+        condition &= term_condition
+    return condition
+
+
+def search(queryset, query: str, rank: bool = False):
+    """
+    Rows of a registered model's queryset matching every term of `query`,
+    plus exact post_id matches. With rank=True each row gets a `search_rank`
+    annotation (higher is better); ordering is left to the caller.
+    """
+    query = (query or '').strip()
+    if not query:
+        return queryset
+
+    model = queryset.model
+    index = SEARCH_INDEXES[model._meta.label]
+    db_table = model._meta.db_table
+    words, hashtags = parse_query(query)
+
+    def or_post_id(condition):
+        if any(field.name == 'post_id' for field in model._meta.fields):
+            return condition | Q(post_id=query)
+        return condition
+
+    if not (words or hashtags) or not _index_installed(db_table):
+        queryset = queryset.filter(or_post_id(_fallback(index, words, hashtags, query)))
+        return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())) if rank else queryset
+
+    if connection.vendor == 'postgresql':
+        tsquery = _postgres_tsquery(words, hashtags)
+        vector = f"{_q(db_table)}.{_q(VECTOR_COLUMN)}"
+        matches = RawSQL(f"{vector} @@ to_tsquery('{TS_CONFIG}', %s)", [tsquery], output_field=BooleanField())
+        score = RawSQL(f"ts_rank({vector}, to_tsquery('{TS_CONFIG}', %s))", [tsquery], output_field=FloatField())
+    else:
+        fts, match = fts_table(db_table), _fts5_query(words, hashtags, index)
+        matches = RawSQL(f"{_q(db_table)}.{_q('id')} IN (SELECT rowid FROM {_q(fts)} WHERE {_q(fts)} MATCH %s)",
+                         [match], output_field=BooleanField())
+        # bm25() is lower for better matches
+        score = RawSQL(f"COALESCE((SELECT -bm25({_q(fts)}) FROM {_q(fts)} WHERE {_q(fts)} MATCH %s "
+                       f"AND rowid = {_q(db_table)}.{_q('id')}), 0)", [match], output_field=FloatField())
+
+    queryset = queryset.filter(or_post_id(Q(matches)))
+    return queryset.annotate(search_rank=score) if rank else queryset
@@ -0,0 +1,138 @@
+"""
+Keyset Pagination
+Cursor (or ?page= offset) pagination over (created_at, id) and ``fields=`` projection for values() querysets
+"""
+
+import base64
+import json
+from typing import Dict, List, Optional, Sequence
+
+from django.conf import settings
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+
+class InvalidPageRequest(ValueError):
+    """Malformed cursor or unknown projected field; views answer 400"""
+
+
+def encode_cursor(created_at, pk) -> str:
+    raw = json.dumps([created_at.isoformat(), pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, pk = json.loads(raw)
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError(cursor)
+        return created_at, int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise InvalidPageRequest(f'Invalid cursor: {cursor!r}')
+
+
+def before_cursor(cursor: str, created_field: str = 'created_at', id_field: str = 'id') -> Q:
+    """Rows after the cursor in newest-first order"""
+    created_at, pk = decode_cursor(cursor)
+    return Q(**{f'{created_field}__lt': created_at}) | Q(**{created_field: created_at, f'{id_field}__lt': pk})
+
+
+PAGE_PARAMS = ('cursor', 'page', 'page_size')
+
+
+def page_size(params) -> Optional[int]:
+    """
+    ?page_size= clamped to WEBHOOK_RESULTS_MAX_PAGE_SIZE, WEBHOOK_RESULTS_PAGE_SIZE
+    when only ?cursor= or ?page= is sent, and None (every row) when the client
+    sends no paging parameter at all, as before pagination existed
+    """
+    if not any(params.get(name) for name in PAGE_PARAMS):
+        return None
+    default = getattr(settings, 'WEBHOOK_RESULTS_PAGE_SIZE', 500)
+    try:
+        size = int(params.get('page_size', default))
+    except (TypeError, ValueError):
+        size = default
+    return min(max(size, 1), getattr(settings, 'WEBHOOK_RESULTS_MAX_PAGE_SIZE', 2000))
+
+
+def page_number(params) -> Optional[int]:
+    """1-based ?page= of offset paging, or None when the client pages by cursor"""
+    if params.get('cursor') or not params.get('page'):
+        return None
+    try:
+        return max(int(params['page']), 1)
+    except (TypeError, ValueError):
+        return 1
+
+
+def keyset_page(queryset, size: Optional[int], created_field: str = 'created_at', id_field: str = 'id',
+                offset: int = 0):
+    """
+    One page of a values() queryset (or a union of them) newest first, and the
+    cursor of the next page or None. Reads one row past the page instead of
+    counting; a size of None returns every row.
+    """
+    ordered = queryset.order_by(f'-{created_field}', f'-{id_field}')
+    if size is None:
+        return list(ordered), None
+    rows = list(ordered[offset:offset + size + 1])
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    return rows, encode_cursor(rows[-1][created_field], rows[-1][id_field])
+
+
+def paginate(queryset, params, created_field: str = 'created_at', id_field: str = 'id'):
+    """
+    Apply ?cursor= or ?page=, and ?page_size=, to a values() queryset; returns
+    (rows, next_cursor). Offset pages also return a cursor, so clients can switch.
+    """
+    cursor = params.get('cursor')
+    if cursor:
+        queryset = queryset.filter(before_cursor(cursor, created_field, id_field))
+    size, page = page_size(params), page_number(params)
+    offset = (page - 1) * size if page else 0
+    return keyset_page(queryset, size, created_field, id_field, offset=offset)
+
+
+class FieldProjection:
+    """
+    Output fields a values() endpoint can return, selected with ``?fields=a,b``.
+
+    ``fields`` maps each output name to a model field name or an expression;
+    names that differ from their source become annotations, so no model
+    instance is ever built.
+    """
+
+    def __init__(self, fields: Dict[str, object], default: Optional[Sequence[str]] = None):
+        self.fields = fields
+        self.default = list(default or fields)
+
+    def select(self, params) -> List[str]:
+        requested = params.get('fields')
+        if not requested:
+            return list(self.default)
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise InvalidPageRequest(f"Unknown fields {unknown}; available: {sorted(self.fields)}")
+        return names
+
+    def values(self, queryset, names: Sequence[str], keys: Sequence[str] = ('created_at', 'id')):
+        """values() queryset with the projected fields plus the pagination keys"""
+        plain, expressions = [], {}
+        for name in list(dict.fromkeys([*names, *keys])):
+            source = self.fields.get(name, name)
+            if source == name:
+                plain.append(name)
+            else:
+                expressions[name] = F(source) if isinstance(source, str) else source
+        return queryset.values(*plain, **expressions)
+
+    @staticmethod
+    def rows(rows, names: Sequence[str]) -> List[Dict]:
+        """Rows limited to the projected fields (drops pagination keys nobody asked for)"""
+        return [{name: row[name] for name in names} for row in rows]
@@ -0,0 +1,206 @@
+"""
+Post Deduplication
+Stable post fingerprints and a Bloom filter in front of the unique
+(scope, fingerprint) indexes, so ingest merges repeat deliveries instead of
+inserting them again
+"""
+
+import hashlib
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+PLATFORMS = ('instagram', 'facebook', 'linkedin', 'tiktok')
+
+# Query parameters that identify the post; everything else (utm_*, igsh, ...) is tracking
+IDENTIFYING_PARAMS = {'story_fbid', 'fbid', 'id', 'v'}
+HOST_PREFIXES = ('www.', 'm.', 'mobile.', 'web.')
+# Instagram serves the same post under /p/, /reel/ and /tv/
+INSTAGRAM_PATH = re.compile(r'^/(?:[^/]+/)?(?:p|reel|reels|tv)/([^/]+)')
+
+# Metrics only grow, so a merge keeps the larger of the stored and delivered value
+MERGE_METRICS = ('likes', 'num_comments', 'shares', 'views', 'follower_count')
+
+
+def canonical_platform(value) -> str:
+    """'facebook_posts', 'Instagram' -> 'facebook', 'instagram'"""
+    value = (value or '').lower()
+    return next((platform for platform in PLATFORMS if value.startswith(platform)), value)
+
+
+def canonical_url(url) -> str:
+    """Lowercased host without www./m., no scheme, tracking parameters or trailing slash"""
+    if not url:
+        return ''
+    parts = urlsplit(str(url).strip())
+    if not parts.netloc:
+        return ''
+    host = parts.netloc.lower()
+    for prefix in HOST_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    path = parts.path.rstrip('/')
+    match = INSTAGRAM_PATH.match(path) if host.startswith('instagram.') else None
+    if match:
+        path = f'/p/{match.group(1)}'
+    query = urlencode(sorted((key, value) for key, value in parse_qsl(parts.query) if key in IDENTIFYING_PARAMS))
+    return f'{host}{path}' + (f'?{query}' if query else '')
+
+
+def fingerprint(platform, post_id=None, url=None) -> Optional[str]:
+    """
+    Stable 32-character id of a post across providers: the platform post id,
+    or the canonical URL for rows that have none. None when there is neither.
+    """
+    post_id = str(post_id).strip() if post_id is not None else ''
+    url = canonical_url(url)
+    if post_id:
+        key = f'id:{post_id}'
+    elif url:
+        key = f'url:{url}'
+    else:
+        return None
+    return hashlib.blake2b(f'{canonical_platform(platform)}|{key}'.encode(), digest_size=16).hexdigest()
+
+
+def merge_metrics(instance, values: Dict[str, Any]) -> List[str]:
+    """
+    Fold a repeat delivery into a stored row: metrics keep the larger value,
+    empty fields are filled in. Returns the changed field names.
+    """
+    changed = []
+    for field, value in values.items():
+        if value in (None, '', [], {}) or not hasattr(instance, field):
+            continue
+        current = getattr(instance, field)
+        if field in MERGE_METRICS:
+            try:
+                value = max(int(current or 0), int(value))
+            except (TypeError, ValueError):
+                continue
+            if value == current:
+                continue
+        elif current not in (None, '', [], {}):
+            continue
+        setattr(instance, field, value)
+        changed.append(field)
+    return changed
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings: `in` is never wrong about absent
+    items and wrong about present ones at about `error_rate` once `capacity`
+    items have been added
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(int(capacity), 1)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        # Double hashing: k positions from two 64-bit halves
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self):
+        return self.count
+
+
+class PostDedupService:
+    """
+    One Bloom filter per (model, scope field), filled from the table on first
+    use, answers "definitely new" without a query; only possible repeats are
+    looked up, in one query per batch. The unique (scope, fingerprint) index
+    stays the source of truth: a filter that missed another process's insert
+    only costs a merge, never a duplicate row.
+    """
+
+    def __init__(self):
+        self._filters: Dict[Tuple[str, str], BloomFilter] = {}
+        self._lock = threading.Lock()
+        self.stats = Counter()
+
+    @property
+    def capacity(self) -> int:
+        return getattr(settings, 'POST_DEDUP_BLOOM_CAPACITY', 1000000)
+
+    @property
+    def error_rate(self) -> float:
+        return getattr(settings, 'POST_DEDUP_BLOOM_ERROR_RATE', 0.01)
+
+    def _filter(self, model, scope_field: str) -> BloomFilter:
+        key = (model._meta.label, scope_field)
+        bloom = self._filters.get(key)
+        if bloom is None:
+            with self._lock:
+                bloom = self._filters.get(key)
+                if bloom is None:
+                    bloom = BloomFilter(self.capacity, self.error_rate)
+                    rows = (model.objects.exclude(fingerprint__isnull=True).exclude(fingerprint='')
+                            .order_by().values_list(scope_field, 'fingerprint').iterator(chunk_size=5000))
+                    for scope, value in rows:
+                        bloom.add(f'{scope}|{value}')
+                    if len(bloom) > bloom.capacity:
+                        logger.warning(f"⚠️ {key[0]} has {len(bloom)} fingerprints, over the Bloom filter capacity "
+                                       f"of {bloom.capacity}; raise POST_DEDUP_BLOOM_CAPACITY")
+                    self._filters[key] = bloom
+        return bloom
+
+    def existing(self, model, scope_field: str, keys: Iterable[Tuple[Any, str]], queryset=None) -> Dict[Tuple[Any, str], Any]:
+        """Stored rows of the (scope, fingerprint) `keys` that may exist, in one query"""
+        bloom = self._filter(model, scope_field)
+        maybe = set()
+        for scope, value in keys:
+            self.stats['checked'] += 1
+            if f'{scope}|{value}' in bloom:
+                maybe.add((scope, value))
+            else:
+                self.stats['bloom_new'] += 1
+        if not maybe:
+            return {}
+        self.stats['lookups'] += 1
+        queryset = model.objects.all() if queryset is None else queryset
+        rows = {(getattr(row, scope_field), row.fingerprint): row for row in queryset.filter(
+            **{f'{scope_field}__in': {scope for scope, _ in maybe}},
+            fingerprint__in={value for _, value in maybe},
+        )}
+        found = {key: row for key, row in rows.items() if key in maybe}
+        self.stats['false_positives'] += len(maybe) - len(found)
+        return found
+
+    def remember(self, model, scope_field: str, keys: Iterable[Tuple[Any, str]]) -> None:
+        bloom = self._filter(model, scope_field)
+        for scope, value in keys:
+            bloom.add(f'{scope}|{value}')
+
+    def reset(self) -> None:
+        """Forget the filters (they are refilled from the tables on next use) and the counters"""
+        with self._lock:
+            self._filters.clear()
+        self.stats.clear()
+
+
+post_dedup_service = PostDedupService()
@@ -0,0 +1,62 @@
+"""
+Query Plans
+Registry of hot queries and an EXPLAIN-based check for full table scans and sorts
+"""
+
+import re
+from typing import Callable, Dict, List
+
+from django.db import connection
+
+
+class HotQuery:
+    """A named query worth keeping on an index; `build` returns the queryset to explain"""
+
+    def __init__(self, name: str, build: Callable, description: str = ''):
+        self.name = name
+        self.build = build
+        self.description = description
+
+
+_registry: Dict[str, HotQuery] = {}
+
+
+def hot_query(name: str, description: str = ''):
+    """Register a function returning a representative queryset under `name`"""
+    def register(build):
+        _registry[name] = HotQuery(name, build, description or (build.__doc__ or '').strip())
+        return build
+    return register
+
+
+def registered() -> List[HotQuery]:
+    return list(_registry.values())
+
+
+# A line of EXPLAIN output reading a whole table, per vendor. SQLite's
+# "SCAN t USING INDEX i" walks every index entry, so it counts too; virtual
+# (FTS5) tables report their own access path and are skipped.
+_FULL_SCAN = {
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+    'sqlite': re.compile(r'\bSCAN (?!CONSTANT ROW)(\w+)\b(?! VIRTUAL TABLE)'),
+}
+_SORT = {
+    'postgresql': re.compile(r'^\s*(->\s*)?(Incremental )?Sort\b'),
+    'sqlite': re.compile(r'USE TEMP B-TREE FOR (ORDER BY|RIGHT PART OF ORDER BY)'),
+}
+
+
+def explain(queryset) -> Dict:
+    """
+    The plan of a queryset and what it costs: tables read in full
+    (`full_scans`) and whether rows are sorted after being read (`sorts`)
+    """
+    plan = queryset.explain().splitlines()
+    vendor = connection.vendor
+    full_scan, sort = _FULL_SCAN.get(vendor), _SORT.get(vendor)
+    full_scans = sorted({match.group(1) for line in plan for match in [full_scan and full_scan.search(line)] if match})
+    return {
+        'plan': plan,
+        'full_scans': full_scans,
+        'sorts': bool(sort and any(sort.search(line) for line in plan)),
+    }
@@ -0,0 +1,267 @@
+"""
+Request Profiling
+Per-request SQL query count, DB time and Python time with per-view query budgets
+
+Profiling is on for every request when REQUEST_PROFILING_ENABLED is set, and
+for single requests sent with an ``X-Profile-Request: 1`` header when
+REQUEST_PROFILING_ALLOW_HEADER is set. Profiles go to an in-memory ring buffer
+(REQUEST_PROFILING_BUFFER_SIZE entries per process) served to superadmins at
+/api/admin/profiling/.
+
+Views declare how many queries they may run with ``@query_budget(n)``; a
+request over budget is logged and flagged in its profile, and tests use
+QueryBudgetTestMixin.assertWithinQueryBudget to fail on N+1 regressions.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import ExitStack
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_PROFILE_REQUEST'
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql: str) -> str:
+    """Normalise a statement so the same query with different parameters groups together"""
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST.sub('IN (...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def query_budget(budget):
+    """
+    Declare the maximum number of SQL queries a view may run.
+
+    Works on function views (apply it above @api_view/@csrf_exempt), on
+    APIView/ViewSet classes, and on individual viewset actions. A class can
+    also set ``query_budget = {'list': 3, 'retrieve': 2}`` per action.
+    """
+    def decorate(view):
+        view.query_budget = budget
+        return view
+    return decorate
+
+
+def resolve_query_budget(callback, method: str = 'GET') -> Optional[int]:
+    """Budget declared for a resolved URL callback, or None"""
+    budget = getattr(callback, 'query_budget', None)
+    if budget is not None:
+        return budget
+
+    view_class = getattr(callback, 'cls', None) or getattr(callback, 'view_class', None)
+    if view_class is None:
+        return None
+
+    # Viewsets map HTTP methods to actions; a budget on the action method wins
+    actions = getattr(callback, 'actions', None) or {}
+    action = actions.get(method.lower())
+    if action:
+        budget = getattr(getattr(view_class, action, None), 'query_budget', None)
+        if budget is not None:
+            return budget
+
+    budget = getattr(view_class, 'query_budget', None)
+    if isinstance(budget, dict):
+        return budget.get(action or method.lower())
+    return budget
+
+
+def view_name(request, callback=None) -> str:
+    match = getattr(request, 'resolver_match', None)
+    if match is not None and match.view_name:
+        return match.view_name
+    if callback is not None:
+        return f'{callback.__module__}.{getattr(callback, "__qualname__", callback.__class__.__name__)}'
+    return request.path
+
+
+class QueryRecorder:
+    """Database execute wrapper counting queries, time and statement fingerprints"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.fingerprint_time = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            key = fingerprint(sql)
+            self.count += 1
+            self.duration += elapsed
+            self.fingerprints[key] += 1
+            self.fingerprint_time[key] += elapsed
+
+    def top_repeated(self, limit: int) -> List[Dict]:
+        """Statements executed more than once, most repeated first (the N+1 suspects)"""
+        return [
+            {'sql': sql, 'count': count, 'time_ms': round(self.fingerprint_time[sql] * 1000, 2)}
+            for sql, count in self.fingerprints.most_common(limit) if count > 1
+        ]
+
+
+class ProfileBuffer:
+    """Thread-safe ring buffer of recent request profiles for this process"""
+
+    def __init__(self, size: Optional[int] = None):
+        self._size = size
+        self._entries = None
+        self._lock = threading.Lock()
+
+    @property
+    def entries(self) -> deque:
+        if self._entries is None:
+            self._entries = deque(maxlen=self._size or getattr(settings, 'REQUEST_PROFILING_BUFFER_SIZE', 500))
+        return self._entries
+
+    def record(self, entry: Dict):
+        with self._lock:
+            self.entries.append(entry)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def snapshot(self, view: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Most recent profiles first, optionally for one view"""
+        with self._lock:
+            entries = list(self.entries)
+        entries.reverse()
+        if view:
+            entries = [entry for entry in entries if entry['view'] == view]
+        return entries[:limit] if limit else entries
+
+    def summary(self) -> List[Dict]:
+        """Per-view aggregates over the buffer, heaviest query users first"""
+        views = {}
+        for entry in self.snapshot():
+            views.setdefault(entry['view'], []).append(entry)
+
+        summary = []
+        for name, entries in views.items():
+            queries = sorted(entry['queries'] for entry in entries)
+            total_ms = sorted(entry['total_ms'] for entry in entries)
+            summary.append({
+                'view': name,
+                'requests': len(entries),
+                'queries_p50': queries[len(queries) // 2],
+                'queries_max': queries[-1],
+                'total_ms_p50': total_ms[len(total_ms) // 2],
+                'total_ms_max': total_ms[-1],
+                'db_ms_avg': round(sum(entry['db_ms'] for entry in entries) / len(entries), 2),
+                'query_budget': entries[0]['query_budget'],
+                'over_budget': sum(1 for entry in entries if entry['over_budget']),
+            })
+        summary.sort(key=lambda row: row['queries_max'], reverse=True)
+        return summary
+
+
+class RequestProfilingMiddleware:
+    """
+    Records query count, DB time, Python time and repeated SQL per request.
+
+    Every query run while the request is handled counts towards its view,
+    including lazy session and user lookups triggered by the view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def _should_profile(self, request) -> bool:
+        if getattr(settings, 'REQUEST_PROFILING_ENABLED', False):
+            return True
+        return (getattr(settings, 'REQUEST_PROFILING_ALLOW_HEADER', False)
+                and request.META.get(PROFILE_HEADER) == '1')
+
+    def process_view(self, request, callback, callback_args, callback_kwargs):
+        request._profiling_callback = callback
+
+    def __call__(self, request):
+        if not self._should_profile(request):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        callback = getattr(request, '_profiling_callback', None)
+        budget = resolve_query_budget(callback, request.method) if callback else None
+        profile = {
+            'view': view_name(request, callback),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'timestamp': time.time(),
+            'queries': recorder.count,
+            'db_ms': round(recorder.duration * 1000, 2),
+            'python_ms': round((total - recorder.duration) * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'query_budget': budget,
+            'over_budget': budget is not None and recorder.count > budget,
+            'repeated_sql': recorder.top_repeated(getattr(settings, 'REQUEST_PROFILING_TOP_SQL', 5)),
+        }
+        profile_buffer.record(profile)
+
+        if profile['over_budget']:
+            logger.warning(f"📈 {profile['view']} ran {recorder.count} queries (budget {budget}) "
+                           f"for {request.method} {request.path}")
+
+        response.query_profile = profile
+        response['X-Query-Count'] = str(recorder.count)
+        response['X-DB-Time-Ms'] = str(profile['db_ms'])
+        response['X-Python-Time-Ms'] = str(profile['python_ms'])
+        return response
+
+
+class QueryBudgetTestMixin:
+    """
+    TestCase mixin asserting a view stays within its declared query budget::
+
+        class FolderApiTest(QueryBudgetTestMixin, APITestCase):
+            def test_contents_budget(self):
+                self.assertWithinQueryBudget('get', '/api/instagram-data/folders/1/contents/')
+    """
+
+    def assertWithinQueryBudget(self, method: str, path: str, budget: Optional[int] = None, **kwargs):
+        from django.test import override_settings
+
+        kwargs[PROFILE_HEADER] = '1'
+        with override_settings(REQUEST_PROFILING_ALLOW_HEADER=True):
+            response = getattr(self.client, method.lower())(path, **kwargs)
+
+        profile = getattr(response, 'query_profile', None)
+        self.assertIsNotNone(profile, 'RequestProfilingMiddleware is not installed')
+        budget = profile['query_budget'] if budget is None else budget
+        self.assertIsNotNone(budget, f"{profile['view']} declares no query budget")
+        self.assertLessEqual(
+            profile['queries'], budget,
+            f"{profile['view']} ran {profile['queries']} queries, budget is {budget}. "
+            f"Repeated statements: {profile['repeated_sql']}"
+        )
+        return response
+
+
+profile_buffer = ProfileBuffer()
@@ -0,0 +1,126 @@
+"""
+Structured Logging
+JSON log formatter, sampled per-item logging and per-batch summaries for ingestion
+"""
+
+import itertools
+import json
+import logging
+import threading
+import time
+from typing import Dict, Optional
+
+from django.conf import settings
+
+# Attributes every LogRecord has; anything else was passed through `extra=`
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    One JSON object per line: timestamp, level, logger, message, any fields
+    passed with ``extra=`` and the formatted exception, if any.
+
+    Enable with LOG_FORMAT=json.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': self.formatTime(record, '%Y-%m-%dT%H:%M:%S') + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+    def formatTime(self, record, datefmt=None):
+        return time.strftime(datefmt or '%Y-%m-%dT%H:%M:%S', time.gmtime(record.created))
+
+
+class LogSampler:
+    """
+    Emits one in every N per-item debug records (N = 1 / INGEST_LOG_SAMPLE_RATE).
+
+    Arguments are formatted lazily by logging, and nothing at all is done
+    when the logger is not enabled for DEBUG, so unsampled items cost one
+    counter increment.
+    """
+
+    def __init__(self, logger: logging.Logger, rate: Optional[float] = None):
+        self.logger = logger
+        self._rate = rate
+        self._counter = itertools.count()
+
+    @property
+    def rate(self) -> float:
+        return self._rate if self._rate is not None else getattr(settings, 'INGEST_LOG_SAMPLE_RATE', 0.01)
+
+    def sampled(self) -> bool:
+        rate = self.rate
+        if rate <= 0:
+            return False
+        if rate >= 1:
+            return True
+        return next(self._counter) % round(1 / rate) == 0
+
+    def should_log(self) -> bool:
+        """True when this item's debug record would be emitted; use to guard costly diagnostics"""
+        return self.logger.isEnabledFor(logging.DEBUG) and self.sampled()
+
+    def debug(self, msg: str, *args, **kwargs):
+        if self.should_log():
+            self.logger.debug(msg, *args, **kwargs)
+
+
+class BatchLog:
+    """
+    Accumulates counts for one ingestion batch and logs a single summary
+    record when the batch ends, instead of several lines per item::
+
+        with BatchLog(logger, 'brightdata_ingest', platform='instagram') as batch:
+            for item in items:
+                batch.count('created' if created else 'existing')
+    """
+
+    def __init__(self, logger: logging.Logger, event: str, **fields):
+        self.logger = logger
+        self.event = event
+        self.fields = fields
+        self.counts: Dict[str, int] = {}
+        self.items = 0
+        self._lock = threading.Lock()
+        self._start = None
+
+    def count(self, outcome: str, amount: int = 1):
+        with self._lock:
+            self.counts[outcome] = self.counts.get(outcome, 0) + amount
+            self.items += amount
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self._start
+        rate = self.items / elapsed if elapsed else 0
+        outcomes = ', '.join(f'{count} {outcome}' for outcome, count in sorted(self.counts.items())) or 'nothing'
+        level = logging.ERROR if exc_type else logging.INFO
+        self.logger.log(
+            level, '📦 %s: %s items (%s) in %.3fs, %.0f items/s%s',
+            self.event, self.items, outcomes, elapsed, rate, ' - failed' if exc_type else '',
+            extra={
+                'event': self.event,
+                'items': self.items,
+                'counts': dict(self.counts),
+                'duration_ms': round(elapsed * 1000, 1),
+                'items_per_second': round(rate, 1),
+                **self.fields,
+            },
+            exc_info=(exc_type, exc, tb) if exc_type else None,
+        )
+        return False
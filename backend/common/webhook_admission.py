@@ -0,0 +1,206 @@
+"""
+Webhook Admission
+Rate limiting, backpressure and concurrency caps for provider webhook endpoints
+"""
+
+import functools
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default, cast=float):
+    return cast(getattr(settings, name, default))
+
+
+def _cache():
+    # Deployment settings that replace CACHES may not define the webhook cache
+    alias = 'webhook_cache' if 'webhook_cache' in settings.CACHES else 'default'
+    return caches[alias]
+
+
+class FixedWindowLimiter:
+    """
+    Fixed-window rate limit of `rate_per_minute`, shared by every worker
+    process through the webhook cache.
+
+    Time is cut into windows of capacity / rate seconds that admit `capacity`
+    deliveries each, counted with cache.add() and cache.incr(). Those are
+    atomic in the cache backends we deploy, where reading a counter and
+    writing it back is not, so concurrent workers cannot over-admit within a
+    window. Counters reset at window boundaries, so up to 2 * capacity
+    deliveries can pass in the span around one boundary.
+    """
+
+    def __init__(self, key: str, rate_per_minute: float, capacity: float):
+        self.key = key
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, capacity)
+
+    @property
+    def window(self) -> float:
+        return self.capacity / self.rate if self.rate > 0 else 60.0
+
+    def take(self, now: Optional[float] = None) -> float:
+        """Count one delivery. Returns 0 when admitted, otherwise seconds until the next window"""
+        now = time.time() if now is None else now
+        cache = _cache()
+        window = self.window
+        index = int(now // window)
+        key = f'{self.key}:{index}'
+
+        cache.add(key, 0, timeout=math.ceil(window) + 1)
+        try:
+            used = cache.incr(key)
+        except ValueError:
+            # The window's counter expired between add() and incr()
+            cache.add(key, 1, timeout=math.ceil(window) + 1)
+            used = 1
+
+        if used <= self.capacity:
+            return 0.0
+        return (index + 1) * window - now
+
+
+class WebhookAdmission:
+    """
+    Admission checks for one webhook source, in order:
+
+    1. fixed-window rate limit shared across processes (WEBHOOK_RATE_LIMIT per minute,
+       WEBHOOK_RATE_BURST per window)
+    2. backpressure: the source's ingestion backlog must stay under WEBHOOK_MAX_EVENTS
+    3. a per-process cap on in-flight deliveries (WEBHOOK_SOURCE_CONCURRENCY)
+
+    Rejected deliveries get a 429 with Retry-After so providers back off and
+    redeliver instead of piling more work onto a saturated API tier.
+    """
+
+    def __init__(self, source: str, queue_depth: Optional[Callable[[], int]] = None):
+        self.source = source
+        self.queue_depth = queue_depth
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def limiter(self) -> FixedWindowLimiter:
+        return FixedWindowLimiter(
+            f'webhook_admission:{self.source}:window',
+            rate_per_minute=_setting('WEBHOOK_RATE_LIMIT', 100),
+            capacity=_setting('WEBHOOK_RATE_BURST', 20),
+        )
+
+    @property
+    def max_concurrency(self) -> int:
+        caps = getattr(settings, 'WEBHOOK_SOURCE_CONCURRENCY', {})
+        return int(caps.get(self.source, 4))
+
+    def current_queue_depth(self) -> int:
+        """Backlog size, cached briefly so admission doesn't hit the database per request"""
+        if self.queue_depth is None:
+            return 0
+        key = f'webhook_admission:{self.source}:depth'
+        try:
+            depth = _cache().get(key)
+        except Exception as e:
+            logger.warning(f"⚠️ Webhook cache unavailable, reading {self.source} backlog directly: {e}")
+            return self.queue_depth()
+        if depth is None:
+            depth = self.queue_depth()
+            try:
+                _cache().set(key, depth, timeout=_setting('WEBHOOK_QUEUE_DEPTH_CACHE_SECONDS', 2, int))
+            except Exception as e:
+                logger.warning(f"⚠️ Webhook cache unavailable, could not store {self.source} backlog: {e}")
+        return depth
+
+    def _reject(self, reason: str, retry_after: float, **details) -> JsonResponse:
+        retry_after = max(1, math.ceil(retry_after))
+        logger.warning(f"🚦 {self.source} webhook rejected ({reason}), retry in {retry_after}s"
+                       + (f" {details}" if details else ''))
+        response = JsonResponse({'error': 'Too many requests', 'reason': reason,
+                                 'retry_after': retry_after, **details}, status=429)
+        response['Retry-After'] = str(retry_after)
+        return response
+
+    def check(self) -> Optional[JsonResponse]:
+        """Rate limit and backpressure checks; returns a 429 response or None"""
+        try:
+            wait = self.limiter.take()
+        except Exception as e:
+            # Fail open: a broken cache must not turn every delivery into an error
+            logger.warning(f"⚠️ Webhook cache unavailable, admitting {self.source} delivery unlimited: {e}")
+            wait = 0
+        if wait:
+            return self._reject('rate_limited', wait)
+
+        depth = self.current_queue_depth()
+        max_events = _setting('WEBHOOK_MAX_EVENTS', 1000, int)
+        if depth >= max_events:
+            return self._reject('backlog', _setting('WEBHOOK_BACKPRESSURE_RETRY_AFTER', 30),
+                                queue_depth=depth)
+        return None
+
+    def acquire(self) -> bool:
+        with self._lock:
+            if self._in_flight >= self.max_concurrency:
+                return False
+            self._in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def __call__(self, view):
+        @functools.wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if not getattr(settings, 'WEBHOOK_ADMISSION_ENABLED', True):
+                return view(request, *args, **kwargs)
+
+            rejected = self.check()
+            if rejected is not None:
+                return rejected
+            if not self.acquire():
+                return self._reject('concurrency', 1, in_flight=self.in_flight)
+
+            start = time.time()
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                self.release()
+                elapsed = time.time() - start
+                if elapsed > _setting('WEBHOOK_RESPONSE_TIME_THRESHOLD', 5.0):
+                    logger.warning(f"🐢 {self.source} webhook took {elapsed:.2f}s")
+
+        return wrapped
+
+
+_admissions: Dict[str, WebhookAdmission] = {}
+
+
+def webhook_admission(source: str, queue_depth: Optional[Callable[[], int]] = None):
+    """
+    Decorator applying the shared admission layer for `source` to a webhook view.
+    Views registered under the same source share one rate limit and concurrency cap.
+    """
+    admission = _admissions.get(source)
+    if admission is None:
+        admission = _admissions[source] = WebhookAdmission(source, queue_depth)
+    elif queue_depth is not None:
+        admission.queue_depth = queue_depth
+    return admission
+
+
+def get_webhook_admission(source: str) -> Optional[WebhookAdmission]:
+    return _admissions.get(source)
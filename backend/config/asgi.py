@@ -2,6 +2,11 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Views are synchronous, so the Django WSGI application is served through
+fixed per-pool thread pools (see config.serving) rather than Django's
+thread-per-request ASGI handler. Run with:
+
+    GUNICORN_WORKER_CLASS=uvicorn gunicorn -c gunicorn.conf.py
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -9,8 +14,10 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
-from django.core.asgi import get_asgi_application
+from django.core.wsgi import get_wsgi_application
+
+from config.serving import PooledASGIApplication
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
-application = get_asgi_application()
+application = PooledASGIApplication(get_wsgi_application())
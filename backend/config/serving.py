@@ -0,0 +1,256 @@
+"""
+Serving Pools
+Routes requests to separate webhook, report, streaming and interactive API
+thread pools
+
+Shared by gunicorn.conf.py, the WSGI entry point (config.wsgi) and the ASGI
+entry point (config.asgi). Nothing here imports Django, so gunicorn can size
+itself from it before the application is loaded.
+
+SERVING_POOLS (comma-separated, default all) limits a process to some pools,
+for deployments that run a dedicated gunicorn per pool behind a path router.
+
+Pool sizes (threads per worker process):
+    SERVING_API_THREADS      interactive API                     (default 8)
+    SERVING_WEBHOOK_THREADS  provider webhooks / notify callbacks (default 4)
+    SERVING_REPORT_THREADS   report generation                    (default 2)
+    SERVING_STREAM_THREADS   server-sent event streams (chat)     (default 4)
+
+A stream holds its slot until the response closes, so long-lived streams get
+their own pool rather than using up the interactive API's slots.
+
+SERVING_POOL_QUEUE_DEPTH (default 0) lets that many requests per pool wait up to
+SERVING_POOL_QUEUE_TIMEOUT seconds for a slot; gunicorn adds a thread for each,
+so waiters never hold threads another pool needs.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+API_POOL = 'api'
+WEBHOOK_POOL = 'webhooks'
+REPORT_POOL = 'reports'
+STREAM_POOL = 'streams'
+
+# Path prefixes per dedicated pool; everything else is interactive API traffic
+POOL_ROUTES = (
+    (WEBHOOK_POOL, (
+        '/api/brightdata/webhook/',
+        '/api/brightdata/notify/',
+        '/api/apify/webhook/',
+        '/api/apify/notify/',
+    )),
+    (REPORT_POOL, (
+        '/api/reports/',
+    )),
+)
+
+# (prefix, suffix) of long-lived streaming endpoints, whose ids sit mid-path
+STREAM_ROUTES = (
+    ('/api/chat/', '/stream_message/'),
+)
+
+DEFAULT_POOL_THREADS = {
+    API_POOL: 8,
+    WEBHOOK_POOL: 4,
+    REPORT_POOL: 2,
+    STREAM_POOL: 4,
+}
+
+POOL_THREAD_ENV = {
+    API_POOL: 'SERVING_API_THREADS',
+    WEBHOOK_POOL: 'SERVING_WEBHOOK_THREADS',
+    REPORT_POOL: 'SERVING_REPORT_THREADS',
+    STREAM_POOL: 'SERVING_STREAM_THREADS',
+}
+
+
+def pool_for_path(path: str) -> str:
+    if any(path.startswith(prefix) and path.endswith(suffix) for prefix, suffix in STREAM_ROUTES):
+        return STREAM_POOL
+    for pool, prefixes in POOL_ROUTES:
+        if path.startswith(prefixes):
+            return pool
+    return API_POOL
+
+
+def pool_threads(pool: str) -> int:
+    return max(1, int(os.getenv(POOL_THREAD_ENV[pool], DEFAULT_POOL_THREADS[pool])))
+
+
+def served_pools():
+    pools = [pool.strip() for pool in os.getenv('SERVING_POOLS', '').split(',') if pool.strip()]
+    unknown = set(pools) - set(DEFAULT_POOL_THREADS)
+    if unknown:
+        raise ValueError(f"Unknown serving pools: {sorted(unknown)}")
+    return pools or list(DEFAULT_POOL_THREADS)
+
+
+def pool_sizes(pools=None) -> Dict[str, int]:
+    """Threads per pool for the pools served by this process"""
+    pools = pools or served_pools()
+    return {pool: pool_threads(pool) for pool in pools}
+
+
+def pool_queue_depth() -> int:
+    """Requests per pool allowed to wait for a slot instead of being shed at once"""
+    return max(0, int(os.getenv('SERVING_POOL_QUEUE_DEPTH', 0)))
+
+
+def worker_threads(sizes: Dict[str, int]) -> int:
+    """gthread threads per worker: every pool slot plus the waiters each pool may queue"""
+    return sum(sizes.values()) + pool_queue_depth() * len(sizes)
+
+
+def _retry_after() -> str:
+    return os.getenv('SERVING_POOL_RETRY_AFTER', '5')
+
+
+class PoolLimiter:
+    """
+    WSGI bulkhead for threaded (gthread) workers.
+
+    A gthread worker shares one set of threads between every request, so a
+    burst of webhook deliveries or a few slow reports can occupy all of them
+    and stall the interactive API. Each pool gets its own semaphore sized from
+    `pool_sizes()`. A request that finds its pool full is answered 503 +
+    Retry-After at once, unless fewer than `queue_depth` requests of that pool
+    are already waiting; then it waits up to SERVING_POOL_QUEUE_TIMEOUT seconds.
+    Waiting blocks a worker thread, so waiters are bounded by the headroom
+    `worker_threads()` adds, never by the other pools' threads.
+    """
+
+    def __init__(self, application, sizes: Optional[Dict[str, int]] = None, queue_timeout: Optional[float] = None,
+                 queue_depth: Optional[int] = None):
+        self.application = application
+        self.sizes = sizes or pool_sizes()
+        self.queue_timeout = float(
+            os.getenv('SERVING_POOL_QUEUE_TIMEOUT', 10) if queue_timeout is None else queue_timeout
+        )
+        self.queue_depth = pool_queue_depth() if queue_depth is None else queue_depth
+        self._slots = {pool: threading.BoundedSemaphore(size) for pool, size in self.sizes.items()}
+        self._waiting = dict.fromkeys(self.sizes, 0)
+        self._waiting_lock = threading.Lock()
+
+    def _acquire(self, pool, slots) -> bool:
+        if slots.acquire(blocking=False):
+            return True
+        with self._waiting_lock:
+            if self._waiting[pool] >= self.queue_depth:
+                return False
+            self._waiting[pool] += 1
+        try:
+            return slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._waiting_lock:
+                self._waiting[pool] -= 1
+
+    def __call__(self, environ, start_response):
+        pool = pool_for_path(environ.get('PATH_INFO', ''))
+        # A dedicated deployment only receives its own pool's paths, but stray
+        # requests still need a slot
+        if pool not in self._slots:
+            pool = next(iter(self._slots))
+        slots = self._slots[pool]
+
+        if not self._acquire(pool, slots):
+            logger.warning(f"🚧 {pool} pool saturated, shedding {environ.get('PATH_INFO')}")
+            start_response('503 Service Unavailable', [
+                ('Content-Type', 'application/json'),
+                ('Retry-After', _retry_after()),
+            ])
+            return [b'{"error": "Server busy", "pool": "' + pool.encode() + b'"}']
+
+        try:
+            result = self.application(environ, start_response)
+        except BaseException:
+            slots.release()
+            raise
+        return _ReleasingIterable(result, slots.release)
+
+
+class _ReleasingIterable:
+    """Holds the pool slot until the server has finished sending a (possibly streamed) response"""
+
+    def __init__(self, iterable, release):
+        self._iterable = iterable
+        self._release = release
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def close(self):
+        try:
+            close = getattr(self._iterable, 'close', None)
+            if close is not None:
+                close()
+        finally:
+            self._release()
+
+
+class PooledASGIApplication:
+    """
+    ASGI front end that runs the (synchronous) Django WSGI application on a
+    fixed thread pool per serving pool.
+
+    Django's own ASGI handler runs sync views on a fresh thread per request,
+    which gives no isolation between traffic classes and opens a new database
+    connection for every request. Here each pool is a long-lived executor, so
+    threads keep their persistent connections (CONN_MAX_AGE) and a flood on
+    one pool queues behind its own executor instead of starving the others.
+    """
+
+    def __init__(self, wsgi_application, sizes: Optional[Dict[str, int]] = None):
+        # Imported here so gunicorn.conf.py can import this module without asgiref
+        from asgiref.sync import SyncToAsync
+        from asgiref.wsgi import WsgiToAsgiInstance
+
+        self.wsgi_application = wsgi_application
+        self.sizes = sizes or pool_sizes()
+        self.executors = {
+            pool: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f'serving-{pool}')
+            for pool, size in self.sizes.items()
+        }
+
+        # asgiref runs every WSGI call on one shared thread; give each pool an
+        # instance class that runs it on the pool's executor instead
+        run_wsgi_app = WsgiToAsgiInstance.__dict__['run_wsgi_app'].func
+        self.instance_classes = {
+            pool: type(f'{pool.title()}WsgiInstance', (WsgiToAsgiInstance,), {
+                'run_wsgi_app': SyncToAsync(run_wsgi_app, thread_sensitive=False, executor=executor),
+            })
+            for pool, executor in self.executors.items()
+        }
+
+    def instance_class_for(self, path: str):
+        pool = pool_for_path(path)
+        return self.instance_classes.get(pool) or next(iter(self.instance_classes.values()))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(f"Unsupported ASGI scope type: {scope['type']}")
+
+        instance_class = self.instance_class_for(scope.get('path', ''))
+        await instance_class(self.wsgi_application)(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                logger.info(f"🧵 Serving pools ready: {self.sizes}")
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                loop = asyncio.get_running_loop()
+                for executor in self.executors.values():
+                    await loop.run_in_executor(None, executor.shutdown)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
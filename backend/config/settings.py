@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+import tempfile
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -20,6 +22,8 @@ load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+RUNNING_TESTS = len(sys.argv) > 1 and sys.argv[1] == 'test'
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.2/howto/deployment/checklist/
@@ -75,6 +79,7 @@ MIDDLEWARE = [
     # "django.middleware.csrf.CsrfViewMiddleware",  # NEVER ENABLE - COMPLETELY DISABLED
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
+    "common.request_profiling.RequestProfilingMiddleware",  # Query count / latency profiles, off unless enabled
     # "django.middleware.clickjacking.XFrameOptionsMiddleware",  # Disable X-Frame protection
 ]
 
@@ -227,12 +232,21 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL', EMAIL_HOST_USER)
 
 # Completely disable custom logging to prevent file handler errors
 # Use Django defaults only for deployment compatibility
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')  # 'json' for one JSON object per line (log aggregators)
+LOG_FORMATTERS = {
+    'text': {'format': '%(message)s'},
+    'json': {'()': 'common.structured_logging.JSONFormatter'},
+}
+INGEST_LOG_SAMPLE_RATE = float(os.getenv('INGEST_LOG_SAMPLE_RATE', 0.01))  # Share of ingested items given a debug record
+
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
+    'formatters': LOG_FORMATTERS,
     'handlers': {
         'console': {
             'class': 'logging.StreamHandler',
+            'formatter': LOG_FORMAT,
         },
     },
     'root': {
@@ -462,6 +476,14 @@ if os.getenv('PLATFORM_APPLICATION_NAME'):
 
 # Apify Integration Settings
 APIFY_API_TOKEN = os.getenv('APIFY_API_TOKEN', '')
+APIFY_DATASET_PAGE_SIZE = int(os.getenv('APIFY_DATASET_PAGE_SIZE', 1000))  # items per dataset page when ingesting results
+APIFY_WEBHOOK_ASYNC = os.getenv('APIFY_WEBHOOK_ASYNC', 'True').lower() == 'true'  # process webhook events off the request thread
+APIFY_WEBHOOK_WORKERS = int(os.getenv('APIFY_WEBHOOK_WORKERS', 2))
+APIFY_WEBHOOK_HEARTBEAT_SECONDS = int(os.getenv('APIFY_WEBHOOK_HEARTBEAT_SECONDS', 30))  # must stay well under the recovery cutoff
+APIFY_WEBHOOK_MAX_ATTEMPTS = int(os.getenv('APIFY_WEBHOOK_MAX_ATTEMPTS', 3))  # failed events go back to pending until this many tries
+FOLDER_ROUTE_CACHE_SIZE = int(os.getenv('FOLDER_ROUTE_CACHE_SIZE', 2048))  # provider run -> result folder routes kept in memory
+APIFY_BATCH_STATUS_DEBOUNCE = float(os.getenv('APIFY_BATCH_STATUS_DEBOUNCE', 2.0))  # seconds to coalesce batch job status updates
+COMMENT_INGEST_CHUNK_SIZE = int(os.getenv('COMMENT_INGEST_CHUNK_SIZE', 1000))  # comments per bulk upsert statement
 
 # Production/Upsun settings.
 if (os.getenv('PLATFORM_APPLICATION_NAME') is not None):
@@ -501,39 +523,113 @@ if (os.getenv('PLATFORM_APPLICATION_NAME') is not None):
         }
 
 # Add webhook configuration
-WEBHOOK_RATE_LIMIT = os.environ.get('WEBHOOK_RATE_LIMIT', 100)  # requests per minute
-WEBHOOK_MAX_TIMESTAMP_AGE = os.environ.get('WEBHOOK_MAX_TIMESTAMP_AGE', 300)  # 5 minutes
-WEBHOOK_MAX_EVENTS = os.environ.get('WEBHOOK_MAX_EVENTS', 1000)
-WEBHOOK_METRICS_RETENTION = os.environ.get('WEBHOOK_METRICS_RETENTION', 3600)  # 1 hour
-WEBHOOK_ERROR_THRESHOLD = os.environ.get('WEBHOOK_ERROR_THRESHOLD', 0.1)  # 10%
-WEBHOOK_RESPONSE_TIME_THRESHOLD = os.environ.get('WEBHOOK_RESPONSE_TIME_THRESHOLD', 5.0)  # 5 seconds
+WEBHOOK_RATE_LIMIT = int(os.environ.get('WEBHOOK_RATE_LIMIT', 100))  # requests per minute
+WEBHOOK_MAX_TIMESTAMP_AGE = int(os.environ.get('WEBHOOK_MAX_TIMESTAMP_AGE', 300))  # 5 minutes
+WEBHOOK_MAX_EVENTS = int(os.environ.get('WEBHOOK_MAX_EVENTS', 1000))  # ingestion backlog before webhooks get 429
+WEBHOOK_METRICS_RETENTION = int(os.environ.get('WEBHOOK_METRICS_RETENTION', 3600))  # 1 hour
+WEBHOOK_ERROR_THRESHOLD = float(os.environ.get('WEBHOOK_ERROR_THRESHOLD', 0.1))  # 10%
+WEBHOOK_RESPONSE_TIME_THRESHOLD = float(os.environ.get('WEBHOOK_RESPONSE_TIME_THRESHOLD', 5.0))  # 5 seconds
+WEBHOOK_ADMISSION_ENABLED = os.environ.get('WEBHOOK_ADMISSION_ENABLED', 'True').lower() == 'true'
+WEBHOOK_RATE_BURST = int(os.environ.get('WEBHOOK_RATE_BURST', 20))  # deliveries per fixed window of BURST / RATE_LIMIT minutes; up to 2x can pass across a window boundary
+WEBHOOK_BACKPRESSURE_RETRY_AFTER = int(os.environ.get('WEBHOOK_BACKPRESSURE_RETRY_AFTER', 30))  # seconds
+WEBHOOK_QUEUE_DEPTH_CACHE_SECONDS = int(os.environ.get('WEBHOOK_QUEUE_DEPTH_CACHE_SECONDS', 2))
+# In-flight webhook deliveries allowed per worker process, by provider
+WEBHOOK_SOURCE_CONCURRENCY = {
+    'brightdata': int(os.environ.get('WEBHOOK_BRIGHTDATA_CONCURRENCY', 4)),
+    'apify': int(os.environ.get('WEBHOOK_APIFY_CONCURRENCY', 8)),
+}
 WEBHOOK_ENABLE_CERT_PINNING = os.environ.get('WEBHOOK_ENABLE_CERT_PINNING', 'False').lower() == 'true'
 
 # Webhook IP whitelist (comma-separated)
 WEBHOOK_ALLOWED_IPS = [ip.strip() for ip in os.environ.get('WEBHOOK_ALLOWED_IPS', '').split(',') if ip.strip()]
+# Page size of the webhook-results endpoints (posts aggregated over a folder and its subfolders)
+WEBHOOK_RESULTS_PAGE_SIZE = int(os.environ.get('WEBHOOK_RESULTS_PAGE_SIZE', 500))
+WEBHOOK_RESULTS_MAX_PAGE_SIZE = int(os.environ.get('WEBHOOK_RESULTS_MAX_PAGE_SIZE', 2000))  # upper bound for ?page_size=
 
+# Rows per INSERT when a scraping run's folder hierarchy is created in bulk
+FOLDER_PLAN_BATCH_SIZE = int(os.environ.get('FOLDER_PLAN_BATCH_SIZE', 500))
 
-# Cache configuration for webhook monitoring
-CACHES = {
-    'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'default-cache',
-        'TIMEOUT': 300,  # 5 minutes default
-        'OPTIONS': {
-            'MAX_ENTRIES': 1000,
-            'CULL_FREQUENCY': 3,
+# Results of the cross-platform post search endpoint
+SEARCH_RESULTS_LIMIT = int(os.environ.get('SEARCH_RESULTS_LIMIT', 50))
+SEARCH_RESULTS_MAX_LIMIT = int(os.environ.get('SEARCH_RESULTS_MAX_LIMIT', 200))  # upper bound for ?limit=
+
+
+# Cache configuration
+# Both caches live in SQLite files shared by every worker process on the host, so
+# cached dashboards and webhook rate-limit buckets are not per-process. Tests and
+# SHARED_CACHE_ENABLED=False fall back to per-process LocMem caches. The directory
+# must be writable at runtime (the app directory is read-only on Upsun), hence the
+# temp directory; cache errors are logged and bypassed, never raised to requests.
+SHARED_CACHE_ENABLED = os.getenv('SHARED_CACHE_ENABLED', 'True').lower() == 'true' and not RUNNING_TESTS
+SHARED_CACHE_DIR = os.getenv('SHARED_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'trackfutura-cache'))
+
+if SHARED_CACHE_ENABLED:
+    CACHES = {
+        'default': {
+            'BACKEND': 'common.cache_backends.SQLiteCache',
+            'LOCATION': os.path.join(SHARED_CACHE_DIR, 'default.sqlite3'),
+            'TIMEOUT': 300,  # 5 minutes default
+            'OPTIONS': {
+                'MAX_ENTRIES': int(os.getenv('SHARED_CACHE_MAX_ENTRIES', 10000)),
+                'CULL_FREQUENCY': 3,
+            }
+        },
+        'webhook_cache': {
+            'BACKEND': 'common.cache_backends.SQLiteCache',
+            'LOCATION': os.path.join(SHARED_CACHE_DIR, 'webhook.sqlite3'),
+            'TIMEOUT': 3600,  # 1 hour default
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+                'CULL_FREQUENCY': 3,
+            }
         }
-    },
-    'webhook_cache': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'webhook-cache',
-        'TIMEOUT': 3600,  # 1 hour default
-        'OPTIONS': {
-            'MAX_ENTRIES': 10000,
-            'CULL_FREQUENCY': 3,
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'default-cache',
+            'TIMEOUT': 300,  # 5 minutes default
+            'OPTIONS': {
+                'MAX_ENTRIES': 1000,
+                'CULL_FREQUENCY': 3,
+            }
+        },
+        'webhook_cache': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'webhook-cache',
+            'TIMEOUT': 3600,  # 1 hour default
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+                'CULL_FREQUENCY': 3,
+            }
         }
     }
-}
+
+# Cache-aside lifetimes for project endpoints (also invalidated when project data changes)
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv('DASHBOARD_CACHE_TIMEOUT', 300))
+FOLDER_TREE_CACHE_TIMEOUT = int(os.getenv('FOLDER_TREE_CACHE_TIMEOUT', 300))
+
+# Rows per upsert when syncing the cross-platform UnifiedPost table (see track_accounts/unified_posts.py)
+UNIFIED_POST_BATCH_SIZE = int(os.getenv('UNIFIED_POST_BATCH_SIZE', 1000))
+
+# Ingest deduplication (see common/post_dedup.py): Bloom filter size per table and its false-positive rate
+POST_DEDUP_BLOOM_CAPACITY = int(os.getenv('POST_DEDUP_BLOOM_CAPACITY', 1000000))  # ~1.2 MB per filter at 1%
+POST_DEDUP_BLOOM_ERROR_RATE = float(os.getenv('POST_DEDUP_BLOOM_ERROR_RATE', 0.01))
+
+# Engagement snapshot retention (see track_accounts/engagement_history.py): all, then hourly, then daily, then gone
+ENGAGEMENT_SNAPSHOT_RAW_DAYS = int(os.getenv('ENGAGEMENT_SNAPSHOT_RAW_DAYS', 2))
+ENGAGEMENT_SNAPSHOT_HOURLY_DAYS = int(os.getenv('ENGAGEMENT_SNAPSHOT_HOURLY_DAYS', 30))
+ENGAGEMENT_SNAPSHOT_RETENTION_DAYS = int(os.getenv('ENGAGEMENT_SNAPSHOT_RETENTION_DAYS', 365))
+
+# Request profiling (see common/request_profiling.py); profiles are served at /api/admin/profiling/
+REQUEST_PROFILING_ENABLED = os.getenv('REQUEST_PROFILING_ENABLED', 'False').lower() == 'true'
+REQUEST_PROFILING_ALLOW_HEADER = os.getenv('REQUEST_PROFILING_ALLOW_HEADER', 'False').lower() == 'true'  # honour X-Profile-Request: 1 from any client
+REQUEST_PROFILING_BUFFER_SIZE = int(os.getenv('REQUEST_PROFILING_BUFFER_SIZE', 500))  # Profiles kept per process
+REQUEST_PROFILING_TOP_SQL = int(os.getenv('REQUEST_PROFILING_TOP_SQL', 5))  # Repeated statements kept per profile
+
+# Project stats compare posts published in the last N days with the N days before
+PROJECT_STATS_GROWTH_WINDOW_DAYS = int(os.getenv('PROJECT_STATS_GROWTH_WINDOW_DAYS', 30))
 
 # Development-specific webhook settings
 if DEBUG:
@@ -549,6 +645,28 @@ PINECONE_API_KEY = os.getenv('PINECONE_API_KEY', '')
 BRIGHTDATA_API_KEY = os.getenv('BRIGHTDATA_API_KEY', '')
 BRIGHTDATA_WEBHOOK_TOKEN = os.getenv('BRIGHTDATA_WEBHOOK_TOKEN', '')
 
+# Report chart rendering: process pool size and cache lifetime of rendered PNGs
+REPORT_CHART_WORKERS = int(os.getenv('REPORT_CHART_WORKERS', min(4, os.cpu_count() or 1)))
+REPORT_CHART_CACHE_TIMEOUT = int(os.getenv('REPORT_CHART_CACHE_TIMEOUT', 24 * 3600))  # 1 day
+
+# Persisted report exports (PDF/CSV), regenerated only when report results change
+REPORT_ARTIFACTS_ROOT = os.getenv('REPORT_ARTIFACTS_ROOT', os.path.join(BASE_DIR, 'report_artifacts'))
+REPORT_ARTIFACT_KEEP_VERSIONS = int(os.getenv('REPORT_ARTIFACT_KEEP_VERSIONS', 3))
+
+# Chat assistant data context: snapshot cache lifetime and prompt token budget
+CHAT_CONTEXT_CACHE_TTL = int(os.getenv('CHAT_CONTEXT_CACHE_TTL', 300))  # 5 minutes
+CHAT_CONTEXT_TOKEN_BUDGET = int(os.getenv('CHAT_CONTEXT_TOKEN_BUDGET', 6000))
+
+# Chat semantic retrieval index (per-project float16 vectors on disk)
+SEMANTIC_INDEX_ROOT = os.getenv('SEMANTIC_INDEX_ROOT', os.path.join(BASE_DIR, 'semantic_index'))
+SEMANTIC_INDEX_EMBEDDER = os.getenv('SEMANTIC_INDEX_EMBEDDER', 'hashing')  # 'hashing' (local) or 'openai'
+SEMANTIC_INDEX_ASYNC = os.getenv('SEMANTIC_INDEX_ASYNC', 'True').lower() == 'true'  # index new rows off the request thread
+SEMANTIC_INDEX_DIM = int(os.getenv('SEMANTIC_INDEX_DIM', 256))
+SEMANTIC_INDEX_EXACT_THRESHOLD = int(os.getenv('SEMANTIC_INDEX_EXACT_THRESHOLD', 5000))  # brute force below this size
+SEMANTIC_INDEX_LSH_TABLES = int(os.getenv('SEMANTIC_INDEX_LSH_TABLES', 8))
+SEMANTIC_INDEX_LSH_BITS = int(os.getenv('SEMANTIC_INDEX_LSH_BITS', 12))
+CHAT_RETRIEVAL_RESULTS = int(os.getenv('CHAT_RETRIEVAL_RESULTS', 5))
+
 # Production Memory Optimization Settings
 import os
 
@@ -574,10 +692,12 @@ if not DEBUG:
     LOGGING = {
         'version': 1,
         'disable_existing_loggers': False,
+        'formatters': LOG_FORMATTERS,
         'handlers': {
             'console': {
                 'class': 'logging.StreamHandler',
                 'level': 'INFO',
+                'formatter': LOG_FORMAT,
             },
         },
         'root': {
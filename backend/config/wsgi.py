@@ -2,6 +2,8 @@
 WSGI config for config project.
 
 It exposes the WSGI callable as a module-level variable named ``application``.
+Requests are admitted through per-pool bulkheads (see config.serving) so
+webhook bursts and report generation cannot take every worker thread.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/wsgi/
@@ -11,6 +13,8 @@ import os
 
 from django.core.wsgi import get_wsgi_application
 
+from config.serving import PoolLimiter
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
-application = get_wsgi_application()
+application = PoolLimiter(get_wsgi_application())
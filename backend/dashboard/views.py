@@ -3,18 +3,29 @@ from rest_framework.response import Response
 from rest_framework import status
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.conf import settings
 import json
 import logging
+from common.cache_aside import cache_aside, project_namespace
 from common.dashboard_service import DashboardService
 
 logger = logging.getLogger(__name__)
 
+
+def _cached(project_id, name, compute, *parts):
+    """Serve dashboard widgets from the shared cache until the project's data changes"""
+    if not project_id:
+        return compute()
+    return cache_aside(project_namespace(project_id), f'dashboard:{name}', compute, *parts,
+                       timeout=getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300))
+
+
 class DashboardStatsView(APIView):
     def get(self, request, project_id=None):
         try:
             days_back = int(request.GET.get('days_back', 30))
             dashboard_service = DashboardService(project_id=project_id)
-            stats = dashboard_service.get_project_stats(days_back=days_back)
+            stats = _cached(project_id, 'stats', lambda: dashboard_service.get_project_stats(days_back=days_back), days_back)
             return Response(stats, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error getting dashboard stats: {e}")
@@ -28,7 +39,8 @@ class DashboardActivityTimelineView(APIView):
         try:
             days_back = int(request.GET.get('days_back', 30))
             dashboard_service = DashboardService(project_id=project_id)
-            timeline = dashboard_service.get_activity_timeline(days_back=days_back)
+            timeline = _cached(project_id, 'activity_timeline',
+                               lambda: dashboard_service.get_activity_timeline(days_back=days_back), days_back)
             return Response(timeline, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error getting activity timeline: {e}")
@@ -41,7 +53,7 @@ class DashboardPlatformDistributionView(APIView):
     def get(self, request, project_id=None):
         try:
             dashboard_service = DashboardService(project_id=project_id)
-            distribution = dashboard_service.get_platform_distribution()
+            distribution = _cached(project_id, 'platform_distribution', dashboard_service.get_platform_distribution)
             return Response(distribution, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error getting platform distribution: {e}")
@@ -55,7 +67,7 @@ class DashboardRecentActivityView(APIView):
         try:
             limit = int(request.GET.get('limit', 5))
             dashboard_service = DashboardService(project_id=project_id)
-            activity = dashboard_service.get_recent_activity(limit=limit)
+            activity = _cached(project_id, 'recent_activity', lambda: dashboard_service.get_recent_activity(limit=limit), limit)
             return Response(activity, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error getting recent activity: {e}")
@@ -69,7 +81,7 @@ class DashboardTopPerformersView(APIView):
         try:
             limit = int(request.GET.get('limit', 3))
             dashboard_service = DashboardService(project_id=project_id)
-            performers = dashboard_service.get_top_performers(limit=limit)
+            performers = _cached(project_id, 'top_performers', lambda: dashboard_service.get_top_performers(limit=limit), limit)
             return Response(performers, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error getting top performers: {e}")
@@ -82,7 +94,7 @@ class DashboardWeeklyGoalsView(APIView):
     def get(self, request, project_id=None):
         try:
             dashboard_service = DashboardService(project_id=project_id)
-            goals = dashboard_service.get_weekly_goals()
+            goals = _cached(project_id, 'weekly_goals', dashboard_service.get_weekly_goals)
             return Response(goals, status=status.HTTP_200_OK)
         except Exception as e:
             logger.error(f"Error getting weekly goals: {e}")
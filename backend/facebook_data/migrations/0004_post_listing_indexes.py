@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('facebook_data', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='facebookpost',
+            index=models.Index(fields=['folder', 'content_type', '-date_posted'], name='facebook_da_folder__1d6fd1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facebookpost',
+            index=models.Index(fields=['folder', '-date_posted'], name='facebook_da_folder__2c88ae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='facebookpost',
+            index=models.Index(fields=['folder', '-likes'], name='facebook_da_folder__c842ad_idx'),
+        ),
+    ]
@@ -206,6 +206,10 @@ class FacebookPost(models.Model):
             models.Index(fields=['date_posted']),
             models.Index(fields=['page_name']),
             models.Index(fields=['content_type']),
+            # Post listings: folder + content type / date range / likes range, newest or most liked first
+            models.Index(fields=['folder', 'content_type', '-date_posted']),
+            models.Index(fields=['folder', '-date_posted']),
+            models.Index(fields=['folder', '-likes']),
         ] 
 
 class FacebookComment(models.Model):
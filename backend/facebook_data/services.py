@@ -17,9 +17,16 @@ from dateutil import parser as date_parser
 
 from .models import FacebookPost, FacebookComment, CommentScrapingJob, Folder
 from apify_integration.models import ApifyConfig
+from chat.context_service import invalidate_project_context
+from common.comment_ingestion import BulkCommentIngestor
 
 logger = logging.getLogger(__name__)
 
+# comment_id is globally unique on FacebookComment
+facebook_comment_ingestor = BulkCommentIngestor(
+    FacebookComment, FacebookPost, post_field='facebook_post', unique_fields=('comment_id',),
+)
+
 class FacebookCommentScraper:
     """
     Service class for scraping Facebook comments using BrightData
@@ -208,19 +215,30 @@ class FacebookCommentScraper:
             'comments_processed': 0,
             'comments_created': 0,
             'comments_updated': 0,
+            'comments_linked': 0,
             'errors': []
         }
         
         try:
+            rows = []
+            for comment_data in webhook_data:
+                result['comments_processed'] += 1
+                try:
+                    rows.append(facebook_comment_ingestor.clean_row(self._build_comment_row(comment_data)))
+                except Exception as e:
+                    error_msg = f"Error processing comment {comment_data.get('comment_id', 'unknown')}: {str(e)}"
+                    self.logger.error(error_msg)
+                    result['errors'].append(error_msg)
+
             with transaction.atomic():
-                for comment_data in webhook_data:
-                    try:
-                        self._process_single_comment(comment_data, result, job_id=None)
-                    except Exception as e:
-                        error_msg = f"Error processing comment {comment_data.get('comment_id', 'unknown')}: {str(e)}"
-                        self.logger.error(error_msg)
-                        result['errors'].append(error_msg)
-                        continue
+                counts = facebook_comment_ingestor.ingest(rows)
+                # Bulk upserts send no post_save; chat context is dropped once the delivery commits
+                for project_id in facebook_comment_ingestor.project_ids(rows):
+                    invalidate_project_context(project_id)
+
+            result['comments_created'] = counts['created']
+            result['comments_updated'] = counts['updated']
+            result['comments_linked'] = counts['linked']
             
             self.logger.info(f"Processed {result['comments_processed']} comments. "
                            f"Created: {result['comments_created']}, Updated: {result['comments_updated']}")
@@ -233,35 +251,14 @@ class FacebookCommentScraper:
         
         return result
     
-    def _process_single_comment(self, comment_data: Dict, result: Dict, job_id: int = None):
+    def _build_comment_row(self, comment_data: Dict, result_folder: Folder = None) -> Dict:
         """
-        Process a single comment from webhook data
+        Map a single comment from webhook data to FacebookComment values
         """
-        result['comments_processed'] += 1
-        
-        # Extract comment data
         comment_id = comment_data.get('comment_id')
         if not comment_id:
             raise ValueError("Missing comment_id in webhook data")
         
-        # Try to find related Facebook post
-        post_id = comment_data.get('post_id')
-        facebook_post = None
-        if post_id:
-            try:
-                facebook_post = FacebookPost.objects.get(post_id=post_id)
-            except FacebookPost.DoesNotExist:
-                self.logger.debug(f"No matching Facebook post found for post_id: {post_id}")
-        
-        # Get the result folder from the job if available
-        result_folder = None
-        if job_id:
-            try:
-                job = CommentScrapingJob.objects.get(id=job_id)
-                result_folder = job.result_folder
-            except CommentScrapingJob.DoesNotExist:
-                pass
-        
         # Parse date
         date_created = None
         if comment_data.get('date_created'):
@@ -270,47 +267,28 @@ class FacebookCommentScraper:
             except (ValueError, TypeError) as e:
                 self.logger.warning(f"Could not parse date_created: {comment_data.get('date_created')}")
         
-        # Create or update comment
-        comment, created = FacebookComment.objects.update_or_create(
-            comment_id=comment_id,
-            defaults={
-                'folder': result_folder,  # Link to the result folder
-                'facebook_post': facebook_post,
-                'url': comment_data.get('url', ''),
-                'post_id': comment_data.get('post_id', ''),
-                'post_url': comment_data.get('post_url', ''),
-                'user_name': comment_data.get('user_name', ''),
-                'user_id': comment_data.get('user_id', ''),
-                'user_url': comment_data.get('user_url', ''),
-                'commentator_profile': comment_data.get('commentator_profile', ''),
-                'comment_text': comment_data.get('comment_text', ''),
-                'date_created': date_created,
-                'comment_link': comment_data.get('comment_link', ''),
-                'num_likes': comment_data.get('num_likes', 0),
-                'num_replies': comment_data.get('num_replies', 0),
-                'attached_files': comment_data.get('attached_files'),
-                'video_length': comment_data.get('video_length'),
-                'source_type': comment_data.get('source_type', ''),
-                'subtype': comment_data.get('subtype', ''),
-                'type': comment_data.get('type', ''),
-            }
-        )
-        
-        # If this comment was created as part of a scraping job, update job stats
-        if job_id and created:
-            try:
-                job = CommentScrapingJob.objects.get(id=job_id)
-                job.total_comments_scraped += 1
-                job.save()
-            except CommentScrapingJob.DoesNotExist:
-                pass
-        
-        if created:
-            result['comments_created'] += 1
-            self.logger.debug(f"Created new comment: {comment_id}")
-        else:
-            result['comments_updated'] += 1
-            self.logger.debug(f"Updated existing comment: {comment_id}")
+        # The linked facebook_post is resolved in bulk by the ingestor from post_id
+        return {
+            'comment_id': str(comment_id),
+            'folder_id': result_folder.id if result_folder else None,  # Link to the result folder
+            'url': comment_data.get('url', ''),
+            'post_id': str(comment_data.get('post_id') or ''),
+            'post_url': comment_data.get('post_url', ''),
+            'user_name': comment_data.get('user_name', ''),
+            'user_id': comment_data.get('user_id', ''),
+            'user_url': comment_data.get('user_url', ''),
+            'commentator_profile': comment_data.get('commentator_profile', ''),
+            'comment_text': comment_data.get('comment_text', ''),
+            'date_created': date_created,
+            'comment_link': comment_data.get('comment_link', ''),
+            'num_likes': comment_data.get('num_likes', 0),
+            'num_replies': comment_data.get('num_replies', 0),
+            'attached_files': comment_data.get('attached_files'),
+            'video_length': comment_data.get('video_length'),
+            'source_type': comment_data.get('source_type', ''),
+            'subtype': comment_data.get('subtype', ''),
+            'type': comment_data.get('type', ''),
+        }
 
     def scrape_comments_from_urls(self, post_urls: List[str], comment_limit: int = 10,
                                 get_all_replies: bool = False, result_folder_name: str = None, 
@@ -1,3 +1,28 @@
 from django.test import TestCase
 
-# Create your tests here. 
\ No newline at end of file
+from .models import FacebookComment, FacebookPost
+from .services import FacebookCommentScraper
+
+
+class FacebookCommentIngestionTest(TestCase):
+    def test_comments_are_linked_and_upserted_in_bulk(self):
+        post = FacebookPost.objects.create(url='https://www.facebook.com/nike/posts/1', post_id='1')
+        payload = [
+            {'comment_id': f'c{i}', 'post_id': '1' if i % 2 else '2', 'comment_text': f'Comment {i}',
+             'date_created': '2025-01-01T10:00:00Z', 'num_likes': i}
+            for i in range(4)
+        ]
+        scraper = FacebookCommentScraper()
+
+        # post lookup, existing-key lookup and upsert inside a savepoint
+        with self.assertNumQueries(5):
+            result = scraper.process_comment_webhook_data(payload)
+        self.assertEqual((result['comments_created'], result['comments_linked']), (4, 2))
+
+        payload[0]['num_likes'] = 40
+        result = scraper.process_comment_webhook_data(payload[:1])
+
+        self.assertEqual(result['comments_updated'], 1)
+        self.assertEqual(FacebookComment.objects.count(), 4)
+        self.assertEqual(FacebookComment.objects.get(comment_id='c0').num_likes, 40)
+        self.assertEqual(FacebookComment.objects.get(comment_id='c1').facebook_post, post)
@@ -12,6 +12,9 @@ from .models import FacebookPost, Folder, FacebookComment, CommentScrapingJob
 from .serializers import FacebookPostSerializer, FolderSerializer, FacebookCommentSerializer, CommentScrapingJobSerializer
 from django.db.models import Q
 from django.db import models
+from common import full_text_search
+from common.request_profiling import query_budget
+from chat.context_service import invalidate_folder_context
 
 # Try to import dateparser, but provide a fallback if it's not available
 try:
@@ -198,6 +201,7 @@ class FolderViewSet(viewsets.ModelViewSet):
             print(f"Error deleting folder: {str(e)}")
             return Response({'error': f'Failed to delete folder: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @query_budget(5)
     @action(detail=True, methods=['GET'])
     def contents(self, request, pk=None):
         """
@@ -213,20 +217,7 @@ class FolderViewSet(viewsets.ModelViewSet):
                 # Apply search if provided
                 search_query = request.query_params.get('search', '')
                 if search_query:
-                    search_filter = Q()
-                    available_fields = [f.name for f in FacebookPost._meta.get_fields()]
-                    
-                    if 'user_posted' in available_fields:
-                        search_filter |= Q(user_posted__icontains=search_query)
-                    if 'content' in available_fields:
-                        search_filter |= Q(content__icontains=search_query)
-                    if 'hashtags' in available_fields:
-                        search_filter |= Q(hashtags__icontains=search_query)
-                    if 'page_name' in available_fields:
-                        search_filter |= Q(page_name__icontains=search_query)
-                    
-                    if search_filter:
-                        posts = posts.filter(search_filter)
+                    posts = full_text_search.search(posts, search_query)
                 
                 # Paginate results
                 page = self.paginate_queryset(posts)
@@ -247,20 +238,7 @@ class FolderViewSet(viewsets.ModelViewSet):
                 # Apply search if provided
                 search_query = request.query_params.get('search', '')
                 if search_query:
-                    search_filter = Q()
-                    available_fields = [f.name for f in FacebookPost._meta.get_fields()]
-                    
-                    if 'user_posted' in available_fields:
-                        search_filter |= Q(user_posted__icontains=search_query)
-                    if 'content' in available_fields:
-                        search_filter |= Q(content__icontains=search_query)
-                    if 'hashtags' in available_fields:
-                        search_filter |= Q(hashtags__icontains=search_query)
-                    if 'page_name' in available_fields:
-                        search_filter |= Q(page_name__icontains=search_query)
-                    
-                    if search_filter:
-                        reels = reels.filter(search_filter)
+                    reels = full_text_search.search(reels, search_query)
                 
                 # Paginate results
                 page = self.paginate_queryset(reels)
@@ -281,11 +259,7 @@ class FolderViewSet(viewsets.ModelViewSet):
                 # Apply search if provided
                 search_query = request.query_params.get('search', '')
                 if search_query:
-                    search_filter = Q()
-                    search_filter |= Q(user_name__icontains=search_query)
-                    search_filter |= Q(comment_text__icontains=search_query)
-                    search_filter |= Q(post_id__icontains=search_query)
-                    comments = comments.filter(search_filter)
+                    comments = full_text_search.search(comments, search_query)
                 
                 # Paginate results
                 page = self.paginate_queryset(comments)
@@ -435,35 +409,7 @@ class FacebookPostViewSet(viewsets.ModelViewSet):
             # Add search functionality
             search_query = self.request.query_params.get('search', '')
             if search_query:
-                # Build a dynamic Q object with fields that exist in the model
-                search_filter = Q()
-                available_fields = [f.name for f in FacebookPost._meta.get_fields()]
-                
-                # Check each field individually to avoid errors with missing fields
-                if 'user_posted' in available_fields:
-                    search_filter |= Q(user_posted__icontains=search_query)
-                
-                if 'description' in available_fields:
-                    search_filter |= Q(description__icontains=search_query)
-                
-                if 'content' in available_fields:
-                    search_filter |= Q(content__icontains=search_query)
-                
-                if 'hashtags' in available_fields:
-                    search_filter |= Q(hashtags__icontains=search_query)
-                
-                if 'content_type' in available_fields:
-                    search_filter |= Q(content_type__icontains=search_query)
-                
-                if 'post_id' in available_fields:
-                    search_filter |= Q(post_id__icontains=search_query)
-                
-                if 'page_name' in available_fields:
-                    search_filter |= Q(page_name__icontains=search_query)
-                
-                # Apply the search filter if we have any valid conditions
-                if search_filter:
-                    queryset = queryset.filter(search_filter)
+                queryset = full_text_search.search(queryset, search_query)
             
             return queryset
         except Exception as e:
@@ -846,6 +792,9 @@ class FacebookPostViewSet(viewsets.ModelViewSet):
                     # Continue processing other rows
                     continue
             
+            # Comments are saved row by row above; the project's chat context is dropped once
+            invalidate_folder_context(folder)
+            
             # Prepare response
             response_data = {
                 'status': 'success',
@@ -1152,17 +1101,26 @@ class FacebookCommentViewSet(viewsets.ModelViewSet):
             # Add search functionality
             search_query = self.request.query_params.get('search', '')
             if search_query:
-                search_filter = Q()
-                search_filter |= Q(user_name__icontains=search_query)
-                search_filter |= Q(comment_text__icontains=search_query)
-                search_filter |= Q(post_id__icontains=search_query)
-                queryset = queryset.filter(search_filter)
+                queryset = full_text_search.search(queryset, search_query)
             
             return queryset
         except Exception as e:
             print(f"Error in get_queryset: {str(e)}")
             return FacebookComment.objects.none()
-    
+
+    def perform_create(self, serializer):
+        # Comments feed the project's chat context; one invalidation per request
+        invalidate_folder_context(serializer.save().folder)
+
+    def perform_update(self, serializer):
+        previous = serializer.instance.folder
+        invalidate_folder_context(previous, serializer.save().folder)
+
+    def perform_destroy(self, instance):
+        folder = instance.folder
+        instance.delete()
+        invalidate_folder_context(folder)
+
     @action(detail=False, methods=['GET'])
     def stats(self, request):
         """
@@ -1440,6 +1398,9 @@ class FacebookCommentViewSet(viewsets.ModelViewSet):
                     # Continue processing other rows
                     continue
             
+            # Comments are saved row by row above; the project's chat context is dropped once
+            invalidate_folder_context(folder)
+            
             # Prepare response
             response_data = {
                 'status': 'success',
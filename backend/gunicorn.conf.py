@@ -1,23 +1,127 @@
 """
 Gunicorn configuration for production deployment
-Optimized for memory efficiency and stability
+Threaded (or ASGI) workers sized from the host, with per-pool thread budgets
+and memory-based worker recycling
+
+Environment:
+    GUNICORN_WORKER_CLASS          gthread (default) or uvicorn (ASGI, needs uvicorn installed)
+    GUNICORN_WORKERS               explicit worker count; derived from cores and memory when unset
+    GUNICORN_WORKER_MEMORY_MB      expected steady-state RSS per worker, used for sizing (default 256)
+    GUNICORN_MEMORY_FRACTION       share of the memory limit workers may use (default 0.75)
+    GUNICORN_MAX_WORKER_MEMORY_MB  recycle a worker once its RSS exceeds this (default 2x the budget)
+    GUNICORN_MEMORY_CHECK_SECONDS  how often workers check their RSS (default 10)
+    GUNICORN_MAX_REQUESTS          optional count-based recycling on top (default 0, disabled)
+    SERVING_POOLS                  pools this deployment serves, see config/serving.py
+    SERVING_POOL_QUEUE_DEPTH       requests per pool that may wait for a slot (default 0, shed at once)
+
+Dedicated pools: run one gunicorn per pool, e.g.
+
+    SERVING_POOLS=webhooks PORT=8001 gunicorn -c gunicorn.conf.py
+    SERVING_POOLS=reports  PORT=8002 gunicorn -c gunicorn.conf.py
+    SERVING_POOLS=streams  PORT=8003 gunicorn -c gunicorn.conf.py
+    SERVING_POOLS=api      PORT=8000 gunicorn -c gunicorn.conf.py
+
+and route /api/brightdata/webhook/, /api/apify/webhook/ (and notify/) to 8001,
+/api/reports/ to 8002 and /api/chat/.../stream_message/ to 8003. With the default (all pools) a single deployment
+still isolates them with per-pool thread budgets inside every worker.
 """
 import os
+import signal
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from config.serving import pool_sizes, served_pools, worker_threads  # noqa: E402
+
+MB = 1024 * 1024
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _memory_limit_mb():
+    """Container memory limit (cgroup v2/v1) or physical memory, in MB"""
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as f:
+                value = f.read().strip()
+        except OSError:
+            continue
+        # cgroup v1 reports "unlimited" as a huge number
+        if value.isdigit() and int(value) < 1 << 60:
+            return int(value) // MB
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') // MB
+    except (ValueError, OSError, AttributeError):
+        return 1024
+
+
+def _rss_mb():
+    """Current resident set size of this process, in MB"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / MB
+    except (OSError, ValueError, IndexError):
+        import resource
+        # Peak RSS in KB on Linux; the best available without /proc
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _worker_class():
+    requested = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+    if requested != 'uvicorn':
+        return requested
+    try:
+        import uvicorn.workers  # noqa: F401
+    except ImportError:
+        print("uvicorn is not installed, falling back to gthread workers", file=sys.stderr)
+        return 'gthread'
+    return 'uvicorn.workers.UvicornWorker'
+
+
+# Sizing
+cpu_count = _cpu_count()
+memory_limit_mb = _memory_limit_mb()
+worker_memory_mb = int(os.getenv('GUNICORN_WORKER_MEMORY_MB', 256))
+memory_fraction = float(os.getenv('GUNICORN_MEMORY_FRACTION', 0.75))
+pools = pool_sizes(served_pools())
+
+# Threads do the concurrency, so processes only need to cover the cores,
+# and never more than the memory limit can hold
+workers = int(os.getenv('GUNICORN_WORKERS', 0)) or max(1, min(
+    cpu_count + 1,
+    int(memory_limit_mb * memory_fraction) // worker_memory_mb,
+))
 
 # Server socket
 bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
 backlog = 2048
 
 # Worker processes
-workers = 1  # Keep low for memory efficiency
-worker_class = "sync"
+worker_class = _worker_class()
+if worker_class == 'uvicorn.workers.UvicornWorker':
+    wsgi_app = 'config.asgi:application'
+else:
+    wsgi_app = 'config.wsgi:application'
+# One thread per pool slot plus one per allowed waiter; the per-pool limits in
+# config.serving share them out, so a burst on one pool cannot take the others' threads
+threads = worker_threads(pools)
 worker_connections = 1000
-timeout = 120
-keepalive = 2
+# Report generation can legitimately run for minutes
+timeout = 300 if 'reports' in pools else 120
+graceful_timeout = 30
+keepalive = 5
 
-# Restart workers after this many requests, to prevent memory leaks
-max_requests = 100
-max_requests_jitter = 50
+# Recycle on memory, not request count
+max_worker_memory_mb = int(os.getenv('GUNICORN_MAX_WORKER_MEMORY_MB', worker_memory_mb * 2))
+memory_check_seconds = float(os.getenv('GUNICORN_MEMORY_CHECK_SECONDS', 10))
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 2
 
 # Preload app to save memory
 preload_app = True
@@ -33,23 +137,48 @@ tmp_upload_dir = None
 errorlog = "-"
 loglevel = "info"
 accesslog = "-"
-access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)sus'
 
 # Process naming
 proc_name = "trackfutura"
 
-# Memory optimization
+
+def _watch_memory(worker):
+    """Ask the worker to exit gracefully once it outgrows its memory budget"""
+    stop = threading.Event()
+    while not stop.wait(memory_check_seconds):
+        if not worker.alive:
+            return
+        rss = _rss_mb()
+        if rss > max_worker_memory_mb:
+            worker.log.warning(
+                "Worker %s RSS %.0fMB exceeds %sMB, recycling after in-flight requests",
+                worker.pid, rss, max_worker_memory_mb,
+            )
+            # Graceful exit for both gthread and uvicorn workers: stop accepting,
+            # finish in-flight requests, and let the arbiter spawn a replacement
+            os.kill(os.getpid(), signal.SIGTERM)
+            return
+
+
 def when_ready(server):
-    server.log.info("Server is ready. Spawning workers")
+    server.log.info(
+        "Server is ready: %s x %s workers, pools %s (%s threads), %s cores, %sMB memory limit, "
+        "recycling above %sMB RSS",
+        workers, worker_class, pools, threads, cpu_count, memory_limit_mb, max_worker_memory_mb,
+    )
 
 def worker_int(worker):
     worker.log.info("worker received INT or QUIT signal")
 
 def pre_fork(server, worker):
-    server.log.info("Worker spawned (pid: %s)", worker.pid)
+    server.log.info("Spawning worker")
 
 def post_fork(server, worker):
     server.log.info("Worker spawned (pid: %s)", worker.pid)
 
+def post_worker_init(worker):
+    threading.Thread(target=_watch_memory, args=(worker,), daemon=True, name='memory-watchdog').start()
+
 def worker_abort(worker):
-    worker.log.info("Worker received SIGABRT signal")
\ No newline at end of file
+    worker.log.info("Worker received SIGABRT signal")
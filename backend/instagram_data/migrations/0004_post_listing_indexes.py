@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instagram_data', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='instagrampost',
+            index=models.Index(fields=['folder', 'content_type', '-date_posted'], name='instagram_d_folder__ad2079_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='instagrampost',
+            index=models.Index(fields=['folder', '-date_posted'], name='instagram_d_folder__1f6e37_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='instagrampost',
+            index=models.Index(fields=['folder', '-likes'], name='instagram_d_folder__e9482b_idx'),
+        ),
+    ]
@@ -174,6 +174,10 @@ class InstagramPost(models.Model):
             models.Index(fields=['date_posted']),
             models.Index(fields=['content_type']),
             models.Index(fields=['product_type']),
+            # Post listings: folder + content type / date range / likes range, newest or most liked first
+            models.Index(fields=['folder', 'content_type', '-date_posted']),
+            models.Index(fields=['folder', '-date_posted']),
+            models.Index(fields=['folder', '-likes']),
         ]
 
 class InstagramComment(models.Model):
@@ -12,14 +12,22 @@ import datetime
 from typing import List, Dict, Optional, Tuple
 from django.utils import timezone
 from django.db import transaction
+from django.db.models import F
 from django.conf import settings
 from dateutil import parser as date_parser
 
 from .models import InstagramPost, InstagramComment, Folder, CommentScrapingJob
 from apify_integration.models import ApifyConfig
+from chat.context_service import invalidate_project_context
+from common.comment_ingestion import BulkCommentIngestor
 
 logger = logging.getLogger(__name__)
 
+# Comments are unique per result folder (InstagramComment.Meta.unique_together)
+instagram_comment_ingestor = BulkCommentIngestor(
+    InstagramComment, InstagramPost, post_field='instagram_post', unique_fields=('comment_id', 'folder'),
+)
+
 class InstagramCommentScraper:
     """
     Service class for scraping Instagram comments using BrightData
@@ -294,6 +302,7 @@ class InstagramCommentScraper:
             'comments_processed': 0,
             'comments_created': 0,
             'comments_updated': 0,
+            'comments_linked': 0,
             'errors': []
         }
         
@@ -302,20 +311,36 @@ class InstagramCommentScraper:
             result_folder = None
             if job_id:
                 try:
-                    job = CommentScrapingJob.objects.get(id=job_id)
+                    job = CommentScrapingJob.objects.select_related('result_folder').get(id=job_id)
                     result_folder = job.result_folder
                 except CommentScrapingJob.DoesNotExist:
                     pass
             
+            rows = []
+            for comment_data in webhook_data:
+                result['comments_processed'] += 1
+                try:
+                    rows.append(instagram_comment_ingestor.clean_row(
+                        self._build_instagram_comment_row(comment_data, result_folder)))
+                except Exception as e:
+                    error_msg = f"Error processing comment {comment_data.get('comment_id', 'unknown')}: {str(e)}"
+                    self.logger.error(error_msg)
+                    result['errors'].append(error_msg)
+
             with transaction.atomic():
-                for comment_data in webhook_data:
-                    try:
-                        self._process_single_instagram_comment(comment_data, result, result_folder, job_id)
-                    except Exception as e:
-                        error_msg = f"Error processing comment {comment_data.get('comment_id', 'unknown')}: {str(e)}"
-                        self.logger.error(error_msg)
-                        result['errors'].append(error_msg)
-                        continue
+                counts = instagram_comment_ingestor.ingest(rows)
+                # Job stats are bumped once per delivery rather than once per comment
+                if job_id and counts['created']:
+                    CommentScrapingJob.objects.filter(id=job_id).update(
+                        total_comments_scraped=F('total_comments_scraped') + counts['created']
+                    )
+                # Bulk upserts send no post_save; chat context is dropped once the delivery commits
+                for project_id in instagram_comment_ingestor.project_ids(rows):
+                    invalidate_project_context(project_id)
+
+            result['comments_created'] = counts['created']
+            result['comments_updated'] = counts['updated']
+            result['comments_linked'] = counts['linked']
             
             self.logger.info(f"Processed {result['comments_processed']} Instagram comments. "
                            f"Created: {result['comments_created']}, Updated: {result['comments_updated']}")
@@ -328,26 +353,14 @@ class InstagramCommentScraper:
         
         return result
     
-    def _process_single_instagram_comment(self, comment_data: Dict, result: Dict, result_folder: Folder = None, job_id: int = None):
+    def _build_instagram_comment_row(self, comment_data: Dict, result_folder: Folder = None) -> Dict:
         """
-        Process a single Instagram comment from webhook data
+        Map a single Instagram comment from webhook data to InstagramComment values
         """
-        result['comments_processed'] += 1
-        
-        # Extract comment data
         comment_id = comment_data.get('comment_id')
         if not comment_id:
             raise ValueError("Missing comment_id in webhook data")
         
-        # Try to find related Instagram post
-        post_id = comment_data.get('post_id')
-        instagram_post = None
-        if post_id:
-            try:
-                instagram_post = InstagramPost.objects.get(post_id=post_id)
-            except InstagramPost.DoesNotExist:
-                self.logger.debug(f"No matching Instagram post found for post_id: {post_id}")
-        
         # Parse comment date
         comment_date = None
         if comment_data.get('comment_date'):
@@ -356,43 +369,24 @@ class InstagramCommentScraper:
             except (ValueError, TypeError) as e:
                 self.logger.warning(f"Could not parse comment_date '{comment_data.get('comment_date')}': {str(e)}")
         
-        # Create or update Instagram comment
-        comment, created = InstagramComment.objects.update_or_create(
-            comment_id=comment_id,
-            defaults={
-                'folder': result_folder,  # Link to the result folder
-                'instagram_post': instagram_post,
-                'post_id': comment_data.get('post_id', ''),
-                'post_url': comment_data.get('post_url', ''),
-                'post_user': comment_data.get('post_user', ''),
-                'comment': comment_data.get('comment', ''),
-                'comment_date': comment_date,
-                'comment_user': comment_data.get('comment_user', ''),
-                'comment_user_url': comment_data.get('comment_user_url', ''),
-                'likes_number': comment_data.get('likes_number', 0),
-                'replies_number': comment_data.get('replies_number', 0),
-                'replies': comment_data.get('replies'),
-                'hashtag_comment': comment_data.get('hashtag_comment'),
-                'tagged_users_in_comment': comment_data.get('tagged_users_in_comment'),
-                'url': comment_data.get('url', ''),
-            }
-        )
-        
-        # If this comment was created as part of a scraping job, update job stats
-        if job_id and created:
-            try:
-                job = CommentScrapingJob.objects.get(id=job_id)
-                job.total_comments_scraped += 1
-                job.save()
-            except CommentScrapingJob.DoesNotExist:
-                pass
-        
-        if created:
-            result['comments_created'] += 1
-            self.logger.debug(f"Created new Instagram comment: {comment_id}")
-        else:
-            result['comments_updated'] += 1
-            self.logger.debug(f"Updated existing Instagram comment: {comment_id}")
+        # The linked instagram_post is resolved in bulk by the ingestor from post_id
+        return {
+            'comment_id': str(comment_id),
+            'folder_id': result_folder.id if result_folder else None,  # Link to the result folder
+            'post_id': str(comment_data.get('post_id') or ''),
+            'post_url': comment_data.get('post_url', ''),
+            'post_user': comment_data.get('post_user', ''),
+            'comment': comment_data.get('comment', ''),
+            'comment_date': comment_date,
+            'comment_user': comment_data.get('comment_user', ''),
+            'comment_user_url': comment_data.get('comment_user_url', ''),
+            'likes_number': comment_data.get('likes_number', 0),
+            'replies_number': comment_data.get('replies_number', 0),
+            'replies': comment_data.get('replies'),
+            'hashtag_comment': comment_data.get('hashtag_comment'),
+            'tagged_users_in_comment': comment_data.get('tagged_users_in_comment'),
+            'url': comment_data.get('url', ''),
+        }
 
 
 def create_and_execute_instagram_comment_scraping_job(name: str, project_id: int, 
@@ -1,3 +1,137 @@
-from django.test import TestCase
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from common.request_profiling import QueryBudgetTestMixin
+from users.models import Project
+from .models import CommentScrapingJob, Folder, InstagramComment, InstagramPost
+from .services import InstagramCommentScraper
+
+
+def comment_payload(number, post_id='p1', likes=0):
+    return {
+        'comment_id': f'c{number}',
+        'post_id': post_id,
+        'post_url': f'https://www.instagram.com/p/{post_id}/',
+        'comment': f'Comment {number}',
+        'comment_user': 'fan',
+        'comment_date': '2025-01-01T10:00:00Z',
+        'likes_number': likes,
+    }
+
+
+@override_settings(COMMENT_INGEST_CHUNK_SIZE=2)
+class InstagramCommentIngestionTest(TestCase):
+    def setUp(self):
+        self.folder = Folder.objects.create(name='Comments', category='comments')
+        self.job = CommentScrapingJob.objects.create(name='Job', result_folder=self.folder, selected_folders=[])
+        self.posts = {
+            post_id: InstagramPost.objects.create(url=f'https://www.instagram.com/p/{post_id}/',
+                                                  user_posted='nike', post_id=post_id)
+            for post_id in ('p1', 'p2')
+        }
+        self.scraper = InstagramCommentScraper()
+
+    def test_comments_are_linked_to_posts_in_bulk(self):
+        payload = [comment_payload(i, post_id=('p1', 'p2', 'missing')[i % 3]) for i in range(6)]
+
+        # job, 2 post lookup chunks, existing-key lookup + upsert per comment chunk,
+        # job stats update, result folder projects, plus the savepoint pair
+        with self.assertNumQueries(1 + 2 + 3 * 2 + 1 + 1 + 2):
+            result = self.scraper.process_comment_webhook_data(payload, job_id=self.job.id)
+
+        self.assertEqual((result['comments_created'], result['comments_linked']), (6, 4))
+        self.assertEqual(InstagramComment.objects.get(comment_id='c1').instagram_post, self.posts['p2'])
+        self.assertIsNone(InstagramComment.objects.get(comment_id='c2').instagram_post)
+        self.assertEqual(InstagramComment.objects.filter(folder=self.folder).count(), 6)
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.total_comments_scraped, 6)
+
+    def test_redelivery_updates_instead_of_duplicating(self):
+        self.scraper.process_comment_webhook_data([comment_payload(1), comment_payload(2)], job_id=self.job.id)
+        result = self.scraper.process_comment_webhook_data(
+            [comment_payload(1, likes=5), comment_payload(1, likes=7), comment_payload(3), {'post_id': 'p1'}],
+            job_id=self.job.id,
+        )
+
+        self.assertEqual((result['comments_created'], result['comments_updated']), (1, 1))
+        self.assertEqual(len(result['errors']), 1)
+        self.assertEqual(InstagramComment.objects.count(), 3)
+        self.assertEqual(InstagramComment.objects.get(comment_id='c1').likes_number, 7)
+
+    def test_bad_comment_is_skipped_without_failing_the_delivery(self):
+        bad_likes = dict(comment_payload(2), likes_number='many')
+        no_user = dict(comment_payload(3), comment_user=None)
+        result = self.scraper.process_comment_webhook_data(
+            [comment_payload(1, likes='4'), bad_likes, no_user, comment_payload(4)], job_id=self.job.id)
+
+        self.assertTrue(result['success'])
+        self.assertEqual((result['comments_created'], len(result['errors'])), (2, 2))
+        self.assertEqual(InstagramComment.objects.get(comment_id='c1').likes_number, 4)
+        self.assertEqual(set(InstagramComment.objects.values_list('comment_id', flat=True)), {'c1', 'c4'})
+
+    def test_delivery_invalidates_the_project_context_once(self):
+        self.folder.project = Project.objects.create(name='Launch', owner=User.objects.create_user('owner'))
+        self.folder.save()
+
+        with mock.patch('instagram_data.services.invalidate_project_context') as invalidate:
+            self.scraper.process_comment_webhook_data([comment_payload(i) for i in range(3)], job_id=self.job.id)
+
+        invalidate.assert_called_once_with(self.folder.project_id)
+
+    def test_comments_without_result_folder_are_upserted(self):
+        self.scraper.process_comment_webhook_data([comment_payload(1)])
+        result = self.scraper.process_comment_webhook_data([comment_payload(1, likes=3)])
+
+        self.assertEqual(result['comments_updated'], 1)
+        comment = InstagramComment.objects.get()
+        self.assertIsNone(comment.folder)
+        self.assertEqual(comment.likes_number, 3)
+
+
+class FolderContentsQueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    def test_contents_within_budget(self):
+        folder = Folder.objects.create(name='Posts', category='posts')
+        for i in range(10):
+            InstagramPost.objects.create(folder=folder, post_id=f'p{i}', url=f'https://www.instagram.com/p/{i}/')
+
+        response = self.assertWithinQueryBudget('get', f'/api/instagram-data/folders/{folder.id}/contents/')
+        self.assertEqual(response.status_code, 200)
+
+
+class FullTextSearchTest(APITestCase):
+    def setUp(self):
+        self.folder = Folder.objects.create(name='Posts', category='posts')
+        self.launch = InstagramPost.objects.create(
+            folder=self.folder, post_id='launch1', url='https://www.instagram.com/p/launch1/',
+            user_posted='nike_running', description='Launch day for the new trail shoe', hashtags=['launch', 'trail'])
+        self.mention = InstagramPost.objects.create(
+            folder=self.folder, post_id='mention1', url='https://www.instagram.com/p/mention1/',
+            user_posted='adidas', description='Not our launch, but congrats', hashtags=['sport'])
+
+    def search(self, query, **kwargs):
+        from common.full_text_search import search
+        return set(search(InstagramPost.objects.all(), query, **kwargs).values_list('post_id', flat=True))
+
+    def test_words_match_as_prefixes_and_hashtags_exactly(self):
+        self.assertEqual(self.search('launch'), {'launch1', 'mention1'})
+        self.assertEqual(self.search('#launch'), {'launch1'})
+        self.assertEqual(self.search('nike trai'), {'launch1'})
+        self.assertEqual(self.search('mention1'), {'mention1'})
+        self.assertEqual(self.search('reebok'), set())
+
+    def test_index_follows_updates_and_deletes(self):
+        self.mention.description = 'Congrats on the trail run'
+        self.mention.save()
+        self.assertEqual(self.search('trail'), {'launch1', 'mention1'})
+        self.assertEqual(self.search('congrats launch'), set())
+
+        self.launch.delete()
+        self.assertEqual(self.search('trail'), {'mention1'})
+
+    def test_folder_contents_search(self):
+        response = self.client.get(f'/api/instagram-data/folders/{self.folder.id}/contents/', {'search': '#trail'})
+        self.assertEqual([post['post_id'] for post in response.json()['results']], ['launch1'])
 
-# Create your tests here.
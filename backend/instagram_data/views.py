@@ -17,6 +17,10 @@ from .serializers import (
 )
 from django.db.models import Q
 from .services import create_and_execute_instagram_comment_scraping_job
+from common import full_text_search
+from common.request_profiling import query_budget
+from chat.context_service import invalidate_folder_context
+from track_accounts.unified_posts import unified_post_service
 
 # Try to import dateparser, but provide a fallback if it's not available
 try:
@@ -260,6 +264,7 @@ class FolderViewSet(viewsets.ModelViewSet):
             print(f"Error deleting folder: {str(e)}")
             return Response({'error': f'Failed to delete folder: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @query_budget(5)
     @action(detail=True, methods=['GET'])
     def contents(self, request, pk=None):
         """
@@ -275,11 +280,7 @@ class FolderViewSet(viewsets.ModelViewSet):
                 # Apply search if provided
                 search_query = request.query_params.get('search', '')
                 if search_query:
-                    search_filter = Q()
-                    search_filter |= Q(user_posted__icontains=search_query)
-                    search_filter |= Q(description__icontains=search_query) 
-                    search_filter |= Q(hashtags__icontains=search_query)
-                    posts = posts.filter(search_filter)
+                    posts = full_text_search.search(posts, search_query)
                 
                 # Paginate results
                 page = self.paginate_queryset(posts)
@@ -304,11 +305,7 @@ class FolderViewSet(viewsets.ModelViewSet):
                 # Apply search if provided
                 search_query = request.query_params.get('search', '')
                 if search_query:
-                    search_filter = Q()
-                    search_filter |= Q(user_posted__icontains=search_query)
-                    search_filter |= Q(description__icontains=search_query) 
-                    search_filter |= Q(hashtags__icontains=search_query)
-                    reels = reels.filter(search_filter)
+                    reels = full_text_search.search(reels, search_query)
                 
                 # Paginate results
                 page = self.paginate_queryset(reels)
@@ -333,11 +330,7 @@ class FolderViewSet(viewsets.ModelViewSet):
                 # Apply search if provided
                 search_query = request.query_params.get('search', '')
                 if search_query:
-                    search_filter = Q()
-                    search_filter |= Q(comment_user__icontains=search_query)
-                    search_filter |= Q(comment__icontains=search_query)
-                    search_filter |= Q(post_id__icontains=search_query)
-                    comments = comments.filter(search_filter)
+                    comments = full_text_search.search(comments, search_query)
                 
                 # Paginate results
                 page = self.paginate_queryset(comments)
@@ -488,13 +481,7 @@ class InstagramPostViewSet(viewsets.ModelViewSet):
         # Add search functionality
         search_query = self.request.query_params.get('search', '')
         if search_query:
-            queryset = queryset.filter(
-                Q(user_posted__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(hashtags__icontains=search_query) |
-                Q(content_type__icontains=search_query) |
-                Q(post_id__icontains=search_query)
-            )
+            queryset = full_text_search.search(queryset, search_query)
         
         # Add date range filtering
         start_date = self.request.query_params.get('start_date')
@@ -684,6 +671,7 @@ class InstagramPostViewSet(viewsets.ModelViewSet):
             return None
 
     @action(detail=False, methods=['POST'])
+    @unified_post_service.deferred()
     def upload_csv(self, request):
         """
         Upload CSV file and parse the data
@@ -1118,6 +1106,7 @@ class InstagramPostViewSet(viewsets.ModelViewSet):
             )
 
     @action(detail=False, methods=['POST'])
+    @unified_post_service.deferred()
     def move_to_folder(self, request):
         """
         Move posts to a specific folder
@@ -1221,11 +1210,7 @@ class InstagramCommentViewSet(viewsets.ModelViewSet):
             # Add search functionality
             search_query = self.request.query_params.get('search', '')
             if search_query:
-                search_filter = Q()
-                search_filter |= Q(comment_user__icontains=search_query)
-                search_filter |= Q(comment__icontains=search_query)
-                search_filter |= Q(post_id__icontains=search_query)
-                queryset = queryset.filter(search_filter)
+                queryset = full_text_search.search(queryset, search_query)
             
             # Add sorting
             sort_by = self.request.query_params.get('sort_by', 'comment_date')
@@ -1250,7 +1235,20 @@ class InstagramCommentViewSet(viewsets.ModelViewSet):
         except Exception as e:
             print(f"Error in get_queryset: {str(e)}")
             return InstagramComment.objects.none()
-    
+
+    def perform_create(self, serializer):
+        # Comments feed the project's chat context; one invalidation per request
+        invalidate_folder_context(serializer.save().folder)
+
+    def perform_update(self, serializer):
+        previous = serializer.instance.folder
+        invalidate_folder_context(previous, serializer.save().folder)
+
+    def perform_destroy(self, instance):
+        folder = instance.folder
+        instance.delete()
+        invalidate_folder_context(folder)
+
     def _parse_date(self, date_str):
         """Parse date string similar to the post viewset"""
         if not date_str or not date_str.strip() or date_str.strip() == '""':
@@ -1682,6 +1680,9 @@ class InstagramCommentViewSet(viewsets.ModelViewSet):
                         print(safe_error_msg)
                     continue
             
+            # Comments are saved row by row above; the project's chat context is dropped once
+            invalidate_folder_context(folder)
+            
             # Prepare response
             response_data = {
                 'status': 'success',
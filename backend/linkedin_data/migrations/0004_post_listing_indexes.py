@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('linkedin_data', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='linkedinpost',
+            index=models.Index(fields=['folder', 'content_type', '-date_posted'], name='linkedin_da_folder__ce126c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='linkedinpost',
+            index=models.Index(fields=['folder', '-date_posted'], name='linkedin_da_folder__31a1f0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='linkedinpost',
+            index=models.Index(fields=['folder', '-likes'], name='linkedin_da_folder__262331_idx'),
+        ),
+    ]
@@ -211,4 +211,8 @@ class LinkedInPost(models.Model):
             models.Index(fields=['date_posted']),
             models.Index(fields=['user_id']),
             models.Index(fields=['post_type']),
+            # Post listings: folder + content type / date range / likes range, newest or most liked first
+            models.Index(fields=['folder', 'content_type', '-date_posted']),
+            models.Index(fields=['folder', '-date_posted']),
+            models.Index(fields=['folder', '-likes']),
         ] 
\ No newline at end of file
@@ -0,0 +1,190 @@
+"""
+Report Artifact Service
+Persists rendered report exports (PDF/CSV) and serves them with HTTP caching
+"""
+
+import hashlib
+import json
+import logging
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import ReportArtifact
+
+logger = logging.getLogger(__name__)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+CONTENT_TYPES = {
+    'pdf': 'application/pdf',
+    'csv': 'text/csv',
+}
+
+
+class FallbackArtifact(Exception):
+    """
+    Raised by a builder that could only produce a degraded fallback export.
+    The content is served for this request but never stored, so the next
+    download tries the full renderer again.
+    """
+
+    def __init__(self, content):
+        super().__init__('fallback export')
+        self.content = content
+
+
+class ReportArtifactService:
+    """
+    Service to build report exports once per results version and serve them from storage
+    """
+
+    def compute_results_hash(self, report):
+        """Hash of everything that affects the rendered export"""
+        payload = json.dumps({
+            'title': report.title,
+            'template_type': report.template.template_type,
+            'results': report.results,
+        }, sort_keys=True, cls=DjangoJSONEncoder)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_or_build(self, report, fmt, builder):
+        """
+        Return the artifact for the report's current results, building it with
+        `builder(report) -> bytes` only when no stored artifact matches.
+        FallbackArtifact raised by the builder propagates; nothing is stored.
+        """
+        results_hash = self.compute_results_hash(report)
+
+        artifact = ReportArtifact.objects.filter(
+            report=report, format=fmt, results_hash=results_hash
+        ).first()
+        if artifact and artifact.file.storage.exists(artifact.file.name):
+            return artifact
+
+        content = builder(report)
+
+        if artifact:
+            # Row survived but the file was removed from storage - rewrite it in place
+            artifact.file.save(self._filename(artifact), ContentFile(content), save=False)
+            artifact.size = len(content)
+            artifact.save(update_fields=['file', 'size'])
+            return artifact
+
+        latest = ReportArtifact.objects.filter(report=report, format=fmt).order_by('-version').first()
+        artifact = ReportArtifact(
+            report=report,
+            format=fmt,
+            results_hash=results_hash,
+            version=(latest.version + 1) if latest else 1,
+            content_type=CONTENT_TYPES[fmt],
+            size=len(content),
+        )
+        artifact.file.save(self._filename(artifact), ContentFile(content), save=False)
+
+        try:
+            with transaction.atomic():
+                artifact.save()
+        except IntegrityError:
+            # A concurrent download built the same version first
+            artifact.file.delete(save=False)
+            return ReportArtifact.objects.get(report=report, format=fmt, results_hash=results_hash)
+
+        self._prune_old_versions(report, fmt)
+        return artifact
+
+    def _filename(self, artifact):
+        return f"{artifact.results_hash[:16]}-v{artifact.version}.{artifact.format}"
+
+    def _prune_old_versions(self, report, fmt):
+        keep = getattr(settings, 'REPORT_ARTIFACT_KEEP_VERSIONS', 3)
+        stale = ReportArtifact.objects.filter(report=report, format=fmt).order_by('-version')[keep:]
+        for artifact in stale:
+            try:
+                artifact.file.delete(save=False)
+            except OSError as e:
+                logger.warning(f"Could not delete report artifact file {artifact.file.name}: {e}")
+            artifact.delete()
+
+    def serve(self, request, artifact, filename):
+        """
+        Serve an artifact with ETag/Last-Modified validators and single byte-range support
+        """
+        etag = artifact.etag
+        last_modified = int(artifact.created_at.timestamp())
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if not_modified is not None:
+            return not_modified
+
+        byte_range = self._requested_range(request, artifact, etag)
+        if byte_range == 'unsatisfiable':
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{artifact.size}'
+        elif byte_range:
+            start, end = byte_range
+            with artifact.file.open('rb') as fh:
+                fh.seek(start)
+                chunk = fh.read(end - start + 1)
+            response = HttpResponse(chunk, status=206, content_type=artifact.content_type)
+            response['Content-Range'] = f'bytes {start}-{end}/{artifact.size}'
+        else:
+            response = FileResponse(artifact.file.open('rb'), content_type=artifact.content_type)
+            response['Content-Length'] = artifact.size
+
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    def serve_unstored(self, content, fmt, filename):
+        """Serve a fallback export that was not stored; clients must not cache it"""
+        response = HttpResponse(content, content_type=CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def _requested_range(self, request, artifact, etag):
+        """Parse a single `Range: bytes=start-end` header into inclusive offsets"""
+        header = request.META.get('HTTP_RANGE', '').strip()
+        if not header:
+            return None
+
+        # If-Range with a stale validator means the client wants the full new file
+        if_range = request.META.get('HTTP_IF_RANGE')
+        if if_range and if_range.strip() != etag:
+            return None
+
+        match = RANGE_RE.match(header)
+        if not match:
+            # Multi-range or malformed requests get the full body
+            return None
+
+        first, last = match.groups()
+        size = artifact.size
+        if not first and not last:
+            return None
+        if not first:
+            # Suffix range: last N bytes
+            length = int(last)
+            if length == 0:
+                return 'unsatisfiable'
+            return max(size - length, 0), size - 1
+
+        start = int(first)
+        end = int(last) if last else size - 1
+        if start >= size or end < start:
+            return 'unsatisfiable'
+        return start, min(end, size - 1)
+
+
+# Global report artifact service instance
+report_artifact_service = ReportArtifactService()
@@ -0,0 +1,318 @@
+"""
+Chart Rendering Service
+Renders report charts to in-memory PNG bytes, in parallel and with caching
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+from threading import Lock
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import seaborn as sns
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# Set matplotlib style (also applied in pool workers when they import this module)
+plt.style.use('seaborn-v0_8')
+sns.set_palette("husl")
+
+# Bump when chart drawing code changes so stale cached PNGs are not served
+CHART_RENDER_VERSION = 1
+
+
+def _figure_to_png(fig, dpi):
+    """Serialise a matplotlib figure to PNG bytes and release it"""
+    buffer = BytesIO()
+    try:
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight',
+                    facecolor='white', edgecolor='none')
+    finally:
+        plt.close(fig)
+    return buffer.getvalue()
+
+
+def draw_sentiment_pie_chart(sentiment_distribution):
+    """Create pie chart for sentiment distribution"""
+    fig, ax = plt.subplots(figsize=(8, 6))
+
+    labels = []
+    sizes = []
+    colors_list = []
+
+    for sentiment, percentage in sentiment_distribution.items():
+        if percentage > 0:
+            labels.append(f'{sentiment.title()}\n({percentage}%)')
+            sizes.append(percentage)
+            if sentiment.lower() == 'positive':
+                colors_list.append('#4CAF50')
+            elif sentiment.lower() == 'negative':
+                colors_list.append('#F44336')
+            else:
+                colors_list.append('#FF9800')
+
+    if sizes:
+        wedges, texts, autotexts = ax.pie(sizes, labels=labels, colors=colors_list,
+                                          autopct='%1.1f%%', startangle=90,
+                                          textprops={'fontsize': 12})
+
+        # Enhance text appearance
+        for autotext in autotexts:
+            autotext.set_color('white')
+            autotext.set_fontweight('bold')
+            autotext.set_fontsize(11)
+
+    ax.set_title('Sentiment Distribution', fontsize=16, fontweight='bold', pad=20)
+    fig.tight_layout()
+    return fig
+
+
+def draw_engagement_trends_chart(trend_data):
+    """Create line chart for engagement trends"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # Sample trend data structure: [{'date': '2024-01', 'likes': 100, 'comments': 50, 'shares': 25}, ...]
+    dates = [item.get('date', '') for item in trend_data]
+    likes = [item.get('likes', 0) for item in trend_data]
+    comments = [item.get('comments', 0) for item in trend_data]
+    shares = [item.get('shares', 0) for item in trend_data]
+
+    if dates and any([likes, comments, shares]):
+        x = range(len(dates))
+
+        ax.plot(x, likes, marker='o', linewidth=2, label='Likes', color='#2196F3')
+        ax.plot(x, comments, marker='s', linewidth=2, label='Comments', color='#4CAF50')
+        ax.plot(x, shares, marker='^', linewidth=2, label='Shares', color='#FF9800')
+
+        ax.set_xlabel('Time Period', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Engagement Count', fontsize=12, fontweight='bold')
+        ax.set_title('Engagement Trends Over Time', fontsize=16, fontweight='bold', pad=20)
+
+        ax.set_xticks(x)
+        ax.set_xticklabels(dates, rotation=45, ha='right')
+        ax.legend(loc='upper left', frameon=True, fancybox=True, shadow=True)
+        ax.grid(True, alpha=0.3)
+
+        # Add value annotations on peaks
+        if likes:
+            max_likes_idx = likes.index(max(likes))
+            ax.annotate(f'Peak: {max(likes)}',
+                        xy=(max_likes_idx, max(likes)),
+                        xytext=(10, 10), textcoords='offset points',
+                        bbox=dict(boxstyle='round,pad=0.3', fc='yellow', alpha=0.7),
+                        arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0'))
+
+    fig.tight_layout()
+    return fig
+
+
+def draw_platform_performance_chart(platform_data):
+    """Create bar chart for platform performance"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    platforms = list(platform_data.keys())
+    engagement_rates = [data.get('avg_engagement', 0) for data in platform_data.values()]
+
+    if platforms and engagement_rates:
+        colors_list = ['#E1306C', '#1877F2', '#0A66C2', '#000000', '#FF0000'][:len(platforms)]
+
+        bars = ax.bar(platforms, engagement_rates, color=colors_list, alpha=0.8, edgecolor='black', linewidth=1)
+
+        # Add value labels on bars
+        for bar, rate in zip(bars, engagement_rates):
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                    f'{rate:.1f}%', ha='center', va='bottom', fontweight='bold')
+
+        ax.set_xlabel('Platform', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Average Engagement Rate (%)', fontsize=12, fontweight='bold')
+        ax.set_title('Platform Performance Comparison', fontsize=16, fontweight='bold', pad=20)
+        ax.grid(True, alpha=0.3, axis='y')
+
+        # Customize platform labels
+        ax.tick_params(axis='x', labelsize=11, rotation=45)
+        ax.tick_params(axis='y', labelsize=11)
+
+    fig.tight_layout()
+    return fig
+
+
+def draw_content_type_chart(content_performance):
+    """Create horizontal bar chart for content type performance"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    content_types = list(content_performance.keys())
+    engagement_values = [data.get('avg_engagement', 0) for data in content_performance.values()]
+
+    if content_types and engagement_values:
+        colors_list = plt.cm.Set3(np.linspace(0, 1, len(content_types)))
+
+        bars = ax.barh(content_types, engagement_values, color=colors_list, alpha=0.8, edgecolor='black')
+
+        # Add value labels
+        for bar, value in zip(bars, engagement_values):
+            width = bar.get_width()
+            ax.text(width + 0.5, bar.get_y() + bar.get_height()/2.,
+                    f'{value:.1f}', ha='left', va='center', fontweight='bold')
+
+        ax.set_xlabel('Average Engagement', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Content Type', fontsize=12, fontweight='bold')
+        ax.set_title('Content Type Performance', fontsize=16, fontweight='bold', pad=20)
+        ax.grid(True, alpha=0.3, axis='x')
+
+    fig.tight_layout()
+    return fig
+
+
+def draw_keyword_cloud_chart(keywords):
+    """Create a visual representation of trending keywords"""
+    fig, ax = plt.subplots(figsize=(10, 6))
+
+    # Extract top 15 keywords
+    top_keywords = keywords[:15]
+    keyword_names = [k.get('keyword', '') for k in top_keywords]
+    keyword_counts = [k.get('count', 0) for k in top_keywords]
+
+    if keyword_names and keyword_counts:
+        # Create bubble chart
+        colors = plt.cm.viridis(np.linspace(0, 1, len(keyword_names)))
+        sizes = [count * 50 for count in keyword_counts]  # Scale for visibility
+
+        ax.scatter(range(len(keyword_names)), keyword_counts,
+                   s=sizes, c=colors, alpha=0.7, edgecolors='black')
+
+        # Add keyword labels
+        for i, (keyword, count) in enumerate(zip(keyword_names, keyword_counts)):
+            ax.annotate(keyword, (i, count), xytext=(5, 5),
+                        textcoords='offset points', fontsize=9, fontweight='bold')
+
+        ax.set_xlabel('Keywords (ranked by frequency)', fontsize=12, fontweight='bold')
+        ax.set_ylabel('Frequency Count', fontsize=12, fontweight='bold')
+        ax.set_title('Trending Keywords Analysis', fontsize=16, fontweight='bold', pad=20)
+        ax.set_xticks(range(len(keyword_names)))
+        ax.set_xticklabels([f'#{i+1}' for i in range(len(keyword_names))])
+        ax.grid(True, alpha=0.3)
+
+    fig.tight_layout()
+    return fig
+
+
+CHART_DRAWERS = {
+    'sentiment_pie': draw_sentiment_pie_chart,
+    'engagement_trends': draw_engagement_trends_chart,
+    'platform_performance': draw_platform_performance_chart,
+    'content_type': draw_content_type_chart,
+    'keyword_cloud': draw_keyword_cloud_chart,
+}
+
+
+def render_chart_spec(spec):
+    """
+    Render a single chart spec to PNG bytes.
+
+    Module-level so it can be pickled into pool worker processes.
+    """
+    drawer = CHART_DRAWERS[spec['kind']]
+    fig = drawer(spec['data'])
+    return _figure_to_png(fig, spec.get('dpi', 150))
+
+
+class ChartRenderService:
+    """
+    Service to render report charts concurrently with a content-addressed cache
+    """
+
+    CACHE_PREFIX = 'report_chart'
+
+    def __init__(self, max_workers=None, cache_timeout=None):
+        if max_workers is None:
+            max_workers = getattr(settings, 'REPORT_CHART_WORKERS', min(4, os.cpu_count() or 1))
+        if cache_timeout is None:
+            cache_timeout = getattr(settings, 'REPORT_CHART_CACHE_TIMEOUT', 24 * 3600)
+        self.max_workers = max_workers
+        self.cache_timeout = cache_timeout
+        self._executor = None
+        self._executor_lock = Lock()
+
+    @staticmethod
+    def make_spec(kind, data, dpi=150):
+        """Build a chart spec; the spec is the cache identity of the rendered chart"""
+        if kind not in CHART_DRAWERS:
+            raise ValueError(f"Unknown chart kind: {kind}")
+        return {'kind': kind, 'data': data, 'dpi': dpi, 'version': CHART_RENDER_VERSION}
+
+    def spec_key(self, spec):
+        """Stable cache key derived from a hash of the chart spec"""
+        payload = json.dumps(spec, sort_keys=True, default=str).encode('utf-8')
+        return f"{self.CACHE_PREFIX}:{hashlib.sha256(payload).hexdigest()}"
+
+    def _get_executor(self):
+        with self._executor_lock:
+            if self._executor is None:
+                # Spawned workers avoid inheriting locks/threads from the web worker
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                )
+            return self._executor
+
+    def _reset_executor(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    def shutdown(self):
+        """Stop pool worker processes"""
+        self._reset_executor()
+
+    def _render_uncached(self, specs):
+        """Render specs that missed the cache, in the process pool when worthwhile"""
+        if self.max_workers <= 1 or len(specs) <= 1:
+            return [render_chart_spec(spec) for spec in specs]
+
+        try:
+            return list(self._get_executor().map(render_chart_spec, specs))
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Chart process pool unavailable, rendering serially: {e}")
+            self._reset_executor()
+            return [render_chart_spec(spec) for spec in specs]
+
+    def render_many(self, specs):
+        """
+        Render a list of chart specs, returning PNG bytes in the same order.
+        Cached charts are not re-rendered.
+        """
+        keys = [self.spec_key(spec) for spec in specs]
+        cached = cache.get_many(keys)
+
+        missing = {}
+        for key, spec in zip(keys, specs):
+            if key not in cached and key not in missing:
+                missing[key] = spec
+
+        if missing:
+            rendered = self._render_uncached(list(missing.values()))
+            fresh = dict(zip(missing.keys(), rendered))
+            cache.set_many(fresh, timeout=self.cache_timeout)
+            cached.update(fresh)
+
+        return [cached[key] for key in keys]
+
+    def render(self, spec):
+        """Render a single chart spec to PNG bytes"""
+        return self.render_many([spec])[0]
+
+
+# Global chart render service instance
+chart_render_service = ChartRenderService()
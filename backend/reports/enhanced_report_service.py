@@ -1348,6 +1348,22 @@ Top 5 Performing Posts:
             trend_data = []
             growth_rate = 0
 
+        # Measured growth from the engagement snapshot history, where the project has one
+        engagement_growth = []
+        if project_id:
+            from track_accounts.engagement_history import engagement_history_service
+            curve = engagement_history_service.growth_curve(project_id=project_id, buckets=8, bucket_days=7)
+            measured_rate = engagement_history_service.growth_rate(curve)
+            if measured_rate is not None:
+                growth_rate = measured_rate
+                engagement_growth = [{
+                    'period': window['start'].strftime('%b %d'),
+                    'likes': window['likes'],
+                    'likes_growth': window['likes_growth'],
+                    'comments_growth': window['num_comments_growth'],
+                    'posts': window['posts'],
+                } for window in curve]
+
         # OpenAI Analysis
         ai_insights = []
         ai_recommendations = []
@@ -1380,6 +1396,7 @@ Top 5 Performing Posts:
             'total_posts': len(posts),
             'growth_rate': round(growth_rate, 1),
             'trend_data': trend_data,
+            'engagement_growth': engagement_growth,
             'insights': ai_insights if ai_insights else [f"Growth rate: {growth_rate:.1f}%"],
             'recommendations': ai_recommendations if ai_recommendations else None,
             'visualizations': {
@@ -0,0 +1,34 @@
+# Generated by Django 5.2 on 2026-10-19 15:29
+
+import django.db.models.deletion
+import reports.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('format', models.CharField(choices=[('pdf', 'PDF'), ('csv', 'CSV')], max_length=10)),
+                ('results_hash', models.CharField(max_length=64)),
+                ('version', models.PositiveIntegerField(default=1)),
+                ('file', models.FileField(max_length=255, storage=reports.models.get_report_artifact_storage, upload_to=reports.models.report_artifact_upload_to)),
+                ('content_type', models.CharField(max_length=100)),
+                ('size', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('report', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='artifacts', to='reports.generatedreport')),
+            ],
+            options={
+                'ordering': ['-version'],
+                'indexes': [models.Index(fields=['report', 'format', '-version'], name='reports_rep_report__d07b45_idx')],
+                'unique_together': {('report', 'format', 'results_hash')},
+            },
+        ),
+    ]
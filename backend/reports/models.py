@@ -1,6 +1,9 @@
 from django.db import models
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
 import json
+import os
 
 # Create your models here.
 class Report(models.Model):
@@ -81,3 +84,57 @@ class GeneratedReport(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+
+
+def report_artifact_upload_to(instance, filename):
+    """Artifacts are grouped per report: <report_id>/<format>/<hash>-v<version>.<ext>"""
+    return f"{instance.report_id}/{instance.format}/{filename}"
+
+
+class ReportArtifactStorage(FileSystemStorage):
+    """Filesystem storage rooted at REPORT_ARTIFACTS_ROOT, resolved on every access"""
+
+    @property
+    def base_location(self):
+        return settings.REPORT_ARTIFACTS_ROOT
+
+    @property
+    def location(self):
+        return os.path.abspath(self.base_location)
+
+
+def get_report_artifact_storage():
+    return ReportArtifactStorage()
+
+
+class ReportArtifact(models.Model):
+    """
+    Rendered export (PDF/CSV) of a generated report, keyed by a hash of its results
+    """
+    FORMAT_CHOICES = [
+        ('pdf', 'PDF'),
+        ('csv', 'CSV'),
+    ]
+
+    report = models.ForeignKey(GeneratedReport, on_delete=models.CASCADE, related_name='artifacts')
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    results_hash = models.CharField(max_length=64)
+    version = models.PositiveIntegerField(default=1)
+    file = models.FileField(upload_to=report_artifact_upload_to, storage=get_report_artifact_storage, max_length=255)
+    content_type = models.CharField(max_length=100)
+    size = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.report_id} {self.format} v{self.version}"
+
+    @property
+    def etag(self):
+        return f'"{self.results_hash[:32]}-{self.format}-v{self.version}"'
+
+    class Meta:
+        ordering = ['-version']
+        unique_together = ['report', 'format', 'results_hash']
+        indexes = [
+            models.Index(fields=['report', 'format', '-version']),
+        ]
@@ -1,3 +1,123 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APITestCase
+
+from .chart_renderer import ChartRenderService
+from .models import GeneratedReport, ReportArtifact, ReportTemplate
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class ChartRenderServiceTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.service = ChartRenderService(max_workers=1)
+
+    def test_render_many_returns_png_bytes_in_order(self):
+        """Rendered charts are PNG bytes returned in spec order"""
+        specs = [
+            self.service.make_spec('sentiment_pie', {'positive': 60, 'negative': 10, 'neutral': 30}),
+            self.service.make_spec('keyword_cloud', [{'keyword': 'nike', 'count': 4}]),
+        ]
+
+        charts = self.service.render_many(specs)
+
+        self.assertEqual(len(charts), 2)
+        for png in charts:
+            self.assertTrue(png.startswith(PNG_SIGNATURE))
+        self.assertEqual(charts[0], self.service.render(specs[0]))
+
+    def test_identical_specs_are_served_from_cache(self):
+        """A chart spec is rendered once and then read back from the cache"""
+        spec = self.service.make_spec('content_type', {'video': {'avg_engagement': 12.5}})
+
+        with mock.patch('reports.chart_renderer.render_chart_spec', return_value=b'png') as render:
+            self.service.render_many([spec, spec])
+            self.service.render(spec)
+
+        render.assert_called_once()
+
+    def test_unknown_chart_kind_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.service.make_spec('radar', {})
+
+
+class ReportArtifactDownloadTest(APITestCase):
+    def setUp(self):
+        self.artifact_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.artifact_root, ignore_errors=True)
+        settings_override = override_settings(REPORT_ARTIFACTS_ROOT=self.artifact_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        template = ReportTemplate.objects.create(
+            name='Trend Analysis',
+            description='Trends',
+            template_type='trend_analysis',
+        )
+        self.report = GeneratedReport.objects.create(
+            title='Weekly Trends',
+            template=template,
+            status='completed',
+            results={'total_posts': 10, 'growth': 2.5},
+        )
+        self.url = f'/api/reports/generated/{self.report.id}/download_csv/'
+
+    def _body(self, response):
+        return b''.join(response.streaming_content) if response.streaming else response.content
+
+    def test_repeated_downloads_reuse_stored_artifact(self):
+        """The CSV is rendered once and served from storage afterwards"""
+        with mock.patch('reports.views.GeneratedReportViewSet._build_csv_bytes',
+                        autospec=True, return_value=b'Key,Value\r\n') as build:
+            first = self.client.get(self.url)
+            second = self.client.get(self.url)
+
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self._body(second), b'Key,Value\r\n')
+        self.assertEqual(first['ETag'], second['ETag'])
+        build.assert_called_once()
+        self.assertEqual(ReportArtifact.objects.filter(report=self.report, format='csv').count(), 1)
+
+    def test_fallback_pdf_is_served_but_not_stored(self):
+        url = f'/api/reports/generated/{self.report.id}/download_pdf/'
+        with mock.patch('reports.views.report_openai_service.generate_enhanced_pdf',
+                        side_effect=RuntimeError('charts unavailable')):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'no-store')
+        self.assertTrue(response.content.startswith(b'%PDF'))
+        self.assertFalse(ReportArtifact.objects.filter(report=self.report, format='pdf').exists())
+
+    def test_conditional_request_returns_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_range_request_returns_partial_content(self):
+        full = self._body(self.client.get(self.url))
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-4')
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.content, full[:5])
+        self.assertEqual(response['Content-Range'], f'bytes 0-4/{len(full)}')
+
+    def test_changed_results_produce_new_version(self):
+        first_etag = self.client.get(self.url)['ETag']
+
+        self.report.results = {'total_posts': 11, 'growth': 3.0}
+        self.report.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first_etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first_etag)
+        versions = ReportArtifact.objects.filter(report=self.report, format='csv').values_list('version', flat=True)
+        self.assertEqual(sorted(versions), [1, 2])
@@ -9,6 +9,7 @@ import random
 import time
 from datetime import datetime, timedelta
 import csv
+import io
 import logging
 from django.core.serializers.json import DjangoJSONEncoder
 
@@ -17,6 +18,7 @@ from .models import ReportTemplate, GeneratedReport
 from rest_framework import serializers
 from .openai_service import report_openai_service
 from .pdf_generator import pdf_generator
+from .artifacts import FallbackArtifact, report_artifact_service
 from rest_framework.permissions import IsAuthenticated
 
 # Serializers
@@ -317,31 +319,10 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            # Create CSV response
-            response = HttpResponse(content_type='text/csv')
-            response['Content-Disposition'] = f'attachment; filename="{report.title.replace(" ", "_")}_{report.id}.csv"'
-            
-            writer = csv.writer(response)
-            
-            if report.template.template_type == 'sentiment_analysis':
-                # Write sentiment analysis CSV
-                writer.writerow(['Comment ID', 'Comment Text', 'Sentiment', 'Confidence', 'Timestamp'])
-                
-                for item in report.results.get('detailed_analysis', []):
-                    writer.writerow([
-                        item['id'],
-                        item['comment'],
-                        item['sentiment'],
-                        item['confidence'],
-                        item['timestamp']
-                    ])
-            else:
-                # Generic CSV export
-                writer.writerow(['Key', 'Value'])
-                for key, value in report.results.items():
-                    writer.writerow([key, str(value)])
-            
-            return response
+            # Reuse the stored CSV unless the report results changed
+            artifact = report_artifact_service.get_or_build(report, 'csv', self._build_csv_bytes)
+            filename = f'{report.title.replace(" ", "_")}_{report.id}.csv'
+            return report_artifact_service.serve(request, artifact, filename)
 
         except Exception as e:
             return Response(
@@ -349,6 +330,31 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _build_csv_bytes(self, report):
+        """Render report results as CSV bytes"""
+        output = io.StringIO()
+        writer = csv.writer(output)
+        
+        if report.template.template_type == 'sentiment_analysis':
+            # Write sentiment analysis CSV
+            writer.writerow(['Comment ID', 'Comment Text', 'Sentiment', 'Confidence', 'Timestamp'])
+            
+            for item in report.results.get('detailed_analysis', []):
+                writer.writerow([
+                    item['id'],
+                    item['comment'],
+                    item['sentiment'],
+                    item['confidence'],
+                    item['timestamp']
+                ])
+        else:
+            # Generic CSV export
+            writer.writerow(['Key', 'Value'])
+            for key, value in report.results.items():
+                writer.writerow([key, str(value)])
+        
+        return output.getvalue().encode('utf-8')
+
     @action(detail=True, methods=['GET'])
     def download_pdf(self, request, pk=None):
         """
@@ -363,36 +369,13 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            # Generate PDF with enhanced visualizations
+            # Reuse the stored PDF unless the report results changed
+            filename = f'{report.title.replace(" ", "_")}_{report.id}.pdf'
             try:
-                pdf_buffer = report_openai_service.generate_enhanced_pdf(
-                    report.results, report.title, report.template.template_type
-                )
-            except Exception as e:
-                # Fallback to basic PDF generator if enhanced fails
-                print(f"Enhanced PDF generation failed, using fallback: {e}")
-                if report.template.template_type == 'sentiment_analysis':
-                    pdf_buffer = pdf_generator.generate_sentiment_analysis_pdf(
-                        report.results, report.title
-                    )
-                elif report.template.template_type == 'engagement_metrics':
-                    pdf_buffer = pdf_generator.generate_engagement_metrics_pdf(
-                        report.results, report.title
-                    )
-                elif report.template.template_type == 'content_analysis':
-                    pdf_buffer = pdf_generator.generate_content_analysis_pdf(
-                        report.results, report.title
-                    )
-                else:
-                    pdf_buffer = pdf_generator.generate_generic_pdf(
-                        report.results, report.title, report.template.template_type
-                    )
-
-            # Create PDF response
-            response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="{report.title.replace(" ", "_")}_{report.id}.pdf"'
-
-            return response
+                artifact = report_artifact_service.get_or_build(report, 'pdf', self._build_pdf_bytes)
+            except FallbackArtifact as fallback:
+                return report_artifact_service.serve_unstored(fallback.content, 'pdf', filename)
+            return report_artifact_service.serve(request, artifact, filename)
 
         except Exception as e:
             return Response(
@@ -400,6 +383,39 @@ class GeneratedReportViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _build_pdf_bytes(self, report):
+        """
+        Render report results as PDF bytes. When the enhanced generator fails
+        the basic PDF is raised as a FallbackArtifact so it is never stored.
+        """
+        # Generate PDF with enhanced visualizations
+        try:
+            pdf_buffer = report_openai_service.generate_enhanced_pdf(
+                report.results, report.title, report.template.template_type
+            )
+        except Exception as e:
+            # Fallback to basic PDF generator if enhanced fails
+            logger.warning(f"Enhanced PDF generation failed for report {report.id}, using fallback: {e}")
+            if report.template.template_type == 'sentiment_analysis':
+                pdf_buffer = pdf_generator.generate_sentiment_analysis_pdf(
+                    report.results, report.title
+                )
+            elif report.template.template_type == 'engagement_metrics':
+                pdf_buffer = pdf_generator.generate_engagement_metrics_pdf(
+                    report.results, report.title
+                )
+            elif report.template.template_type == 'content_analysis':
+                pdf_buffer = pdf_generator.generate_content_analysis_pdf(
+                    report.results, report.title
+                )
+            else:
+                pdf_buffer = pdf_generator.generate_generic_pdf(
+                    report.results, report.title, report.template.template_type
+                )
+            raise FallbackArtifact(pdf_buffer.getvalue())
+
+        return pdf_buffer.getvalue()
+
     def _process_engagement_metrics_with_real_data(self, report, project_id=None):
         """Process engagement metrics using real Instagram data"""
         start_time = time.time()
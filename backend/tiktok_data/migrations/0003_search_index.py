@@ -0,0 +1,16 @@
+# Full-text search index: tsvector + GIN on PostgreSQL, FTS5 on SQLite
+
+from django.db import migrations
+
+from common.full_text_search import install_migration
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tiktok_data', '0002_initial'),
+    ]
+
+    operations = [
+        install_migration('tiktok_data.TikTokPost'),
+    ]
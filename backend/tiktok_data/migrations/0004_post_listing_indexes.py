@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-19 16:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tiktok_data', '0003_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='tiktokpost',
+            index=models.Index(fields=['folder', 'content_type', '-date_posted'], name='tiktok_data_folder__bce6ae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tiktokpost',
+            index=models.Index(fields=['folder', '-date_posted'], name='tiktok_data_folder__f62ca9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tiktokpost',
+            index=models.Index(fields=['folder', '-likes'], name='tiktok_data_folder__e422ac_idx'),
+        ),
+    ]
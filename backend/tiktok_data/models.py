@@ -117,4 +117,8 @@ class TikTokPost(models.Model):
             models.Index(fields=['user_posted']),
             models.Index(fields=['post_id']),
             models.Index(fields=['date_posted']),
+            # Post listings: folder + content type / date range / likes range, newest or most liked first
+            models.Index(fields=['folder', 'content_type', '-date_posted']),
+            models.Index(fields=['folder', '-date_posted']),
+            models.Index(fields=['folder', '-likes']),
         ] 
\ No newline at end of file
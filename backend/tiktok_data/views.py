@@ -11,6 +11,8 @@ from django.http import HttpResponse
 from .models import TikTokPost, Folder
 from .serializers import TikTokPostSerializer, FolderSerializer
 from django.db.models import Q
+from common import full_text_search
+from track_accounts.unified_posts import unified_post_service
 
 # Try to import dateparser, but provide a fallback if it's not available
 try:
@@ -248,13 +250,7 @@ class TikTokPostViewSet(viewsets.ModelViewSet):
         # Add search functionality
         search_query = self.request.query_params.get('search', '')
         if search_query:
-            queryset = queryset.filter(
-                Q(user_posted__icontains=search_query) |
-                Q(description__icontains=search_query) |
-                Q(hashtags__icontains=search_query) |
-                Q(content_type__icontains=search_query) |
-                Q(post_id__icontains=search_query)
-            )
+            queryset = full_text_search.search(queryset, search_query)
         
         return queryset
 
@@ -384,6 +380,7 @@ class TikTokPostViewSet(viewsets.ModelViewSet):
             return None
 
     @action(detail=False, methods=['POST'])
+    @unified_post_service.deferred()
     def upload_csv(self, request):
         """
         Upload CSV file and parse the data
@@ -582,6 +579,7 @@ class TikTokPostViewSet(viewsets.ModelViewSet):
             return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=False, methods=['POST'])
+    @unified_post_service.deferred()
     def move_to_folder(self, request):
         """
         Move posts to a specified folder
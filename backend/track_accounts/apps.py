@@ -5,3 +5,10 @@ class TrackAccountsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "track_accounts"
     verbose_name = "Track Accounts"
+
+    def ready(self):
+        import track_accounts.signals
+        from django.db.models.signals import post_migrate
+        from common.full_text_search import ensure_sqlite_triggers
+
+        post_migrate.connect(ensure_sqlite_triggers, sender=self)
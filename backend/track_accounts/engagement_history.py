@@ -0,0 +1,194 @@
+"""
+Engagement History
+Append-only engagement snapshots of unified posts, their retention policy and
+numpy growth curves over them
+"""
+
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db.models import F, OuterRef, Subquery, Window
+from django.db.models.functions import RowNumber, Trunc
+from django.utils import timezone
+
+from .unified_posts import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+class EngagementHistoryService:
+    """
+    UnifiedPostService records a snapshot whenever a sync changes a post's
+    metrics, so unchanged re-scrapes cost nothing and the history is exact:
+    between two snapshots the metrics were those of the first.
+
+    compact() applies the retention policy: everything is kept for
+    ENGAGEMENT_SNAPSHOT_RAW_DAYS, then the last snapshot per hour until
+    ENGAGEMENT_SNAPSHOT_HOURLY_DAYS, then the last per day until
+    ENGAGEMENT_SNAPSHOT_RETENTION_DAYS, after which snapshots are deleted.
+    """
+
+    def __init__(self, get_model=global_apps.get_model):
+        self.get_model = get_model
+
+    @property
+    def policy(self) -> Dict[str, int]:
+        return {
+            'raw_days': getattr(settings, 'ENGAGEMENT_SNAPSHOT_RAW_DAYS', 2),
+            'hourly_days': getattr(settings, 'ENGAGEMENT_SNAPSHOT_HOURLY_DAYS', 30),
+            'retention_days': getattr(settings, 'ENGAGEMENT_SNAPSHOT_RETENTION_DAYS', 365),
+        }
+
+    # Writing
+
+    def record(self, observations: Iterable[Tuple[int, Dict[str, int]]], observed_at=None) -> int:
+        """Append one snapshot per (unified post id, metrics)"""
+        EngagementSnapshot = self.get_model('track_accounts.EngagementSnapshot')
+        observed_at = observed_at or timezone.now()
+        created = EngagementSnapshot.objects.bulk_create([
+            EngagementSnapshot(post_id=post_id, observed_at=observed_at, **{metric: metrics[metric] for metric in METRICS})
+            for post_id, metrics in observations
+        ], batch_size=1000)
+        return len(created)
+
+    def record_changes(self, post_ids: Iterable[int], observed_at=None) -> int:
+        """
+        Snapshot the posts whose stored metrics differ from their latest
+        snapshot, or that have none yet, comparing in one query. Reading the
+        stored values rather than what a sync wrote keeps concurrent syncs of
+        the same post from recording it twice.
+        """
+        post_ids = list(post_ids)
+        if not post_ids:
+            return 0
+        latest = (self.get_model('track_accounts.EngagementSnapshot').objects
+                  .filter(post=OuterRef('pk')).order_by('-observed_at', '-id'))
+        rows = (self.get_model('track_accounts.UnifiedPost').objects.filter(pk__in=post_ids)
+                .annotate(**{f'last_{metric}': Subquery(latest.values(metric)[:1]) for metric in METRICS})
+                .values('pk', *METRICS, *(f'last_{metric}' for metric in METRICS)))
+        changed = [(row['pk'], row) for row in rows if any(row[metric] != row[f'last_{metric}'] for metric in METRICS)]
+        return self.record(changed, observed_at)
+
+    def compact(self, now=None, dry_run: bool = False) -> Dict[str, int]:
+        """Thin old snapshots to hourly and daily resolution and drop expired ones"""
+        EngagementSnapshot = self.get_model('track_accounts.EngagementSnapshot')
+        now = now or timezone.now()
+        policy = self.policy
+        raw_cutoff = now - timedelta(days=policy['raw_days'])
+        hourly_cutoff = now - timedelta(days=policy['hourly_days'])
+        retention_cutoff = now - timedelta(days=policy['retention_days'])
+
+        expired = EngagementSnapshot.objects.filter(observed_at__lt=retention_cutoff)
+        result = {'expired': expired.count() if dry_run else expired.delete()[0]}
+        for name, kind, start, stop in (('hourly', 'hour', hourly_cutoff, raw_cutoff),
+                                        ('daily', 'day', retention_cutoff, hourly_cutoff)):
+            # All but the last snapshot of each post in each hour/day of the window
+            superseded = list(
+                EngagementSnapshot.objects.filter(observed_at__gte=start, observed_at__lt=stop)
+                .annotate(newer=Window(RowNumber(), partition_by=[F('post_id'), Trunc('observed_at', kind)],
+                                       order_by=F('observed_at').desc()))
+                .filter(newer__gt=1).values_list('id', flat=True)
+            )
+            if not dry_run:
+                for offset in range(0, len(superseded), 500):
+                    EngagementSnapshot.objects.filter(id__in=superseded[offset:offset + 500]).delete()
+            result[name] = len(superseded)
+        return result
+
+    # Reading
+
+    def snapshots(self, project_id=None, post_ids=None, until=None):
+        queryset = self.get_model('track_accounts.EngagementSnapshot').objects.all()
+        if project_id:
+            queryset = queryset.filter(post__project_id=project_id)
+        if post_ids is not None:
+            queryset = queryset.filter(post_id__in=post_ids)
+        if until:
+            queryset = queryset.filter(observed_at__lt=until)
+        return queryset
+
+    def curves(self, project_id=None, post_ids=None, buckets: int = 8, bucket_days: int = 7, end=None):
+        """
+        Metrics of every post at the end of each of `buckets` windows of
+        `bucket_days` ending at `end`, from two queries that skip snapshots
+        older than each post's last one before the first window.
+
+        Returns (post ids, window edges, states, openings). states has shape
+        (posts, buckets + 1, len(METRICS)): column 0 is the state before the
+        first window, NaN where a post had not been observed yet. openings
+        (posts, buckets, len(METRICS)) is each window's starting point for
+        growth: the previous state, or the post's first snapshot in the
+        window if it had none.
+        """
+        end = end or timezone.now()
+        edges = [end - timedelta(days=(buckets - i) * bucket_days) for i in range(buckets + 1)]
+        # Only the windows' snapshots and, for the state before them, each post's last earlier one
+        fields = ('post_id', 'observed_at', *METRICS)
+        earlier = (self.snapshots(project_id, post_ids, until=edges[0])
+                   .annotate(newer=Window(RowNumber(), partition_by=[F('post_id')],
+                                          order_by=[F('observed_at').desc(), F('id').desc()]))
+                   .filter(newer=1).values_list(*fields))
+        recent = (self.snapshots(project_id, post_ids, until=end).filter(observed_at__gte=edges[0])
+                  .order_by('post_id', 'observed_at').values_list(*fields))
+        rows = sorted([*earlier, *recent], key=lambda row: row[:2])
+        if not rows:
+            return (np.zeros(0, dtype=np.int64), edges, np.full((0, buckets + 1, len(METRICS)), np.nan),
+                    np.full((0, buckets, len(METRICS)), np.nan))
+
+        posts = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+        times = np.fromiter((row[1].timestamp() for row in rows), dtype=np.float64, count=len(rows))
+        values = np.array([row[2:] for row in rows], dtype=np.float64)
+
+        ids, post_index = np.unique(posts, return_inverse=True)
+        column = np.searchsorted(np.array([edge.timestamp() for edge in edges]), times, side='right')
+        # Rows are ordered by post then time, so the last row of each (post, column) run is its state
+        key = post_index * (buckets + 1) + column
+        boundary = key[1:] != key[:-1]
+        last, first = np.append(boundary, True), np.insert(boundary, 0, True)
+        states = np.full((len(ids), buckets + 1, len(METRICS)), np.nan)
+        states[post_index[last], column[last]] = values[last]
+        firsts = np.full_like(states, np.nan)
+        firsts[post_index[first], column[first]] = values[first]
+
+        # Forward fill: a window without a snapshot keeps the previous state
+        observed = ~np.isnan(states[:, :, 0])
+        source = np.maximum.accumulate(np.where(observed, np.arange(buckets + 1), 0), axis=1)
+        states = states[np.arange(len(ids))[:, None], source]
+        openings = np.where(np.isnan(states[:, :-1]), firsts[:, 1:], states[:, :-1])
+        return ids, edges, states, openings
+
+    def growth_curve(self, project_id=None, post_ids=None, buckets: int = 8, bucket_days: int = 7,
+                     end=None) -> List[Dict[str, Any]]:
+        """
+        Per window, oldest first: posts observed so far, their metric totals at
+        the window end and the growth within the window. Growth only counts
+        change between snapshots, so a post first scraped in a window grows
+        from its first snapshot there, not from zero.
+        """
+        ids, edges, states, openings = self.curves(project_id, post_ids, buckets, bucket_days, end)
+        totals = np.nansum(states[:, 1:], axis=0)
+        growth = np.nansum(states[:, 1:] - openings, axis=0)
+        tracked = (~np.isnan(states[:, 1:, 0])).sum(axis=0)
+        return [
+            {
+                'start': edges[i], 'end': edges[i + 1], 'posts': int(tracked[i]),
+                **{metric: int(totals[i, m]) for m, metric in enumerate(METRICS)},
+                **{f'{metric}_growth': int(growth[i, m]) for m, metric in enumerate(METRICS)},
+            }
+            for i in range(buckets)
+        ]
+
+    def growth_rate(self, curve: List[Dict[str, Any]], metric: str = 'likes') -> Optional[float]:
+        """Growth of the last window relative to the total at its start, in percent"""
+        if not curve:
+            return None
+        last = curve[-1]
+        base = last[metric] - last[f'{metric}_growth']
+        return round(last[f'{metric}_growth'] / base * 100, 1) if base > 0 else None
+
+
+engagement_history_service = EngagementHistoryService()
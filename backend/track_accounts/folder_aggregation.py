@@ -0,0 +1,160 @@
+"""
+Folder Aggregation Service
+Gathers posts from a UnifiedRunFolder and all of its subfolders in-process, across
+webhook-delivered BrightData posts and the platform post tables, one page at a time
+"""
+
+import logging
+
+from django.db.models import CharField, F, IntegerField, Q, TextField, Value
+from django.db.models.functions import Coalesce, NullIf
+
+from common.keyset_pagination import FieldProjection, before_cursor, keyset_page, page_number, page_size
+from .models import UnifiedRunFolder
+
+logger = logging.getLogger(__name__)
+
+# Fields of an aggregated post, in response order
+FIELDS = ('id', 'post_id', 'url', 'user_posted', 'content', 'likes', 'num_comments', 'date_posted',
+          'platform', 'folder_id', 'webhook_delivered', 'created_at')
+
+
+def _first_text(*fields):
+    """First non-empty text column, so every UNION member exposes one content column"""
+    if len(fields) == 1:
+        return Coalesce(F(fields[0]), Value(''), output_field=TextField())
+    return Coalesce(*(NullIf(F(field), Value('')) for field in fields), Value(''), output_field=TextField())
+
+
+class FolderAggregationService:
+    """
+    Posts of a folder subtree as one UNION ALL query, newest first.
+
+    A page costs one folder lookup, one query per folder level to resolve the
+    subtree, one count (first page only) and one keyset page query over
+    (created_at, id), however many subfolders and platforms are involved.
+    """
+
+    # Run > platform > service > job > content is five levels; anything deeper
+    # is a cycle or corrupt data
+    MAX_DEPTH = 8
+
+    # Model columns every post table has, and computed columns (annotated per
+    # UNION member under a name no model field uses)
+    COLUMNS = ('id', 'post_id', 'url', 'user_posted', 'likes', 'num_comments', 'date_posted', 'created_at')
+    COMPUTED = {
+        'content': 'agg_content',
+        'platform': 'agg_platform',
+        'folder_id': 'agg_folder_id',
+        'webhook_delivered': 'agg_webhook',
+    }
+
+    @staticmethod
+    def _platform_models():
+        from facebook_data.models import FacebookPost
+        from instagram_data.models import InstagramPost
+        from linkedin_data.models import LinkedInPost
+        from tiktok_data.models import TikTokPost
+        return {
+            'facebook': (FacebookPost, _first_text('content', 'description')),
+            'instagram': (InstagramPost, _first_text('description')),
+            'linkedin': (LinkedInPost, _first_text('description', 'post_text')),
+            'tiktok': (TikTokPost, _first_text('description')),
+        }
+
+    def subtree_ids(self, folder_id):
+        """Ids of the folder and every folder below it, one query per level"""
+        folder_ids, frontier = [int(folder_id)], [int(folder_id)]
+        for _ in range(self.MAX_DEPTH):
+            frontier = [
+                child_id for child_id in
+                UnifiedRunFolder.objects.filter(parent_folder_id__in=frontier).values_list('id', flat=True)
+                if child_id not in folder_ids
+            ]
+            if not frontier:
+                break
+            folder_ids.extend(frontier)
+        return folder_ids
+
+    def posts(self, folder_ids, fields=FIELDS, cursor=None):
+        """UNION ALL of every post under the given folders, as value rows of the given fields"""
+        from brightdata_integration.models import BrightDataScrapedPost
+
+        columns = [field for field in self.COLUMNS if field in fields or field in ('created_at', 'id')]
+        computed = [field for field in fields if field in self.COMPUTED]
+        after = before_cursor(cursor) if cursor else Q()
+
+        def member(queryset, platform, content, webhook_delivered):
+            expressions = {
+                'content': content,
+                'platform': platform,
+                'folder_id': F('folder_id'),
+                'webhook_delivered': Value(int(webhook_delivered), output_field=IntegerField()),
+            }
+            return queryset.filter(after).order_by().values(
+                *columns, **{self.COMPUTED[field]: expressions[field] for field in computed}
+            )
+
+        members = [member(
+            BrightDataScrapedPost.objects.filter(folder_id__in=folder_ids, webhook_delivered=True),
+            F('platform'), _first_text('description', 'content'), True,
+        )]
+        for platform, (model, content) in self._platform_models().items():
+            members.append(member(
+                model.objects.filter(folder__unified_job_folder_id__in=folder_ids),
+                Value(platform, output_field=CharField()), content, False,
+            ))
+
+        first, *rest = members
+        return first.union(*rest, all=True)
+
+    def aggregate(self, folder_id, cursor=None, page_size=None, fields=FIELDS, page=None):
+        """
+        Posts under a folder, newest first, or None when the folder does not
+        exist. With a page_size only one page is read: pass the returned
+        next_cursor, or the next page number, to get the next one. Only the
+        first page counts the posts; total_results is None on later pages.
+        """
+        folder = UnifiedRunFolder.objects.filter(id=folder_id).values('id', 'name').first()
+        if folder is None:
+            return None
+
+        folder_ids = self.subtree_ids(folder['id'])
+        # Later pages reuse the total the client got with the first one
+        first_page = cursor is None and (page or 1) == 1
+        total = self.posts(folder_ids, fields=('id',)).count() if first_page else None
+        offset = (page - 1) * page_size if page and page_size else 0
+        rows, next_cursor = keyset_page(self.posts(folder_ids, fields, cursor), page_size, offset=offset)
+
+        return {
+            'folder_id': folder['id'],
+            'folder_name': folder['name'],
+            'total_results': total,
+            'data': [self._row(row, fields) for row in rows],
+            **({'page': page} if page else {}),
+            'page_size': page_size,
+            'next_cursor': next_cursor,
+            'has_next': next_cursor is not None,
+            'subfolders_processed': len(folder_ids) - 1,
+        }
+
+    @classmethod
+    def _row(cls, row, fields):
+        data = {field: row[cls.COMPUTED.get(field, field)] for field in fields}
+        if 'webhook_delivered' in data:
+            data['webhook_delivered'] = bool(data['webhook_delivered'])
+        return data
+
+
+def page_params(params):
+    """aggregate() keyword arguments from ?cursor=, ?page=, ?page_size= and ?fields="""
+    return {
+        'cursor': params.get('cursor') or None,
+        'page': page_number(params),
+        'page_size': page_size(params),
+        'fields': projection.select(params),
+    }
+
+
+projection = FieldProjection(dict.fromkeys(FIELDS))
+folder_aggregation_service = FolderAggregationService()
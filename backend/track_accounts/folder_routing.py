@@ -0,0 +1,117 @@
+"""
+Result Folder Routing Service
+Resolves provider runs to their destination folders through ResultFolderRoute,
+with an in-process cache so ingestion and result readers skip the database.
+A route change in any process bumps a shared generation that empties the
+other processes' caches.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from common.cache_aside import invalidate_namespace, namespace_version
+from .models import ResultFolderRoute
+
+logger = logging.getLogger(__name__)
+
+ROUTES_NAMESPACE = 'folder_routes'
+
+
+def invalidate_folder_routes():
+    """Make every process drop its cached routes"""
+    invalidate_namespace(ROUTES_NAMESPACE)
+
+
+class FolderRouteService:
+    """
+    Read-through LRU cache in front of the ResultFolderRoute table.
+    Cached routes are shared between threads and must be treated as read-only.
+    They are kept only while the shared route generation is unchanged; when
+    the shared cache is unavailable every lookup goes to the table.
+    """
+
+    def __init__(self, max_entries=None):
+        self._max_entries = max_entries
+        self._routes = OrderedDict()
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _sync_generation(self):
+        try:
+            generation = namespace_version(ROUTES_NAMESPACE)
+        except Exception as e:
+            logger.warning(f"⚠️ Cache unavailable, resolving folder routes from the table: {e}")
+            generation = None
+        with self._lock:
+            if generation is None or generation != self._generation:
+                self._routes.clear()
+                self._generation = generation
+
+    @property
+    def max_entries(self):
+        if self._max_entries is not None:
+            return self._max_entries
+        return getattr(settings, 'FOLDER_ROUTE_CACHE_SIZE', 2048)
+
+    def _remember(self, route):
+        key = (route.provider, route.external_id)
+        with self._lock:
+            self._routes[key] = route
+            self._routes.move_to_end(key)
+            while len(self._routes) > self.max_entries:
+                self._routes.popitem(last=False)
+
+    def resolve(self, provider, external_id):
+        """Route for a provider run id, or None when none was registered"""
+        if not external_id:
+            return None
+        key = (provider, str(external_id))
+        self._sync_generation()
+        with self._lock:
+            route = self._routes.get(key)
+            if route is not None:
+                self._routes.move_to_end(key)
+                return route
+
+        route = ResultFolderRoute.objects.filter(provider=provider, external_id=str(external_id)).first()
+        if route is not None:
+            self._remember(route)
+        return route
+
+    def register(self, provider, external_id, platform_code=None, project_id=None,
+                 platform_folder_id=None, unified_job_folder_id=None):
+        """Create or update the route of a provider run; unset arguments keep stored values"""
+        if not external_id:
+            return None
+
+        values = {
+            'platform_code': platform_code,
+            'project_id': project_id,
+            'platform_folder_id': platform_folder_id,
+            'unified_job_folder_id': unified_job_folder_id,
+        }
+        values = {field: value for field, value in values.items() if value is not None}
+
+        route, created = ResultFolderRoute.objects.update_or_create(
+            provider=provider,
+            external_id=str(external_id),
+            defaults=values,
+        )
+        invalidate_folder_routes()
+        self._sync_generation()
+        self._remember(route)
+        if created:
+            logger.info(f"📍 Registered {provider} route {external_id} -> folder {route.platform_folder_id} "
+                        f"(job folder {route.unified_job_folder_id})")
+        return route
+
+    def clear(self):
+        with self._lock:
+            self._routes.clear()
+
+
+# Global folder route service instance
+folder_route_service = FolderRouteService()
@@ -0,0 +1,182 @@
+"""
+Folder Tree Materializer
+Loads a UnifiedRunFolder hierarchy, its linked platform folders and their counts
+in a fixed number of queries and assembles the tree in memory
+"""
+
+import logging
+from collections import defaultdict
+
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import UnifiedRunFolder
+
+logger = logging.getLogger(__name__)
+
+
+def _count(model, condition=Q()):
+    """Correlated count of `model` rows in the outer platform folder"""
+    rows = (model.objects.filter(condition, folder=OuterRef('pk')).order_by()
+            .values('folder').annotate(n=Count('pk')).values('n'))
+    return Coalesce(Subquery(rows, output_field=IntegerField()), 0)
+
+
+def _precounted(serializer_class):
+    """Platform FolderSerializer reading the counts annotated by the materializer"""
+    class PrecountedFolderSerializer(serializer_class):
+        def get_post_count(self, obj):
+            return obj.tree_post_count
+
+        def get_reel_count(self, obj):
+            return obj.tree_reel_count
+
+        def get_comment_count(self, obj):
+            return obj.tree_comment_count
+
+    return PrecountedFolderSerializer
+
+
+class FolderTree:
+    """
+    An in-memory folder hierarchy: unified folders grouped by parent, platform
+    folders grouped by unified job folder, each platform folder annotated with
+    tree_post_count / tree_reel_count / tree_comment_count / tree_total_posts.
+    """
+
+    def __init__(self, folders, platform_folders=(), serializers=None):
+        self.folders = {folder.pk: folder for folder in folders}
+        self._children = defaultdict(list)
+        for folder in folders:
+            if folder.parent_folder_id is not None:
+                self._children[folder.parent_folder_id].append(folder)
+        self._platform_folders = defaultdict(list)
+        for platform_folder in platform_folders:
+            self._platform_folders[platform_folder.unified_job_folder_id].append(platform_folder)
+        self._serializers = serializers or {}
+
+    def covers(self, folder_id):
+        return folder_id in self.folders
+
+    def children(self, folder_id):
+        return self._children.get(folder_id, [])
+
+    def platform_folders(self, folder_id):
+        return self._platform_folders.get(folder_id, [])
+
+    def content_count(self, folder):
+        """UnifiedRunFolder.get_content_count() from the loaded rows"""
+        def children_of(folder_type):
+            return sum(1 for child in self.children(folder.pk) if child.folder_type == folder_type)
+
+        if folder.folder_type == 'run':
+            return children_of('platform') or children_of('service')
+        if folder.folder_type == 'platform':
+            return children_of('service')
+        if folder.folder_type == 'service':
+            return children_of('job') or children_of('content')
+        if folder.folder_type == 'job':
+            return sum(platform_folder.tree_total_posts for platform_folder in self.platform_folders(folder.pk))
+        return 0
+
+    def platform_folder_data(self, folder_id, context=None):
+        """Linked platform folders as their platform FolderSerializer renders them"""
+        return [
+            self._serializers[type(platform_folder)](platform_folder, context=context).data
+            for platform_folder in self.platform_folders(folder_id)
+        ]
+
+
+class FolderTreeMaterializer:
+    """
+    Builds a FolderTree covering the given root folders.
+
+    Costs one query per folder level below the roots (resolved level by level
+    through parent_folder_id, as FolderAggregationService.subtree_ids does)
+    and, when any job folder is present, one query per platform for the linked
+    platform folders with their counts as correlated subqueries - however wide
+    the tree is. Folders outside the roots' subtrees are never read.
+    """
+
+    # Run > platform > service > job > content is five levels; anything deeper
+    # is a cycle or corrupt data
+    MAX_DEPTH = 8
+
+    # Ids bound per IN clause, below SQLite's bound-parameter limit
+    CHUNK_SIZE = 500
+
+    @staticmethod
+    def _platforms():
+        from facebook_data.models import FacebookComment, FacebookPost, Folder as FBFolder
+        from facebook_data.serializers import FolderSerializer as FBFolderSerializer
+        from instagram_data.models import Folder as IGFolder, InstagramComment, InstagramPost
+        from instagram_data.serializers import FolderSerializer as IGFolderSerializer
+        from linkedin_data.models import Folder as LIFolder, LinkedInPost
+        from linkedin_data.serializers import FolderSerializer as LIFolderSerializer
+        from tiktok_data.models import Folder as TTFolder, TikTokPost
+        from tiktok_data.serializers import FolderSerializer as TTFolderSerializer
+
+        # Counts mirror what each platform FolderSerializer reports
+        return [
+            (IGFolder, IGFolderSerializer, {
+                'tree_post_count': _count(InstagramPost, ~Q(content_type='reel')),
+                'tree_reel_count': _count(InstagramPost, Q(content_type='reel')),
+                'tree_comment_count': _count(InstagramComment),
+                'tree_total_posts': _count(InstagramPost),
+            }),
+            (FBFolder, FBFolderSerializer, {
+                'tree_post_count': _count(FacebookPost, Q(content_type='post')),
+                'tree_reel_count': _count(FacebookPost, Q(content_type='reel')),
+                'tree_comment_count': _count(FacebookComment),
+                'tree_total_posts': _count(FacebookPost),
+            }),
+            (LIFolder, LIFolderSerializer, {
+                'tree_post_count': _count(LinkedInPost),
+                'tree_total_posts': _count(LinkedInPost),
+            }),
+            (TTFolder, TTFolderSerializer, {
+                'tree_post_count': _count(TikTokPost),
+                'tree_total_posts': _count(TikTokPost),
+            }),
+        ]
+
+    @classmethod
+    def _in_chunks(cls, ids):
+        ids = list(ids)
+        for start in range(0, len(ids), cls.CHUNK_SIZE):
+            yield ids[start:start + cls.CHUNK_SIZE]
+
+    def load(self, roots):
+        """FolderTree holding the roots and every unified folder below them"""
+        roots = list(roots)
+        if not roots:
+            return FolderTree([])
+
+        folders = {root.pk: root for root in roots}
+        frontier = list(folders)
+        for _ in range(self.MAX_DEPTH):
+            children = [
+                child for chunk in self._in_chunks(frontier)
+                for child in UnifiedRunFolder.objects.filter(parent_folder_id__in=chunk)
+                if child.pk not in folders
+            ]
+            if not children:
+                break
+            folders.update((child.pk, child) for child in children)
+            frontier = [child.pk for child in children]
+        folders = list(folders.values())
+
+        platform_folders, serializers = [], {}
+        job_folder_ids = [folder.pk for folder in folders if folder.folder_type == 'job']
+        if job_folder_ids:
+            for model, serializer_class, counts in self._platforms():
+                serializers[model] = _precounted(serializer_class)
+                for chunk in self._in_chunks(job_folder_ids):
+                    platform_folders.extend(model.objects.filter(unified_job_folder__in=chunk).annotate(**counts))
+
+        logger.debug(f"🌳 Materialized {len(folders)} folders and {len(platform_folders)} platform folders "
+                     f"for {len(roots)} roots")
+        return FolderTree(folders, platform_folders, serializers)
+
+
+folder_tree_materializer = FolderTreeMaterializer()
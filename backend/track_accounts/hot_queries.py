@@ -0,0 +1,91 @@
+"""
+Hot Queries
+The post-listing and folder-page queries the audit_query_plans command explains,
+built with parameters taken from the busiest folder in the database
+"""
+
+from datetime import timedelta
+
+from django.db.models import Count, Max
+
+from common.query_plans import hot_query
+
+PAGE = 25
+
+
+def _platform_post_models():
+    from facebook_data.models import FacebookPost
+    from instagram_data.models import InstagramPost
+    from linkedin_data.models import LinkedInPost
+    from tiktok_data.models import TikTokPost
+    return {'instagram': InstagramPost, 'facebook': FacebookPost, 'linkedin': LinkedInPost, 'tiktok': TikTokPost}
+
+
+def busiest(model, field='folder_id'):
+    """Value of `field` with the most rows (1 when the table is empty)"""
+    row = model.objects.order_by().values(field).annotate(n=Count('pk')).order_by('-n').first()
+    return row[field] if row and row[field] is not None else 1
+
+
+def _date_range(model, folder_id):
+    latest = model.objects.filter(folder_id=folder_id).aggregate(latest=Max('date_posted'))['latest']
+    if latest is None:
+        from django.utils import timezone
+        latest = timezone.now()
+    return latest - timedelta(days=30), latest
+
+
+def _register_platform(platform, model_getter):
+    @hot_query(f'{platform}_posts_by_folder', f'{platform} folder listing, newest first')
+    def by_folder():
+        model = model_getter()
+        return model.objects.filter(folder_id=busiest(model)).order_by('-date_posted')[:PAGE]
+
+    @hot_query(f'{platform}_posts_by_folder_type_dates', f'{platform} folder listing by content type and date range')
+    def by_type_and_dates():
+        model = model_getter()
+        folder_id = busiest(model)
+        start, end = _date_range(model, folder_id)
+        content_type = model.objects.filter(folder_id=folder_id).values_list('content_type', flat=True).first()
+        return (model.objects.filter(folder_id=folder_id, content_type=content_type or 'post',
+                                     date_posted__gte=start, date_posted__lte=end)
+                .order_by('-date_posted')[:PAGE])
+
+    @hot_query(f'{platform}_posts_by_folder_likes', f'{platform} folder listing by likes range, most liked first')
+    def by_likes():
+        model = model_getter()
+        return (model.objects.filter(folder_id=busiest(model), likes__gte=10, likes__lte=100000)
+                .order_by('-likes')[:PAGE])
+
+
+for _platform in ('instagram', 'facebook', 'linkedin', 'tiktok'):
+    _register_platform(_platform, lambda platform=_platform: _platform_post_models()[platform])
+
+
+@hot_query('brightdata_folder_page', 'data-storage run endpoint: one job folder, keyset page newest first')
+def brightdata_folder_page():
+    from brightdata_integration.models import BrightDataScrapedPost
+    return (BrightDataScrapedPost.objects.filter(folder_id=busiest(BrightDataScrapedPost))
+            .order_by('-created_at', '-id')[:500])
+
+
+@hot_query('brightdata_webhook_posts', 'webhook results: delivered posts of a folder, newest first')
+def brightdata_webhook_posts():
+    from brightdata_integration.models import BrightDataScrapedPost
+    return (BrightDataScrapedPost.objects.filter(folder_id=busiest(BrightDataScrapedPost), webhook_delivered=True)
+            .order_by('-created_at', '-id')[:500])
+
+
+@hot_query('unified_project_timeline', 'dashboard activity timeline: posts per platform and week of a project')
+def unified_project_timeline():
+    from django.db.models import Q
+    from django.utils import timezone
+
+    from .models import UnifiedPost
+    end = timezone.now()
+    return (UnifiedPost.objects.filter(project_id=busiest(UnifiedPost, 'project_id'),
+                                       date_posted__gte=end - timedelta(days=28), date_posted__lt=end)
+            .values('project_id').annotate(**{
+                platform: Count('id', filter=Q(platform=platform))
+                for platform in ('instagram', 'facebook', 'linkedin', 'tiktok')
+            }))
@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-19 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('track_accounts', '0003_sourcefolder_tracksource_folder_and_more'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResultFolderRoute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('provider', models.CharField(choices=[('apify', 'Apify'), ('brightdata', 'BrightData')], max_length=20)),
+                ('external_id', models.CharField(help_text='Apify run id or BrightData snapshot id', max_length=255)),
+                ('platform_code', models.CharField(blank=True, choices=[('facebook', 'Facebook'), ('instagram', 'Instagram'), ('linkedin', 'LinkedIn'), ('tiktok', 'TikTok')], max_length=20, null=True)),
+                ('platform_folder_id', models.IntegerField(blank=True, help_text='Folder id in the platform app (e.g. instagram_data.Folder)', null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='result_folder_routes', to='users.project')),
+                ('unified_job_folder', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='result_routes', to='track_accounts.unifiedrunfolder')),
+            ],
+            options={
+                'unique_together': {('provider', 'external_id')},
+            },
+        ),
+    ]
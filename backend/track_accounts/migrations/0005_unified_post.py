@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-19 16:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill(apps, schema_editor):
+    from track_accounts.unified_posts import UnifiedPostService
+
+    UnifiedPostService(apps.get_model).sync_all()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('track_accounts', '0004_result_folder_route'),
+        ('users', '0001_initial'),
+        ('instagram_data', '0004_post_listing_indexes'),
+        ('facebook_data', '0004_post_listing_indexes'),
+        ('linkedin_data', '0004_post_listing_indexes'),
+        ('tiktok_data', '0004_post_listing_indexes'),
+        ('brightdata_integration', '0011_scraped_post_folder_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnifiedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('instagram_post', 'Instagram post'), ('facebook_post', 'Facebook post'), ('linkedin_post', 'LinkedIn post'), ('tiktok_post', 'TikTok post'), ('brightdata_post', 'BrightData scraped post')], max_length=20)),
+                ('source_id', models.BigIntegerField(help_text='Primary key of the row in the source table')),
+                ('platform', models.CharField(choices=[('facebook', 'Facebook'), ('instagram', 'Instagram'), ('linkedin', 'LinkedIn'), ('tiktok', 'TikTok')], max_length=20)),
+                ('post_id', models.CharField(blank=True, default='', max_length=255)),
+                ('account', models.CharField(blank=True, default='', help_text='user_posted of the source row', max_length=255)),
+                ('url', models.CharField(blank=True, default='', max_length=500)),
+                ('content_type', models.CharField(blank=True, default='', max_length=50)),
+                ('date_posted', models.DateTimeField(help_text='When it was posted, or stored if the platform gave no date')),
+                ('likes', models.BigIntegerField(default=0)),
+                ('num_comments', models.BigIntegerField(default=0)),
+                ('shares', models.BigIntegerField(default=0)),
+                ('views', models.BigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('folder', models.ForeignKey(blank=True, help_text='Job folder the post was scraped into', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='unified_posts', to='track_accounts.unifiedrunfolder')),
+                ('project', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='unified_posts', to='users.project')),
+            ],
+            options={
+                'verbose_name': 'Unified Post',
+                'verbose_name_plural': 'Unified Posts',
+                'indexes': [models.Index(fields=['project', '-date_posted'], name='track_accou_project_a1da2b_idx'), models.Index(fields=['project', 'platform', '-date_posted'], name='track_accou_project_ae311b_idx'), models.Index(fields=['folder', '-date_posted'], name='track_accou_folder__41cbc8_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'source_id'), name='uq_unified_post_source')],
+            },
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
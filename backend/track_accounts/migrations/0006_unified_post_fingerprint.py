@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-19 17:02
+
+from django.db import migrations, models
+
+
+def clear(apps, schema_editor):
+    # Rows are keyed per source row until now; they are rebuilt below, one per distinct post
+    apps.get_model('track_accounts', 'UnifiedPost').objects.all().delete()
+
+
+def backfill(apps, schema_editor):
+    from track_accounts.unified_posts import UnifiedPostService
+
+    UnifiedPostService(apps.get_model).sync_all()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('track_accounts', '0005_unified_post'),
+        ('brightdata_integration', '0012_scraped_post_fingerprint'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='unifiedpost',
+            name='uq_unified_post_source',
+        ),
+        migrations.RunPython(clear, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='unifiedpost',
+            name='fingerprint',
+            field=models.CharField(default='', help_text='Hash of platform and canonical URL or post id (common/post_dedup.py)', max_length=32),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='unifiedpost',
+            index=models.Index(fields=['source', 'source_id'], name='track_accou_source_2072a2_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='unifiedpost',
+            constraint=models.UniqueConstraint(fields=('project', 'fingerprint'), name='uq_unified_post_fingerprint'),
+        ),
+        migrations.RunPython(backfill, migrations.RunPython.noop),
+    ]
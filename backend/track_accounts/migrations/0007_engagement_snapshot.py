@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-19 16:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def seed(apps, schema_editor):
+    """Start the history of every existing post with its current metrics"""
+    UnifiedPost = apps.get_model('track_accounts', 'UnifiedPost')
+    EngagementSnapshot = apps.get_model('track_accounts', 'EngagementSnapshot')
+    batch = []
+    posts = UnifiedPost.objects.values('id', 'updated_at', 'likes', 'num_comments', 'shares', 'views')
+    for post in posts.iterator(chunk_size=2000):
+        batch.append(EngagementSnapshot(post_id=post.pop('id'), observed_at=post.pop('updated_at'), **post))
+        if len(batch) >= 2000:
+            EngagementSnapshot.objects.bulk_create(batch)
+            batch = []
+    EngagementSnapshot.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('track_accounts', '0006_unified_post_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EngagementSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('observed_at', models.DateTimeField()),
+                ('likes', models.BigIntegerField(default=0)),
+                ('num_comments', models.BigIntegerField(default=0)),
+                ('shares', models.BigIntegerField(default=0)),
+                ('views', models.BigIntegerField(default=0)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='track_accounts.unifiedpost')),
+            ],
+            options={
+                'verbose_name': 'Engagement Snapshot',
+                'verbose_name_plural': 'Engagement Snapshots',
+                'indexes': [models.Index(fields=['post', 'observed_at'], name='track_accou_post_id_94a53b_idx'), models.Index(fields=['observed_at'], name='track_accou_observe_f05855_idx')],
+            },
+        ),
+        migrations.RunPython(seed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2 on 2026-10-19 17:08
+
+import importlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+rebuilt = importlib.import_module('track_accounts.migrations._unified_post_rows')
+
+
+def link(apps, schema_editor):
+    """Link every source row to the post of its (project, fingerprint), not only the copy a post points at"""
+    UnifiedPost = apps.get_model('track_accounts', 'UnifiedPost')
+    UnifiedPostSource = apps.get_model('track_accounts', 'UnifiedPostSource')
+    for batch in rebuilt.batches(rebuilt.unified_rows(apps)):
+        posts = {(project_id, value): pk for project_id, value, pk in UnifiedPost.objects.filter(
+            project_id__in={fields['project_id'] for fields in batch},
+            fingerprint__in={fields['fingerprint'] for fields in batch},
+        ).values_list('project_id', 'fingerprint', 'pk')}
+        UnifiedPostSource.objects.bulk_create([
+            UnifiedPostSource(post_id=posts[fields['project_id'], fields['fingerprint']],
+                              source=fields['source'], source_id=fields['source_id'])
+            for fields in batch if (fields['project_id'], fields['fingerprint']) in posts
+        ], ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('track_accounts', '0007_engagement_snapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnifiedPostSource',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('instagram_post', 'Instagram post'), ('facebook_post', 'Facebook post'), ('linkedin_post', 'LinkedIn post'), ('tiktok_post', 'TikTok post'), ('brightdata_post', 'BrightData scraped post')], max_length=20)),
+                ('source_id', models.BigIntegerField(help_text='Primary key of the row in the source table')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='copies', to='track_accounts.unifiedpost')),
+            ],
+            options={
+                'verbose_name': 'Unified Post Source',
+                'verbose_name_plural': 'Unified Post Sources',
+                'constraints': [models.UniqueConstraint(fields=('source', 'source_id'), name='uq_unified_post_source_row')],
+            },
+        ),
+        migrations.RunPython(link, migrations.RunPython.noop),
+    ]
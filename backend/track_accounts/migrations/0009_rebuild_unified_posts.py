@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-19 18:20
+
+import importlib
+
+from django.db import migrations
+
+rows = importlib.import_module('track_accounts.migrations._unified_post_rows')
+
+
+def rebuild(apps, schema_editor):
+    """
+    Redo the 0005/0006 backfill with the frozen source mapping: those ran the
+    live sync code, so rows are upserted again with the largest metrics of
+    their copies and every copy is linked. Rows are not cleared, so their
+    engagement snapshots stay.
+    """
+    rows.rebuild(apps, schema_editor)
+    rows.link(apps, schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('track_accounts', '0008_unified_post_source'),
+    ]
+
+    operations = [
+        migrations.RunPython(rebuild, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,139 @@
+"""
+Frozen UnifiedPost backfill helpers for track_accounts migrations 0008 and 0009.
+The migration loader skips modules starting with "_", so this is not a migration
+itself; like one, it does not import app code and must not change once released.
+"""
+
+import importlib
+from itertools import islice
+
+from django.utils import timezone
+
+scraped = importlib.import_module('brightdata_integration.migrations.0012_scraped_post_fingerprint')
+
+BATCH_SIZE = 2000
+
+# Frozen copy of the source table mapping in track_accounts/unified_posts.py as of migration 0008:
+# (key, model, platform, {UnifiedPost field: source column or tuple of fallbacks}, folder lookup, project lookup)
+COMMON = {'post_id': 'post_id', 'account': 'user_posted', 'url': 'url', 'date_posted': 'date_posted',
+          'likes': 'likes', 'num_comments': 'num_comments', 'content_type': 'content_type'}
+JOB_FOLDER, PROJECT = 'folder__unified_job_folder_id', 'folder__project_id'
+SOURCE_TABLES = [
+    ('instagram_post', 'instagram_data.InstagramPost', 'instagram',
+     {**COMMON, 'views': ('video_view_count', 'video_play_count', 'views')}, JOB_FOLDER, PROJECT),
+    ('facebook_post', 'facebook_data.FacebookPost', 'facebook',
+     {**COMMON, 'shares': 'num_shares', 'views': 'video_view_count'}, JOB_FOLDER, PROJECT),
+    ('linkedin_post', 'linkedin_data.LinkedInPost', 'linkedin', {**COMMON, 'shares': 'num_shares'}, JOB_FOLDER, PROJECT),
+    ('tiktok_post', 'tiktok_data.TikTokPost', 'tiktok', COMMON, JOB_FOLDER, PROJECT),
+    ('brightdata_post', 'brightdata_integration.BrightDataScrapedPost', None,
+     {**COMMON, 'content_type': 'media_type', 'shares': 'shares', 'platform': 'platform'}, 'folder_id', None),
+]
+PLATFORMS = ('instagram', 'facebook', 'linkedin', 'tiktok')
+METRICS = ('likes', 'num_comments', 'shares', 'views')
+
+
+def _int(value):
+    try:
+        return max(int(value or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def source_rows(apps, chunk_size=2000):
+    """UnifiedPost field values of every source row, plus the raw post id and URL"""
+    UnifiedRunFolder = apps.get_model('track_accounts', 'UnifiedRunFolder')
+    folder_projects = dict(UnifiedRunFolder.objects.values_list('id', 'project_id'))
+    for key, label, platform, columns, folder_lookup, project_lookup in SOURCE_TABLES:
+        lookups = {'pk', 'created_at', folder_lookup, *([project_lookup] if project_lookup else [])}
+        for column in columns.values():
+            lookups.update(column if isinstance(column, tuple) else (column,))
+        model = apps.get_model(label)
+        for values in model.objects.order_by().values(*sorted(lookups)).iterator(chunk_size=chunk_size):
+            def column(name):
+                source = columns.get(name)
+                for lookup in (source if isinstance(source, tuple) else (source,)):
+                    if lookup and values.get(lookup) not in (None, ''):
+                        return values[lookup]
+                return None
+
+            folder_id = values.get(folder_lookup)
+            if project_lookup:
+                project_id = values.get(project_lookup)
+            else:
+                project_id = folder_projects.get(folder_id)
+                if folder_id not in folder_projects:
+                    folder_id = None
+            row_platform = (platform or column('platform') or '').lower()
+            row_platform = next((name for name in PLATFORMS if row_platform.startswith(name)),
+                                row_platform[:20] or 'instagram')
+            yield {
+                'source': key,
+                'source_id': values['pk'],
+                'platform': row_platform,
+                'project_id': project_id,
+                'folder_id': folder_id,
+                'post_id': str(column('post_id') or '')[:255],
+                'account': str(column('account') or '')[:255],
+                'url': str(column('url') or '')[:500],
+                'content_type': str(column('content_type') or '')[:50],
+                'date_posted': column('date_posted') or values.get('created_at') or timezone.now(),
+                **{metric: _int(column(metric)) for metric in METRICS},
+            }, column('post_id'), column('url')
+
+
+def unified_rows(apps):
+    """UnifiedPost field values, with fingerprint, of every source row that belongs to a project"""
+    for fields, post_id, url in source_rows(apps):
+        if fields['project_id'] is None:
+            continue
+        fields['fingerprint'] = (scraped.fingerprint(fields['platform'], post_id, url)
+                                 or scraped.fingerprint(fields['platform'], f"{fields['source']}:{fields['source_id']}"))
+        yield fields
+
+
+def batches(rows, size=BATCH_SIZE):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def rebuild(apps, schema_editor):
+    """One row per (project, fingerprint), pointing at the first copy and keeping the largest metrics"""
+    UnifiedPost = apps.get_model('track_accounts', 'UnifiedPost')
+    for batch in batches(unified_rows(apps)):
+        rows = {}
+        for fields in batch:
+            key = (fields['project_id'], fields['fingerprint'])
+            if key in rows:
+                rows[key].update({metric: max(rows[key][metric], fields[metric]) for metric in METRICS})
+            else:
+                rows[key] = fields
+        stored = UnifiedPost.objects.filter(project_id__in={project for project, _ in rows},
+                                            fingerprint__in={value for _, value in rows})
+        for post in stored:
+            fields = rows.get((post.project_id, post.fingerprint))
+            if fields:
+                fields.update({metric: max(fields[metric], getattr(post, metric)) for metric in METRICS},
+                              source=post.source, source_id=post.source_id)
+        UnifiedPost.objects.bulk_create(
+            [UnifiedPost(**fields) for fields in rows.values()],
+            update_conflicts=True, unique_fields=['project', 'fingerprint'],
+            update_fields=['source', 'source_id', 'platform', 'folder', 'post_id', 'account', 'url', 'content_type',
+                           'date_posted', *METRICS],
+        )
+
+
+def link(apps, schema_editor):
+    """Link every source row to the post of its (project, fingerprint), not only the copy a post points at"""
+    UnifiedPost = apps.get_model('track_accounts', 'UnifiedPost')
+    UnifiedPostSource = apps.get_model('track_accounts', 'UnifiedPostSource')
+    for batch in batches(unified_rows(apps)):
+        posts = {(project_id, value): pk for project_id, value, pk in UnifiedPost.objects.filter(
+            project_id__in={fields['project_id'] for fields in batch},
+            fingerprint__in={fields['fingerprint'] for fields in batch},
+        ).values_list('project_id', 'fingerprint', 'pk')}
+        UnifiedPostSource.objects.bulk_create([
+            UnifiedPostSource(post_id=posts[fields['project_id'], fields['fingerprint']],
+                              source=fields['source'], source_id=fields['source_id'])
+            for fields in batch if (fields['project_id'], fields['fingerprint']) in posts
+        ], ignore_conflicts=True)
@@ -319,3 +319,131 @@ class ServiceFolderIndex(models.Model):
         indexes = [
             models.Index(fields=['scraping_run', 'platform_code', 'service_code'])
         ]
+
+
+class ResultFolderRoute(models.Model):
+    """
+    Routing table resolving a provider run (Apify run id / BrightData snapshot id)
+    to the folders its results are stored in. Written when the scrape is triggered.
+    """
+    PROVIDER_CHOICES = [
+        ('apify', 'Apify'),
+        ('brightdata', 'BrightData'),
+    ]
+
+    provider = models.CharField(max_length=20, choices=PROVIDER_CHOICES)
+    external_id = models.CharField(max_length=255, help_text="Apify run id or BrightData snapshot id")
+    platform_code = models.CharField(max_length=20, choices=UnifiedRunFolder.PLATFORM_CODE_CHOICES, null=True, blank=True)
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='result_folder_routes', null=True, blank=True)
+    platform_folder_id = models.IntegerField(null=True, blank=True, help_text="Folder id in the platform app (e.g. instagram_data.Folder)")
+    unified_job_folder = models.ForeignKey(UnifiedRunFolder, on_delete=models.SET_NULL, null=True, blank=True, related_name='result_routes')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.provider}:{self.external_id} -> {self.platform_code} folder {self.platform_folder_id}"
+
+    class Meta:
+        unique_together = [('provider', 'external_id')]
+
+
+class UnifiedPost(models.Model):
+    """
+    Narrow cross-platform post table: one row per distinct post of a project,
+    with the columns analytics filter, group and sum on. Copies of a post
+    stored by several providers or runs share a fingerprint and are merged
+    into one row. Text, media and everything else stay in the platform
+    tables, which (source, source_id) points back to; every copy is listed
+    in UnifiedPostSource. Kept in sync on ingest, see
+    track_accounts/unified_posts.py.
+    """
+    SOURCE_CHOICES = [
+        ('instagram_post', 'Instagram post'),
+        ('facebook_post', 'Facebook post'),
+        ('linkedin_post', 'LinkedIn post'),
+        ('tiktok_post', 'TikTok post'),
+        ('brightdata_post', 'BrightData scraped post'),
+    ]
+
+    source = models.CharField(max_length=20, choices=SOURCE_CHOICES)
+    source_id = models.BigIntegerField(help_text="Primary key of the row in the source table")
+    platform = models.CharField(max_length=20, choices=UnifiedRunFolder.PLATFORM_CODE_CHOICES)
+    fingerprint = models.CharField(max_length=32, help_text="Hash of platform and canonical URL or post id (common/post_dedup.py)")
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='unified_posts', null=True, blank=True)
+    folder = models.ForeignKey(UnifiedRunFolder, on_delete=models.SET_NULL, related_name='unified_posts', null=True, blank=True,
+                               help_text="Job folder the post was scraped into")
+    post_id = models.CharField(max_length=255, blank=True, default='')
+    account = models.CharField(max_length=255, blank=True, default='', help_text="user_posted of the source row")
+    url = models.CharField(max_length=500, blank=True, default='')
+    content_type = models.CharField(max_length=50, blank=True, default='')
+    date_posted = models.DateTimeField(help_text="When it was posted, or stored if the platform gave no date")
+
+    likes = models.BigIntegerField(default=0)
+    num_comments = models.BigIntegerField(default=0)
+    shares = models.BigIntegerField(default=0)
+    views = models.BigIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.platform} {self.post_id} ({self.source}:{self.source_id})"
+
+    class Meta:
+        verbose_name = "Unified Post"
+        verbose_name_plural = "Unified Posts"
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'fingerprint'], name='uq_unified_post_fingerprint'),
+        ]
+        indexes = [
+            models.Index(fields=['source', 'source_id']),
+            models.Index(fields=['project', '-date_posted']),
+            models.Index(fields=['project', 'platform', '-date_posted']),
+            models.Index(fields=['folder', '-date_posted']),
+        ]
+
+
+class UnifiedPostSource(models.Model):
+    """
+    One source row feeding a UnifiedPost. A post merged from several copies
+    has one row per copy, so deleting a copy rebuilds the post from the
+    copies that remain instead of dropping it.
+    """
+    post = models.ForeignKey(UnifiedPost, on_delete=models.CASCADE, related_name='copies')
+    source = models.CharField(max_length=20, choices=UnifiedPost.SOURCE_CHOICES)
+    source_id = models.BigIntegerField(help_text="Primary key of the row in the source table")
+
+    def __str__(self):
+        return f"{self.source}:{self.source_id} -> {self.post_id}"
+
+    class Meta:
+        verbose_name = "Unified Post Source"
+        verbose_name_plural = "Unified Post Sources"
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'source_id'], name='uq_unified_post_source_row'),
+        ]
+
+
+class EngagementSnapshot(models.Model):
+    """
+    Append-only engagement history: the metrics of a UnifiedPost each time a
+    scrape saw them change. Older snapshots are thinned to hourly and daily
+    resolution and finally dropped, see track_accounts/engagement_history.py.
+    """
+    post = models.ForeignKey(UnifiedPost, on_delete=models.CASCADE, related_name='snapshots')
+    observed_at = models.DateTimeField()
+    likes = models.BigIntegerField(default=0)
+    num_comments = models.BigIntegerField(default=0)
+    shares = models.BigIntegerField(default=0)
+    views = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.post_id} @ {self.observed_at:%Y-%m-%d %H:%M}: {self.likes} likes"
+
+    class Meta:
+        verbose_name = "Engagement Snapshot"
+        verbose_name_plural = "Engagement Snapshots"
+        indexes = [
+            models.Index(fields=['post', 'observed_at']),
+            models.Index(fields=['observed_at']),
+        ]
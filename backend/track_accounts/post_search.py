@@ -0,0 +1,59 @@
+"""
+Post Search Service
+Ranked full-text search across the Facebook, Instagram, LinkedIn and TikTok post tables
+"""
+
+import heapq
+import logging
+
+from django.conf import settings
+
+from common.full_text_search import search
+from .folder_aggregation import folder_aggregation_service
+
+logger = logging.getLogger(__name__)
+
+
+class PostSearchService:
+    """
+    One search over every platform's posts: the best `limit` matches of each
+    table, merged by search rank. Costs one query per platform searched.
+    """
+
+    FIELDS = ('id', 'post_id', 'url', 'user_posted', 'likes', 'num_comments', 'date_posted')
+
+    def search(self, query, project_id=None, folder_id=None, platforms=None, limit=None):
+        limit = self.limit(limit)
+        folder_ids = folder_aggregation_service.subtree_ids(folder_id) if folder_id else None
+
+        ranked = []
+        for platform, (model, content) in folder_aggregation_service._platform_models().items():
+            if platforms and platform not in platforms:
+                continue
+            queryset = model.objects.all()
+            if project_id:
+                queryset = queryset.filter(folder__project_id=project_id)
+            if folder_ids is not None:
+                queryset = queryset.filter(folder__unified_job_folder_id__in=folder_ids)
+
+            rows = (search(queryset, query, rank=True)
+                    .order_by('-search_rank', '-date_posted', '-id')
+                    .values(*self.FIELDS, 'folder_id', 'search_rank', search_content=content)[:limit])
+            # Facebook has its own `content` column, so the common one is annotated under another name
+            ranked.extend({'platform': platform, 'content': row.pop('search_content'), **row} for row in rows)
+
+        results = heapq.nlargest(limit, ranked, key=lambda row: row['search_rank'])
+        logger.debug(f"🔎 '{query}': {len(ranked)} candidates, {len(results)} results")
+        return results
+
+    @staticmethod
+    def limit(value):
+        default = getattr(settings, 'SEARCH_RESULTS_LIMIT', 50)
+        try:
+            value = int(value) if value is not None else default
+        except (TypeError, ValueError):
+            value = default
+        return min(max(value, 1), getattr(settings, 'SEARCH_RESULTS_MAX_LIMIT', 200))
+
+
+post_search_service = PostSearchService()
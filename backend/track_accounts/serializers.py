@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import TrackSource, SourceFolder, ReportFolder, ReportEntry, UnifiedRunFolder
 from users.models import Project
+from .folder_tree import folder_tree_materializer
 
 class SourceFolderSerializer(serializers.ModelSerializer):
     source_count = serializers.SerializerMethodField()
@@ -144,6 +145,14 @@ class ReportFolderDetailSerializer(ReportFolderSerializer):
     class Meta(ReportFolderSerializer.Meta):
         fields = ReportFolderSerializer.Meta.fields + ['entries']
 
+class UnifiedRunFolderListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        # One tree for the whole page instead of queries per folder and level
+        folders = list(data.all() if hasattr(data, 'all') else data)
+        self.root._folder_tree = folder_tree_materializer.load(folders)
+        return super().to_representation(folders)
+
+
 class UnifiedRunFolderSerializer(serializers.ModelSerializer):
     platform = serializers.SerializerMethodField()
     category_display = serializers.SerializerMethodField()
@@ -158,6 +167,7 @@ class UnifiedRunFolderSerializer(serializers.ModelSerializer):
             'platform', 'subfolders', 'post_count', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'platform', 'category_display', 'subfolders', 'post_count', 'created_at', 'updated_at']
+        list_serializer_class = UnifiedRunFolderListSerializer
     
     def get_platform(self, obj):
         # Return the actual platform code if available, otherwise 'unified'
@@ -172,58 +182,25 @@ class UnifiedRunFolderSerializer(serializers.ModelSerializer):
         }
         return category_display_map.get(obj.category, obj.category.title())
     
+    def _tree(self, obj):
+        # The folder tree is loaded once per response and shared by every
+        # nested folder through the root serializer
+        tree = getattr(self.root, '_folder_tree', None)
+        if tree is None or not tree.covers(obj.pk):
+            tree = folder_tree_materializer.load([obj])
+            self.root._folder_tree = tree
+        return tree
+
     def get_subfolders(self, obj):
-        # Get direct subfolders (UnifiedRunFolder children) and serialize them recursively
-        subfolders_data = UnifiedRunFolderSerializer(obj.subfolders.all(), many=True, context=self.context).data
+        # Direct subfolders (UnifiedRunFolder children) serialized recursively from the loaded tree
+        tree = self._tree(obj)
+        subfolders_data = [self.to_representation(child) for child in tree.children(obj.pk)]
 
         # If this is a job folder, also include linked platform-specific folders
         if obj.folder_type == 'job':
-            platform_folders = []
-
-            # Check for linked Instagram folders
-            try:
-                from instagram_data.models import Folder as IGFolder
-                from instagram_data.serializers import FolderSerializer as IGFolderSerializer
-                ig_folders = IGFolder.objects.filter(unified_job_folder=obj)
-                if ig_folders.exists():
-                    platform_folders.extend(IGFolderSerializer(ig_folders, many=True, context=self.context).data)
-            except Exception as e:
-                pass
-
-            # Check for linked Facebook folders
-            try:
-                from facebook_data.models import Folder as FBFolder
-                from facebook_data.serializers import FolderSerializer as FBFolderSerializer
-                fb_folders = FBFolder.objects.filter(unified_job_folder=obj)
-                if fb_folders.exists():
-                    platform_folders.extend(FBFolderSerializer(fb_folders, many=True, context=self.context).data)
-            except Exception as e:
-                pass
-
-            # Check for linked LinkedIn folders
-            try:
-                from linkedin_data.models import Folder as LIFolder
-                from linkedin_data.serializers import FolderSerializer as LIFolderSerializer
-                li_folders = LIFolder.objects.filter(unified_job_folder=obj)
-                if li_folders.exists():
-                    platform_folders.extend(LIFolderSerializer(li_folders, many=True, context=self.context).data)
-            except Exception as e:
-                pass
-
-            # Check for linked TikTok folders
-            try:
-                from tiktok_data.models import Folder as TTFolder
-                from tiktok_data.serializers import FolderSerializer as TTFolderSerializer
-                tt_folders = TTFolder.objects.filter(unified_job_folder=obj)
-                if tt_folders.exists():
-                    platform_folders.extend(TTFolderSerializer(tt_folders, many=True, context=self.context).data)
-            except Exception as e:
-                pass
-
-            # Combine unified subfolders with platform-specific folders
-            subfolders_data = list(subfolders_data) + platform_folders
+            subfolders_data += tree.platform_folder_data(obj.pk, self.context)
 
         return subfolders_data
-    
+
     def get_post_count(self, obj):
-        return obj.get_content_count() 
\ No newline at end of file
+        return self._tree(obj).content_count(obj) 
\ No newline at end of file
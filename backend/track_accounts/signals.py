@@ -0,0 +1,104 @@
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from chat.context_service import invalidate_project_context
+from chat.retrieval import SemanticIndexService, move_indexed_folder, refresh_indexed_document
+from common.cache_aside import invalidate_project_cache
+from .folder_routing import invalidate_folder_routes
+from .models import ResultFolderRoute, UnifiedRunFolder
+from .unified_posts import SOURCE_TABLES, unified_post_service
+
+logger = logging.getLogger(__name__)
+
+
+@receiver(post_save, sender=UnifiedRunFolder)
+@receiver(post_delete, sender=UnifiedRunFolder)
+def invalidate_folder_tree_cache(sender, instance, **kwargs):
+    """Folder listings are cached per project, so any folder change drops that project's cache"""
+    invalidate_project_cache(instance.project_id)
+
+
+# Platform folders feed the same listings; their posts invalidate through UnifiedPostService
+for _label in ('instagram_data.Folder', 'facebook_data.Folder', 'linkedin_data.Folder', 'tiktok_data.Folder'):
+    post_save.connect(invalidate_folder_tree_cache, sender=_label, dispatch_uid=f'folder_tree_cache_{_label}')
+    post_delete.connect(invalidate_folder_tree_cache, sender=_label, dispatch_uid=f'folder_tree_cache_delete_{_label}')
+
+
+@receiver(post_delete, sender=ResultFolderRoute)
+def drop_cached_folder_routes(sender, instance, **kwargs):
+    """Routes are cached by every worker; register() covers updates, this covers deletes"""
+    invalidate_folder_routes()
+
+
+def invalidate_folder_chat_context(sender, instance, **kwargs):
+    """
+    Deleting a platform folder moves its posts and comments out with queryset
+    updates, which no per-row signal sees, so the project's chat context goes here
+    """
+    if instance.project_id:
+        invalidate_project_context(instance.project_id)
+
+
+for _label in ('instagram_data.Folder', 'facebook_data.Folder', 'linkedin_data.Folder', 'tiktok_data.Folder'):
+    post_delete.connect(invalidate_folder_chat_context, sender=_label, dispatch_uid=f'chat_context_folder_{_label}')
+
+
+def sync_unified_post(sender, instance, raw=False, **kwargs):
+    """Mirror a saved platform or BrightData post into UnifiedPost; never fails the save"""
+    if raw:
+        return
+    try:
+        with transaction.atomic():
+            unified_post_service.sync_instance(instance)
+    except Exception as e:
+        logger.exception(f"❌ Could not sync {sender.__name__} {instance.pk} to UnifiedPost: {e}")
+
+
+def remove_unified_post(sender, instance, **kwargs):
+    unified_post_service.remove(unified_post_service.table_for(sender).key, [instance.pk])
+
+
+for _table in SOURCE_TABLES.values():
+    post_save.connect(sync_unified_post, sender=_table.label, dispatch_uid=f'unified_post_sync_{_table.key}')
+    post_delete.connect(remove_unified_post, sender=_table.label, dispatch_uid=f'unified_post_remove_{_table.key}')
+
+
+def refresh_semantic_index(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Edited and deleted posts/comments are re-embedded or tombstoned in the chat
+    retrieval index; new rows are appended by its catch-up instead
+    """
+    if raw or created:
+        return
+    refresh_indexed_document(instance)
+
+
+for _source, _app_label, _model_name, *_ in SemanticIndexService.SOURCES:
+    post_save.connect(refresh_semantic_index, sender=f'{_app_label}.{_model_name}',
+                      dispatch_uid=f'semantic_index_refresh_{_source}')
+    post_delete.connect(refresh_semantic_index, sender=f'{_app_label}.{_model_name}',
+                        dispatch_uid=f'semantic_index_remove_{_source}')
+
+
+def remember_folder_project(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Project a platform folder belonged to before this save, to notice it moving to another project"""
+    instance.__dict__.pop('_project_before_save', None)
+    if raw or not instance.pk or (update_fields is not None and 'project' not in update_fields):
+        return
+    instance._project_before_save = sender.objects.filter(pk=instance.pk).values_list('project_id', flat=True).first()
+
+
+def move_folder_in_semantic_index(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created or '_project_before_save' not in instance.__dict__:
+        return
+    previous_project_id = instance.__dict__.pop('_project_before_save')
+    if previous_project_id != instance.project_id:
+        move_indexed_folder(instance, previous_project_id)
+
+
+for _label in ('instagram_data.Folder', 'facebook_data.Folder', 'linkedin_data.Folder', 'tiktok_data.Folder'):
+    pre_save.connect(remember_folder_project, sender=_label, dispatch_uid=f'semantic_index_folder_project_{_label}')
+    post_save.connect(move_folder_in_semantic_index, sender=_label, dispatch_uid=f'semantic_index_folder_move_{_label}')
@@ -0,0 +1,360 @@
+"""
+Synthetic Data
+Generates realistic projects - track sources, scraping runs with their folder
+hierarchies, posts and comments - for benchmarks and load tests
+"""
+
+import csv
+import io
+import json
+import logging
+import random
+import zlib
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from django.utils import timezone
+
+from track_accounts.unified_posts import unified_post_service
+
+logger = logging.getLogger(__name__)
+
+PLATFORMS = ('instagram', 'facebook', 'linkedin', 'tiktok')
+
+_WORDS = ('launch', 'summer', 'collection', 'new', 'drop', 'behind', 'scenes', 'team', 'event', 'today',
+          'thank', 'you', 'community', 'product', 'limited', 'edition', 'weekend', 'sale', 'story', 'design',
+          'running', 'city', 'training', 'morning', 'style', 'studio', 'release', 'partners', 'live', 'now')
+_HASHTAGS = ('launch', 'summer', 'style', 'running', 'training', 'design', 'community', 'newdrop', 'sale', 'live')
+
+
+def _caption(rng: random.Random, words: int = 24) -> str:
+    tags = ' '.join(f'#{tag}' for tag in rng.sample(_HASHTAGS, 2))
+    return f"{' '.join(rng.choice(_WORDS) for _ in range(words)).capitalize()} {tags}"
+
+
+def _audience(account: str) -> int:
+    # Stable per account, unlike hash()
+    return zlib.crc32(account.encode())
+
+
+def _engagement(rng: random.Random) -> int:
+    # Heavy-tailed like real engagement: most posts get little, a few go viral
+    return int(rng.paretovariate(1.3) * 40)
+
+
+# Records in the shape of the BrightData datasets (the keys the webhook
+# payloads and CSV exports use), one function per platform and record type
+
+def instagram_post(rng: random.Random, n: int, account: str, posted) -> Dict[str, Any]:
+    shortcode = f'SYN{n:08d}'
+    description = _caption(rng)
+    reel = rng.random() < 0.3
+    return {
+        'url': f'https://www.instagram.com/{"reel" if reel else "p"}/{shortcode}/',
+        'user_posted': account,
+        'description': description,
+        'hashtags': [word[1:] for word in description.split() if word.startswith('#')],
+        'num_comments': _engagement(rng) // 10,
+        'date_posted': posted.isoformat(),
+        'likes': _engagement(rng),
+        'post_id': f'syn_ig_{n}',
+        'shortcode': shortcode,
+        'content_type': 'reel' if reel else 'post',
+        'product_type': 'clips' if reel else 'feed',
+        'followers': 1000 + _audience(account) % 500000,
+        'is_verified': _audience(account) % 5 == 0,
+        'profile_url': f'https://www.instagram.com/{account}/',
+        'video_play_count': _engagement(rng) * 20 if reel else None,
+        'photos': [] if reel else [f'https://cdn.example.com/ig/{shortcode}.jpg'],
+        'videos': [f'https://cdn.example.com/ig/{shortcode}.mp4'] if reel else [],
+    }
+
+
+def instagram_comment(rng: random.Random, n: int, post: Dict[str, Any], posted) -> Dict[str, Any]:
+    return {
+        'comment_id': f'syn_igc_{n}',
+        'post_id': post['post_id'],
+        'post_url': post['url'],
+        'post_user': post['user_posted'],
+        'comment': ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(3, 14))),
+        'comment_date': (posted + timedelta(minutes=rng.randint(1, 2880))).isoformat(),
+        'comment_user': f'fan_{rng.randrange(5000)}',
+        'likes_number': _engagement(rng) // 20,
+        'replies_number': rng.randint(0, 3),
+        'url': f"{post['url']}c/{n}/",
+    }
+
+
+def facebook_post(rng: random.Random, n: int, account: str, posted) -> Dict[str, Any]:
+    content = _caption(rng, 40)
+    return {
+        'url': f'https://www.facebook.com/{account}/posts/{n}',
+        'post_id': f'syn_fb_{n}',
+        'user_url': f'https://www.facebook.com/{account}',
+        'user_posted': account,
+        'page_name': account.replace('_', ' ').title(),
+        'content': content,
+        'hashtags': [word[1:] for word in content.split() if word.startswith('#')],
+        'date_posted': posted.isoformat(),
+        'num_comments': _engagement(rng) // 10,
+        'num_shares': _engagement(rng) // 15,
+        'likes': _engagement(rng),
+        'page_followers': 5000 + _audience(account) % 900000,
+        'page_is_verified': _audience(account) % 4 == 0,
+        'content_type': 'reel' if rng.random() < 0.2 else 'post',
+    }
+
+
+def facebook_comment(rng: random.Random, n: int, post: Dict[str, Any], posted) -> Dict[str, Any]:
+    return {
+        'url': post['url'],
+        'post_id': post['post_id'],
+        'post_url': post['url'],
+        'comment_id': f'syn_fbc_{n}',
+        'user_name': f'Fan {rng.randrange(5000)}',
+        'comment_text': ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(3, 20))),
+        'date_created': (posted + timedelta(minutes=rng.randint(1, 2880))).isoformat(),
+        'num_likes': _engagement(rng) // 20,
+        'num_replies': rng.randint(0, 3),
+    }
+
+
+def linkedin_post(rng: random.Random, n: int, account: str, posted) -> Dict[str, Any]:
+    text = _caption(rng, 60)
+    return {
+        'id': f'syn_li_{n}',
+        'url': f'https://www.linkedin.com/posts/{account}_activity-{n}',
+        'user_id': account,
+        'use_url': f'https://www.linkedin.com/company/{account}',
+        'title': account.replace('_', ' ').title(),
+        'post_text': text,
+        'hashtags': [word[1:] for word in text.split() if word.startswith('#')],
+        'num_likes': _engagement(rng),
+        'num_comments': _engagement(rng) // 10,
+        'num_shares': _engagement(rng) // 20,
+        'date_posted': posted.isoformat(),
+        'user_followers': 2000 + _audience(account) % 300000,
+        'post_type': 'post',
+        'account_type': 'Organization',
+    }
+
+
+def tiktok_post(rng: random.Random, n: int, account: str, posted) -> Dict[str, Any]:
+    description = _caption(rng, 16)
+    likes = _engagement(rng) * 3
+    return {
+        'post_id': f'syn_tt_{n}',
+        'url': f'https://www.tiktok.com/@{account}/video/{7000000000000 + n}',
+        'description': description,
+        'create_time': posted.isoformat(),
+        'digg_count': likes,
+        'comment_count': likes // 30,
+        'share_count': likes // 50,
+        'play_count': likes * 25,
+        'hashtags': [word[1:] for word in description.split() if word.startswith('#')],
+        'profile_username': account,
+        'profile_url': f'https://www.tiktok.com/@{account}',
+        'profile_followers': 1000 + _audience(account) % 2000000,
+        'is_verified': _audience(account) % 5 == 0,
+        'post_type': 'video',
+    }
+
+
+POST_RECORDS = {
+    'instagram': instagram_post,
+    'facebook': facebook_post,
+    'linkedin': linkedin_post,
+    'tiktok': tiktok_post,
+}
+COMMENT_RECORDS = {
+    'instagram': instagram_comment,
+    'facebook': facebook_comment,
+}
+
+# Dataset keys stored under another model field name; Instagram and Facebook
+# records already use the model's names
+FIELD_MAPS = {
+    'linkedin': {'id': 'post_id', 'user_id': 'user_posted', 'use_url': 'user_url', 'title': 'user_title',
+                 'post_text': 'description', 'num_likes': 'likes'},
+    'tiktok': {'create_time': 'date_posted', 'digg_count': 'likes', 'comment_count': 'num_comments',
+               'profile_username': 'user_posted', 'profile_followers': 'followers', 'post_type': 'content_type'},
+}
+
+
+def platform_models() -> Dict[str, Dict[str, Any]]:
+    """Folder, post and (where the platform has them) comment model of each platform"""
+    from facebook_data.models import FacebookComment, FacebookPost, Folder as FacebookFolder
+    from instagram_data.models import Folder as InstagramFolder, InstagramComment, InstagramPost
+    from linkedin_data.models import Folder as LinkedInFolder, LinkedInPost
+    from tiktok_data.models import Folder as TikTokFolder, TikTokPost
+
+    return {
+        'instagram': {'folder': InstagramFolder, 'post': InstagramPost, 'comment': InstagramComment,
+                      'comment_post_field': 'instagram_post'},
+        'facebook': {'folder': FacebookFolder, 'post': FacebookPost, 'comment': FacebookComment,
+                     'comment_post_field': 'facebook_post'},
+        'linkedin': {'folder': LinkedInFolder, 'post': LinkedInPost},
+        'tiktok': {'folder': TikTokFolder, 'post': TikTokPost},
+    }
+
+
+def to_instance(model, record: Dict[str, Any], field_map: Dict[str, str] = None, **extra):
+    """
+    Model instance from a dataset record, renaming keys through `field_map`;
+    keys the model has no column for are dropped
+    """
+    fields = {field.name: field for field in model._meta.concrete_fields if not field.primary_key}
+    values = {}
+    for key, value in record.items():
+        key = (field_map or {}).get(key, key)
+        field = fields.get(key)
+        if field is None or value is None:
+            continue
+        if field.get_internal_type() == 'DateTimeField' and isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        values[key] = value
+    return model(**values, **extra)
+
+
+def to_csv(records: List[Dict[str, Any]]) -> bytes:
+    """Records as a BrightData CSV export: one column per key, lists as JSON"""
+    columns = list(dict.fromkeys(key for record in records for key in record))
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=columns)
+    writer.writeheader()
+    for record in records:
+        writer.writerow({key: json.dumps(value) if isinstance(value, (list, dict)) else value
+                         for key, value in record.items()})
+    return output.getvalue().encode('utf-8')
+
+
+class SyntheticDataGenerator:
+    """
+    Builds one synthetic project::
+
+        dataset = SyntheticDataGenerator(seed=1).generate(sources=40, runs=3, posts=50, comments=5)
+
+    Each run gets the folder hierarchy the workflow creates for it (run,
+    platform, service and job folders, see CorrectFolderService), a platform
+    folder per job folder and `posts` posts per job, dated over the last
+    `days` days; Instagram and Facebook posts get `comments` comments each.
+    Everything is written with bulk_create, so generating a large project
+    is a handful of statements per run. Call inside a transaction to be
+    able to roll it back.
+    """
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        # Content is reproducible from the seed; names and ids are unique per
+        # generator so several synthetic projects can share a database
+        self.batch = random.SystemRandom().randrange(10 ** 6)
+        self._counter = self.batch * 10 ** 7
+
+    def _next(self) -> int:
+        self._counter += 1
+        return self._counter
+
+    def generate(self, sources: int = 20, runs: int = 2, posts: int = 50, comments: int = 5, days: int = 90,
+                 platforms=PLATFORMS, user=None) -> Dict[str, Any]:
+        from users.models import Project, User
+        from workflow.correct_folder_service import CorrectFolderService
+        from workflow.models import ScrapingRun
+        from .models import TrackSource
+
+        if user is None:
+            user = User.objects.create_user(f'synthetic_{self.batch}', password=None)
+        project = Project.objects.create(name=f'Synthetic project {self.batch}', owner=user)
+
+        TrackSource.objects.bulk_create([
+            TrackSource(project=project, name=f'Brand {i}', platform=platforms[i % len(platforms)],
+                        service_name='posts',
+                        **{f'{platforms[i % len(platforms)]}_link': self._profile_url(platforms[i % len(platforms)], i)})
+            for i in range(sources)
+        ], batch_size=self.BATCH_SIZE)
+        track_sources = list(TrackSource.objects.filter(project=project).order_by('id'))
+
+        dataset = {'user': user, 'project': project, 'track_sources': track_sources, 'runs': [],
+                   'run_folders': [], 'job_folders': [], 'platform_folders': {platform: [] for platform in platforms},
+                   'counts': {'track_sources': len(track_sources), 'runs': 0, 'folders': 0, 'posts': 0, 'comments': 0}}
+        now = timezone.now()
+        for r in range(runs):
+            run = ScrapingRun.objects.create(project=project, name=f'Synthetic run {r + 1}', created_by=user)
+            created = CorrectFolderService().create_correct_folder_structure(run, track_sources)
+            dataset['runs'].append(run)
+            dataset['run_folders'].append(created['run_folder'])
+            dataset['counts']['runs'] += 1
+            dataset['counts']['folders'] += len(created['folder_ids'])
+            self._fill_run(dataset, run, created['job_folders'], posts, comments, now - timedelta(days=days), now)
+
+        logger.info(f"🧪 Synthetic project {project.id}: {dataset['counts']}")
+        return dataset
+
+    @staticmethod
+    def _profile_url(platform: str, i: int) -> str:
+        return {
+            'instagram': f'https://www.instagram.com/brand_{i}/',
+            'facebook': f'https://www.facebook.com/brand_{i}',
+            'linkedin': f'https://www.linkedin.com/company/brand_{i}',
+            'tiktok': f'https://www.tiktok.com/@brand_{i}',
+        }[platform]
+
+    def _fill_run(self, dataset, run, job_folders, posts, comments, start, end):
+        models = platform_models()
+        sources = {source.id: source for source in dataset['track_sources']}
+        span = (end - start).total_seconds()
+
+        # One platform folder per job folder, linked the way the webhook links results
+        folders = {}
+        for platform in dataset['platform_folders']:
+            folder_model = models[platform]['folder']
+            jobs = [(source_id, job) for source_id, job in job_folders.items()
+                    if sources[source_id].platform == platform]
+            created = folder_model.objects.bulk_create([
+                folder_model(name=job.name, category='posts', project=dataset['project'], scraping_run=run,
+                             unified_job_folder=job)
+                for _, job in jobs
+            ], batch_size=self.BATCH_SIZE)
+            folders.update({source_id: folder for (source_id, _), folder in zip(jobs, created)})
+            dataset['platform_folders'][platform].extend(created)
+            dataset['job_folders'].extend(job for _, job in jobs)
+            dataset['counts']['folders'] += len(created)
+
+        for platform in dataset['platform_folders']:
+            spec = models[platform]
+            post_records = []
+            for source_id, folder in folders.items():
+                if sources[source_id].platform != platform:
+                    continue
+                account = f'brand_{source_id}'
+                for _ in range(posts):
+                    posted = start + timedelta(seconds=self.rng.random() * span)
+                    post_records.append((folder, POST_RECORDS[platform](self.rng, self._next(), account, posted)))
+            created = spec['post'].objects.bulk_create(
+                [to_instance(spec['post'], record, FIELD_MAPS.get(platform), folder=folder)
+                 for folder, record in post_records],
+                batch_size=self.BATCH_SIZE,
+            )
+            dataset['counts']['posts'] += len(created)
+            unified_post_service.sync_queryset(
+                spec['post'].objects.filter(folder__in={folder for folder, _ in post_records}))
+
+            if comments and 'comment' in spec:
+                comment_model = spec['comment']
+                comment_records = [
+                    to_instance(comment_model,
+                                COMMENT_RECORDS[platform](self.rng, self._next(), record,
+                                                          datetime.fromisoformat(record['date_posted'])),
+                                folder=folder, **{spec['comment_post_field']: post})
+                    for (folder, record), post in zip(post_records, created)
+                    for _ in range(comments)
+                ]
+                comment_model.objects.bulk_create(comment_records, batch_size=self.BATCH_SIZE)
+                dataset['counts']['comments'] += len(comment_records)
+
+    def records(self, platform: str, items: int, account: str = 'brand_delivery') -> List[Dict[str, Any]]:
+        """`items` new post records, as a BrightData webhook delivers them (see to_csv for a CSV export)"""
+        now = timezone.now()
+        return [POST_RECORDS[platform](self.rng, self._next(), account, now - timedelta(hours=self.rng.randrange(720)))
+                for _ in range(items)]
@@ -1,8 +1,22 @@
-from django.test import TestCase
+import multiprocessing
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
-from .models import TrackSource
+from common.cache_aside import cache_aside, invalidate_project_cache, project_namespace
+from common.cache_backends import SQLiteCache
+from common.request_profiling import QueryBudgetTestMixin
+from .folder_routing import FolderRouteService
+from .models import ResultFolderRoute, TrackSource, UnifiedRunFolder
 from users.models import Project, User, Organization
 
 # Create your tests here.
@@ -116,3 +130,674 @@ class TrackSourceAPITest(APITestCase):
         self.assertEqual(source.platform, 'linkedin')
         self.assertEqual(source.service_name, 'linkedin_posts')
         self.assertEqual(source.linkedin_link, 'https://linkedin.com/in/testuser')
+
+
+class FolderRouteServiceTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='router', password='x')
+        self.project = Project.objects.create(name='Routing', owner=user)
+        self.job_folder = UnifiedRunFolder.objects.create(
+            name='Instagram Posts', project=self.project, folder_type='job', platform_code='instagram'
+        )
+        self.service = FolderRouteService(max_entries=2)
+
+    def test_registered_route_is_served_from_cache(self):
+        self.service.register('brightdata', 's_abc', platform_code='instagram', project_id=self.project.id,
+                              unified_job_folder_id=self.job_folder.id)
+
+        with self.assertNumQueries(0):
+            route = self.service.resolve('brightdata', 's_abc')
+
+        self.assertEqual(route.unified_job_folder_id, self.job_folder.id)
+
+    def test_register_keeps_values_not_passed(self):
+        self.service.register('apify', 'run-1', platform_code='instagram', unified_job_folder_id=self.job_folder.id)
+        self.service.register('apify', 'run-1', platform_folder_id=42)
+
+        route = ResultFolderRoute.objects.get(provider='apify', external_id='run-1')
+        self.assertEqual((route.platform_folder_id, route.unified_job_folder_id), (42, self.job_folder.id))
+
+    def test_route_changed_by_another_process_is_not_served_stale(self):
+        self.service.register('apify', 'run-1', platform_folder_id=1)
+        self.service.resolve('apify', 'run-1')
+
+        other_process = FolderRouteService()
+        other_process.register('apify', 'run-1', platform_folder_id=2)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.service.resolve('apify', 'run-1').platform_folder_id, 2)
+
+    def test_cache_is_bounded_and_falls_back_to_table(self):
+        for run_id in ['run-1', 'run-2', 'run-3']:
+            self.service.register('apify', run_id, platform_folder_id=1)
+
+        with self.assertNumQueries(1):
+            self.assertIsNotNone(self.service.resolve('apify', 'run-1'))
+        self.assertIsNone(self.service.resolve('apify', 'unknown'))
+
+
+def _make_cache(path, **options):
+    return SQLiteCache(path, {'TIMEOUT': 300, 'OPTIONS': {'MAX_ENTRIES': 100, 'CULL_FREQUENCY': 3, **options}})
+
+
+def _increment(path):
+    shared = _make_cache(path)
+    for _ in range(50):
+        shared.incr('counter')
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        self.path = os.path.join(directory, 'cache.sqlite3')
+        self.cache = _make_cache(self.path)
+
+    def test_basic_operations_and_expiry(self):
+        self.cache.set('stats', {'totalPosts': 3})
+        self.assertEqual(self.cache.get('stats'), {'totalPosts': 3})
+        self.assertFalse(self.cache.add('stats', 'other'))
+
+        with mock.patch('common.cache_backends.time.time', return_value=10 ** 10):
+            self.assertIsNone(self.cache.get('stats'))
+            self.assertTrue(self.cache.add('stats', 'fresh'))
+
+        self.cache.set_many({'a': 1, 'b': [2]})
+        self.assertEqual(self.cache.get_many(['a', 'b', 'c']), {'a': 1, 'b': [2]})
+        self.assertTrue(self.cache.delete('a'))
+        self.assertFalse(self.cache.has_key('a'))
+
+    def test_entries_are_shared_between_instances(self):
+        self.cache.set('tree', ['folder'])
+        self.assertEqual(_make_cache(self.path).get('tree'), ['folder'])
+
+    def test_counters_are_atomic_across_processes(self):
+        self.cache.set('counter', 0)
+        with multiprocessing.get_context('fork').Pool(4) as pool:
+            pool.map(_increment, [self.path] * 4)
+
+        self.assertEqual(self.cache.get('counter'), 200)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_least_recently_used_entries_are_culled(self):
+        small = _make_cache(self.path, MAX_ENTRIES=10, CULL_CHECK_INTERVAL=1, LRU_RESOLUTION=0)
+        clock = iter(range(1000, 2000))
+        with mock.patch('common.cache_backends.time.time', side_effect=lambda: next(clock)):
+            for i in range(10):
+                small.set(f'key:{i}', i)
+            small.get('key:0')  # recently used, so it survives the cull
+            small.set('key:10', 10)
+
+            self.assertLessEqual(len(small.get_many([f'key:{i}' for i in range(11)])), 10)
+            self.assertEqual(small.get('key:0'), 0)
+            self.assertIsNone(small.get('key:1'))
+
+
+class CacheAsideTest(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_values_are_reused_until_project_is_invalidated(self):
+        compute = mock.Mock(side_effect=[{'totalPosts': 1}, {'totalPosts': 2}])
+        namespace = project_namespace(7)
+
+        self.assertEqual(cache_aside(namespace, 'stats', compute, 30), {'totalPosts': 1})
+        self.assertEqual(cache_aside(namespace, 'stats', compute, 30), {'totalPosts': 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_project_cache(7)
+            # Until the write commits, readers keep the old version rather than cache pre-commit rows
+            self.assertEqual(cache_aside(namespace, 'stats', compute, 30), {'totalPosts': 1})
+        self.assertEqual(cache_aside(namespace, 'stats', compute, 30), {'totalPosts': 2})
+        self.assertEqual(compute.call_count, 2)
+
+    def test_dashboard_stats_are_cached_per_project(self):
+        with mock.patch('dashboard.views.DashboardService') as service:
+            service.return_value.get_project_stats.return_value = {'totalPosts': 5}
+            for _ in range(2):
+                response = self.client.get('/api/dashboard/stats/3/', {'days_back': 7})
+
+        self.assertEqual(response.json(), {'totalPosts': 5})
+        service.return_value.get_project_stats.assert_called_once_with(days_back=7)
+
+    def test_folder_tree_is_invalidated_when_a_folder_changes(self):
+        user = User.objects.create_user(username='tree', password='x')
+        project = Project.objects.create(name='Tree', owner=user)
+        UnifiedRunFolder.objects.create(name='Run 1', project=project, folder_type='run')
+        params = {'project': project.id, 'filter_empty': 'false'}
+
+        first = self.client.get('/api/track-accounts/report-folders/', params)
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/track-accounts/report-folders/', params)
+        self.assertEqual(cached.json(), first.json())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            UnifiedRunFolder.objects.create(name='Run 2', project=project, folder_type='run')
+        fresh = self.client.get('/api/track-accounts/report-folders/', params)
+        self.assertNotEqual(fresh.json(), first.json())
+
+    def test_post_and_platform_folder_writes_invalidate_the_project(self):
+        from instagram_data.models import Folder as InstagramFolder, InstagramPost
+
+        project = Project.objects.create(name='Posts', owner=User.objects.create_user(username='posts', password='x'))
+        compute = mock.Mock(side_effect=range(10))
+        cached = lambda: cache_aside(project_namespace(project.id), 'folder_tree', compute)
+        cached()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            folder = InstagramFolder.objects.create(name='CSV upload', project=project)
+            post = InstagramPost.objects.create(folder=folder, post_id='ig1', likes=1)
+            post.delete()
+            folder.delete()
+        for _ in range(2):
+            cached()
+        self.assertEqual(compute.call_count, 2)  # 4 writes, one recompute after them
+        with self.captureOnCommitCallbacks(execute=True):
+            InstagramFolder.objects.create(name='Other', project=project)
+        self.assertEqual(cached(), 2)
+
+    def test_broken_cache_backend_fails_open(self):
+        compute = mock.Mock(return_value={'totalPosts': 1})
+        with mock.patch('common.cache_aside.cache') as broken:
+            broken.get.side_effect = broken.incr.side_effect = OSError('unable to open database file')
+            self.assertEqual(cache_aside(project_namespace(9), 'stats', compute), {'totalPosts': 1})
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_project_cache(9)
+
+
+class DataStorageQueryBudgetTest(QueryBudgetTestMixin, APITestCase):
+    def test_run_endpoint_counts_subfolders_in_one_query(self):
+        from brightdata_integration.models import BrightDataScrapedPost
+
+        user = User.objects.create_user('owner', password='pw')
+        project = Project.objects.create(name='Runs', owner=user)
+        run = UnifiedRunFolder.objects.create(name='Run', project=project, folder_type='run')
+        for i in range(6):
+            job = UnifiedRunFolder.objects.create(name=f'Job {i}', project=project, folder_type='job',
+                                                  parent_folder=run)
+            for j in range(i):
+                BrightDataScrapedPost.objects.create(folder_id=job.id, post_id=f'{i}-{j}', url=f'https://x/{i}/{j}')
+
+        response = self.assertWithinQueryBudget('get', f'/api/brightdata/data-storage/run/{run.id}/')
+        counts = [subfolder['posts_count'] for subfolder in response.json()['subfolders']]
+        self.assertEqual(sorted(counts), [0, 1, 2, 3, 4, 5])
+
+    def test_run_endpoint_pages_posts_by_cursor(self):
+        from brightdata_integration.models import BrightDataScrapedPost
+
+        user = User.objects.create_user('owner', password='pw')
+        project = Project.objects.create(name='Runs', owner=user)
+        job = UnifiedRunFolder.objects.create(name='Job', project=project, folder_type='job')
+        for i in range(5):
+            BrightDataScrapedPost.objects.create(folder_id=job.id, post_id=f'p{i}', likes=i)
+        url = f'/api/brightdata/data-storage/run/{job.id}/'
+
+        seen, cursor, totals = [], None, []
+        for _ in range(3):
+            params = {'page_size': 2, 'fields': 'post_id,likesCount'}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(url, params).json()
+            totals.append(data['total_results'])
+            seen.extend(data['data'])
+            cursor = data['next_cursor']
+        self.assertIsNone(cursor)
+        # Only the first page is counted
+        self.assertEqual(totals, [5, None, None])
+        # Newest first, only the projected fields, aliases on request
+        self.assertEqual(seen, [{'post_id': f'p{i}', 'likesCount': i} for i in reversed(range(5))])
+
+        self.assertEqual(self.client.get(url, {'fields': 'post_id,password'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'cursor': 'garbage'}).status_code, 400)
+
+
+class FolderAggregationTest(QueryBudgetTestMixin, APITestCase):
+    def setUp(self):
+        from brightdata_integration.models import BrightDataScrapedPost
+        from instagram_data.models import Folder as InstagramFolder, InstagramPost
+
+        user = User.objects.create_user('owner', password='pw')
+        project = Project.objects.create(name='Runs', owner=user)
+        self.run = UnifiedRunFolder.objects.create(name='Run', project=project, folder_type='run')
+        platform = UnifiedRunFolder.objects.create(name='Instagram', project=project, folder_type='platform',
+                                                   platform_code='instagram', parent_folder=self.run)
+        self.job = UnifiedRunFolder.objects.create(name='Job', project=project, folder_type='job',
+                                                   parent_folder=platform)
+        ig_folder = InstagramFolder.objects.create(name='IG', project=project, unified_job_folder=self.job)
+        for i in range(3):
+            InstagramPost.objects.create(folder=ig_folder, post_id=f'ig{i}', url=f'https://i/{i}',
+                                         description=f'caption {i}', likes=i)
+        for i in range(2):
+            BrightDataScrapedPost.objects.create(folder_id=self.job.id, post_id=f'bd{i}', url=f'https://b/{i}',
+                                                 platform='facebook', content=f'text {i}', webhook_delivered=True)
+        # Polled posts and posts of unrelated folders are not included
+        BrightDataScrapedPost.objects.create(folder_id=self.job.id, post_id='polled', webhook_delivered=False)
+        other = UnifiedRunFolder.objects.create(name='Other', project=project, folder_type='run')
+        BrightDataScrapedPost.objects.create(folder_id=other.id, post_id='other', webhook_delivered=True)
+
+    def test_aggregates_subtree_across_platform_tables(self):
+        from .folder_aggregation import folder_aggregation_service
+
+        with self.assertNumQueries(6):  # folder, 3 tree levels, count, page
+            results = folder_aggregation_service.aggregate(self.run.id, page_size=4)
+
+        self.assertEqual(results['total_results'], 5)
+        self.assertEqual(results['subfolders_processed'], 2)
+        self.assertTrue(results['has_next'])
+        self.assertEqual(len(results['data']), 4)
+        with self.assertNumQueries(5):  # no count after the first page
+            last_page = folder_aggregation_service.aggregate(self.run.id, cursor=results['next_cursor'], page_size=4)
+        self.assertIsNone(last_page['next_cursor'])
+        self.assertIsNone(last_page['total_results'])
+        posts = {post['post_id']: post for post in results['data'] + last_page['data']}
+        self.assertEqual(set(posts), {'ig0', 'ig1', 'ig2', 'bd0', 'bd1'})
+        self.assertEqual(posts['ig2']['platform'], 'instagram')
+        self.assertEqual(posts['ig2']['content'], 'caption 2')
+        self.assertEqual(posts['bd1']['platform'], 'facebook')
+        self.assertTrue(posts['bd1']['webhook_delivered'])
+        self.assertIsNone(folder_aggregation_service.aggregate(999999))
+
+    @mock.patch('requests.get', side_effect=AssertionError('no HTTP calls expected'))
+    def test_webhook_results_endpoints_served_in_process(self, _):
+        response = self.assertWithinQueryBudget('get', f'/api/brightdata/webhook-results/folder/{self.run.id}/')
+        self.assertTrue(response.json()['success'])
+        self.assertEqual(response.json()['source'], 'aggregated_subfolders')
+        self.assertEqual(response.json()['total_results'], 5)
+        self.assertEqual(len(response.json()['data']), 5)  # no paging parameter: every post
+        self.assertIsNone(response.json()['next_cursor'])
+
+        response = self.client.get(f'/api/brightdata/webhook-results/job/{self.run.id}/?page=3&page_size=2')
+        self.assertEqual((response.json()['page'], len(response.json()['data'])), (3, 1))
+        self.assertFalse(response.json()['has_next'])
+
+        response = self.client.get(f'/api/brightdata/webhook-results/job/{self.run.id}/?page_size=3&fields=post_id')
+        self.assertEqual(response.json()['total_results'], 5)
+        self.assertEqual(len(response.json()['data']), 3)
+        self.assertEqual(set(response.json()['data'][0]), {'post_id'})
+        response = self.client.get(f'/api/brightdata/webhook-results/job/{self.run.id}/',
+                                   {'cursor': response.json()['next_cursor']})
+        self.assertEqual(len(response.json()['data']), 2)
+        self.assertFalse(response.json()['has_next'])
+
+        response = self.client.get('/api/brightdata/webhook-results/Run/1/')
+        self.assertEqual(response.json()['folder_id'], self.run.id)
+        self.assertEqual(self.client.get('/api/brightdata/webhook-results/job/999999/').status_code, 404)
+
+
+class FolderTreeTest(APITestCase):
+    def build_run(self, project, platforms, jobs_per_service):
+        from instagram_data.models import Folder as InstagramFolder, InstagramPost
+
+        run = UnifiedRunFolder.objects.create(name='Run', project=project, folder_type='run')
+        for p in range(platforms):
+            platform = UnifiedRunFolder.objects.create(name=f'Platform {p}', project=project, folder_type='platform',
+                                                       platform_code='instagram', parent_folder=run)
+            service = UnifiedRunFolder.objects.create(name='Posts', project=project, folder_type='service',
+                                                      platform_code='instagram', service_code='posts',
+                                                      parent_folder=platform)
+            for j in range(jobs_per_service):
+                job = UnifiedRunFolder.objects.create(name=f'Job {j}', project=project, folder_type='job',
+                                                      parent_folder=service)
+                ig_folder = InstagramFolder.objects.create(name=f'IG {p}-{j}', project=project,
+                                                           unified_job_folder=job)
+                for i in range(j + 1):
+                    InstagramPost.objects.create(folder=ig_folder, post_id=f'{project.id}-{p}-{j}-{i}',
+                                                 url=f'https://i/{project.id}/{p}/{j}/{i}',
+                                                 content_type='reel' if i == 0 else 'Image')
+        return run
+
+    def fetch(self, run):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/track-accounts/report-folders/{run.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json(), len(queries)
+
+    def test_query_count_independent_of_tree_size(self):
+        user = User.objects.create_user('owner', password='pw')
+        small, small_queries = self.fetch(self.build_run(Project.objects.create(name='Small', owner=user), 1, 1))
+        large, large_queries = self.fetch(self.build_run(Project.objects.create(name='Large', owner=user), 3, 4))
+
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(large['post_count'], 3)
+        service = large['subfolders'][0]['subfolders'][0]
+        self.assertEqual(service['post_count'], 4)
+        job = next(job for job in service['subfolders'] if job['name'] == 'Job 2')
+        self.assertEqual(job['post_count'], 3)
+        self.assertEqual(job['post_count'], UnifiedRunFolder.objects.get(id=job['id']).get_content_count())
+        [ig_folder] = job['subfolders']
+        self.assertEqual((ig_folder['platform'], ig_folder['post_count'], ig_folder['reel_count']),
+                         ('instagram', 2, 1))
+
+
+    def test_only_the_requested_subtree_is_loaded(self):
+        from .folder_tree import folder_tree_materializer
+
+        project = Project.objects.create(name='Runs', owner=User.objects.create_user('owner', password='pw'))
+        run = self.build_run(project, 1, 2)
+        other_run = self.build_run(project, 2, 3)
+
+        tree = folder_tree_materializer.load([run])
+
+        self.assertEqual(len(tree.folders), 1 + 1 + 1 + 2)
+        self.assertFalse(tree.covers(other_run.pk))
+        # Platform folders (and their counts) of the other run's job folders are not read either
+        loaded = [platform_folder for job_id in tree.folders for platform_folder in tree.platform_folders(job_id)]
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(sum(len(folders) for folders in tree._platform_folders.values()), 2)
+
+class FolderPlanTest(TestCase):
+    def create_structure(self, sources):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from workflow.correct_folder_service import CorrectFolderService
+        from workflow.models import ScrapingRun
+
+        user = User.objects.create_user(f'owner{sources}', password='pw')
+        project = Project.objects.create(name='Runs', owner=user)
+        platforms = ['instagram', 'facebook', 'linkedin', 'tiktok']
+        TrackSource.objects.bulk_create([
+            TrackSource(project=project, name=f'Source {i}', platform=platforms[i % 4],
+                        service_name='posts' if i % 3 else 'comments',
+                        instagram_link=f'https://www.instagram.com/user{i}/')
+            for i in range(sources)
+        ])
+        run = ScrapingRun.objects.create(project=project, name='Run')
+        track_sources = list(TrackSource.objects.filter(project=project))
+
+        with CaptureQueriesContext(connection) as queries:
+            created = CorrectFolderService().create_correct_folder_structure(run, track_sources)
+        return run, track_sources, created, len(queries)
+
+    def test_hierarchy_written_level_by_level(self):
+        from .models import ServiceFolderIndex
+
+        _, _, _, few_queries = self.create_structure(8)
+        run, track_sources, created, many_queries = self.create_structure(300)
+
+        # One INSERT per level; SQLite's bound-parameter limit splits the 300 job folders into a few
+        self.assertEqual(few_queries, 7)
+        self.assertLessEqual(many_queries, few_queries + 3)
+        self.assertEqual(len(created['platform_folders']), 4)
+        self.assertEqual(len(created['service_folders']), 8)
+        self.assertEqual(len(created['job_folders']), 300)
+
+        source = track_sources[4]
+        job = UnifiedRunFolder.objects.get(id=created['folder_ids'][('job', source.id)])
+        self.assertEqual(job.name, 'Instagram Profile - user4')
+        self.assertEqual(job.parent_folder.folder_type, 'service')
+        self.assertEqual(job.parent_folder.parent_folder.parent_folder, created['run_folder'])
+        self.assertEqual(UnifiedRunFolder.objects.filter(scraping_run=run).count(), 1 + 4 + 8 + 300)
+
+        index = ServiceFolderIndex.objects.get(scraping_run=run, platform_code='instagram', service_code='posts')
+        self.assertEqual(index.folder, created['service_folders']['instagram_posts'])
+
+
+class PostSearchTest(APITestCase):
+    def test_ranked_search_across_platforms(self):
+        from facebook_data.models import FacebookPost, Folder as FacebookFolder
+        from instagram_data.models import Folder as InstagramFolder, InstagramPost
+
+        user = User.objects.create_user('owner', password='pw')
+        project = Project.objects.create(name='Search', owner=user)
+        other = Project.objects.create(name='Other', owner=user)
+        ig_folder = InstagramFolder.objects.create(name='IG', project=project)
+        fb_folder = FacebookFolder.objects.create(name='FB', project=project)
+        InstagramPost.objects.create(folder=ig_folder, post_id='ig1', url='https://i/1', user_posted='brand',
+                                     description='Summer launch', hashtags=['launch'])
+        FacebookPost.objects.create(folder=fb_folder, post_id='fb1', url='https://f/1', user_posted='brand',
+                                    content='Launch launch launch: the summer launch event')
+        InstagramPost.objects.create(folder=InstagramFolder.objects.create(name='IG', project=other),
+                                     post_id='ig2', url='https://i/2', user_posted='x', description='launch')
+
+        response = self.client.get('/api/track-accounts/search/', {'q': 'launch', 'project': project.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()['results']
+        self.assertEqual({(row['platform'], row['post_id']) for row in results},
+                         {('instagram', 'ig1'), ('facebook', 'fb1')})
+        self.assertEqual(results, sorted(results, key=lambda row: -row['search_rank']))
+        self.assertEqual(results[0]['content'].split()[0], 'Launch')
+
+        response = self.client.get('/api/track-accounts/search/', {'q': '#launch', 'project': project.id})
+        self.assertEqual([row['post_id'] for row in response.json()['results']], ['ig1'])
+        self.assertEqual(self.client.get('/api/track-accounts/search/').status_code, status.HTTP_400_BAD_REQUEST)
+
+
+
+class HotQueryPlanTest(TestCase):
+    def test_post_listings_use_folder_indexes(self):
+        import track_accounts.hot_queries  # noqa: F401
+        from common.query_plans import explain, registered
+
+        queries = {query.name: query for query in registered()}
+        for name in ('instagram_posts_by_folder', 'tiktok_posts_by_folder_type_dates', 'brightdata_folder_page'):
+            result = explain(queries[name].build())
+            self.assertEqual(result['full_scans'], [], f'{name}: {result["plan"]}')
+            self.assertFalse(result['sorts'], f'{name}: {result["plan"]}')
+
+
+class SyntheticDataTest(TestCase):
+    def test_generated_project_is_linked_like_a_real_run(self):
+        from instagram_data.models import InstagramComment, InstagramPost
+        from .synthetic_data import SyntheticDataGenerator
+
+        dataset = SyntheticDataGenerator(seed=1).generate(sources=8, runs=2, posts=3, comments=2)
+
+        self.assertEqual(dataset['counts']['posts'], 8 * 2 * 3)
+        self.assertEqual(dataset['counts']['comments'], 4 * 2 * 3 * 2)  # Instagram and Facebook sources only
+        post = InstagramPost.objects.filter(folder__project=dataset['project']).first()
+        job = post.folder.unified_job_folder
+        self.assertEqual(job.folder_type, 'job')
+        self.assertEqual(job.parent_folder.parent_folder.parent_folder.scraping_run, post.folder.scraping_run)
+        self.assertEqual(InstagramComment.objects.filter(instagram_post=post).count(), 2)
+
+    def test_bench_command_reports_json(self):
+        import json
+        from io import StringIO
+        from django.core.management import call_command
+
+        out = StringIO()
+        call_command('bench', '--sources', '4', '--runs', '1', '--posts', '3', '--comments', '0', '--repeat', '1',
+                     '--ingest-items', '5', '--only', 'webhook_ingest', '--only', 'folder_tree', '--json', stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual(set(results['benchmarks']),
+                         {'webhook_ingest.instagram', 'webhook_ingest.facebook', 'webhook_ingest.linkedin',
+                          'webhook_ingest.tiktok', 'folder_tree'})
+        self.assertEqual(results['benchmarks']['webhook_ingest.instagram']['items'], 5)
+        self.assertIn('median_ms', results['benchmarks']['folder_tree'])
+        # Everything generated is rolled back
+        self.assertFalse(UnifiedRunFolder.objects.exists())
+
+
+class UnifiedPostTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pw')
+        self.project = Project.objects.create(name='Unified', owner=self.user)
+
+    def test_ingest_paths_keep_unified_posts_in_step(self):
+        from brightdata_integration.models import BrightDataScrapedPost
+        from instagram_data.models import Folder as InstagramFolder, InstagramPost
+        from .models import UnifiedPost
+
+        folder = InstagramFolder.objects.create(name='IG', project=self.project)
+        post = InstagramPost.objects.create(folder=folder, post_id='ig1', url='https://i/1', user_posted='brand',
+                                            likes=10, num_comments=2, video_view_count=40)
+        post.likes = 15
+        post.save()
+        row = UnifiedPost.objects.get(source='instagram_post', source_id=post.id)
+        self.assertEqual((row.platform, row.project_id, row.likes, row.views), ('instagram', self.project.id, 15, 40))
+
+        job = UnifiedRunFolder.objects.create(name='Job', folder_type='job', project=self.project)
+        BrightDataScrapedPost.objects.create(folder_id=job.id, post_id='fb1', platform='facebook_posts', shares=3)
+        BrightDataScrapedPost.objects.create(folder_id=job.id + 1000, post_id='fb2', platform='facebook')
+        rows = {row.post_id: row for row in UnifiedPost.objects.filter(source='brightdata_post')}
+        self.assertEqual((rows['fb1'].platform, rows['fb1'].project_id, rows['fb1'].folder_id, rows['fb1'].shares),
+                         ('facebook', self.project.id, job.id, 3))
+        self.assertNotIn('fb2', rows)  # Its folder does not exist, so it belongs to no project
+
+        post.delete()
+        self.assertFalse(UnifiedPost.objects.filter(source='instagram_post').exists())
+
+    def test_csv_upload_syncs_unified_posts_in_one_batch(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from instagram_data.models import Folder as InstagramFolder
+        from .models import UnifiedPost
+        from .unified_posts import UnifiedPostService
+
+        folder = InstagramFolder.objects.create(name='IG', project=self.project)
+        rows = ''.join(f'ig{i},https://www.instagram.com/p/ig{i}/,brand,{i}\n' for i in range(5))
+        upload = SimpleUploadedFile('posts.csv', f'post_id,url,user_posted,likes\n{rows}'.encode(), content_type='text/csv')
+
+        with mock.patch.object(UnifiedPostService, '_upsert', autospec=True,
+                               side_effect=UnifiedPostService._upsert) as upsert:
+            response = self.client.post('/api/instagram_data/posts/upload_csv/', {'file': upload, 'folder_id': folder.id})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(upsert.call_count, 1)
+        self.assertEqual(UnifiedPost.objects.filter(project=self.project).count(), 5)
+
+    def test_dashboard_stats_come_from_unified_aggregates(self):
+        from common.dashboard_service import DashboardService
+        from .synthetic_data import SyntheticDataGenerator
+
+        dataset = SyntheticDataGenerator(seed=2).generate(sources=4, runs=1, posts=5, comments=0, days=20,
+                                                          user=self.user)
+        service = DashboardService(project_id=dataset['project'].id)
+        with self.assertNumQueries(3):
+            stats = service.get_project_stats(days_back=30)
+        self.assertEqual(stats['totalPosts'], 20)
+        self.assertEqual(sum(platform['posts'] for platform in stats['platforms'].values()), 20)
+        with self.assertNumQueries(1):
+            timeline = service.get_activity_timeline(days_back=28)
+        self.assertEqual(len(timeline), 4)
+        self.assertEqual(sum(week[platform] for week in timeline
+                             for platform in ('instagram', 'facebook', 'linkedin', 'tiktok')), 20)
+
+    def test_copies_from_several_providers_are_merged(self):
+        from brightdata_integration.models import BrightDataScrapedPost
+        from brightdata_integration.views import _process_brightdata_results
+        from instagram_data.models import Folder as InstagramFolder, InstagramPost
+        from .models import UnifiedPost
+
+        job = UnifiedRunFolder.objects.create(name='Job', folder_type='job', project=self.project)
+        item = {'post_id': 'Cx1', 'url': 'https://www.instagram.com/reel/Cx1/?utm_source=ig', 'likes': 5,
+                'user_posted': 'brand'}
+        self.assertTrue(_process_brightdata_results([item], 'instagram', None, job.id))
+        # The polling copy of the same delivery, with newer metrics
+        self.assertTrue(_process_brightdata_results([{**item, 'likes': 9}], 'instagram', None, job.id))
+        scraped = BrightDataScrapedPost.objects.get(folder_id=job.id)
+        self.assertEqual(scraped.likes, 9)
+
+        folder = InstagramFolder.objects.create(name='IG', project=self.project, unified_job_folder=job)
+        InstagramPost.objects.create(folder=folder, post_id='Cx1', url='https://instagram.com/p/Cx1', user_posted='brand',
+                                     likes=7, num_comments=3)
+        row = UnifiedPost.objects.get(project=self.project)
+        self.assertEqual((row.source, row.likes, row.num_comments), ('brightdata_post', 9, 3))
+
+
+    def test_copies_never_lower_metrics_and_deletes_keep_remaining_copies(self):
+        from brightdata_integration.models import BrightDataScrapedPost
+        from instagram_data.models import Folder as InstagramFolder, InstagramPost
+        from .models import EngagementSnapshot, UnifiedPost
+
+        job = UnifiedRunFolder.objects.create(name='Job', folder_type='job', project=self.project)
+        scraped = BrightDataScrapedPost.objects.create(folder_id=job.id, post_id='Cx1', platform='instagram', likes=90)
+        folder = InstagramFolder.objects.create(name='IG', project=self.project, unified_job_folder=job)
+        # A later copy with stale metrics, e.g. from a worker that has not seen the first one
+        post = InstagramPost.objects.create(folder=folder, post_id='Cx1', url='https://instagram.com/p/Cx1', likes=3)
+        row = UnifiedPost.objects.get(project=self.project)
+        self.assertEqual((row.source, row.likes, row.copies.count()), ('brightdata_post', 90, 2))
+        self.assertEqual(list(EngagementSnapshot.objects.values_list('likes', flat=True)), [90])
+
+        scraped.delete()
+        row = UnifiedPost.objects.get(project=self.project)
+        self.assertEqual((row.source, row.source_id, row.likes), ('instagram_post', post.id, 3))
+        post.delete()
+        self.assertFalse(UnifiedPost.objects.exists())
+
+
+class PostDedupTest(SimpleTestCase):
+    def test_fingerprint_ignores_url_variants(self):
+        from common.post_dedup import fingerprint
+
+        variants = ['https://www.instagram.com/p/Cx1/', 'http://instagram.com/reel/Cx1?igsh=abc',
+                    'https://m.instagram.com/brand/p/Cx1']
+        self.assertEqual(len({fingerprint('instagram', None, url) for url in variants}), 1)
+        self.assertEqual(fingerprint('facebook_posts', '1', 'https://facebook.com/1'), fingerprint('Facebook', ' 1', ''))
+        self.assertNotEqual(fingerprint('facebook', None, 'https://facebook.com/permalink.php?story_fbid=1&id=2'),
+                            fingerprint('facebook', None, 'https://facebook.com/permalink.php?story_fbid=3&id=2'))
+        self.assertIsNone(fingerprint('tiktok', '', None))
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        from common.post_dedup import BloomFilter
+
+        bloom = BloomFilter(capacity=2000, error_rate=0.01)
+        for i in range(2000):
+            bloom.add(f'in{i}')
+        self.assertTrue(all(f'in{i}' in bloom for i in range(2000)))
+        false_positives = sum(f'out{i}' in bloom for i in range(5000))
+        self.assertLess(false_positives, 5000 * 0.03)
+
+
+class EngagementHistoryTest(TestCase):
+    def setUp(self):
+        from .models import UnifiedPost
+        self.project = Project.objects.create(name='History', owner=User.objects.create_user('owner', password='pw'))
+        self.end = timezone.now().replace(hour=12, minute=0, second=0, microsecond=0)
+        self.posts = [UnifiedPost.objects.create(source='tiktok_post', source_id=i, platform='tiktok', project=self.project,
+                                                 fingerprint=f'fp{i}', date_posted=self.end) for i in range(2)]
+
+    def snapshot(self, post, days_ago, likes, minutes=0, **extra):
+        from .models import EngagementSnapshot
+        return EngagementSnapshot.objects.create(
+            post=post, observed_at=self.end - timedelta(days=days_ago) + timedelta(minutes=minutes), likes=likes, **extra)
+
+    def test_syncs_record_only_changed_metrics(self):
+        from instagram_data.models import Folder as InstagramFolder, InstagramPost
+        from .models import EngagementSnapshot
+
+        folder = InstagramFolder.objects.create(name='IG', project=self.project)
+        post = InstagramPost.objects.create(folder=folder, post_id='ig1', url='https://i/1', likes=10)
+        post.save()
+        post.likes = 12
+        post.save()
+        snapshots = EngagementSnapshot.objects.filter(post__source='instagram_post', post__source_id=post.id)
+        self.assertEqual(list(snapshots.order_by('id').values_list('likes', flat=True)), [10, 12])
+
+    def test_growth_curve_counts_change_between_snapshots(self):
+        from .engagement_history import engagement_history_service
+
+        first, second = self.posts
+        self.snapshot(first, 30, 40)  # Superseded before the first window: never loaded
+        self.snapshot(first, 20, 100)
+        self.snapshot(first, 10, 150, num_comments=4)
+        self.snapshot(first, 9, 160)
+        self.snapshot(second, 5, 1000)  # First seen in the last window: grows from here, not from zero
+        self.snapshot(second, 1, 1040)
+
+        with self.assertNumQueries(2):
+            curve = engagement_history_service.growth_curve(project_id=self.project.id, buckets=2, bucket_days=7,
+                                                            end=self.end)
+        self.assertEqual([(w['posts'], w['likes'], w['likes_growth']) for w in curve], [(1, 160, 60), (2, 1200, 40)])
+        self.assertEqual(curve[0]['num_comments'], 0)  # The newest snapshot of the window wins
+        self.assertEqual(engagement_history_service.growth_rate(curve), round(40 / 1160 * 100, 1))
+
+    def test_compact_applies_retention_tiers(self):
+        from .engagement_history import engagement_history_service
+        from .models import EngagementSnapshot
+
+        post = self.posts[0]
+        for minutes in (0, 10, 20):
+            self.snapshot(post, 1, minutes, minutes=minutes)  # Raw: all kept
+            self.snapshot(post, 10, minutes, minutes=minutes)  # Hourly: the last of the hour kept
+            self.snapshot(post, 100, minutes, minutes=minutes)  # Daily: the last of the day kept
+        newest = self.snapshot(post, 100, 999, minutes=300)
+        self.snapshot(post, 400, 1)  # Expired
+
+        self.assertEqual(engagement_history_service.compact(now=self.end, dry_run=True),
+                         {'expired': 1, 'hourly': 2, 'daily': 3})
+        engagement_history_service.compact(now=self.end)
+        self.assertEqual(EngagementSnapshot.objects.count(), 5)
+        self.assertTrue(EngagementSnapshot.objects.filter(id=newest.id).exists())
@@ -0,0 +1,417 @@
+"""
+Unified Posts
+Keeps the UnifiedPost table in step with the platform post tables and answers
+cross-platform analytics from it in single queries
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from common.post_dedup import canonical_platform, fingerprint
+
+logger = logging.getLogger(__name__)
+
+PLATFORMS = ('instagram', 'facebook', 'linkedin', 'tiktok')
+
+# Written on every sync; created_at keeps the time the post was first seen and (source, source_id)
+# the first copy stored. Metrics are raised separately, never overwritten.
+UPDATE_FIELDS = ['platform', 'folder', 'post_id', 'account', 'url', 'content_type', 'date_posted', 'updated_at']
+METRICS = ('likes', 'num_comments', 'shares', 'views')
+
+
+class SourceTable:
+    """
+    How rows of one post table become UnifiedPost rows. `columns` maps
+    UnifiedPost fields to source columns; a tuple means the first non-empty
+    of several. Platform tables reach their job folder and project through
+    their platform folder; BrightData rows store the job folder id directly.
+    """
+
+    def __init__(self, key: str, label: str, columns: Dict[str, Any], platform: Optional[str] = None,
+                 folder_lookup: str = 'folder__unified_job_folder_id', project_lookup: Optional[str] = 'folder__project_id'):
+        self.key = key
+        self.label = label
+        self.columns = columns
+        self.platform = platform
+        self.folder_lookup = folder_lookup
+        self.project_lookup = project_lookup
+
+    def lookups(self) -> List[str]:
+        names = {'pk', 'created_at', self.folder_lookup}
+        if self.project_lookup:
+            names.add(self.project_lookup)
+        for column in self.columns.values():
+            names.update(column if isinstance(column, tuple) else (column,))
+        return sorted(names)
+
+    def fields(self, values: Dict[str, Any], folder_projects: Dict[int, Any]) -> Dict[str, Any]:
+        """UnifiedPost field values of one source row (`values` keyed by lookups())"""
+        def column(name):
+            source = self.columns.get(name)
+            for lookup in (source if isinstance(source, tuple) else (source,)):
+                if lookup and values.get(lookup) not in (None, ''):
+                    return values[lookup]
+            return None
+
+        folder_id = values.get(self.folder_lookup)
+        if self.project_lookup:
+            project_id = values.get(self.project_lookup)
+        else:
+            # A stored folder id need not exist (webhooks fall back to folder 1)
+            project_id = folder_projects.get(folder_id)
+            if folder_id not in folder_projects:
+                folder_id = None
+
+        platform = self.platform or _platform(column('platform'))
+        return {
+            'source': self.key,
+            'source_id': values['pk'],
+            'platform': platform,
+            # Rows without a post id or URL only ever match themselves
+            'fingerprint': (fingerprint(platform, column('post_id'), column('url'))
+                            or fingerprint(platform, f"{self.key}:{values['pk']}")),
+            'project_id': project_id,
+            'folder_id': folder_id,
+            'post_id': str(column('post_id') or '')[:255],
+            'account': str(column('account') or '')[:255],
+            'url': str(column('url') or '')[:500],
+            'content_type': str(column('content_type') or '')[:50],
+            'date_posted': column('date_posted') or values.get('created_at') or timezone.now(),
+            **{metric: _int(column(metric)) for metric in METRICS},
+        }
+
+
+def _platform(value) -> str:
+    return canonical_platform(value)[:20] or 'instagram'
+
+
+def _int(value) -> int:
+    try:
+        return max(int(value or 0), 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+_COMMON = {'post_id': 'post_id', 'account': 'user_posted', 'url': 'url', 'date_posted': 'date_posted',
+           'likes': 'likes', 'num_comments': 'num_comments', 'content_type': 'content_type'}
+
+SOURCE_TABLES = {table.key: table for table in (
+    SourceTable('instagram_post', 'instagram_data.InstagramPost', platform='instagram',
+                columns={**_COMMON, 'views': ('video_view_count', 'video_play_count', 'views')}),
+    SourceTable('facebook_post', 'facebook_data.FacebookPost', platform='facebook',
+                columns={**_COMMON, 'shares': 'num_shares', 'views': 'video_view_count'}),
+    SourceTable('linkedin_post', 'linkedin_data.LinkedInPost', platform='linkedin',
+                columns={**_COMMON, 'shares': 'num_shares'}),
+    SourceTable('tiktok_post', 'tiktok_data.TikTokPost', platform='tiktok', columns=_COMMON),
+    SourceTable('brightdata_post', 'brightdata_integration.BrightDataScrapedPost',
+                columns={**_COMMON, 'content_type': 'media_type', 'shares': 'shares', 'platform': 'platform'},
+                folder_lookup='folder_id', project_lookup=None),
+)}
+
+
+class UnifiedPostService:
+    """
+    Writes UnifiedPost rows from the source tables with one upsert per batch
+    (INSERT ... ON CONFLICT (project, fingerprint) DO UPDATE) and reads
+    cross-platform aggregates back in one query each. Copies of a post from
+    several providers or runs land on one row; its metrics are raised with
+    GREATEST() in the database, so concurrent syncs never lower them, and
+    every copy is linked in UnifiedPostSource. Rows of posts that belong to
+    no project are not kept.
+
+    Single saves and deletes are synced by signals (track_accounts/signals.py);
+    ingest loops that save posts one by one run inside deferred() so they are
+    upserted in batches, and code that writes posts with bulk_create or
+    update() calls sync() itself.
+    """
+
+    def __init__(self, get_model=global_apps.get_model):
+        self.get_model = get_model
+        self._local = threading.local()
+
+    @cached_property
+    def history(self):
+        from .engagement_history import EngagementHistoryService
+        return EngagementHistoryService(self.get_model)
+
+    @property
+    def batch_size(self) -> int:
+        return getattr(settings, 'UNIFIED_POST_BATCH_SIZE', 1000)
+
+    def table_for(self, model) -> Optional[SourceTable]:
+        label = model._meta.label
+        return next((table for table in SOURCE_TABLES.values() if table.label == label), None)
+
+    # Writing
+
+    def sync(self, source: str, queryset=None) -> int:
+        """Upsert the UnifiedPost rows of a source table, or of `queryset` of its rows"""
+        table = SOURCE_TABLES[source]
+        if queryset is None:
+            queryset = self.get_model(table.label).objects.all()
+        synced, batch = 0, []
+        for values in queryset.order_by().values(*table.lookups()).iterator(chunk_size=self.batch_size):
+            batch.append(values)
+            if len(batch) >= self.batch_size:
+                synced += self._upsert(table, batch)
+                batch = []
+        if batch:
+            synced += self._upsert(table, batch)
+        return synced
+
+    def sync_queryset(self, queryset) -> int:
+        """Upsert the UnifiedPost rows of a queryset of any source table"""
+        return self.sync(self.table_for(queryset.model).key, queryset)
+
+    def sync_all(self) -> Dict[str, int]:
+        return {source: self.sync(source) for source in SOURCE_TABLES}
+
+    @contextmanager
+    def deferred(self):
+        """
+        Collect the posts saved inside the block and upsert them in batches on
+        exit instead of one row per save; used by the per-item ingest loops
+        """
+        if getattr(self._local, 'pending', None) is not None:
+            yield
+            return
+        self._local.pending = pending = {}
+        try:
+            yield
+        finally:
+            # Posts saved before an error are kept, so they are synced either way
+            self._local.pending = None
+            for source, ids in pending.items():
+                ids = sorted(ids)
+                model = self.get_model(SOURCE_TABLES[source].label)
+                for start in range(0, len(ids), self.batch_size):
+                    self.sync(source, model.objects.filter(pk__in=ids[start:start + self.batch_size]))
+
+    def sync_instance(self, instance) -> None:
+        """Upsert the row of one saved post, from the instance (related folders are usually cached)"""
+        table = self.table_for(type(instance))
+        pending = getattr(self._local, 'pending', None)
+        if pending is not None:
+            pending.setdefault(table.key, set()).add(instance.pk)
+            return
+        values = {}
+        for lookup in table.lookups():
+            value = instance
+            for part in lookup.split('__'):
+                value = getattr(value, part, None) if value is not None else None
+            values[lookup] = value
+        self._upsert(table, [values])
+
+    def remove(self, source: str, ids: Iterable[int]) -> int:
+        """
+        Unlink deleted source rows; the posts they fed are rebuilt from their
+        remaining copies, or deleted if none remain. Returns the posts deleted.
+        """
+        links = self.get_model('track_accounts.UnifiedPostSource').objects.filter(source=source, source_id__in=list(ids))
+        posts = dict(links.values_list('post_id', 'post__project_id'))
+        links.delete()
+        deleted = self._rebuild(posts)
+        self._changed(set(posts.values()))
+        return deleted
+
+    def _folder_projects(self, table: SourceTable, batch: List[Dict[str, Any]]) -> Dict[int, Any]:
+        if table.project_lookup:
+            return {}
+        folder_ids = {values[table.folder_lookup] for values in batch if values.get(table.folder_lookup)}
+        if not folder_ids:
+            return {}
+        return dict(self.get_model('track_accounts.UnifiedRunFolder').objects
+                    .filter(id__in=folder_ids).values_list('id', 'project_id'))
+
+    def _upsert(self, table: SourceTable, batch: List[Dict[str, Any]]) -> int:
+        UnifiedPost = self.get_model('track_accounts.UnifiedPost')
+        folder_projects = self._folder_projects(table, batch)
+
+        # One row per (project, fingerprint): fold copies within the batch, the database folds in stored rows
+        rows, copies = {}, {}
+        for values in batch:
+            fields = table.fields(values, folder_projects)
+            if fields['project_id'] is None:
+                continue
+            key = (fields['project_id'], fields['fingerprint'])
+            copies.setdefault(key, []).append(fields['source_id'])
+            if key in rows:
+                fields.update({metric: max(fields[metric], rows[key][metric]) for metric in METRICS})
+                fields.update({name: rows[key][name] for name in ('source', 'source_id')})
+            rows[key] = fields
+
+        with transaction.atomic():
+            posts = UnifiedPost.objects.bulk_create(
+                [UnifiedPost(**fields) for fields in rows.values()],
+                update_conflicts=True, unique_fields=['project', 'fingerprint'], update_fields=UPDATE_FIELDS,
+                batch_size=self.batch_size,
+            ) if rows else []
+            post_ids = {key: post.pk for key, post in zip(rows, posts)}
+            self._raise_metrics(UnifiedPost, {post_ids[key]: fields for key, fields in rows.items()})
+            moved = self._link(table, [values['pk'] for values in batch],
+                               {source_id: post_ids[key] for key, source_ids in copies.items() for source_id in source_ids})
+            if moved:
+                self._rebuild(moved)
+            # Engagement history: posts whose metrics differ from their latest snapshot
+            self.history.record_changes(post_ids.values())
+        self._changed({project_id for project_id, _ in rows})
+        return len(rows)
+
+    def _changed(self, project_ids: Iterable[Any]) -> None:
+        """
+        Every post write ends here, whatever path it took (ingest, CSV upload,
+        edit or delete), so cached project endpoints and chat context are dropped here
+        """
+        from chat.context_service import invalidate_project_context
+
+        for project_id in project_ids:
+            invalidate_project_context(project_id)
+
+    def _raise_metrics(self, UnifiedPost, rows: Dict[int, Dict[str, Any]]) -> None:
+        """
+        metric = GREATEST(metric, delivered) for every row, in one statement
+        per chunk; rows just inserted already hold the delivered values and are
+        not written again
+        """
+        table = connection.ops.quote_name(UnifiedPost._meta.db_table)
+        greatest = 'MAX' if connection.vendor == 'sqlite' else 'GREATEST'
+        post_ids = list(rows)
+        with connection.cursor() as cursor:
+            for start in range(0, len(post_ids), 500):
+                chunk = post_ids[start:start + 500]
+                placeholders = ', '.join(['(%s, %s, %s, %s, %s)'] * len(chunk))
+                cursor.execute(
+                    f"WITH delivered (id, {', '.join(METRICS)}) AS (VALUES {placeholders}) "
+                    f"UPDATE {table} SET "
+                    + ', '.join(f"{metric} = {greatest}({table}.{metric}, CAST(delivered.{metric} AS BIGINT))"
+                                for metric in METRICS)
+                    + f" FROM delivered WHERE {table}.id = CAST(delivered.id AS BIGINT) AND ("
+                    + ' OR '.join(f"{table}.{metric} < CAST(delivered.{metric} AS BIGINT)" for metric in METRICS)
+                    + ')',
+                    [value for post_id in chunk for value in (post_id, *(rows[post_id][metric] for metric in METRICS))],
+                )
+
+    def _link(self, table: SourceTable, source_ids: List[int], post_of: Dict[int, int]) -> set:
+        """
+        Point the synced source rows at their posts. Returns the posts a row
+        was moved away from (its URL, post id or project changed), which have
+        to be rebuilt without it.
+        """
+        UnifiedPostSource = self.get_model('track_accounts.UnifiedPostSource')
+        linked = dict(UnifiedPostSource.objects.filter(source=table.key, source_id__in=source_ids)
+                      .values_list('source_id', 'post_id'))
+        moved = {post_id for source_id, post_id in linked.items() if post_of.get(source_id) != post_id}
+        unlinked = [source_id for source_id in linked if source_id not in post_of]
+        if unlinked:
+            UnifiedPostSource.objects.filter(source=table.key, source_id__in=unlinked).delete()
+        UnifiedPostSource.objects.bulk_create(
+            [UnifiedPostSource(post_id=post_id, source=table.key, source_id=source_id)
+             for source_id, post_id in post_of.items() if linked.get(source_id) != post_id],
+            update_conflicts=True, unique_fields=['source', 'source_id'], update_fields=['post'],
+            batch_size=self.batch_size,
+        )
+        return moved
+
+    def _rebuild(self, post_ids: Iterable[int]) -> int:
+        """
+        Recompute posts from the copies still linked to them, after a copy was
+        deleted or moved to another post. Metrics are set, not raised: the
+        largest of the remaining copies. Returns the posts left without copies,
+        which are deleted.
+        """
+        UnifiedPost = self.get_model('track_accounts.UnifiedPost')
+        UnifiedPostSource = self.get_model('track_accounts.UnifiedPostSource')
+        post_ids = set(post_ids)
+        if not post_ids:
+            return 0
+        linked = {}
+        for source, source_id, post_id in (UnifiedPostSource.objects.filter(post_id__in=post_ids)
+                                           .values_list('source', 'source_id', 'post_id')):
+            linked.setdefault(source, {})[source_id] = post_id
+
+        copies = {}
+        for source, post_of in linked.items():
+            table = SOURCE_TABLES[source]
+            batch = list(self.get_model(table.label).objects.filter(pk__in=list(post_of)).values(*table.lookups()))
+            folder_projects = self._folder_projects(table, batch)
+            for values in batch:
+                copies.setdefault(post_of.pop(values['pk']), []).append(table.fields(values, folder_projects))
+            # Links whose source row is gone (deleted together with the one being removed)
+            if post_of:
+                UnifiedPostSource.objects.filter(source=source, source_id__in=list(post_of)).delete()
+
+        orphans = post_ids - set(copies)
+        if orphans:
+            UnifiedPost.objects.filter(pk__in=orphans).delete()
+        # (source, source_id) keeps pointing at the copy it did if that one remains
+        current = {pk: (source, source_id) for pk, source, source_id
+                   in UnifiedPost.objects.filter(pk__in=list(copies)).values_list('pk', 'source', 'source_id')}
+        now = timezone.now()
+        posts = []
+        for post_id, fields in copies.items():
+            first = min(fields, key=lambda copy: ((copy['source'], copy['source_id']) != current.get(post_id),
+                                                  copy['source'], copy['source_id']))
+            post = UnifiedPost(pk=post_id, source=first['source'], source_id=first['source_id'], folder_id=first['folder_id'],
+                               **{name: first[name] for name in UPDATE_FIELDS if name not in ('folder', 'updated_at')},
+                               **{metric: max(copy[metric] for copy in fields) for metric in METRICS})
+            post.updated_at = now
+            posts.append(post)
+        UnifiedPost.objects.bulk_update(posts, ['source', 'source_id', *UPDATE_FIELDS, *METRICS], batch_size=self.batch_size)
+        self.history.record_changes(copies)
+        return len(orphans)
+
+    # Reading
+
+    def posts(self, project_id=None, since=None, until=None, platform=None):
+        queryset = self.get_model('track_accounts.UnifiedPost').objects.all()
+        if project_id:
+            queryset = queryset.filter(project_id=project_id)
+        if since:
+            queryset = queryset.filter(date_posted__gte=since)
+        if until:
+            queryset = queryset.filter(date_posted__lt=until)
+        if platform:
+            queryset = queryset.filter(platform=platform)
+        return queryset
+
+    def totals(self, project_id=None, since=None, until=None) -> Dict[str, int]:
+        """Post count, metric sums and distinct accounts, in one query"""
+        totals = self.posts(project_id, since, until).aggregate(
+            posts=Count('id'), accounts=Count('account', distinct=True),
+            **{metric: Sum(metric) for metric in METRICS},
+        )
+        return {key: value or 0 for key, value in totals.items()}
+
+    def platform_totals(self, project_id=None, since=None, until=None) -> Dict[str, Dict[str, int]]:
+        """totals() per platform, in one query"""
+        rows = (self.posts(project_id, since, until).order_by().values('platform')
+                .annotate(posts=Count('id'), **{metric: Sum(metric) for metric in METRICS}))
+        return {row.pop('platform'): {key: value or 0 for key, value in row.items()} for row in rows}
+
+    def timeline(self, project_id=None, buckets: int = 4, bucket_days: int = 7, end=None) -> List[Dict[str, Any]]:
+        """
+        Posts per platform in `buckets` consecutive windows of `bucket_days`
+        ending at `end`, oldest first, in one query
+        """
+        end = end or timezone.now()
+        windows = [(end - timedelta(days=(i + 1) * bucket_days), end - timedelta(days=i * bucket_days))
+                   for i in reversed(range(buckets))]
+        counts = self.posts(project_id, since=windows[0][0], until=end).aggregate(**{
+            f'{platform}_{i}': Count('id', filter=Q(platform=platform, date_posted__gte=start, date_posted__lt=stop))
+            for i, (start, stop) in enumerate(windows) for platform in PLATFORMS
+        })
+        return [{'start': start, 'end': stop, **{platform: counts[f'{platform}_{i}'] for platform in PLATFORMS}}
+                for i, (start, stop) in enumerate(windows)]
+
+
+unified_post_service = UnifiedPostService()
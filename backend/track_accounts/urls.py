@@ -14,6 +14,7 @@ router.register(r'report-folders', views.UnifiedRunFolderViewSet, basename='unif
 urlpatterns = [
     path('', include(router.urls)),
     path('fix-folder-4/', views.fix_folder_4_api, name='fix-folder-4'),
+    path('search/', views.post_search_api, name='post-search'),
     # 🎯 UNIFIED DATA STORAGE API - Single endpoint for all folders
     path('unified-folders/', unified_data_storage_api, name='unified_data_storage_api'),
 ] 
\ No newline at end of file
@@ -5,7 +5,7 @@ import json
 import datetime
 from rest_framework import viewsets, status
 from rest_framework.response import Response
-from rest_framework.decorators import action
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.pagination import PageNumberPagination
 from django.http import HttpResponse, JsonResponse
@@ -13,7 +13,10 @@ from django.db.models import Q
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 import logging
+from django.conf import settings
+from common.cache_aside import cache_aside, project_namespace
 from .models import TrackSource, SourceFolder, ReportFolder, ReportEntry, UnifiedRunFolder
+from .post_search import post_search_service
 from .serializers import (
     TrackSourceSerializer,
     SourceFolderSerializer,
@@ -640,13 +643,27 @@ class UnifiedRunFolderViewSet(viewsets.ModelViewSet):
                 ~Q(folder_type='content')
             )
         
-        # Check if hierarchical data is requested
-        include_hierarchy = self.request.query_params.get('include_hierarchy', 'false').lower() == 'true'
-        if include_hierarchy:
-            queryset = queryset.prefetch_related('subfolders')
-        
+        # Subfolders (include_hierarchy) are assembled by the serializer from one
+        # materialized folder tree, so nothing is prefetched here
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        """
+        Folder listings for a project are served from the shared cache; the
+        project's cache is invalidated whenever folders or posts change.
+        """
+        project_id = request.query_params.get('project')
+        if not project_id:
+            return super().list(request, *args, **kwargs)
+
+        data = cache_aside(
+            project_namespace(project_id), 'folder_tree',
+            lambda: super(UnifiedRunFolderViewSet, self).list(request, *args, **kwargs).data,
+            sorted(request.query_params.lists()),
+            timeout=getattr(settings, 'FOLDER_TREE_CACHE_TIMEOUT', 300),
+        )
+        return Response(data)
+
     @action(detail=True, methods=['GET'])
     def platform_data(self, request, pk=None):
         """
@@ -955,3 +972,31 @@ def fix_folder_4_api(request):
             'success': False,
             'error': f'Failed to fix folder 4: {str(e)}'
         })
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def post_search_api(request):
+    """
+    Ranked full-text search over every platform's posts.
+
+    ?q= words match as prefixes and #tags match hashtags exactly; filter with
+    ?project=, ?folder_id= (a unified folder and its subfolders) and
+    ?platform=instagram,facebook; at most ?limit= results, best first.
+    """
+    params = request.query_params
+    query = (params.get('q') or params.get('search') or '').strip()
+    if not query:
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+
+    platforms = [platform.strip().lower() for platform in params.get('platform', '').split(',') if platform.strip()]
+    try:
+        project_id = int(params['project']) if params.get('project') else None
+        folder_id = int(params['folder_id']) if params.get('folder_id') else None
+    except ValueError:
+        return Response({'error': 'project and folder_id must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = post_search_service.search(query, project_id=project_id, folder_id=folder_id,
+                                         platforms=platforms, limit=params.get('limit'))
+
+    return Response({'query': query, 'count': len(results), 'results': results})
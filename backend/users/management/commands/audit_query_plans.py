@@ -0,0 +1,193 @@
+"""
+Management command to EXPLAIN the registered hot queries and flag full table scans
+
+Each query in track_accounts/hot_queries.py is explained with parameters taken
+from the busiest folder in the database. Queries that read a whole table are
+flagged; queries that sort after reading are reported too.
+
+With --synthetic N, N posts per table are generated inside a transaction that
+is rolled back, and every query is timed with the current indexes and again
+with the composite folder indexes dropped (and the old single-column folder_id
+index of BrightDataScrapedPost restored), as a before/after comparison.
+
+Usage:
+    python manage.py audit_query_plans
+    python manage.py audit_query_plans --query instagram_posts_by_folder --verbose
+    python manage.py audit_query_plans --fail-on-full-scan
+    python manage.py audit_query_plans --synthetic 50000 --json
+"""
+
+import json
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from common.query_plans import explain, registered
+
+# Models whose composite folder indexes the before/after comparison drops
+INDEXED_MODELS = (
+    'instagram_data.InstagramPost',
+    'facebook_data.FacebookPost',
+    'linkedin_data.LinkedInPost',
+    'tiktok_data.TikTokPost',
+    'brightdata_integration.BrightDataScrapedPost',
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+def composite_folder_indexes(model):
+    return [index for index in model._meta.indexes
+            if len(index.fields) > 1 and index.fields[0].lstrip('-') in ('folder', 'folder_id')]
+
+
+def seed(count, folders=20):
+    """`count` synthetic posts per indexed table spread over `folders` folders, most in the first"""
+    from facebook_data.models import Folder as FacebookFolder
+    from instagram_data.models import Folder as InstagramFolder
+    from linkedin_data.models import Folder as LinkedInFolder
+    from tiktok_data.models import Folder as TikTokFolder
+
+    rng = random.Random(46)
+    now = timezone.now()
+    content_types = ['post', 'reel', 'carousel', 'video']
+    folder_models = {
+        'instagram_data.InstagramPost': InstagramFolder,
+        'facebook_data.FacebookPost': FacebookFolder,
+        'linkedin_data.LinkedInPost': LinkedInFolder,
+        'tiktok_data.TikTokPost': TikTokFolder,
+    }
+
+    def folder_index():
+        # Skewed so one folder is clearly the busiest, like real runs
+        return 0 if rng.random() < 0.3 else rng.randrange(folders)
+
+    for label, folder_model in folder_models.items():
+        model = apps.get_model(label)
+        folder_ids = [folder_model.objects.create(name=f'Bench {i}').id for i in range(folders)]
+        model.objects.bulk_create([
+            model(folder_id=folder_ids[folder_index()], post_id=f'bench{i}', url=f'https://example.com/p/{i}',
+                  user_posted=f'account_{i % 500}', content_type=rng.choice(content_types),
+                  likes=int(rng.paretovariate(1.2) * 10), date_posted=now - timedelta(minutes=rng.randrange(525600)))
+            for i in range(count)
+        ], batch_size=2000)
+
+    from brightdata_integration.models import BrightDataScrapedPost
+    BrightDataScrapedPost.objects.bulk_create([
+        BrightDataScrapedPost(folder_id=100000 + folder_index(), post_id=f'bench{i}', platform='instagram',
+                              webhook_delivered=rng.random() < 0.7)
+        for i in range(count)
+    ], batch_size=2000)
+
+
+def analyze():
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN the hot post-listing queries and flag full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--query', action='append', dest='queries', help='Only these queries (repeatable)')
+        parser.add_argument('--analyze', action='store_true', help='Refresh planner statistics first')
+        parser.add_argument('--verbose', action='store_true', help='Print each plan')
+        parser.add_argument('--fail-on-full-scan', action='store_true', help='Exit with an error if any query scans a table')
+        parser.add_argument('--synthetic', type=int, default=0,
+                            help='Generate this many posts per table (rolled back) and time before/after the indexes')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per timed query (default: 20)')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        import track_accounts.hot_queries  # noqa: F401 - registers the queries
+
+        queries = registered()
+        if options['queries']:
+            queries = [query for query in queries if query.name in options['queries']]
+            if not queries:
+                raise CommandError(f"No registered query named {', '.join(options['queries'])}")
+
+        if options['synthetic']:
+            results = self._compare(queries, options)
+        else:
+            if options['analyze']:
+                analyze()
+            results = [self._audit(query) for query in queries]
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self._print(results, options)
+
+        flagged = [result['name'] for result in results if result['full_scans']]
+        if options['fail_on_full_scan'] and flagged:
+            raise CommandError(f"Full table scans in: {', '.join(flagged)}")
+
+    def _audit(self, query, repeat=0):
+        queryset = query.build()
+        result = {'name': query.name, 'description': query.description, **explain(queryset)}
+        if repeat:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - start) * 1000)
+            result['median_ms'] = round(statistics.median(timings), 3)
+        return result
+
+    def _compare(self, queries, options):
+        results = []
+        try:
+            with transaction.atomic():
+                seed(options['synthetic'])
+                analyze()
+                after = {query.name: self._audit(query, options['repeat']) for query in queries}
+
+                # Back to the indexes these tables had before the composite ones
+                quote = connection.ops.quote_name
+                scraped_post = apps.get_model('brightdata_integration.BrightDataScrapedPost')
+                with connection.cursor() as cursor:
+                    for label in INDEXED_MODELS:
+                        for index in composite_folder_indexes(apps.get_model(label)):
+                            cursor.execute(f'DROP INDEX {quote(index.name)}')
+                    cursor.execute(f'CREATE INDEX {quote("bench_scraped_folder_idx")} '
+                                   f'ON {quote(scraped_post._meta.db_table)} ({quote("folder_id")})')
+                analyze()
+                for query in queries:
+                    before = self._audit(query, options['repeat'])
+                    results.append({
+                        **after[query.name],
+                        'before_median_ms': before['median_ms'],
+                        'before_full_scans': before['full_scans'],
+                        'before_sorts': before['sorts'],
+                    })
+                raise _Rollback
+        except _Rollback:
+            pass
+        return results
+
+    def _print(self, results, options):
+        for result in results:
+            if result['full_scans']:
+                status = self.style.ERROR(f"FULL SCAN {', '.join(result['full_scans'])}")
+            elif result['sorts']:
+                status = self.style.WARNING('sort')
+            else:
+                status = self.style.SUCCESS('ok')
+            line = f"{result['name']:<45} {status}"
+            if 'before_median_ms' in result:
+                line += (f"  {result['before_median_ms']:>9.3f} ms -> {result['median_ms']:.3f} ms"
+                         f"{'  (was full scan)' if result['before_full_scans'] else ''}"
+                         f"{'  (was sorting)' if result['before_sorts'] and not result['sorts'] else ''}")
+            self.stdout.write(line)
+            if options['verbose']:
+                for plan_line in result['plan']:
+                    self.stdout.write(f'    {plan_line}')
@@ -0,0 +1,374 @@
+"""
+Management command to benchmark ingestion and read paths on a synthetic project
+
+A synthetic project (track sources, scraping runs with their folder trees,
+posts and comments on every platform, see track_accounts/synthetic_data.py)
+is generated inside a transaction that is rolled back afterwards, then each
+benchmark is timed through the same code path production traffic takes:
+
+    webhook_ingest      BrightData webhook processing of a delivery, per platform
+    csv_export          posts CSV download of a job folder, per platform
+    csv_import          upload of a BrightData posts CSV into a new folder, per platform
+    folder_tree         report-folders tree of a scraping run
+    dashboard_stats     dashboard stats, cold (cache invalidated) and warm
+    report_generation   report generation per template type, cold
+
+Results are JSON so runs can be compared; --compare reports the change of
+every median against an earlier --output file.
+
+Usage:
+    python manage.py bench
+    python manage.py bench --sources 40 --runs 3 --posts 100 --comments 10 --output bench.json
+    python manage.py bench --only webhook_ingest --only csv_import --repeat 10
+    python manage.py bench --compare bench.json --max-regression 20
+"""
+
+import contextlib
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+import warnings
+
+import django
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+BENCHMARKS = ('webhook_ingest', 'csv_export', 'csv_import', 'folder_tree', 'dashboard_stats', 'report_generation')
+
+# API prefix of each platform's posts endpoints
+POST_ENDPOINTS = {
+    'instagram': '/api/instagram-data/posts/',
+    'facebook': '/api/facebook-data/posts/',
+    'linkedin': '/api/linkedin-data/posts/',
+    'tiktok': '/api/tiktok-data/posts/',
+}
+
+REPORT_TYPES = ('engagement_metrics', 'content_analysis', 'trend_analysis')
+
+
+class _Rollback(Exception):
+    pass
+
+
+class _Stopwatch:
+    """Times the `with` blocks of one benchmark body; setup outside them is not counted"""
+
+    def __init__(self):
+        self.elapsed = 0.0
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed += time.perf_counter() - self._start
+
+
+def summarize(timings, items=None):
+    """Timing summary of one benchmark (timings in seconds)"""
+    ms = sorted(value * 1000 for value in timings)
+    result = {
+        'runs': len(ms),
+        'median_ms': round(statistics.median(ms), 3),
+        'p95_ms': round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        'min_ms': round(ms[0], 3),
+        'max_ms': round(ms[-1], 3),
+    }
+    if items:
+        result['items'] = items
+        result['items_per_second'] = round(items / (result['median_ms'] / 1000), 1) if result['median_ms'] else None
+    return result
+
+
+def compare(results, baseline):
+    """Change of each benchmark's median against a baseline results document, in percent"""
+    changes = {}
+    for name, result in results['benchmarks'].items():
+        before = baseline.get('benchmarks', {}).get(name)
+        if before and before.get('median_ms') and result.get('median_ms'):
+            changes[name] = round((result['median_ms'] / before['median_ms'] - 1) * 100, 1)
+    return changes
+
+
+class Command(BaseCommand):
+    help = 'Benchmark webhook ingestion, CSV import/export, folder trees, dashboard stats and reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sources', type=int, default=20, help='Track sources in the project (default: 20)')
+        parser.add_argument('--runs', type=int, default=2, help='Scraping runs (default: 2)')
+        parser.add_argument('--posts', type=int, default=50, help='Posts per job folder (default: 50)')
+        parser.add_argument('--comments', type=int, default=5,
+                            help='Comments per Instagram/Facebook post (default: 5)')
+        parser.add_argument('--ingest-items', type=int, default=200,
+                            help='Posts per webhook delivery (default: 200)')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per benchmark (default: 5)')
+        parser.add_argument('--seed', type=int, default=47, help='Seed of the synthetic data')
+        parser.add_argument('--only', action='append', choices=BENCHMARKS, help='Only these benchmarks (repeatable)')
+        parser.add_argument('--report-type', action='append', dest='report_types', choices=REPORT_TYPES,
+                            help=f"Report templates to generate (default: {', '.join(REPORT_TYPES)})")
+        parser.add_argument('--keep', action='store_true', help='Keep the synthetic project instead of rolling back')
+        parser.add_argument('--logs', action='store_true', help='Leave application logging and print() output on')
+        parser.add_argument('--output', help='Write the JSON results to this file')
+        parser.add_argument('--compare', help='Earlier --output file to compare against')
+        parser.add_argument('--max-regression', type=float,
+                            help='With --compare, exit with an error if any median is this many percent slower')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['compare']}: {e}")
+
+        self.logs = options['logs']
+        if not self.logs:
+            logging.disable(logging.CRITICAL)
+        try:
+            results = self._run(options)
+        finally:
+            logging.disable(logging.NOTSET)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+
+        changes = compare(results, baseline) if baseline else {}
+        if changes:
+            results['change_pct'] = changes
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+        else:
+            self._print(results, changes)
+
+        if options['max_regression'] is not None and changes:
+            slower = [f'{name} (+{change}%)' for name, change in changes.items() if change > options['max_regression']]
+            if slower:
+                raise CommandError(f"Slower than {options['compare']}: {', '.join(slower)}")
+
+    def _run(self, options):
+        from track_accounts.synthetic_data import SyntheticDataGenerator
+
+        selected = options['only'] or BENCHMARKS
+        results = {
+            'timestamp': timezone.now().isoformat(),
+            'environment': {'database': connection.vendor, 'python': platform.python_version(),
+                            'django': django.get_version()},
+            'config': {key: options[key] for key in ('sources', 'runs', 'posts', 'comments', 'ingest_items',
+                                                     'repeat', 'seed')},
+            'benchmarks': {},
+        }
+        try:
+            with transaction.atomic():
+                generator = SyntheticDataGenerator(seed=options['seed'])
+                start = time.perf_counter()
+                dataset = generator.generate(sources=options['sources'], runs=options['runs'],
+                                             posts=options['posts'], comments=options['comments'])
+                results['dataset'] = {**dataset['counts'], 'generate_seconds': round(time.perf_counter() - start, 3)}
+
+                for name in BENCHMARKS:
+                    if name in selected:
+                        results['benchmarks'].update(getattr(self, f'bench_{name}')(dataset, generator, options))
+                if not options['keep']:
+                    raise _Rollback
+        except _Rollback:
+            pass
+        return results
+
+    def _measure(self, body, repeat, items=None):
+        """
+        Run `body(stopwatch)` `repeat` times, each in a transaction that is
+        rolled back; a failing benchmark is reported with its error
+        """
+        timings = []
+        for _ in range(repeat):
+            stopwatch = _Stopwatch()
+            try:
+                with transaction.atomic(), self._quiet():
+                    body(stopwatch)
+                    raise _Rollback
+            except _Rollback:
+                pass
+            except CommandError as e:
+                return {'error': str(e)}
+            timings.append(stopwatch.elapsed)
+        return summarize(timings, items)
+
+    def _quiet(self):
+        """Silence the print() debugging of the views under test unless --logs"""
+        if self.logs:
+            return contextlib.nullcontext()
+        stack = contextlib.ExitStack()
+        stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+        stack.enter_context(warnings.catch_warnings())
+        warnings.simplefilter('ignore')
+        return stack
+
+    @staticmethod
+    def _client(dataset):
+        from rest_framework.test import APIClient
+
+        client = APIClient()
+        client.force_authenticate(dataset['user'])
+        return client
+
+    @staticmethod
+    def _check(response, name):
+        if response.status_code >= 400:
+            raise CommandError(f'{name}: HTTP {response.status_code} {response.content[:300]!r}')
+        return response
+
+    # Benchmarks: each returns {benchmark name: summary}
+
+    def bench_webhook_ingest(self, dataset, generator, options):
+        from brightdata_integration.views import _process_brightdata_results
+
+        results = {}
+        for platform_name, folders in dataset['platform_folders'].items():
+            if not folders:
+                continue
+            job_folder_id = folders[0].unified_job_folder_id
+            payload = generator.records(platform_name, options['ingest_items'])
+
+            def body(stopwatch):
+                with stopwatch:
+                    if not _process_brightdata_results(payload, platform_name, None, job_folder_id):
+                        raise CommandError(f'webhook_ingest: {platform_name} delivery failed')
+
+            results[f'webhook_ingest.{platform_name}'] = self._measure(body, options['repeat'], len(payload))
+        return results
+
+    def bench_csv_export(self, dataset, generator, options):
+        client = self._client(dataset)
+        results = {}
+        for platform_name, folders in dataset['platform_folders'].items():
+            if not folders:
+                continue
+
+            def body(stopwatch):
+                with stopwatch:
+                    response = client.get(f'{POST_ENDPOINTS[platform_name]}download_csv/', {'folder_id': folders[0].id})
+                self._check(response, f'csv_export.{platform_name}')
+
+            results[f'csv_export.{platform_name}'] = self._measure(body, options['repeat'], options['posts'])
+        return results
+
+    def bench_csv_import(self, dataset, generator, options):
+        from track_accounts.synthetic_data import platform_models, to_csv
+
+        client = self._client(dataset)
+        results = {}
+        for platform_name, folders in dataset['platform_folders'].items():
+            if not folders:
+                continue
+            content = to_csv(generator.records(platform_name, options['posts']))
+            models = platform_models()[platform_name]
+            imported = []
+
+            def body(stopwatch):
+                folder = models['folder'].objects.create(name='CSV import', project=dataset['project'])
+                upload = SimpleUploadedFile('posts.csv', content, content_type='text/csv')
+                with stopwatch:
+                    response = client.post(f'{POST_ENDPOINTS[platform_name]}upload_csv/',
+                                           {'file': upload, 'folder_id': folder.id}, format='multipart')
+                self._check(response, f'csv_import.{platform_name}')
+                imported.append(models['post'].objects.filter(folder=folder).count())
+
+            result = self._measure(body, options['repeat'], options['posts'])
+            if imported:
+                # Rows the importer accepted, so a rejecting importer does not look fast
+                result['imported'] = imported[-1]
+            results[f'csv_import.{platform_name}'] = result
+        return results
+
+    def bench_folder_tree(self, dataset, generator, options):
+        client = self._client(dataset)
+        run_folder = dataset['run_folders'][-1]
+
+        def body(stopwatch):
+            with stopwatch:
+                self._check(client.get(f'/api/track-accounts/report-folders/{run_folder.id}/'), 'folder_tree')
+
+        return {'folder_tree': self._measure(body, options['repeat'])}
+
+    def bench_dashboard_stats(self, dataset, generator, options):
+        from common.cache_aside import invalidate_namespace, project_namespace
+
+        client = self._client(dataset)
+        project_id = dataset['project'].id
+        url = f'/api/dashboard/stats/{project_id}/'
+
+        def cold(stopwatch):
+            # Bodies run in rolled-back transactions, so bump the version now rather than on commit
+            invalidate_namespace(project_namespace(project_id))
+            with stopwatch:
+                self._check(client.get(url), 'dashboard_stats')
+
+        def warm(stopwatch):
+            with stopwatch:
+                self._check(client.get(url), 'dashboard_stats')
+
+        results = {'dashboard_stats.cold': self._measure(cold, options['repeat'])}
+        self._check(client.get(url), 'dashboard_stats')
+        results['dashboard_stats.warm'] = self._measure(warm, options['repeat'])
+        return results
+
+    def bench_report_generation(self, dataset, generator, options):
+        from common.cache_aside import invalidate_namespace, project_namespace
+        from reports.enhanced_report_service import enhanced_report_service
+        from reports.models import ReportTemplate
+
+        client = self._client(dataset)
+        project_id = dataset['project'].id
+        results = {}
+        # Time the report itself, not a round trip to the OpenAI API
+        openai_available = enhanced_report_service.openai_available
+        enhanced_report_service.openai_available = False
+        try:
+            for template_type in options['report_types'] or REPORT_TYPES:
+                template = ReportTemplate.objects.create(name=f'Bench {template_type}', description='Benchmark',
+                                                         template_type=template_type)
+
+                def body(stopwatch):
+                    invalidate_namespace(project_namespace(project_id))
+                    with stopwatch:
+                        response = client.post('/api/reports/generated/generate_report/',
+                                               {'template_id': template.id, 'project_id': project_id}, format='json')
+                    report = self._check(response, f'report_generation.{template_type}').json()
+                    if report.get('status') != 'completed':
+                        raise CommandError(f"report_generation.{template_type}: {report.get('error_message')}")
+
+                results[f'report_generation.{template_type}'] = self._measure(body, options['repeat'])
+        finally:
+            enhanced_report_service.openai_available = openai_available
+        return results
+
+    def _print(self, results, changes):
+        dataset = results['dataset']
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{dataset['track_sources']} sources, {dataset['runs']} runs, {dataset['folders']} folders, "
+            f"{dataset['posts']} posts, {dataset['comments']} comments "
+            f"(generated in {dataset['generate_seconds']}s, {results['environment']['database']})"
+        ))
+        for name, result in results['benchmarks'].items():
+            if 'error' in result:
+                self.stdout.write(f"  {name:<42} {self.style.ERROR(result['error'][:150])}")
+                continue
+            line = f"  {name:<42} {result['median_ms']:>10.2f} ms  p95 {result['p95_ms']:>10.2f} ms"
+            if 'items_per_second' in result:
+                line += f"  {result['items_per_second']:>10.1f} items/s"
+            if 'imported' in result:
+                line += f"  ({result['imported']}/{result['items']} rows imported)"
+            if name in changes:
+                change = changes[name]
+                text = f'{change:+.1f}%'
+                line += '  ' + (self.style.ERROR(text) if change > 10 else
+                                self.style.SUCCESS(text) if change < -10 else text)
+            self.stdout.write(line)
@@ -0,0 +1,117 @@
+"""
+Management command to benchmark the shared SQLite cache against LocMemCache
+
+Usage:
+    python manage.py benchmark_cache --ops 5000 --processes 4
+    python manage.py benchmark_cache --json
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand
+
+from common.cache_backends import SQLiteCache
+
+PAYLOAD = {'totalPosts': 1200, 'platforms': {'instagram': 800, 'facebook': 400}, 'series': list(range(30))}
+
+
+def _make_cache(backend, location):
+    params = {'TIMEOUT': 300, 'OPTIONS': {'MAX_ENTRIES': 100000, 'CULL_FREQUENCY': 3}}
+    if backend == 'sqlite':
+        return SQLiteCache(location, params)
+    return LocMemCache(location, params)
+
+
+def _timed(ops, fn):
+    start = time.perf_counter()
+    for i in range(ops):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    return {'ops_per_sec': round(ops / elapsed) if elapsed else None, 'us_per_op': round(elapsed / ops * 1e6, 1)}
+
+
+def _single_process(backend, location, ops):
+    cache = _make_cache(backend, location)
+    cache.set('counter', 0)
+    results = {
+        'set': _timed(ops, lambda i: cache.set(f'key:{i}', PAYLOAD)),
+        'get': _timed(ops, lambda i: cache.get(f'key:{i}')),
+        'get_miss': _timed(ops, lambda i: cache.get(f'missing:{i}')),
+        'incr': _timed(ops, lambda i: cache.incr('counter')),
+    }
+    cache.clear()
+    return results
+
+
+def _worker(args):
+    backend, location, ops, worker = args
+    cache = _make_cache(backend, location)
+    hits = 0
+    for i in range(ops):
+        cache.incr('shared_counter')
+        # Read what the previous worker wrote, write for the next one
+        if cache.get(f'from:{worker - 1}:{i}') is not None:
+            hits += 1
+        cache.set(f'from:{worker}:{i}', PAYLOAD)
+    return hits
+
+
+def _multi_process(backend, location, ops, processes):
+    cache = _make_cache(backend, location)
+    cache.clear()
+    cache.set('shared_counter', 0)
+    start = time.perf_counter()
+    with multiprocessing.get_context('fork').Pool(processes) as pool:
+        hits = pool.map(_worker, [(backend, location, ops, w) for w in range(processes)])
+    elapsed = time.perf_counter() - start
+
+    # LocMem counters live in each process, so the parent never sees the workers' increments
+    counter = cache.get('shared_counter')
+    cache.clear()
+    return {
+        'ops_per_sec': round(processes * ops * 3 / elapsed),
+        'counter_expected': processes * ops,
+        'counter_seen_by_parent': counter,
+        'cross_process_hits': sum(hits),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the shared SQLite cache backend against per-process LocMemCache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ops', type=int, default=5000, help='Operations per benchmark (default: 5000)')
+        parser.add_argument('--processes', type=int, default=4, help='Worker processes for the shared test')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        ops, processes = options['ops'], options['processes']
+        results = {}
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for backend in ('locmem', 'sqlite'):
+                location = os.path.join(tmp, 'bench.sqlite3') if backend == 'sqlite' else f'bench-{backend}'
+                results[backend] = {
+                    'single_process': _single_process(backend, location, ops),
+                    'multi_process': _multi_process(backend, location, ops // processes, processes),
+                }
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for backend, result in results.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(backend))
+            for op, timing in result['single_process'].items():
+                self.stdout.write(f"  {op:<10} {timing['ops_per_sec']:>10} ops/s  {timing['us_per_op']:>8} µs/op")
+            multi = result['multi_process']
+            self.stdout.write(
+                f"  {processes} processes: {multi['ops_per_sec']} ops/s, counter "
+                f"{multi['counter_seen_by_parent']}/{multi['counter_expected']}, "
+                f"cross-process hits {multi['cross_process_hits']}"
+            )
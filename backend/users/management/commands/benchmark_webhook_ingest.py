@@ -0,0 +1,118 @@
+"""
+Management command to measure BrightData webhook ingestion throughput
+
+Synthetic posts are run through the webhook processing path inside a
+transaction that is rolled back, with logging sent to a counting sink at
+the configured level and format, so logging overhead shows up in the result.
+
+Usage:
+    python manage.py benchmark_webhook_ingest --items 500
+    python manage.py benchmark_webhook_ingest --items 500 --log-format json --log-level DEBUG --json
+"""
+
+import io
+import json
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from common.structured_logging import JSONFormatter
+
+
+class _CountingStream(io.TextIOBase):
+    """Discards log output, keeping line and byte counts"""
+
+    def __init__(self):
+        self.lines = 0
+        self.bytes = 0
+
+    def write(self, text):
+        self.lines += text.count('\n')
+        self.bytes += len(text)
+        return len(text)
+
+
+def synthetic_posts(count, run=0):
+    return [
+        {
+            'post_id': f'bench-{run}-{i}',
+            'url': f'https://www.instagram.com/p/bench{run}x{i}/',
+            'user_posted': f'account_{i % 25}',
+            'description': f'Benchmark post {i} #launch #product #bench{i % 10} ' + 'lorem ipsum ' * 20,
+            'likes': 100 + i,
+            'num_comments': i % 40,
+            'hashtags': ['launch', 'product', f'bench{i % 10}'],
+            'is_verified': i % 3 == 0,
+            'date_posted': '2025-10-06T12:00:00.000Z',
+        }
+        for i in range(count)
+    ]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Measure BrightData webhook ingestion throughput including logging overhead'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=500, help='Posts per run (default: 500)')
+        parser.add_argument('--runs', type=int, default=3, help='Runs to average (default: 3)')
+        parser.add_argument('--platform', default='instagram', help='Platform passed to the processor')
+        parser.add_argument('--log-format', choices=['text', 'json'], default='text')
+        parser.add_argument('--log-level', default='INFO', help='Root log level during the run (default: INFO)')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        from brightdata_integration.views import _process_brightdata_results
+
+        stream = _CountingStream()
+        handler = logging.StreamHandler(stream)
+        handler.setFormatter(JSONFormatter() if options['log_format'] == 'json'
+                             else logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s'))
+        root = logging.getLogger()
+        saved_handlers, saved_level = root.handlers[:], root.level
+        root.handlers = [handler]
+        root.setLevel(options['log_level'].upper())
+
+        timings = []
+        try:
+            for run in range(options['runs']):
+                posts = synthetic_posts(options['items'], run)
+                start = time.perf_counter()
+                try:
+                    with transaction.atomic():
+                        _process_brightdata_results(posts, options['platform'], None, None)
+                        raise _Rollback
+                except _Rollback:
+                    pass
+                timings.append(time.perf_counter() - start)
+        finally:
+            root.handlers, root.level = saved_handlers, saved_level
+
+        total_items = options['items'] * options['runs']
+        elapsed = sum(timings)
+        results = {
+            'items': options['items'],
+            'runs': options['runs'],
+            'log_format': options['log_format'],
+            'log_level': options['log_level'].upper(),
+            'items_per_second': round(total_items / elapsed, 1) if elapsed else None,
+            'ms_per_item': round(elapsed / total_items * 1000, 3),
+            'log_lines_per_item': round(stream.lines / total_items, 2),
+            'log_bytes_per_item': round(stream.bytes / total_items, 1),
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{options['runs']} x {options['items']} {options['platform']} posts, "
+            f"{results['log_format']} logs at {results['log_level']}"
+        ))
+        self.stdout.write(f"  {results['items_per_second']} items/s ({results['ms_per_item']} ms/item)")
+        self.stdout.write(f"  {results['log_lines_per_item']} log lines, {results['log_bytes_per_item']} bytes per item")
@@ -0,0 +1,34 @@
+"""
+Management command to apply the engagement snapshot retention policy
+
+Keeps every snapshot for ENGAGEMENT_SNAPSHOT_RAW_DAYS, the last per hour until
+ENGAGEMENT_SNAPSHOT_HOURLY_DAYS, the last per day until
+ENGAGEMENT_SNAPSHOT_RETENTION_DAYS, and deletes older ones. Meant to run daily
+from cron.
+
+Usage:
+    python manage.py compact_engagement_snapshots
+    python manage.py compact_engagement_snapshots --dry-run
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from track_accounts.engagement_history import engagement_history_service
+
+
+class Command(BaseCommand):
+    help = 'Thin old engagement snapshots to hourly/daily resolution and delete expired ones'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be deleted')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        result = engagement_history_service.compact(dry_run=options['dry_run'])
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['hourly']} superseded within an hour, {result['daily']} within a day "
+            f"and {result['expired']} expired snapshots in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,181 @@
+"""
+Management command to load test a running server with mixed traffic
+
+Interactive API reads, webhook deliveries and report requests are sent
+concurrently in the given proportions, and latency percentiles are reported
+per traffic class, so serving profiles (see gunicorn.conf.py) can be compared.
+
+Usage:
+    python manage.py loadtest --url http://localhost:8000 --duration 30 --concurrency 20
+    python manage.py loadtest --mix api=60,webhooks=30,reports=10 --token <auth token> --json
+    python manage.py loadtest --api "GET /api/track-accounts/report-folders/?project=1" \\
+        --report "POST /api/reports/generated/"
+"""
+
+import itertools
+import json
+import random
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+DEFAULT_TARGETS = {
+    'api': ['GET /api/health/'],
+    'webhooks': ['POST /api/apify/webhook/'],
+    'reports': ['GET /api/reports/templates/'],
+}
+
+# Statuses that mean the server shed load on purpose rather than failed
+SHED_STATUSES = {429, 503}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples, elapsed):
+    """Summarise (latency_seconds, status) samples for one traffic class"""
+    latencies = sorted(latency * 1000 for latency, _ in samples)
+    statuses = defaultdict(int)
+    for _, status in samples:
+        statuses[status] += 1
+    errors = sum(count for status, count in statuses.items()
+                 if status is None or (status >= 500 and status not in SHED_STATUSES))
+    shed = sum(statuses[status] for status in SHED_STATUSES)
+
+    def ms(value):
+        return round(value, 1) if value is not None else None
+
+    return {
+        'requests': len(samples),
+        'rps': round(len(samples) / elapsed, 1) if elapsed else None,
+        'errors': errors,
+        'shed': shed,
+        'p50_ms': ms(percentile(latencies, 50)),
+        'p95_ms': ms(percentile(latencies, 95)),
+        'p99_ms': ms(percentile(latencies, 99)),
+        'max_ms': ms(latencies[-1] if latencies else None),
+        'statuses': {str(status): count for status, count in sorted(statuses.items(), key=str)},
+    }
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_TARGETS:
+            raise CommandError(f"Unknown traffic class '{name}', expected one of {sorted(DEFAULT_TARGETS)}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight for '{name}': {weight!r}")
+    if not any(mix.values()):
+        raise CommandError('The traffic mix needs at least one positive weight')
+    return mix
+
+
+def parse_target(value):
+    method, _, path = value.strip().partition(' ')
+    if not path:
+        method, path = 'GET', method
+    return method.upper(), path.strip()
+
+
+class Command(BaseCommand):
+    help = 'Load test a running server with mixed API, webhook and report traffic and report p50/p99 latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://localhost:8000', help='Base URL of the server under test')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run (default: 30)')
+        parser.add_argument('--concurrency', type=int, default=20, help='Concurrent clients (default: 20)')
+        parser.add_argument('--mix', default='api=70,webhooks=20,reports=10',
+                            help='Traffic class weights (default: api=70,webhooks=20,reports=10)')
+        parser.add_argument('--api', action='append', help='"METHOD /path" for API traffic (repeatable)')
+        parser.add_argument('--webhook', action='append', help='"METHOD /path" for webhook traffic (repeatable)')
+        parser.add_argument('--report', action='append', help='"METHOD /path" for report traffic (repeatable)')
+        parser.add_argument('--token', help='Auth token sent as "Authorization: Token <token>"')
+        parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the traffic mix')
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        targets = {
+            'api': options['api'] or DEFAULT_TARGETS['api'],
+            'webhooks': options['webhook'] or DEFAULT_TARGETS['webhooks'],
+            'reports': options['report'] or DEFAULT_TARGETS['reports'],
+        }
+        targets = {name: [parse_target(t) for t in values] for name, values in targets.items()}
+        classes = [name for name, weight in mix.items() if weight > 0]
+        weights = [mix[name] for name in classes]
+
+        headers = {'Content-Type': 'application/json'}
+        if options['token']:
+            headers['Authorization'] = f"Token {options['token']}"
+        base_url = options['url'].rstrip('/')
+
+        samples = defaultdict(list)
+        lock = threading.Lock()
+        counter = itertools.count()
+        deadline = time.perf_counter() + options['duration']
+
+        def client(client_id):
+            rng = random.Random(options['seed'] + client_id)
+            session = requests.Session()
+            session.headers.update(headers)
+            while time.perf_counter() < deadline:
+                name = rng.choices(classes, weights)[0]
+                method, path = rng.choice(targets[name])
+                body = None
+                if method != 'GET' and name == 'webhooks':
+                    # Unknown run ids are accepted and then ignored by the processors
+                    body = json.dumps({'runId': f'loadtest-{next(counter)}', 'status': 'SUCCEEDED',
+                                       'actorId': 'loadtest/loadtest'})
+                start = time.perf_counter()
+                try:
+                    status = session.request(method, base_url + path, data=body,
+                                             timeout=options['timeout']).status_code
+                except requests.RequestException:
+                    status = None
+                with lock:
+                    samples[name].append((time.perf_counter() - start, status))
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(client, range(options['concurrency'])))
+        elapsed = time.perf_counter() - started
+
+        results = {
+            'url': base_url,
+            'duration_s': round(elapsed, 1),
+            'concurrency': options['concurrency'],
+            'mix': mix,
+            'classes': {name: summarize(samples[name], elapsed) for name in classes},
+            'overall': summarize([s for name in classes for s in samples[name]], elapsed),
+        }
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{base_url}: {options['concurrency']} clients for {results['duration_s']}s"
+        ))
+        self.stdout.write(f"  {'class':<10} {'reqs':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+                          f" {'errors':>7} {'shed':>6}")
+        for name, summary in [*results['classes'].items(), ('overall', results['overall'])]:
+            self.stdout.write(
+                f"  {name:<10} {summary['requests']:>7} {summary['rps'] or 0:>8} "
+                f"{summary['p50_ms'] or '-':>8} {summary['p95_ms'] or '-':>8} {summary['p99_ms'] or '-':>8} "
+                f"{summary['max_ms'] or '-':>8} {summary['errors']:>7} {summary['shed']:>6}"
+            )
+        self.stdout.write('  (latencies in ms)')
@@ -0,0 +1,42 @@
+"""
+Management command to drop and recreate the full-text search indexes
+
+Needed after changing SEARCH_INDEXES in common/full_text_search.py; migrate
+already restores SQLite sync triggers dropped by table rebuilds.
+
+Usage:
+    python manage.py rebuild_search_index
+    python manage.py rebuild_search_index --model instagram_data.InstagramPost
+"""
+
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from common.full_text_search import SEARCH_INDEXES, install, uninstall
+
+
+class Command(BaseCommand):
+    help = 'Drop and recreate the full-text search indexes of the post and comment tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='models',
+                            help=f'Model label to rebuild (repeatable; default: all of {", ".join(SEARCH_INDEXES)})')
+
+    def handle(self, *args, **options):
+        labels = options['models'] or list(SEARCH_INDEXES)
+        unknown = [label for label in labels if label not in SEARCH_INDEXES]
+        if unknown:
+            raise CommandError(f"No search index for {', '.join(unknown)}")
+
+        for label in labels:
+            db_table = apps.get_model(label)._meta.db_table
+            start = time.perf_counter()
+            with connection.schema_editor() as schema_editor:
+                uninstall(schema_editor, db_table)
+                install(schema_editor, db_table, SEARCH_INDEXES[label])
+            self.stdout.write(self.style.SUCCESS(
+                f'Rebuilt {label} ({connection.vendor}) in {time.perf_counter() - start:.2f}s'
+            ))
@@ -0,0 +1,49 @@
+"""
+Management command to rebuild the UnifiedPost table from the platform post tables
+
+Ingest keeps UnifiedPost in step; this is for backfills and for repairing rows
+after posts were written or deleted outside the ORM. With --prune, copies whose
+source row no longer exists are unlinked first and their posts rebuilt from the
+remaining copies, or deleted if none remain.
+
+Usage:
+    python manage.py sync_unified_posts
+    python manage.py sync_unified_posts --source instagram_post --prune
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from track_accounts.models import UnifiedPost, UnifiedPostSource
+from track_accounts.unified_posts import SOURCE_TABLES, unified_post_service
+
+class Command(BaseCommand):
+    help = 'Upsert UnifiedPost rows for every post in the platform post tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', action='append', dest='sources',
+                            help=f'Source table to sync (repeatable; default: all of {", ".join(SOURCE_TABLES)})')
+        parser.add_argument('--prune', action='store_true', help='Unlink copies whose source row is gone')
+
+    def handle(self, *args, **options):
+        sources = options['sources'] or list(SOURCE_TABLES)
+        unknown = [source for source in sources if source not in SOURCE_TABLES]
+        if unknown:
+            raise CommandError(f"Unknown source {', '.join(unknown)}")
+
+        if options['prune']:
+            for source in sources:
+                model = unified_post_service.get_model(SOURCE_TABLES[source].label)
+                gone = list(UnifiedPostSource.objects.filter(source=source)
+                            .exclude(source_id__in=model.objects.values('pk')).values_list('source_id', flat=True))
+                deleted = unified_post_service.remove(source, gone)
+                self.stdout.write(f'Pruned {len(gone)} {source} copies ({deleted} posts left without copies deleted)')
+
+        for source in sources:
+            start = time.perf_counter()
+            synced = unified_post_service.sync(source)
+            self.stdout.write(self.style.SUCCESS(
+                f'Synced {synced} {source} rows in {time.perf_counter() - start:.2f}s'
+            ))
+        self.stdout.write(f'{UnifiedPost.objects.count()} posts from {UnifiedPostSource.objects.count()} source rows')
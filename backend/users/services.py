@@ -1,5 +1,10 @@
+from datetime import timedelta
 from typing import List, Dict, Optional, Tuple
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from .models import Platform, Service, PlatformService
 
 class PlatformServiceManager:
@@ -189,4 +194,124 @@ class PlatformServiceManager:
             platform_service.save()
             return True
         except PlatformService.DoesNotExist:
-            return False 
\ No newline at end of file
+            return False
+
+
+class ProjectStatsService:
+    """
+    Project statistics computed in a single query.
+
+    Post totals per platform, folder counts, tracked accounts and reports are
+    each one aggregate SELECT without GROUP BY (so exactly one row, even when
+    empty), combined with UNION ALL into one round trip.
+    """
+
+    # Engagement columns per platform post model; follower columns are the
+    # account size the post was published to
+    PLATFORMS = {
+        'facebook': {'engagement': ('likes', 'num_comments', 'num_shares'), 'followers': 'page_followers'},
+        'instagram': {'engagement': ('likes', 'num_comments'), 'followers': 'followers'},
+        'linkedin': {'engagement': ('likes', 'num_comments', 'num_shares'), 'followers': 'user_followers'},
+        'tiktok': {'engagement': ('likes', 'num_comments'), 'followers': 'followers'},
+    }
+
+    COLUMNS = ('posts', 'folders', 'engagement', 'audience_engagement', 'audience',
+               'recent_posts', 'previous_posts', 'accounts', 'reports')
+
+    @staticmethod
+    def _models():
+        from facebook_data.models import FacebookPost, Folder as FacebookFolder
+        from instagram_data.models import InstagramPost, Folder as InstagramFolder
+        from linkedin_data.models import LinkedInPost, Folder as LinkedInFolder
+        from tiktok_data.models import TikTokPost, Folder as TikTokFolder
+        return {
+            'facebook': (FacebookPost, FacebookFolder),
+            'instagram': (InstagramPost, InstagramFolder),
+            'linkedin': (LinkedInPost, LinkedInFolder),
+            'tiktok': (TikTokPost, TikTokFolder),
+        }
+
+    @classmethod
+    def _member(cls, queryset, platform: str, **aggregates):
+        """One UNION member: the given aggregates, zero for every other column"""
+        columns = {column: aggregates.get(column, Value(0)) for column in cls.COLUMNS}
+        return (
+            queryset.order_by()
+            .annotate(stats_platform=Value(platform))
+            .values('stats_platform')
+            .annotate(**columns)
+            .values('stats_platform', *cls.COLUMNS)
+        )
+
+    @staticmethod
+    def _posted_between(start, end=None):
+        """Posts published in [start, end), falling back to when they were collected"""
+        posted = Q(date_posted__gte=start)
+        collected = Q(date_posted__isnull=True, created_at__gte=start)
+        if end is not None:
+            posted &= Q(date_posted__lt=end)
+            collected &= Q(created_at__lt=end)
+        return posted | collected
+
+    @classmethod
+    def _posts_member(cls, platform, post_model, project_id, recent_start, previous_start):
+        spec = cls.PLATFORMS[platform]
+        first, *rest = spec['engagement']
+        engagement = sum((Coalesce(F(field), 0) for field in rest), Coalesce(F(first), 0))
+        has_audience = Q(**{f"{spec['followers']}__gt": 0})
+
+        return cls._member(
+            post_model.objects.filter(folder__project_id=project_id), platform,
+            posts=Count('id'),
+            engagement=Coalesce(Sum(engagement), 0),
+            audience_engagement=Coalesce(Sum(Case(When(has_audience, then=engagement), default=0)), 0),
+            audience=Coalesce(Sum(Case(When(has_audience, then=F(spec['followers'])), default=0)), 0),
+            recent_posts=Count('id', filter=cls._posted_between(recent_start)),
+            previous_posts=Count('id', filter=cls._posted_between(previous_start, recent_start)),
+        )
+
+    @classmethod
+    def get_project_stats(cls, project_id) -> Dict:
+        from track_accounts.models import ReportFolder, TrackSource
+
+        window = timedelta(days=getattr(settings, 'PROJECT_STATS_GROWTH_WINDOW_DAYS', 30))
+        recent_start = timezone.now() - window
+        previous_start = recent_start - window
+
+        members = []
+        for platform, (post_model, folder_model) in cls._models().items():
+            members.append(cls._posts_member(platform, post_model, project_id, recent_start, previous_start))
+            members.append(cls._member(folder_model.objects.filter(project_id=project_id), platform,
+                                       folders=Count('id')))
+        members.append(cls._member(TrackSource.objects.filter(project_id=project_id), '', accounts=Count('id')))
+        members.append(cls._member(ReportFolder.objects.filter(project_id=project_id), '', reports=Count('id')))
+
+        totals = {column: 0 for column in cls.COLUMNS}
+        platforms = {platform: {'posts': 0, 'folders': 0, 'engagement': 0} for platform in cls.PLATFORMS}
+        for row in members[0].union(*members[1:], all=True):
+            for column in cls.COLUMNS:
+                totals[column] += row[column] or 0
+            if row['stats_platform']:
+                for column in ('posts', 'folders', 'engagement'):
+                    platforms[row['stats_platform']][column] += row[column] or 0
+
+        # Interactions per follower across every post with a known audience
+        if totals['audience']:
+            engagement_rate = round(totals['audience_engagement'] / totals['audience'] * 100, 2)
+        else:
+            engagement_rate = 0.0
+        # Posts published in the last window vs. the one before it
+        if totals['previous_posts']:
+            growth_rate = round((totals['recent_posts'] - totals['previous_posts']) / totals['previous_posts'] * 100, 1)
+        else:
+            growth_rate = 0.0
+
+        return {
+            'totalPosts': totals['posts'],
+            'totalAccounts': totals['accounts'],
+            'totalReports': totals['reports'],
+            'totalEngagement': totals['engagement'],
+            'engagementRate': engagement_rate,
+            'growthRate': growth_rate,
+            'platforms': platforms,
+        }
@@ -1,3 +1,336 @@
-from django.test import TestCase
+import json
+import logging
+import threading
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from common.request_profiling import fingerprint, profile_buffer, query_budget, resolve_query_budget
+from common.structured_logging import BatchLog, JSONFormatter, LogSampler
+from config.serving import PoolLimiter, PooledASGIApplication, pool_for_path
+from users.management.commands.loadtest import percentile, summarize
+from users.models import Project
+
+
+class ServingPoolTest(SimpleTestCase):
+    """Per-pool routing and isolation used by the gunicorn serving profiles"""
+
+    def test_paths_route_to_pools(self):
+        self.assertEqual(pool_for_path('/api/apify/webhook/'), 'webhooks')
+        self.assertEqual(pool_for_path('/api/brightdata/webhook/'), 'webhooks')
+        self.assertEqual(pool_for_path('/api/reports/generated/'), 'reports')
+        self.assertEqual(pool_for_path('/api/brightdata/webhook-results/folder/1/'), 'api')
+        self.assertEqual(pool_for_path('/api/track-accounts/report-folders/'), 'api')
+        self.assertEqual(pool_for_path('/api/chat/threads/3/stream_message/'), 'streams')
+        self.assertEqual(pool_for_path('/api/chat/threads/3/messages/'), 'api')
+
+    def test_limiter_sheds_saturated_pool_only(self):
+        release = threading.Event()
+        entered = threading.Event()
+
+        def app(environ, start_response):
+            if environ['PATH_INFO'].startswith('/api/reports/'):
+                entered.set()
+                release.wait(5)
+            start_response('200 OK', [])
+            return [b'ok']
+
+        limiter = PoolLimiter(app, sizes={'api': 1, 'webhooks': 1, 'reports': 1}, queue_timeout=0.05)
+        statuses = []
+        start_response = lambda status, headers: statuses.append(status)  # noqa: E731
+
+        worker = threading.Thread(target=lambda: list(limiter({'PATH_INFO': '/api/reports/x/'}, start_response)))
+        worker.start()
+        entered.wait(5)
+        try:
+            # The report pool is full, the API pool is not
+            self.assertEqual(list(limiter({'PATH_INFO': '/api/reports/y/'}, start_response))[0][:7], b'{"error')
+            self.assertEqual(list(limiter({'PATH_INFO': '/api/health/'}, start_response)), [b'ok'])
+        finally:
+            release.set()
+            worker.join()
+        self.assertEqual(statuses[:2], ['503 Service Unavailable', '200 OK'])
+
+    def test_limiter_queues_only_up_to_queue_depth(self):
+        release = threading.Event()
+        entered = threading.Semaphore(0)
+
+        def app(environ, start_response):
+            entered.release()
+            release.wait(5)
+            start_response('200 OK', [])
+            return [b'ok']
+
+        limiter = PoolLimiter(app, sizes={'api': 1, 'webhooks': 1}, queue_timeout=5, queue_depth=1)
+        statuses = []
+        start_response = lambda status, headers: statuses.append(status)  # noqa: E731
+
+        def call():
+            response = limiter({'PATH_INFO': '/api/apify/webhook/'}, start_response)
+            body = list(response)
+            getattr(response, 'close', lambda: None)()  # frees the slot, as the server does
+            return body
+
+        running = threading.Thread(target=call)
+        running.start()
+        entered.acquire(timeout=5)
+        waiting = threading.Thread(target=call)
+        waiting.start()
+        for _ in range(100):
+            if limiter._waiting['webhooks']:
+                break
+            threading.Event().wait(0.01)
+
+        # The one queue place is taken, so the next delivery is shed without waiting
+        self.assertEqual(call()[0][:7], b'{"error')
+        release.set()
+        running.join()
+        waiting.join()
+        self.assertEqual(sorted(statuses), ['200 OK', '200 OK', '503 Service Unavailable'])
+
+    def test_open_streams_do_not_take_api_slots(self):
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/event-stream')])
+            return iter([b'data: token\n\n', b'data: done\n\n'])
+
+        limiter = PoolLimiter(app, sizes={'api': 1, 'streams': 1}, queue_timeout=0.05)
+        statuses = []
+        start_response = lambda status, headers: statuses.append(status)  # noqa: E731
+
+        # A chat stream holds its slot until the server closes the response
+        stream = limiter({'PATH_INFO': '/api/chat/threads/1/stream_message/'}, start_response)
+        next(iter(stream))
+        try:
+            for _ in range(2):
+                response = limiter({'PATH_INFO': '/api/chat/threads/'}, start_response)
+                list(response)
+                response.close()
+            shed = limiter({'PATH_INFO': '/api/chat/threads/2/stream_message/'}, start_response)
+        finally:
+            stream.close()
+        self.assertEqual(list(shed)[0][:7], b'{"error')
+        self.assertEqual(statuses, ['200 OK', '200 OK', '200 OK', '503 Service Unavailable'])
+
+    async def test_asgi_application_runs_views_on_pool_threads(self):
+        threads = []
+
+        def app(environ, start_response):
+            threads.append(threading.current_thread().name)
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+            return [b'ok']
+
+        application = PooledASGIApplication(app, sizes={'api': 2, 'webhooks': 1, 'reports': 1})
+        for path in ('/api/apify/webhook/', '/api/health/'):
+            communicator = ApplicationCommunicator(application, {
+                'type': 'http', 'http_version': '1.1', 'method': 'POST', 'path': path,
+                'query_string': b'', 'headers': [],
+            })
+            await communicator.send_input({'type': 'http.request', 'body': b'{}'})
+            start = await communicator.receive_output(5)
+            body = await communicator.receive_output(5)
+            self.assertEqual(start['status'], 200)
+            self.assertEqual(body['body'], b'ok')
+
+        self.assertTrue(threads[0].startswith('serving-webhooks'))
+        self.assertTrue(threads[1].startswith('serving-api'))
+
+
+class LoadTestSummaryTest(SimpleTestCase):
+    def test_percentiles_and_error_classes(self):
+        samples = [(i / 1000, 200) for i in range(1, 99)] + [(0.5, 503), (1.0, None)]
+        summary = summarize(samples, elapsed=10)
+
+        self.assertEqual(summary['requests'], 100)
+        self.assertEqual(summary['p50_ms'], 50.0)
+        self.assertEqual(summary['p99_ms'], 500.0)
+        self.assertEqual(summary['max_ms'], 1000.0)
+        self.assertEqual(summary['errors'], 1)
+        self.assertEqual(summary['shed'], 1)
+        self.assertIsNone(percentile([], 99))
+
+
+class ProjectStatsViewTest(APITestCase):
+    def setUp(self):
+        from django.core.cache import cache
+        cache.clear()
+        self.user = User.objects.create_user('owner', password='pw')
+        self.project = Project.objects.create(name='Stats', owner=self.user)
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/users/projects/{self.project.id}/stats/'
+
+    def test_stats_from_single_query(self):
+        from facebook_data.models import FacebookPost, Folder as FacebookFolder
+        from instagram_data.models import InstagramPost, Folder as InstagramFolder
+        from track_accounts.models import TrackSource
+        from tiktok_data.models import Folder as TikTokFolder
+
+        now = timezone.now()
+        ig_folder = InstagramFolder.objects.create(name='IG', project=self.project)
+        fb_folder = FacebookFolder.objects.create(name='FB', project=self.project)
+        TikTokFolder.objects.create(name='Empty', project=self.project)
+        # Last 30 days: 3 posts, the 30 days before: 2 posts
+        for i, days_ago in enumerate((1, 2, 3, 40, 45)):
+            InstagramPost.objects.create(folder=ig_folder, post_id=f'ig{i}', url=f'https://i/{i}', likes=90,
+                                         num_comments=10, followers=1000, date_posted=now - timedelta(days=days_ago))
+        FacebookPost.objects.create(folder=fb_folder, post_id='fb', url='https://f/1', likes=5, num_comments=5,
+                                    num_shares=10, date_posted=now - timedelta(days=1))
+        TrackSource.objects.create(name='Nike', project=self.project, platform='instagram')
+        # Another project's data must not leak in
+        other = Project.objects.create(name='Other', owner=self.user)
+        InstagramPost.objects.create(folder=InstagramFolder.objects.create(name='X', project=other), post_id='x',
+                                     url='https://i/x', likes=1000, followers=1)
+
+        with self.assertNumQueries(4):  # project, access check, owner, stats
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['totalPosts'], 6)
+        self.assertEqual(data['totalAccounts'], 1)
+        self.assertEqual(data['totalEngagement'], 5 * 100 + 20)
+        # Only posts with a known audience count: 500 interactions over 5000 followers
+        self.assertEqual(data['engagementRate'], 10.0)
+        # 4 posts in the last window vs 2 before
+        self.assertEqual(data['growthRate'], 100.0)
+        self.assertEqual(data['platforms']['instagram'], {'posts': 5, 'folders': 1, 'engagement': 500})
+        self.assertEqual(data['platforms']['tiktok'], {'posts': 0, 'folders': 1, 'engagement': 0})
+        self.assertEqual(data['platforms']['linkedin'], {'posts': 0, 'folders': 0, 'engagement': 0})
+
+    def test_stats_cached_until_project_invalidated(self):
+        from common.cache_aside import invalidate_project_cache
+        from users.services import ProjectStatsService
+
+        with mock.patch.object(ProjectStatsService, 'get_project_stats',
+                               wraps=ProjectStatsService.get_project_stats) as compute:
+            self.client.get(self.url)
+            self.client.get(self.url)
+            self.assertEqual(compute.call_count, 1)
+            with self.captureOnCommitCallbacks(execute=True):
+                invalidate_project_cache(self.project.id)
+            self.client.get(self.url)
+            self.assertEqual(compute.call_count, 2)
+
+    def test_forbidden_for_other_users(self):
+        self.client.force_authenticate(User.objects.create_user('stranger', password='pw'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class RequestProfilingTest(APITestCase):
+    def setUp(self):
+        profile_buffer.clear()
+        self.admin = User.objects.create_superuser('admin', password='pw')
+        self.project = Project.objects.create(name='Profiled', owner=self.admin)
+        self.client.force_authenticate(self.admin)
+
+    def test_fingerprint_groups_parameters(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 12 AND name = 'a''b' AND x IN (%s, %s, %s)"),
+            'SELECT * FROM t WHERE id = ? AND name = ? AND x IN (...)',
+        )
+
+    def test_budget_resolution(self):
+        from instagram_data.views import FolderViewSet
+
+        @query_budget(3)
+        def view(request):
+            pass
+
+        self.assertEqual(resolve_query_budget(view), 3)
+        contents = FolderViewSet.as_view({'get': 'contents'})
+        self.assertEqual(resolve_query_budget(contents, 'GET'), 5)
+        self.assertIsNone(resolve_query_budget(FolderViewSet.as_view({'get': 'list'}), 'GET'))
+
+    def test_profiles_only_when_enabled_or_requested(self):
+        url = f'/api/users/projects/{self.project.id}/stats/'
+        response = self.client.get(url)
+        self.assertNotIn('X-Query-Count', response)
+        # The header alone is ignored unless profiling by header was switched on
+        response = self.client.get(url, HTTP_X_PROFILE_REQUEST='1')
+        self.assertNotIn('X-Query-Count', response)
+        self.assertEqual(profile_buffer.snapshot(), [])
+
+        with override_settings(REQUEST_PROFILING_ALLOW_HEADER=True):
+            response = self.client.get(url, HTTP_X_PROFILE_REQUEST='1')
+        with override_settings(REQUEST_PROFILING_ENABLED=True):
+            self.client.get(url)
+
+        self.assertEqual(response['X-Query-Count'], str(response.query_profile['queries']))
+        profiles = profile_buffer.snapshot()
+        self.assertEqual(len(profiles), 2)
+        self.assertEqual(profiles[0]['view'], 'project-stats')
+        self.assertGreater(profiles[0]['queries'], 0)
+        self.assertGreaterEqual(profiles[0]['total_ms'], profiles[0]['db_ms'])
+
+    @override_settings(REQUEST_PROFILING_ENABLED=True)
+    def test_admin_endpoint(self):
+        url = f'/api/users/projects/{self.project.id}/stats/'
+        self.client.get(url)
+        self.client.get(url)
+
+        response = self.client.get('/api/admin/profiling/?view=project-stats')
+        self.assertEqual(response.status_code, 200)
+        summary = {row['view']: row for row in response.json()['summary']}
+        self.assertEqual(summary['project-stats']['requests'], 2)
+        self.assertEqual(len(response.json()['requests']), 2)
+
+        self.client.force_authenticate(User.objects.create_user('member', password='pw'))
+        self.assertEqual(self.client.get('/api/admin/profiling/').status_code, 403)
+
+
+class StructuredLoggingTest(TestCase):
+    def test_json_formatter_includes_extra_fields(self):
+        record = logging.LogRecord('ingest', logging.INFO, __file__, 1, 'saved %s posts', (3,), None)
+        record.platform = 'instagram'
+        entry = json.loads(JSONFormatter().format(record))
+
+        self.assertEqual(entry['message'], 'saved 3 posts')
+        self.assertEqual(entry['level'], 'INFO')
+        self.assertEqual(entry['logger'], 'ingest')
+        self.assertEqual(entry['platform'], 'instagram')
+
+    def test_sampler_emits_one_in_n_debug_records(self):
+        logger = logging.getLogger('tests.sampler')
+        sampler = LogSampler(logger, rate=0.25)
+        with self.assertLogs(logger, 'DEBUG') as logs:
+            logger.debug('start')
+            for i in range(8):
+                sampler.debug('item %s', i)
+        self.assertEqual(logs.output[1:], ['DEBUG:tests.sampler:item 0', 'DEBUG:tests.sampler:item 4'])
+
+        # Nothing is sampled (or formatted) unless DEBUG is enabled
+        logger.setLevel(logging.INFO)
+        self.addCleanup(logger.setLevel, logging.NOTSET)
+        self.assertFalse(LogSampler(logger, rate=1).should_log())
+
+    def test_batch_log_summarises_once(self):
+        logger = logging.getLogger('tests.batch')
+        with self.assertLogs(logger, 'INFO') as logs:
+            with BatchLog(logger, 'ingest', platform='tiktok') as batch:
+                batch.count('created', 2)
+                batch.count('failed')
+
+        self.assertEqual(len(logs.records), 1)
+        record = logs.records[0]
+        self.assertEqual(record.counts, {'created': 2, 'failed': 1})
+        self.assertEqual(record.items, 3)
+        self.assertEqual(record.platform, 'tiktok')
+
+    def test_webhook_batch_logs_one_summary(self):
+        from brightdata_integration.models import BrightDataScrapedPost
+        from brightdata_integration.views import _process_brightdata_results
+        from users.management.commands.benchmark_webhook_ingest import synthetic_posts
+
+        posts = synthetic_posts(20)
+        posts[0]['post_id'] = posts[1]['post_id']
+        with self.assertLogs('brightdata_integration.views', 'INFO') as logs:
+            self.assertTrue(_process_brightdata_results(posts, 'twitter'))
+
+        summaries = [r for r in logs.records if getattr(r, 'event', None) == 'brightdata_ingest']
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(summaries[0].counts, {'created': 19, 'existing': 1})
+        self.assertEqual(BrightDataScrapedPost.objects.count(), 19)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AdminUserViewSet, AdminOrganizationViewSet, AdminStatsView, AdminCompanyViewSet
+from .views import AdminUserViewSet, AdminOrganizationViewSet, AdminStatsView, AdminCompanyViewSet, AdminProfilingView
 
 router = DefaultRouter()
 router.register(r'users', AdminUserViewSet, basename='admin-user')
@@ -10,4 +10,5 @@ router.register(r'companies', AdminCompanyViewSet, basename='admin-company')
 urlpatterns = [
     path('', include(router.urls)),
     path('stats/', AdminStatsView.as_view(), name='admin-stats'),
+    path('profiling/', AdminProfilingView.as_view(), name='admin-profiling'),
 ] 
\ No newline at end of file
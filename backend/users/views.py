@@ -43,6 +43,8 @@ from django.template.loader import render_to_string
 from django.utils.crypto import get_random_string
 from django.conf import settings
 from django.db.models import Count
+from common.cache_aside import cache_aside, project_namespace
+from .services import ProjectStatsService
 
 # Create your views here.
 
@@ -205,52 +207,14 @@ class ProjectStatsView(APIView):
             if not project.authorized_users.filter(id=request.user.id).exists() and project.owner != request.user:
                 raise PermissionDenied("You don't have access to this project")
 
-            # Import models for statistics calculation
-            from facebook_data.models import FacebookPost, Folder as FacebookFolder
-            from instagram_data.models import InstagramPost, Folder as InstagramFolder
-            from linkedin_data.models import LinkedInPost, Folder as LinkedInFolder
-            from tiktok_data.models import TikTokPost, Folder as TikTokFolder
-            from track_accounts.models import TrackSource
-            from reports.models import GeneratedReport
-            from django.db.models import Count, Q
-
-            # Calculate total posts across all platforms
-            total_posts = 0
-            total_accounts = 0
-            
-            # Facebook posts
-            facebook_folders = FacebookFolder.objects.filter(project=project)
-            facebook_posts = FacebookPost.objects.filter(folder__in=facebook_folders)
-            total_posts += facebook_posts.count()
-            
-            # Instagram posts
-            instagram_folders = InstagramFolder.objects.filter(project=project)
-            instagram_posts = InstagramPost.objects.filter(folder__in=instagram_folders)
-            total_posts += instagram_posts.count()
-            
-            # LinkedIn posts
-            linkedin_folders = LinkedInFolder.objects.filter(project=project)
-            linkedin_posts = LinkedInPost.objects.filter(folder__in=linkedin_folders)
-            total_posts += linkedin_posts.count()
-            
-            # TikTok posts
-            tiktok_folders = TikTokFolder.objects.filter(project=project)
-            tiktok_posts = TikTokPost.objects.filter(folder__in=tiktok_folders)
-            total_posts += tiktok_posts.count()
-            
-            # Track sources (accounts)
-            total_accounts = TrackSource.objects.filter(project=project).count()
-            
-            # Generated reports
-            total_reports = GeneratedReport.objects.filter(project=project).count()
-            
-            # Calculate engagement rate (simplified - could be enhanced with actual engagement data)
-            # For now, we'll use a placeholder calculation
-            engagement_rate = 3.2  # Placeholder - could be calculated from actual engagement data
-            
-            # Calculate growth rate (simplified - could be enhanced with historical data)
-            growth_rate = 5.8  # Placeholder - could be calculated from historical data
-            
+            # One UNION ALL aggregate, cached until the project's data changes
+            stats = cache_aside(
+                project_namespace(project.id), 'project_stats',
+                lambda: ProjectStatsService.get_project_stats(project.id),
+                timeout=getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300),
+            )
+            total_posts = stats['totalPosts']
+
             # Calculate storage used (simplified - could be enhanced with actual file sizes)
             # For now, we'll estimate based on number of posts
             estimated_storage_mb = total_posts * 0.5  # Estimate 0.5MB per post
@@ -264,38 +228,18 @@ class ProjectStatsView(APIView):
             max_credits = 5000
 
             stats = {
-                'totalPosts': total_posts,
-                'totalAccounts': total_accounts,
-                'totalReports': total_reports,
+                **stats,
                 'totalStorageUsed': total_storage_used,
                 'creditBalance': credit_balance,
                 'maxCredits': max_credits,
-                'engagementRate': engagement_rate,
-                'growthRate': growth_rate,
-                'platforms': {
-                    'facebook': {
-                        'posts': facebook_posts.count(),
-                        'folders': facebook_folders.count()
-                    },
-                    'instagram': {
-                        'posts': instagram_posts.count(),
-                        'folders': instagram_folders.count()
-                    },
-                    'linkedin': {
-                        'posts': linkedin_posts.count(),
-                        'folders': linkedin_folders.count()
-                    },
-                    'tiktok': {
-                        'posts': tiktok_posts.count(),
-                        'folders': tiktok_folders.count()
-                    }
-                }
             }
 
             return Response(stats)
 
         except Project.DoesNotExist:
             raise NotFound("Project not found")
+        except PermissionDenied:
+            raise
         except Exception as e:
             return Response(
                 {'error': f'Error calculating project statistics: {str(e)}'},
@@ -1166,6 +1110,30 @@ class AdminStatsView(APIView):
             'regularUsers': regular_users,
         })
 
+class AdminProfilingView(APIView):
+    """Recent request profiles (query count, DB/Python time, repeated SQL) - Superadmin only"""
+    permission_classes = [IsSuperAdmin]
+
+    def get(self, request):
+        """Per-view summary plus the most recent profiles, optionally for one view"""
+        from common.request_profiling import profile_buffer
+
+        try:
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            limit = 50
+        return Response({
+            'enabled': getattr(settings, 'REQUEST_PROFILING_ENABLED', False),
+            'summary': profile_buffer.summary(),
+            'requests': profile_buffer.snapshot(view=request.query_params.get('view'), limit=limit),
+        })
+
+    def delete(self, request):
+        from common.request_profiling import profile_buffer
+
+        profile_buffer.clear()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
 class AdminCompanyViewSet(viewsets.ModelViewSet):
     """ViewSet for admin company management - Superadmin only"""
     queryset = Company.objects.all()
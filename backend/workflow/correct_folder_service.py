@@ -1,6 +1,7 @@
 from typing import List, Dict, Any, Optional
 from django.db import transaction
 from django.utils import timezone
+from .folder_plan import FolderPlan, id_map
 from .models import ScrapingRun
 from track_accounts.models import TrackSource
 from users.models import Project
@@ -50,71 +51,87 @@ class CorrectFolderService:
             track_sources: List of TrackSource items for this run
             
         Returns:
-            Dict containing created folders
+            Dict containing created folders, and every folder id by plan key under 'folder_ids'
         """
         try:
             with transaction.atomic():
-                # Create the parent run folder
-                run_folder = self._create_run_folder(scraping_run)
+                folders = self.build_folder_plan(scraping_run, track_sources).execute()
 
                 created_folders = {
-                    'run_folder': run_folder,
+                    'run_folder': folders['run'],
                     'platform_folders': {},
                     'service_folders': {},
-                    'job_folders': {}
+                    'job_folders': {},
+                    'folder_ids': id_map(folders),
                 }
+                for key, folder in folders.items():
+                    if key[0] == 'platform':
+                        created_folders['platform_folders'][key[1]] = folder
+                    elif key[0] == 'service':
+                        created_folders['service_folders'][f"{key[1]}_{key[2]}"] = folder
+                    elif key[0] == 'job':
+                        created_folders['job_folders'][key[1]] = folder
 
-                # Group track sources by platform and service
-                by_platform: Dict[str, Dict[str, List[TrackSource]]] = {}
-                for track_source in track_sources:
-                    if not track_source.platform or not track_source.service_name:
-                        # Skip sources lacking identity
-                        logger.warning(f"TrackSource {track_source.id} missing platform/service; skipping")
-                        continue
-                    platform = track_source.platform.lower()
-                    service = track_source.service_name.lower()
-                    by_platform.setdefault(platform, {})
-                    by_platform[platform].setdefault(service, [])
-                    by_platform[platform][service].append(track_source)
+                # Maintain ServiceFolderIndex for O(1) lookups
+                self._upsert_service_folder_indexes(scraping_run, created_folders['service_folders'].values())
 
-                # For each platform, create platform folder, then service folders, then job folders
-                for platform, services_map in by_platform.items():
-                    platform_folder = self._create_platform_folder(run_folder, platform, scraping_run)
-                    created_folders['platform_folders'][platform] = platform_folder
-
-                    for service, sources in services_map.items():
-                        service_folder = self._create_service_folder(platform_folder, platform, service, scraping_run)
-                        created_folders['service_folders'][f"{platform}_{service}"] = service_folder
-
-                        # Maintain ServiceFolderIndex for O(1) lookups
-                        self._upsert_service_folder_index(scraping_run, platform, service, service_folder)
-
-                        for track_source in sources:
-                            job_folder = self._create_job_folder(service_folder, track_source, scraping_run)
-                            created_folders['job_folders'][track_source.id] = job_folder
-                
-                total_services = sum(len(services_map) for services_map in by_platform.values())
                 logger.info(
                     f"Created correct folder structure for scraping run {scraping_run.id}: "
-                    f"{len(by_platform)} platform folders, {total_services} service folders, {len(track_sources)} job folders"
+                    f"{len(created_folders['platform_folders'])} platform folders, "
+                    f"{len(created_folders['service_folders'])} service folders, "
+                    f"{len(created_folders['job_folders'])} job folders"
                 )
                 return created_folders
                 
         except Exception as e:
             logger.error(f"Error creating correct folder structure: {str(e)}")
             raise
+
+    def build_folder_plan(self, scraping_run: ScrapingRun, track_sources: List[TrackSource]) -> FolderPlan:
+        """
+        Plan the run, platform, service and job folders of a scraping run
+        without writing anything
+
+        Keys: 'run', ('platform', platform), ('service', platform, service)
+        and ('job', track_source_id).
+        """
+        from track_accounts.models import UnifiedRunFolder
+
+        plan = FolderPlan()
+        plan.add(0, 'run', UnifiedRunFolder, **self._run_folder_fields(scraping_run))
+
+        for track_source in track_sources:
+            if not track_source.platform or not track_source.service_name:
+                # Skip sources lacking identity
+                logger.warning(f"TrackSource {track_source.id} missing platform/service; skipping")
+                continue
+            platform = track_source.platform.lower()
+            service = track_source.service_name.lower()
+            platform_key = ('platform', platform)
+            service_key = ('service', platform, service)
+
+            if platform_key not in plan:
+                plan.add(1, platform_key, UnifiedRunFolder, parent='run',
+                         **self._platform_folder_fields(platform, scraping_run))
+            if service_key not in plan:
+                plan.add(2, service_key, UnifiedRunFolder, parent=platform_key,
+                         **self._service_folder_fields(platform, service, scraping_run))
+            plan.add(3, ('job', track_source.id), UnifiedRunFolder, parent=service_key,
+                     **self._job_folder_fields(track_source, scraping_run))
+
+        return plan
     
-    def _create_run_folder(self, scraping_run: ScrapingRun):
+    def _run_folder_fields(self, scraping_run: ScrapingRun) -> Dict[str, Any]:
         """
-        Create the top-level Scraping Run folder
+        Fields of the top-level Scraping Run folder
 
         Args:
             scraping_run: ScrapingRun instance
 
         Returns:
-            Single run folder that represents the entire scraping run
+            Fields of the single run folder that represents the entire scraping run
         """
-        from track_accounts.models import UnifiedRunFolder, SourceFolder
+        from track_accounts.models import SourceFolder
 
         # Get source folder names from configuration
         source_folder_names = []
@@ -142,100 +159,71 @@ class CorrectFolderService:
         name = f"{folder_base_name} - {scraping_run.created_at.strftime('%d/%m/%Y %H:%M:%S')}"
         description = f"Scraping run created on {scraping_run.created_at.strftime('%d/%m/%Y %H:%M:%S')}"
 
-        # Create a single run folder in the track_accounts app (platform-agnostic)
-        run_folder = UnifiedRunFolder.objects.create(
-            name=name,
-            description=description,
-            folder_type='run',
-            scraping_run=scraping_run,
-            project=scraping_run.project,
-            category='posts'
-        )
-
-        logger.info(f"Created unified run folder: {name}")
-        return run_folder
+        # A single run folder in the track_accounts app (platform-agnostic)
+        return {
+            'name': name,
+            'description': description,
+            'folder_type': 'run',
+            'scraping_run': scraping_run,
+            'project': scraping_run.project,
+            'category': 'posts',
+        }
     
-    def _create_service_folder(self, parent_folder, platform: str, service: str, scraping_run: ScrapingRun):
+    def _service_folder_fields(self, platform: str, service: str, scraping_run: ScrapingRun) -> Dict[str, Any]:
         """
-        Create a service folder (child of platform folder)
+        Fields of a service folder (child of platform folder)
         
         Args:
-            parent_folder: Parent platform folder
             platform: Platform name (facebook, instagram, etc.)
             service: Service name (posts, comments, etc.)
             scraping_run: ScrapingRun instance
             
         Returns:
-            UnifiedRunFolder instance for the service
+            UnifiedRunFolder fields for the service
         """
-        from track_accounts.models import UnifiedRunFolder
-        
-        # Generate service folder name
-        service_name = f"{platform.title()} - {service.title()}"
-        
-        # Map service to category
-        category = self._map_service_to_category(service)
-        
-        service_folder = UnifiedRunFolder.objects.create(
-            name=service_name,
-            description=f"Service folder for {platform} {service}",
-            category=category,
-            folder_type='service',
-            parent_folder=parent_folder,
-            project=scraping_run.project,
-            scraping_run=scraping_run,
-            platform_code=platform.lower(),
-            service_code=service.lower(),
-        )
-        
-        logger.info(f"Created service folder: {service_name}")
-        return service_folder
+        return {
+            'name': f"{platform.title()} - {service.title()}",
+            'description': f"Service folder for {platform} {service}",
+            'category': self._map_service_to_category(service),
+            'folder_type': 'service',
+            'project': scraping_run.project,
+            'scraping_run': scraping_run,
+            'platform_code': platform.lower(),
+            'service_code': service.lower(),
+        }
 
-    def _create_platform_folder(self, run_folder, platform: str, scraping_run: ScrapingRun):
+    def _platform_folder_fields(self, platform: str, scraping_run: ScrapingRun) -> Dict[str, Any]:
         """
-        Create a platform folder (child of run folder)
+        Fields of a platform folder (child of run folder)
 
         Args:
-            run_folder: Parent run folder
             platform: Platform code
             scraping_run: ScrapingRun instance
 
         Returns:
-            UnifiedRunFolder instance for the platform
+            UnifiedRunFolder fields for the platform
         """
-        from track_accounts.models import UnifiedRunFolder
-
-        platform_name = platform.title()
-        platform_folder = UnifiedRunFolder.objects.create(
-            name=platform_name,
-            description=f"Platform folder for {platform}",
-            category='posts',
-            folder_type='platform',
-            parent_folder=run_folder,
-            project=scraping_run.project,
-            scraping_run=scraping_run,
-            platform_code=platform.lower(),
-        )
-        logger.info(f"Created platform folder: {platform_name}")
-        return platform_folder
+        return {
+            'name': platform.title(),
+            'description': f"Platform folder for {platform}",
+            'category': 'posts',
+            'folder_type': 'platform',
+            'project': scraping_run.project,
+            'scraping_run': scraping_run,
+            'platform_code': platform.lower(),
+        }
     
-    def _create_job_folder(self, service_folder, track_source: TrackSource, scraping_run: ScrapingRun):
+    def _job_folder_fields(self, track_source: TrackSource, scraping_run: ScrapingRun) -> Dict[str, Any]:
         """
-        Create a job folder for a single TrackSource (child of service folder)
+        Fields of the job folder for a single TrackSource (child of service folder)
         
         Args:
-            service_folder: Parent service folder
             track_source: TrackSource instance
             scraping_run: ScrapingRun instance
             
         Returns:
-            UnifiedRunFolder instance for the job
+            UnifiedRunFolder fields for the job
         """
-        from track_accounts.models import UnifiedRunFolder
-        
-        # Generate job folder name
-        job_name = self._generate_job_folder_name(track_source)
-        
         # Get the appropriate URL for description
         platform = track_source.platform.lower()
         url = None
@@ -251,31 +239,33 @@ class CorrectFolderService:
         elif track_source.other_social_media:
             url = track_source.other_social_media
         
-        job_folder = UnifiedRunFolder.objects.create(
-            name=job_name,
-            description=f"Job output for {url or 'unknown source'}",
-            folder_type='job',
-            parent_folder=service_folder,  # Parent is the service folder
-            scraping_run=scraping_run,
-            project=scraping_run.project,
-            category=self._map_service_to_category(track_source.service_name),
-            platform_code=(track_source.platform or '').lower() or None,
-            service_code=(track_source.service_name or '').lower() or None,
-        )
-        
-        logger.info(f"Created job folder: {job_name}")
-        return job_folder
+        return {
+            'name': self._generate_job_folder_name(track_source),
+            'description': f"Job output for {url or 'unknown source'}",
+            'folder_type': 'job',
+            'scraping_run': scraping_run,
+            'project': scraping_run.project,
+            'category': self._map_service_to_category(track_source.service_name),
+            'platform_code': (track_source.platform or '').lower() or None,
+            'service_code': (track_source.service_name or '').lower() or None,
+        }
 
-    def _upsert_service_folder_index(self, scraping_run: ScrapingRun, platform: str, service: str, folder) -> None:
-        """Create or update the ServiceFolderIndex entry for this (run, platform, service)."""
+    def _upsert_service_folder_indexes(self, scraping_run: ScrapingRun, service_folders) -> None:
+        """Create or update the ServiceFolderIndex entries for the run's service folders in one statement."""
         from track_accounts.models import ServiceFolderIndex
-        ServiceFolderIndex.objects.update_or_create(
-            scraping_run=scraping_run,
-            platform_code=platform.lower(),
-            service_code=service.lower(),
-            defaults={
-                'folder': folder,
-            }
+        ServiceFolderIndex.objects.bulk_create(
+            [
+                ServiceFolderIndex(
+                    scraping_run=scraping_run,
+                    platform_code=folder.platform_code,
+                    service_code=folder.service_code,
+                    folder=folder,
+                )
+                for folder in service_folders
+            ],
+            update_conflicts=True,
+            unique_fields=['scraping_run', 'platform_code', 'service_code'],
+            update_fields=['folder'],
         )
     
     def _generate_job_folder_name(self, track_source: TrackSource) -> str:
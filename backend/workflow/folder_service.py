@@ -2,6 +2,7 @@ from typing import List, Dict, Any, Optional
 from django.db import transaction
 from django.utils import timezone
 from datetime import datetime
+from .folder_plan import FolderPlan, id_map
 from .models import ScrapingRun
 from track_accounts.models import TrackSource
 from users.models import Project
@@ -31,35 +32,24 @@ class FolderService:
             track_sources: List of TrackSource items for this run
             
         Returns:
-            Dict containing created folders organized by platform
+            Dict containing created folders organized by platform, and every
+            folder id by plan key under 'folder_ids'
         """
         try:
             with transaction.atomic():
-                # Create a single unified run folder
-                run_folder = self._create_run_folder(scraping_run)
-                
-                # Group TrackSources by platform and service
-                platform_service_groups = self._group_tracksources_by_platform_service(track_sources)
+                folders = self.build_folder_plan(scraping_run, track_sources).execute()
                 
                 created_folders = {
-                    'run_folder': run_folder,
+                    'run_folder': folders['run'],
                     'service_folders': {},
-                    'content_folders': {}
+                    'content_folders': {},
+                    'folder_ids': id_map(folders),
                 }
-                
-                # Create platform-service folders under the unified run folder
-                for (platform, service), sources in platform_service_groups.items():
-                    service_folder = self._create_service_folder(
-                        run_folder, platform, service, scraping_run
-                    )
-                    created_folders['service_folders'][f"{platform}_{service}"] = service_folder
-                    
-                    # Create content folders for each source
-                    for source in sources:
-                        content_folder = self._create_content_folder(
-                            service_folder, source, scraping_run
-                        )
-                        created_folders['content_folders'][source.id] = content_folder
+                for key, folder in folders.items():
+                    if key[0] == 'service':
+                        created_folders['service_folders'][f"{key[1]}_{key[2]}"] = folder
+                    elif key[0] == 'content':
+                        created_folders['content_folders'][key[1]] = folder
                 
                 logger.info(f"Created hierarchical folders for scraping run {scraping_run.id}")
                 return created_folders
@@ -67,85 +57,85 @@ class FolderService:
         except Exception as e:
             logger.error(f"Error creating hierarchical folders: {str(e)}")
             raise
+
+    def build_folder_plan(self, scraping_run: ScrapingRun, track_sources: List[TrackSource]) -> FolderPlan:
+        """
+        Plan the run folder, platform-service folders and content folders of a
+        scraping run without writing anything
+
+        Keys: 'run', ('service', platform, service) and ('content', track_source_id).
+        """
+        from track_accounts.models import UnifiedRunFolder
+
+        plan = FolderPlan()
+        plan.add(0, 'run', UnifiedRunFolder, **self._run_folder_fields(scraping_run))
+
+        # Platform-service folders are not parented to the run folder, which lives in a different model
+        for (platform, service), sources in self._group_tracksources_by_platform_service(track_sources).items():
+            service_key = ('service', platform, service)
+            plan.add(1, service_key, self._get_folder_model(platform),
+                     **self._service_folder_fields(platform, service, scraping_run))
+            for source in sources:
+                plan.add(2, ('content', source.id), self._get_folder_model(platform), parent=service_key,
+                         **self._content_folder_fields(source, scraping_run))
+
+        return plan
     
-    def _create_run_folder(self, scraping_run: ScrapingRun):
+    def _run_folder_fields(self, scraping_run: ScrapingRun) -> Dict[str, Any]:
         """
-        Create the top-level Scraping Run folder
+        Fields of the top-level Scraping Run folder
         
         Args:
             scraping_run: ScrapingRun instance
             
         Returns:
-            Single run folder that represents the entire scraping run
+            Fields of the single run folder that represents the entire scraping run
         """
         name = f"Scraping Run - {scraping_run.created_at.strftime('%Y-%m-%d %H:%M')}"
         description = f"Scraping run created on {scraping_run.created_at.strftime('%Y-%m-%d %H:%M')}"
         
-        # Create a single run folder in the track_accounts app (platform-agnostic)
-        from track_accounts.models import UnifiedRunFolder
-        
-        run_folder = UnifiedRunFolder.objects.create(
-            name=name,
-            description=description,
-            folder_type='run',
-            scraping_run=scraping_run,
-            project=scraping_run.project,
-            category='posts'
-        )
-        
-        logger.info(f"Created unified run folder: {name}")
-        return run_folder
+        # A single run folder in the track_accounts app (platform-agnostic)
+        return {
+            'name': name,
+            'description': description,
+            'folder_type': 'run',
+            'scraping_run': scraping_run,
+            'project': scraping_run.project,
+            'category': 'posts',
+        }
     
-    def _create_service_folder(self, parent_folder, platform: str, service: str, scraping_run: ScrapingRun):
+    def _service_folder_fields(self, platform: str, service: str, scraping_run: ScrapingRun) -> Dict[str, Any]:
         """
-        Create a platform-service folder
+        Fields of a platform-service folder
         
         Args:
-            parent_folder: Parent folder (run folder)
             platform: Platform name (facebook, instagram, etc.)
             service: Service type (posts, comments, etc.)
             scraping_run: ScrapingRun instance
             
         Returns:
-            Folder instance for the service
+            Platform Folder fields for the service
         """
-        # Get the appropriate Folder model for the platform
-        folder_model = self._get_folder_model(platform)
-        
-        name = f"{platform.title()} - {service.title()}"
-        
-        # Create service folder without parent_folder (since it's cross-platform)
-        service_folder = folder_model.objects.create(
-            name=name,
-            description=f"{platform.title()} {service} data from scraping run",
-            folder_type='service',
-            parent_folder=None,  # No parent since run folder is in different model
-            scraping_run=scraping_run,
-            project=scraping_run.project,
-            category=self._map_service_to_category(service)
-        )
-        
-        logger.info(f"Created service folder: {name}")
-        return service_folder
+        return {
+            'name': f"{platform.title()} - {service.title()}",
+            'description': f"{platform.title()} {service} data from scraping run",
+            'folder_type': 'service',
+            'scraping_run': scraping_run,
+            'project': scraping_run.project,
+            'category': self._map_service_to_category(service),
+        }
     
-    def _create_content_folder(self, parent_folder, track_source: TrackSource, scraping_run: ScrapingRun):
+    def _content_folder_fields(self, track_source: TrackSource, scraping_run: ScrapingRun) -> Dict[str, Any]:
         """
-        Create a content folder for a specific TrackSource
+        Fields of the content folder for a specific TrackSource
         
         Args:
-            parent_folder: Parent folder (service folder)
             track_source: TrackSource instance
             scraping_run: ScrapingRun instance
             
         Returns:
-            Folder instance for the content
+            Platform Folder fields for the content
         """
-        # Get the appropriate Folder model for the platform
-        folder_model = self._get_folder_model(track_source.platform.lower())
-        
-        # Generate folder name from TrackSource
-        folder_name = self._generate_content_folder_name(track_source)
-        
         # Get the appropriate URL for description
         platform = track_source.platform.lower()
         url = None
@@ -161,18 +151,14 @@ class FolderService:
         elif track_source.other_social_media:
             url = track_source.other_social_media
         
-        content_folder = folder_model.objects.create(
-            name=folder_name,
-            description=f"Content from {url or 'unknown source'}",
-            folder_type='content',
-            parent_folder=parent_folder,
-            scraping_run=scraping_run,
-            project=scraping_run.project,
-            category=self._map_service_to_category(track_source.service_name)
-        )
-        
-        logger.info(f"Created content folder: {folder_name}")
-        return content_folder
+        return {
+            'name': self._generate_content_folder_name(track_source),
+            'description': f"Content from {url or 'unknown source'}",
+            'folder_type': 'content',
+            'scraping_run': scraping_run,
+            'project': scraping_run.project,
+            'category': self._map_service_to_category(track_source.service_name),
+        }
     
     def _group_tracksources_by_platform_service(self, track_sources: List[TrackSource]) -> Dict[tuple, List[TrackSource]]:
         """
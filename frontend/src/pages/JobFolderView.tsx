@@ -29,6 +29,20 @@ import {
 import { apiFetch } from '../utils/api';
 import UniversalDataDisplay, { UniversalFolder, UniversalDataItem } from '../components/UniversalDataDisplay';
 
+// Result endpoints return one page per request. The first page is rendered
+// right away and the following ones are read on demand via next_cursor; only
+// the columns this view shows are requested, and only the first page is counted
+const RESULTS_PAGE_SIZE = 100;
+const RESULTS_FIELDS = 'post_id,url,user_posted,content,likes,num_comments,date_posted,created_at';
+
+const resultsPageUrl = (path: string, cursor?: string) => {
+  const params = new URLSearchParams({ page_size: String(RESULTS_PAGE_SIZE), fields: RESULTS_FIELDS });
+  if (cursor) params.set('cursor', cursor);
+  return `${path}${path.includes('?') ? '&' : '?'}${params}`;
+};
+
+const fetchResults = (path: string) => apiFetch(resultsPageUrl(path));
+
 interface JobFolder {
   id: number;
   name: string;
@@ -69,6 +83,42 @@ interface Post {
   is_verified?: boolean;
 }
 
+// Result rows as posts; index continues across pages so ids stay unique
+const resultItemToPost = (item: any, index: number): Post => ({
+  id: index + 1,
+  post_id: item.post_id || item.shortcode || item.id || `post_${index}`,
+  url: item.url || item.post_url || item.link || '',
+  user_posted: item.user_posted || item.user_username || item.username || item.ownerUsername || item.user || 'Unknown',
+  content: item.content || item.caption || item.description || item.text || '',
+  description: item.content || item.caption || item.description || item.text || '',
+  likes: parseInt(item.likes || item.likes_count || item.likesCount || '0') || 0,
+  num_comments: parseInt(item.num_comments || item.comments_count || item.commentsCount || item.comments || '0') || 0,
+  date_posted: item.date_posted || item.timestamp || item.date || new Date().toISOString(),
+  created_at: item.date_posted || item.timestamp || new Date().toISOString(),
+  is_verified: item.is_verified || false
+});
+
+// Older BrightData payloads name their columns after the Instagram API
+const legacyResultItemToPost = (item: any, index: number): Post => ({
+  id: index + 1,
+  post_id: item.post_id || item.shortcode || item.id || `post_${index}`,
+  url: item.url || item.post_url || item.link || '',
+  user_posted: item.user_username || item.username || item.ownerUsername || item.user || 'Unknown',
+  content: item.caption || item.description || item.text || item.content || '',
+  description: item.caption || item.description || item.text || '',
+  likes: parseInt(item.likes_count || item.likesCount || item.likes || '0') || 0,
+  num_comments: parseInt(item.comments_count || item.commentsCount || item.comments || '0') || 0,
+  date_posted: item.timestamp || item.date_posted || item.date || new Date().toISOString(),
+  created_at: item.timestamp || item.date_posted || new Date().toISOString(),
+  is_verified: item.is_verified || false
+});
+
+interface ResultPages {
+  path: string;
+  cursor: string;
+  toPost: (item: any, index: number) => Post;
+}
+
 // Data adapter to convert posts to UniversalDataItem format
 const postToUniversalData = (posts: Post[]): UniversalDataItem[] => {
   return posts.map(post => ({
@@ -158,6 +208,37 @@ const JobFolderView = () => {
   const [jobStatus, setJobStatus] = useState<{status: string, message: string} | null>(null);
   const [downloading, setDownloading] = useState<{csv: boolean, json: boolean}>({csv: false, json: false});
   const [actualBatchJobId, setActualBatchJobId] = useState<number | null>(null);
+  const [morePages, setMorePages] = useState<ResultPages | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+
+  // First page of a results endpoint; remembers where the next page starts
+  const readFirstResultPage = async (response: Response, path: string, toPost = resultItemToPost) => {
+    const results = await response.json();
+    setMorePages(results.next_cursor ? { path, cursor: results.next_cursor, toPost } : null);
+    return results;
+  };
+
+  const loadMorePosts = async () => {
+    if (!morePages) return;
+    setLoadingMore(true);
+    try {
+      const response = await apiFetch(resultsPageUrl(morePages.path, morePages.cursor));
+      if (!response.ok) {
+        throw new Error(`Failed to load results page from ${morePages.path}: ${response.status}`);
+      }
+      const page = await response.json();
+      setPosts(prev => [
+        ...prev,
+        ...(page.data || []).map((item: any, index: number) => morePages.toPost(item, prev.length + index))
+      ]);
+      setMorePages(page.next_cursor ? { ...morePages, cursor: page.next_cursor } : null);
+    } catch (err) {
+      console.error('Error loading more results:', err);
+      setError('Failed to load more posts. Please try again.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
 
   // Download functions
   const downloadData = async (format: 'csv' | 'json') => {
@@ -218,6 +299,7 @@ const JobFolderView = () => {
   const fetchJobData = async () => {
     setLoading(true);
     setError(null);
+    setMorePages(null);
 
     try {
       // 🚨 HARD OVERRIDE FOR JOB%203/1 URL PATTERN 🚨
@@ -239,26 +321,15 @@ const JobFolderView = () => {
             // 🎯 WEBHOOK-BASED DATA LOADING: No polling, wait for webhook delivery
             console.log('🎯 Using webhook-based data loading - checking for delivered results');
             
-            const response = await apiFetch(`/api/brightdata/webhook-results/${folderNameRaw}/${scrapeNum}/`);
+            const webhookResultsPath = `/api/brightdata/webhook-results/${folderNameRaw}/${scrapeNum}/`;
+            const response = await fetchResults(webhookResultsPath);
             if (response.ok) {
-              const data = await response.json();
+              const data = await readFirstResultPage(response, webhookResultsPath);
               console.log('🎯 WEBHOOK DATA SUCCESS:', data);
               
               if (data.success && data.data && data.data.length > 0) {
                 // Transform the webhook-delivered data
-                const transformedPosts: Post[] = data.data.map((item: any, index: number) => ({
-                  id: index + 1,
-                  post_id: item.post_id || item.shortcode || item.id || `post_${index}`,
-                  url: item.url || item.post_url || item.link || '',
-                  user_posted: item.user_posted || item.user_username || item.username || item.ownerUsername || item.user || 'Unknown',
-                  content: item.content || item.caption || item.description || item.text || '',
-                  description: item.content || item.caption || item.description || item.text || '',
-                  likes: parseInt(item.likes || item.likes_count || item.likesCount || '0') || 0,
-                  num_comments: parseInt(item.num_comments || item.comments_count || item.commentsCount || item.comments || '0') || 0,
-                  date_posted: item.date_posted || item.timestamp || item.date || new Date().toISOString(),
-                  created_at: item.date_posted || item.timestamp || new Date().toISOString(),
-                  is_verified: item.is_verified || false
-                }));
+                const transformedPosts: Post[] = data.data.map(resultItemToPost);
                 
                 setPosts(transformedPosts);
                 
@@ -290,10 +361,11 @@ const JobFolderView = () => {
         // 🎯 WEBHOOK-BASED: Use webhook-results endpoint instead of polling
         try {
           console.log(`🎯 Checking webhook-delivered results for run: ${runId}`);
-          const runDataResponse = await apiFetch(`/api/brightdata/webhook-results/run/${runId}/`);
+          const runResultsPath = `/api/brightdata/webhook-results/run/${runId}/`;
+          const runDataResponse = await fetchResults(runResultsPath);
           
           if (runDataResponse.ok) {
-            const runResults = await runDataResponse.json();
+            const runResults = await readFirstResultPage(runDataResponse, runResultsPath);
             console.log('✅ Direct run data received:', runResults);
             
             // 🚨 BRIGHTDATA INTEGRATION: Handle successful scrapers with no linked data
@@ -326,19 +398,7 @@ const JobFolderView = () => {
             
             if (runResults.success && runResults.data && runResults.data.length > 0) {
               // Transform and set posts directly
-              const transformedPosts: Post[] = runResults.data.map((item: any, index: number) => ({
-                id: index + 1,
-                post_id: item.post_id || item.shortcode || item.id || `post_${index}`,
-                url: item.url || item.post_url || item.link || '',
-                user_posted: item.user_posted || item.user_username || item.username || item.ownerUsername || item.user || 'Unknown',
-                content: item.content || item.caption || item.description || item.text || '',
-                description: item.content || item.caption || item.description || item.text || '',
-                likes: parseInt(item.likes || item.likes_count || item.likesCount || '0') || 0,
-                num_comments: parseInt(item.num_comments || item.comments_count || item.commentsCount || item.comments || '0') || 0,
-                date_posted: item.date_posted || item.timestamp || item.date || new Date().toISOString(),
-                created_at: item.date_posted || item.timestamp || new Date().toISOString(),
-                is_verified: item.is_verified || false
-              }));
+              const transformedPosts: Post[] = runResults.data.map(resultItemToPost);
               
               setPosts(transformedPosts);
               
@@ -351,7 +411,7 @@ const JobFolderView = () => {
                 category_display: 'Posts',
                 platform: 'instagram',
                 folder_type: 'job',
-                post_count: transformedPosts.length,
+                post_count: runResults.total_results ?? transformedPosts.length,
                 created_at: new Date().toISOString()
               };
               
@@ -374,7 +434,7 @@ const JobFolderView = () => {
               
               setJobStatus({
                 status: 'completed',
-                message: `✅ Successfully loaded ${transformedPosts.length} posts from Run ${runId}`
+                message: `✅ Successfully loaded ${runResults.total_results ?? transformedPosts.length} posts from Run ${runId}`
               });
               
               setLoading(false);
@@ -395,26 +455,15 @@ const JobFolderView = () => {
           // 🚨 PRODUCTION FIX: Fallback to job-results endpoint
           console.log(`🔄 Trying fallback: /api/brightdata/job-results/${runId}/`);
           try {
-            const jobResultsResponse = await apiFetch(`/api/brightdata/job-results/${runId}/`);
+            const jobResultsPath = `/api/brightdata/job-results/${runId}/`;
+            const jobResultsResponse = await fetchResults(jobResultsPath);
             if (jobResultsResponse.ok) {
-              const jobResults = await jobResultsResponse.json();
+              const jobResults = await readFirstResultPage(jobResultsResponse, jobResultsPath);
               console.log('✅ Job results fallback successful:', jobResults);
               
               if (jobResults.success && jobResults.data && jobResults.data.length > 0) {
                 // Transform and set posts directly from job-results format
-                const transformedPosts: Post[] = jobResults.data.map((item: any, index: number) => ({
-                  id: index + 1,
-                  post_id: item.post_id || item.shortcode || item.id || `post_${index}`,
-                  url: item.url || item.post_url || item.link || '',
-                  user_posted: item.user_posted || item.user_username || item.username || item.ownerUsername || item.user || 'Unknown',
-                  content: item.content || item.caption || item.description || item.text || '',
-                  description: item.content || item.caption || item.description || item.text || '',
-                  likes: parseInt(item.likes || item.likes_count || item.likesCount || '0') || 0,
-                  num_comments: parseInt(item.num_comments || item.comments_count || item.commentsCount || item.comments || '0') || 0,
-                  date_posted: item.date_posted || item.timestamp || item.date || new Date().toISOString(),
-                  created_at: item.date_posted || item.timestamp || new Date().toISOString(),
-                  is_verified: item.is_verified || false
-                }));
+                const transformedPosts: Post[] = jobResults.data.map(resultItemToPost);
                 
                 setPosts(transformedPosts);
                 
@@ -427,7 +476,7 @@ const JobFolderView = () => {
                   category_display: 'Posts',
                   platform: 'instagram',
                   folder_type: 'job',
-                  post_count: transformedPosts.length,
+                  post_count: jobResults.total_results ?? transformedPosts.length,
                   created_at: new Date().toISOString()
                 };
                 
@@ -450,7 +499,7 @@ const JobFolderView = () => {
                 
                 setJobStatus({
                   status: 'completed',
-                  message: `✅ Successfully loaded ${transformedPosts.length} posts from Run ${runId} (via job-results)`
+                  message: `✅ Successfully loaded ${jobResults.total_results ?? transformedPosts.length} posts from Run ${runId} (via job-results)`
                 });
                 
                 setLoading(false);
@@ -490,28 +539,17 @@ const JobFolderView = () => {
         
         // 🎯 WEBHOOK-BASED: Use webhook-results endpoint for delivered data
         console.log(`🎯 Checking webhook-delivered results: ${encodeURIComponent(decodedFolderName)}/${finalScrapeNumber}`);
-        const brightDataResponse = await apiFetch(`/api/brightdata/webhook-results/${encodeURIComponent(decodedFolderName)}/${finalScrapeNumber}/`);
+        const brightDataPath = `/api/brightdata/webhook-results/${encodeURIComponent(decodedFolderName)}/${finalScrapeNumber}/`;
+        const brightDataResponse = await fetchResults(brightDataPath);
         
         if (brightDataResponse.ok) {
-          const brightDataResults = await brightDataResponse.json();
+          const brightDataResults = await readFirstResultPage(brightDataResponse, brightDataPath);
           console.log('BrightData results from human-friendly endpoint:', brightDataResults);
           
           // Process the results
           if (brightDataResults.success && brightDataResults.data && brightDataResults.data.length > 0) {
             // Transform and set posts
-            const transformedPosts: Post[] = brightDataResults.data.map((item: any, index: number) => ({
-              id: index + 1,
-              post_id: item.post_id || item.shortcode || item.id || `post_${index}`,
-              url: item.url || item.post_url || item.link || '',
-              user_posted: item.user_posted || item.user_username || item.username || item.ownerUsername || item.user || 'Unknown',
-              content: item.content || item.caption || item.description || item.text || '',
-              description: item.content || item.caption || item.description || item.text || '',
-              likes: parseInt(item.likes || item.likes_count || item.likesCount || '0') || 0,
-              num_comments: parseInt(item.num_comments || item.comments_count || item.commentsCount || item.comments || '0') || 0,
-              date_posted: item.date_posted || item.timestamp || item.date || new Date().toISOString(),
-              created_at: item.date_posted || item.timestamp || new Date().toISOString(),
-              is_verified: item.is_verified || false
-            }));
+            const transformedPosts: Post[] = brightDataResults.data.map(resultItemToPost);
             
             setPosts(transformedPosts);
             
@@ -524,7 +562,7 @@ const JobFolderView = () => {
               category_display: 'Posts',
               platform: 'instagram',
               folder_type: 'job',
-              post_count: transformedPosts.length,
+              post_count: brightDataResults.total_results ?? transformedPosts.length,
               created_at: new Date().toISOString()
             };
             
@@ -575,31 +613,21 @@ const JobFolderView = () => {
       }
 
         // 🎯 WEBHOOK-BASED: Try webhook-results first, then fallback to old endpoint
-        let brightDataResponse = await apiFetch(`/api/brightdata/webhook-results/${encodeURIComponent(fallbackFolderName)}/${fallbackScrapeNumber}/`);
+        let brightDataPath = `/api/brightdata/webhook-results/${encodeURIComponent(fallbackFolderName)}/${fallbackScrapeNumber}/`;
+        let brightDataResponse = await fetchResults(brightDataPath);
       if (!brightDataResponse.ok) {
         console.log('🎯 Webhook results not available, trying fallback endpoint...');
-        brightDataResponse = await apiFetch(`/api/brightdata/webhook-results/job/${folderId}/`);
+        brightDataPath = `/api/brightdata/webhook-results/job/${folderId}/`;
+        brightDataResponse = await fetchResults(brightDataPath);
       }
       
       if (brightDataResponse.ok) {
-        const brightDataResults = await brightDataResponse.json();
+        const brightDataResults = await readFirstResultPage(brightDataResponse, brightDataPath, legacyResultItemToPost);
         console.log('BrightData results:', brightDataResults);
         
         if (brightDataResults.success && brightDataResults.data.length > 0) {
           // We have BrightData results! Transform them to our format
-          const transformedPosts: Post[] = brightDataResults.data.map((item: any, index: number) => ({
-            id: index + 1,
-            post_id: item.post_id || item.shortcode || item.id || `post_${index}`,
-            url: item.url || item.post_url || item.link || '',
-            user_posted: item.user_username || item.username || item.ownerUsername || item.user || 'Unknown',
-            content: item.caption || item.description || item.text || item.content || '',
-            description: item.caption || item.description || item.text || '',
-            likes: parseInt(item.likes_count || item.likesCount || item.likes || '0') || 0,
-            num_comments: parseInt(item.comments_count || item.commentsCount || item.comments || '0') || 0,
-            date_posted: item.timestamp || item.date_posted || item.date || new Date().toISOString(),
-            created_at: item.timestamp || item.date_posted || new Date().toISOString(),
-            is_verified: item.is_verified || false
-          }));
+          const transformedPosts: Post[] = brightDataResults.data.map(legacyResultItemToPost);
           
           setPosts(transformedPosts);
           
@@ -612,7 +640,7 @@ const JobFolderView = () => {
             category_display: 'Posts',
             platform: 'instagram',
             folder_type: 'job',
-            post_count: transformedPosts.length,
+            post_count: brightDataResults.total_results ?? transformedPosts.length,
             created_at: new Date().toISOString()
           };
           
@@ -635,7 +663,7 @@ const JobFolderView = () => {
           
           setJobStatus({
             status: 'completed',
-            message: `Successfully loaded ${transformedPosts.length} posts from BrightData`
+            message: `Successfully loaded ${brightDataResults.total_results ?? transformedPosts.length} posts from BrightData`
           });
           
           setLoading(false);
@@ -687,9 +715,10 @@ const JobFolderView = () => {
       if (jobFolderData.folder_type === 'service' && jobFolderData.post_count > 0) {
         try {
           console.log('Trying BrightData integration for service folder...');
-          const brightDataResponse = await apiFetch(`/api/brightdata/job-results/${folderId}/`);
+          const jobResultsPath = `/api/brightdata/job-results/${folderId}/`;
+          const brightDataResponse = await fetchResults(jobResultsPath);
           if (brightDataResponse.ok) {
-            const brightDataResult = await brightDataResponse.json();
+            const brightDataResult = await readFirstResultPage(brightDataResponse, jobResultsPath, (item: any) => item);
             if (brightDataResult.success && brightDataResult.total_results > 0) {
               console.log('Found BrightData posts:', brightDataResult.total_results);
               // Use BrightData posts
@@ -1103,6 +1132,20 @@ const JobFolderView = () => {
            </Box>
          ) : null}
 
+         {/* Further result pages are read on demand */}
+         {calculatedStats && morePages && (
+           <Box display="flex" justifyContent="center" sx={{ mt: 2 }}>
+             <Button
+               variant="outlined"
+               onClick={loadMorePosts}
+               disabled={loadingMore}
+               startIcon={loadingMore ? <CircularProgress size={16} /> : undefined}
+             >
+               {loadingMore ? 'Loading...' : `Load more posts (${posts.length} loaded)`}
+             </Button>
+           </Box>
+         )}
+
         {/* Job Details (Collapsible) */}
         {scraperRequests.length > 0 && (
           <Paper sx={{ p: 3, mt: 3 }}>